@@ -32,6 +32,7 @@ class Settings(BaseSettings):
 
     # Redis
     redis_url: str = "redis://localhost:6379/1"
+    job_progress_min_interval_seconds: float = 0.5  # Progress-only job updates are coalesced to one write per interval
 
     # Database (Supabase PostgreSQL for direct updates)
     database_url: str = ""  # PostgreSQL connection string
@@ -41,6 +42,32 @@ class Settings(BaseSettings):
     aws_secret_access_key: str = ""
     aws_region: str = "ap-northeast-2"  # Seoul region
     aws_s3_bucket: str = "hydra-assets-seoul"
+    aws_s3_endpoint_url: str = ""  # S3-compatible endpoint (MinIO, moto server); empty = AWS
+
+    # Object store client (one async HTTP connection pool per process, shared by S3/GCS/HTTP)
+    object_store_download_connections: int = 16  # Concurrent download requests (asset fetches, ranged GETs)
+    object_store_upload_connections: int = 8  # Concurrent upload requests (parts, PUTs), separate from downloads
+    object_store_connect_timeout: float = 10.0  # Seconds
+    object_store_read_timeout: float = 60.0  # Seconds without data before a request fails
+    object_store_local_root: str = os.path.join(tempfile.gettempdir(), "compose-object-store")  # Root of file:// objects
+
+    # Asset downloads (streamed, hashed, resumable)
+    download_max_retries: int = 3  # Attempts per download (HTTP resumes with Range) or per S3 part
+    download_ranged_threshold_mb: int = 16  # S3 objects at least this big use parallel ranged GETs
+    download_part_size_mb: int = 8  # Bytes per ranged GET
+    download_part_concurrency: int = 4  # Ranged GETs in flight per download
+
+    # Output uploads (multipart, parallel)
+    upload_part_size_mb: int = 8  # Bytes per multipart part (S3 minimum is 5MB); smaller files use one PUT
+    upload_concurrency: int = 4  # Parts in flight per upload
+    upload_max_retries: int = 3  # Attempts per part
+    upload_while_encoding: bool = False  # Fused renders write fragmented MP4 and upload parts while FFmpeg encodes
+
+    # Downloaded asset cache (node-local, content-addressed, can be a shared volume)
+    asset_cache_enabled: bool = True
+    asset_cache_dir: str = os.path.join(tempfile.gettempdir(), "compose-asset-cache")
+    asset_cache_max_bytes: int = 4 * 1024 * 1024 * 1024  # 4GB on disk
+    asset_cache_revalidate_seconds: float = 3600.0  # Older entries are checked against the current ETag before reuse
 
     # Google Custom Search
     google_search_api_key: str = ""
@@ -57,6 +84,55 @@ class Settings(BaseSettings):
     default_fps: int = 30
     default_video_codec: str = "libx264"
     default_audio_codec: str = "aac"
+    render_mode: str = "fused"  # "fused" (one FFmpeg pass per job) or "multi_step"
+    render_plan_dump_dir: str = ""  # Write each job's render plan JSON here (debugging)
+    xfade_group_size: int = 8  # Longer xfade sequences are rendered as a tree of groups
+
+    # Audio analysis cache (content-addressed, shared by all analyzers)
+    analysis_cache_dir: str = os.path.join(tempfile.gettempdir(), "compose-analysis-cache")
+    analysis_cache_max_bytes: int = 256 * 1024 * 1024  # 256MB on disk
+    analysis_cache_memory_entries: int = 64
+    analysis_cache_redis_url: str = ""  # Optional shared tier, e.g. redis://host:6379/2
+
+    # Audio analysis executor (keeps librosa off the event loop)
+    analysis_workers: int = 2        # Worker processes (0 = in-process thread)
+    analysis_queue_size: int = 8     # Jobs allowed to wait beyond the running ones
+    analysis_timeout: float = 60.0   # Seconds, including time spent queued
+
+    # Overlay effect textures (light leaks, flares, vignette masks, ...)
+    overlay_texture_cache_bytes: int = 512 * 1024 * 1024  # 512MB in memory
+
+    # GL transitions (headless OpenGL; both platforms fall back to Mesa on CPU)
+    gl_platform: str = "osmesa"  # "osmesa" or "egl"; PYOPENGL_PLATFORM wins if set
+    gl_texture_cache_size: int = 8  # Image textures kept uploaded between transitions
+
+    # Encoded Ken Burns clip cache (content-addressed, can be a shared volume)
+    clip_cache_enabled: bool = True
+    clip_cache_dir: str = os.path.join(tempfile.gettempdir(), "compose-clip-cache")
+    clip_cache_max_bytes: int = 2 * 1024 * 1024 * 1024  # 2GB on disk
+    clip_encode_batch_size: int = 6  # Clips per FFmpeg process (1 = one process per clip)
+
+    # Process-wide FFmpeg scheduler (limits shared by all render jobs)
+    ffmpeg_max_processes: int = 0         # Concurrent CPU FFmpeg processes (0 = half the cores)
+    ffmpeg_nvenc_sessions: int = 8        # Concurrent NVENC sessions (encoders, not processes)
+    ffmpeg_max_load_per_cpu: float = 1.5  # Hold new processes while 1-min load per core is above this
+    ffmpeg_min_free_memory_mb: int = 512  # Hold new processes while available memory is below this
+
+    # Media probe cache (ffprobe results keyed by path, mtime and size)
+    probe_cache_entries: int = 1024
+    probe_batch_concurrency: int = 8  # ffprobe processes per probe_many() call
+
+    # Render admission queue (priority + per-tenant fair share)
+    render_queue_aging_seconds: float = 300.0  # Waiting this long promotes a job one priority level (0 disables)
+    render_queue_history_size: int = 50  # Finished jobs per kind used for ETA estimates
+    render_default_duration_seconds: float = 60.0  # ETA estimate before any job has finished
+
+    # Durable work queue (Redis Streams) and render workers (python -m app.worker)
+    work_visibility_timeout_seconds: float = 120.0  # Unrefreshed work is reclaimed by another worker after this
+    work_max_attempts: int = 3  # Attempts before work goes to the dead-letter stream
+    worker_prefetch: int = 2  # Extra jobs a worker holds beyond max_concurrent_jobs (queued in the render queue)
+    worker_shutdown_grace_seconds: float = 60.0  # Time running jobs get to finish on SIGTERM
+    embedded_worker: bool = False  # Also run a worker in the API process (always on without Redis)
 
     # Modal serverless settings
     modal_enabled: bool = False  # Set to True to enable Modal cloud rendering
@@ -1,13 +1,17 @@
 """FastAPI dependencies for Compose Engine."""
 
-import asyncio
 from .utils.job_queue import JobQueue
+from .utils.render_queue import RenderQueue
+from .utils.work_queue import WorkQueue
 
 # Global job queue instance - set by main.py lifespan
 _job_queue: JobQueue = None
 
-# Semaphore for controlling concurrent render jobs
-_render_semaphore: asyncio.Semaphore = None
+# Priority queue controlling concurrent render jobs
+_render_queue: RenderQueue = None
+
+# Durable work queue the API hands render jobs to
+_work_queue: WorkQueue = None
 
 
 def set_job_queue(queue: JobQueue):
@@ -21,12 +25,33 @@ def get_job_queue() -> JobQueue:
     return _job_queue
 
 
-def init_render_semaphore(max_concurrent: int):
-    """Initialize the render semaphore with max concurrent jobs."""
-    global _render_semaphore
-    _render_semaphore = asyncio.Semaphore(max_concurrent)
+def set_work_queue(queue: WorkQueue):
+    """Set the global work queue instance (called during app startup)."""
+    global _work_queue
+    _work_queue = queue
+
+
+def get_work_queue() -> WorkQueue:
+    """Get the global work queue instance."""
+    return _work_queue
+
+
+def init_render_queue(max_concurrent: int) -> RenderQueue:
+    """Initialize the render admission queue with max concurrent jobs."""
+    from .config import get_settings
+    global _render_queue
+    settings = get_settings()
+    _render_queue = RenderQueue(
+        max_concurrent,
+        aging_seconds=settings.render_queue_aging_seconds,
+        history_size=settings.render_queue_history_size,
+        default_duration=settings.render_default_duration_seconds,
+    )
+    if _job_queue:
+        _job_queue.render_queue = _render_queue
+    return _render_queue
 
 
-def get_render_semaphore() -> asyncio.Semaphore:
-    """Get the render semaphore for concurrency control."""
-    return _render_semaphore
+def get_render_queue() -> RenderQueue:
+    """Get the render admission queue for concurrency control."""
+    return _render_queue
@@ -4,6 +4,10 @@ from moviepy import VideoClip
 import numpy as np
 import os
 
+from ..utils.color_lut import ColorLUT, export_cube, get_color_lut
+from .particles import create_particle_field
+from .texture_bank import get_texture_bank
+
 # Try to import cupy for GPU acceleration
 try:
     import cupy as cp
@@ -22,21 +26,39 @@ def apply_color_grade(
 ) -> VideoClip:
     """
     Apply color grading to a video clip.
-    Uses GPU (cupy) when available for faster processing.
+
+    Each grade is compiled once into a 3D LUT, so every frame is a single
+    table lookup instead of per-frame float math.
     """
-    if grade == "vibrant":
-        return _apply_vibrant(video)
-    elif grade == "cinematic":
-        return _apply_cinematic(video)
-    elif grade == "bright":
-        return _apply_bright(video)
-    elif grade == "moody":
-        return _apply_moody(video)
-    elif grade == "bw":
-        return _apply_bw(video)
-    else:  # natural
+    if grade not in COLOR_GRADE_TRANSFORMS:  # natural
         return video
 
+    lut = get_grade_lut(grade)
+
+    def process_frame(frame):
+        return lut.apply(frame)
+
+    return video.image_transform(process_frame)
+
+
+def get_grade_lut(grade: str) -> ColorLUT:
+    """Get the compiled 3D LUT for a color grade."""
+    return get_color_lut(_grade_lut_key(grade), _grade_fn(grade))
+
+
+def export_grade_cube(grade: str, cube_dir: str) -> str:
+    """Export a color grade's LUT as a .cube file for FFmpeg's lut3d filter."""
+    return export_cube(_grade_lut_key(grade), _grade_fn(grade), cube_dir)
+
+
+def _grade_lut_key(grade: str) -> str:
+    return f"filters.v{GRADE_VERSION}.{grade}"
+
+
+def _grade_fn(grade: str):
+    transform = COLOR_GRADE_TRANSFORMS[grade]
+    return lambda chunk: _gpu_process(chunk, transform)
+
 
 def _gpu_process(frame: np.ndarray, transform_fn) -> np.ndarray:
     """Process frame on GPU if available, else CPU.
@@ -67,100 +89,86 @@ def _gpu_process(frame: np.ndarray, transform_fn) -> np.ndarray:
         return transform_fn(frame.astype(np.float32), np).astype(np.uint8)
 
 
-def _apply_vibrant(video: VideoClip) -> VideoClip:
+def _vibrant_transform(frame, xp):
     """Increase saturation and contrast."""
-    def transform(frame, xp):
-        gray = xp.mean(frame, axis=2, keepdims=True)
-        frame = gray + 1.3 * (frame - gray)
-        return xp.clip(frame, 0, 255)
-
-    def process_frame(frame):
-        return _gpu_process(frame, transform)
-
-    return video.image_transform(process_frame)
+    gray = xp.mean(frame, axis=2, keepdims=True)
+    frame = gray + 1.3 * (frame - gray)
+    return xp.clip(frame, 0, 255)
 
 
-def _apply_cinematic(video: VideoClip) -> VideoClip:
+def _cinematic_transform(frame, xp):
     """Apply cinematic color grading (orange/teal look)."""
-    def transform(frame, xp):
-        # Lift shadows (blue tint)
-        frame[:, :, 0] = xp.clip(frame[:, :, 0] * 0.95, 0, 255)  # Red
-        frame[:, :, 2] = xp.clip(frame[:, :, 2] * 1.05, 0, 255)  # Blue
-        # Slight desaturation
-        gray = xp.mean(frame, axis=2, keepdims=True)
-        frame = gray + 0.9 * (frame - gray)
-        # Add slight contrast
-        frame = (frame - 128) * 1.1 + 128
-        return xp.clip(frame, 0, 255)
-
-    def process_frame(frame):
-        return _gpu_process(frame, transform)
-
-    return video.image_transform(process_frame)
-
-
-def _apply_bright(video: VideoClip) -> VideoClip:
+    # Lift shadows (blue tint)
+    frame[:, :, 0] = xp.clip(frame[:, :, 0] * 0.95, 0, 255)  # Red
+    frame[:, :, 2] = xp.clip(frame[:, :, 2] * 1.05, 0, 255)  # Blue
+    # Slight desaturation
+    gray = xp.mean(frame, axis=2, keepdims=True)
+    frame = gray + 0.9 * (frame - gray)
+    # Add slight contrast
+    frame = (frame - 128) * 1.1 + 128
+    return xp.clip(frame, 0, 255)
+
+
+def _bright_transform(frame, xp):
     """Brighten the video."""
-    def transform(frame, xp):
-        frame = frame * 1.1 + 10
-        return xp.clip(frame, 0, 255)
-
-    def process_frame(frame):
-        return _gpu_process(frame, transform)
-
-    return video.image_transform(process_frame)
+    frame = frame * 1.1 + 10
+    return xp.clip(frame, 0, 255)
 
 
-def _apply_moody(video: VideoClip) -> VideoClip:
+def _moody_transform(frame, xp):
     """Apply moody/dark color grading (low saturation, darker, blue shadows)."""
-    def transform(frame, xp):
-        # Darken overall
-        frame = frame * 0.85
-        # Add blue tint to shadows
-        frame[:, :, 2] = xp.clip(frame[:, :, 2] * 1.1, 0, 255)
-        # Desaturate
-        gray = xp.mean(frame, axis=2, keepdims=True)
-        frame = gray + 0.7 * (frame - gray)
-        # Increase contrast slightly
-        frame = (frame - 128) * 1.15 + 128
-        return xp.clip(frame, 0, 255)
-
-    def process_frame(frame):
-        return _gpu_process(frame, transform)
-
-    return video.image_transform(process_frame)
-
-
-def _apply_bw(video: VideoClip) -> VideoClip:
+    # Darken overall
+    frame = frame * 0.85
+    # Add blue tint to shadows
+    frame[:, :, 2] = xp.clip(frame[:, :, 2] * 1.1, 0, 255)
+    # Desaturate
+    gray = xp.mean(frame, axis=2, keepdims=True)
+    frame = gray + 0.7 * (frame - gray)
+    # Increase contrast slightly
+    frame = (frame - 128) * 1.15 + 128
+    return xp.clip(frame, 0, 255)
+
+
+def _bw_transform(frame, xp):
     """Convert to black and white."""
-    def transform(frame, xp):
-        gray = xp.mean(frame, axis=2, keepdims=True)
-        return xp.broadcast_to(gray, frame.shape)
-
-    def process_frame(frame):
-        return _gpu_process(frame, transform)
-
-    return video.image_transform(process_frame)
+    gray = xp.mean(frame, axis=2, keepdims=True)
+    return xp.broadcast_to(gray, frame.shape)
+
+
+# Per-pixel grade math, compiled into LUTs by get_grade_lut.
+# Bump GRADE_VERSION when any transform changes.
+GRADE_VERSION = 1
+COLOR_GRADE_TRANSFORMS = {
+    "vibrant": _vibrant_transform,
+    "cinematic": _cinematic_transform,
+    "bright": _bright_transform,
+    "moody": _moody_transform,
+    "bw": _bw_transform,
+}
 
 
 def apply_vignette(video: VideoClip, strength: float = 0.3) -> VideoClip:
     """Apply vignette effect."""
     def process_frame(frame):
         h, w = frame.shape[:2]
-        # Create vignette mask
-        x = np.linspace(-1, 1, w)
-        y = np.linspace(-1, 1, h)
-        X, Y = np.meshgrid(x, y)
-        mask = 1 - strength * (X**2 + Y**2)
-        mask = np.clip(mask, 0, 1)
-        mask = np.stack([mask] * 3, axis=2)
-
-        frame = frame.astype(np.float32) * mask
-        return np.clip(frame, 0, 255).astype(np.uint8)
+        mask = get_texture_bank().get(
+            "vignette", w, h, lambda: _generate_vignette(w, h, strength), variant=strength
+        )
+        # mask is within 0-1, so the product needs no clipping
+        return (frame * mask).astype(np.uint8)
 
     return video.image_transform(process_frame)
 
 
+def _generate_vignette(w: int, h: int, strength: float) -> np.ndarray:
+    """Generate a vignette mask (h, w, 1)."""
+    x = np.linspace(-1, 1, w)
+    y = np.linspace(-1, 1, h)
+    X, Y = np.meshgrid(x, y)
+    mask = 1 - strength * (X**2 + Y**2)
+    return np.clip(mask, 0, 1)[:, :, np.newaxis]
+
+
 def apply_film_grain(video: VideoClip, intensity: float = 0.05) -> VideoClip:
     """Apply film grain effect."""
     def process_frame(frame):
@@ -175,6 +183,37 @@ def apply_film_grain(video: VideoClip, intensity: float = 0.05) -> VideoClip:
 # =============================================================================
 # IMAGE OVERLAY EFFECTS - AI-selectable visual effects
 # =============================================================================
+#
+# Overlay textures come from the shared texture bank; each clip only derives
+# its blend layer (texture x intensity) once, so per-frame work is a single
+# blend with no full-resolution temporaries beyond the frame itself.
+
+def _additive_layer(texture: np.ndarray, scale: float) -> np.ndarray:
+    """Premultiply a texture into a uint8 layer for additive blending.
+
+    frame + floor(layer) then clip equals the float add-clip-truncate blend,
+    since frame values are integers.
+    """
+    return np.floor(np.clip(texture * np.float32(scale), 0, 255)).astype(np.uint8)
+
+
+def _blend_additive(frame: np.ndarray, layer: np.ndarray) -> np.ndarray:
+    """Saturating add of a premultiplied uint8 layer."""
+    result = np.add(frame, layer, dtype=np.uint16)
+    np.minimum(result, 255, out=result)
+    return result.astype(np.uint8)
+
+
+def _screen_layer(texture: np.ndarray, intensity: float) -> np.ndarray:
+    """(1 - texture * intensity) for screen blending."""
+    return 1 - texture * np.float32(intensity)
+
+
+def _blend_screen(frame: np.ndarray, inverse_layer: np.ndarray) -> np.ndarray:
+    """Screen blend: 1 - (1 - frame) * (1 - layer), in 0-255 space."""
+    result = (255 - frame.astype(np.float32)) * inverse_layer
+    return (255 - result).astype(np.uint8)
+
 
 def apply_light_leak(video: VideoClip, style: str = "warm", intensity: float = 0.3, rgb: tuple = None) -> VideoClip:
     """
@@ -186,14 +225,16 @@ def apply_light_leak(video: VideoClip, style: str = "warm", intensity: float = 0
         intensity: Effect strength (0.0 - 1.0)
         rgb: Optional direct RGB tuple (0.0-1.0 normalized), overrides style preset
     """
-    # Pre-generate light leak pattern for consistency across frames
     h, w = video.size[1], video.size[0]
-    leak_pattern = _generate_light_leak(w, h, style, rgb)
+    leak_pattern = get_texture_bank().get(
+        "light_leak", w, h, lambda: _generate_light_leak(w, h, style, rgb),
+        variant=None if rgb else style, rgb=rgb,
+    )
+    leak_layer = _additive_layer(leak_pattern, intensity * 255)
 
     def process_frame(frame):
         # Additive blend for light leak effect
-        result = frame.astype(np.float32) + leak_pattern * intensity * 255
-        return np.clip(result, 0, 255).astype(np.uint8)
+        return _blend_additive(frame, leak_layer)
 
     return video.image_transform(process_frame)
 
@@ -246,15 +287,14 @@ def apply_bokeh(video: VideoClip, intensity: float = 0.4, size: str = "medium")
         size: "small", "medium", "large" - bokeh circle size
     """
     h, w = video.size[1], video.size[0]
-    bokeh_pattern = _generate_bokeh(w, h, size)
+    bokeh_pattern = get_texture_bank().get(
+        "bokeh", w, h, lambda: _generate_bokeh(w, h, size), variant=size
+    )
+    bokeh_layer = _screen_layer(bokeh_pattern, intensity)
 
     def process_frame(frame):
         # Screen blend mode for bokeh
-        frame_f = frame.astype(np.float32) / 255.0
-        bokeh_f = bokeh_pattern * intensity
-        # Screen blend: 1 - (1-a)*(1-b)
-        result = 1 - (1 - frame_f) * (1 - bokeh_f)
-        return (result * 255).astype(np.uint8)
+        return _blend_screen(frame, bokeh_layer)
 
     return video.image_transform(process_frame)
 
@@ -266,33 +306,33 @@ def _generate_bokeh(w: int, h: int, size: str) -> np.ndarray:
     radius_base = size_map.get(size, 30)
 
     # Create random bokeh circles
-    np.random.seed(42)  # Consistent pattern
+    rng = np.random.RandomState(42)  # Consistent pattern
     num_circles = 20
 
     pattern = np.zeros((h, w, 3), dtype=np.float32)
 
     for _ in range(num_circles):
-        cx = np.random.randint(0, w)
-        cy = np.random.randint(0, h)
-        radius = radius_base + np.random.randint(-10, 20)
-        brightness = np.random.uniform(0.2, 0.6)
-
-        # Create soft circle
-        y, x = np.ogrid[:h, :w]
+        cx = rng.randint(0, w)
+        cy = rng.randint(0, h)
+        radius = radius_base + rng.randint(-10, 20)
+        brightness = rng.uniform(0.2, 0.6)
+
+        # Soft edge circle, drawn only inside its bounding box
+        y1, y2 = max(0, cy - radius), min(h, cy + radius + 1)
+        x1, x2 = max(0, cx - radius), min(w, cx + radius + 1)
+        y, x = np.ogrid[y1:y2, x1:x2]
         dist = np.sqrt((x - cx)**2 + (y - cy)**2)
-
-        # Soft edge circle
         circle = np.clip(1 - dist / radius, 0, 1) ** 2
 
         # Random warm color tint
         color = np.array([
-            0.9 + np.random.uniform(0, 0.1),
-            0.7 + np.random.uniform(0, 0.2),
-            0.5 + np.random.uniform(0, 0.3)
+            0.9 + rng.uniform(0, 0.1),
+            0.7 + rng.uniform(0, 0.2),
+            0.5 + rng.uniform(0, 0.3)
         ])
 
         for c in range(3):
-            pattern[:, :, c] += circle * brightness * color[c]
+            pattern[y1:y2, x1:x2, c] += circle * brightness * color[c]
 
     return np.clip(pattern, 0, 1)
 
@@ -338,12 +378,14 @@ def apply_lens_flare(video: VideoClip, position: str = "top_right", intensity: f
         intensity: Effect strength (0.0 - 1.0)
     """
     h, w = video.size[1], video.size[0]
-    flare_pattern = _generate_lens_flare(w, h, position)
+    flare_pattern = get_texture_bank().get(
+        "lens_flare", w, h, lambda: _generate_lens_flare(w, h, position), variant=position
+    )
+    flare_layer = _additive_layer(flare_pattern, intensity * 255)
 
     def process_frame(frame):
         # Additive blend for flare
-        result = frame.astype(np.float32) + flare_pattern * intensity * 255
-        return np.clip(result, 0, 255).astype(np.uint8)
+        return _blend_additive(frame, flare_layer)
 
     return video.image_transform(process_frame)
 
@@ -424,53 +466,10 @@ def apply_dust_particles(video: VideoClip, intensity: float = 0.3, density: str
         density: "sparse", "medium", "dense"
     """
     h, w = video.size[1], video.size[0]
-    duration = video.duration or 10.0
-
-    # Density mapping
-    density_map = {"sparse": 30, "medium": 60, "dense": 100}
-    num_particles = density_map.get(density, 60)
-
-    # Pre-generate particle positions and properties
-    np.random.seed(42)
-    particles = []
-    for _ in range(num_particles):
-        particles.append({
-            "x": np.random.uniform(0, 1),
-            "y": np.random.uniform(0, 1),
-            "size": np.random.uniform(2, 6),
-            "speed": np.random.uniform(0.01, 0.03),
-            "drift": np.random.uniform(-0.005, 0.005),
-            "brightness": np.random.uniform(0.3, 0.8),
-        })
+    particles = create_particle_field("dust_particles", w, h, density)
 
     def make_frame(get_frame, t):
-        frame = get_frame(t)
-        frame_f = frame.astype(np.float32)
-
-        # Create dust layer
-        dust = np.zeros((h, w), dtype=np.float32)
-
-        for p in particles:
-            # Animate particle position (floating upward with drift)
-            px = int((p["x"] + p["drift"] * t) % 1.0 * w)
-            py = int((p["y"] - p["speed"] * t) % 1.0 * h)
-            size = int(p["size"])
-
-            # Draw soft particle
-            y1, y2 = max(0, py - size), min(h, py + size)
-            x1, x2 = max(0, px - size), min(w, px + size)
-
-            if y2 > y1 and x2 > x1:
-                yy, xx = np.ogrid[y1:y2, x1:x2]
-                dist = np.sqrt((xx - px)**2 + (yy - py)**2)
-                particle_shape = np.clip(1 - dist / size, 0, 1) * p["brightness"]
-                dust[y1:y2, x1:x2] = np.maximum(dust[y1:y2, x1:x2], particle_shape)
-
-        # Screen blend dust onto frame
-        dust_rgb = np.stack([dust, dust, dust], axis=2) * intensity * 255
-        result = frame_f + dust_rgb * (1 - frame_f / 255)
-
-        return np.clip(result, 0, 255).astype(np.uint8)
+        return particles.composite(get_frame(t), t, intensity)
 
     return video.transform(make_frame)
 
@@ -499,19 +498,15 @@ def apply_color_wash(video: VideoClip, color: str = "warm", intensity: float = 0
         }
         r, g, b = colors.get(color, colors["warm"])
 
+    # Overlay blend with a flat color is a per-channel scale and offset:
+    # frame * (1 - i) + color * i + frame * color * i * 0.5
+    overlay = np.array([r, g, b], dtype=np.float32)
+    scale = (1 - intensity) + overlay * intensity * 0.5
+    offset = overlay * intensity
+
     def process_frame(frame):
         frame_f = frame.astype(np.float32) / 255.0
-
-        # Create color overlay
-        h, w = frame_f.shape[:2]
-        overlay = np.zeros_like(frame_f)
-        overlay[:, :, 0] = r
-        overlay[:, :, 1] = g
-        overlay[:, :, 2] = b
-
-        # Overlay blend mode
-        result = frame_f * (1 - intensity) + overlay * intensity + frame_f * overlay * intensity * 0.5
-
+        result = frame_f * scale + offset
         return (np.clip(result, 0, 1) * 255).astype(np.uint8)
 
     return video.image_transform(process_frame)
@@ -527,7 +522,20 @@ def apply_sun_rays(video: VideoClip, position: str = "top", intensity: float = 0
         intensity: Effect strength (0.0 - 1.0)
     """
     h, w = video.size[1], video.size[0]
+    rays_rgb = get_texture_bank().get(
+        "sun_rays", w, h, lambda: _generate_sun_rays(w, h, position), variant=position
+    )
+    rays_layer = _additive_layer(rays_rgb, intensity * 255)
+
+    def process_frame(frame):
+        # Additive blend
+        return _blend_additive(frame, rays_layer)
 
+    return video.image_transform(process_frame)
+
+
+def _generate_sun_rays(w: int, h: int, position: str) -> np.ndarray:
+    """Generate sun rays pattern."""
     # Position mapping
     positions = {
         "top": (0.5, -0.1),
@@ -536,7 +544,6 @@ def apply_sun_rays(video: VideoClip, position: str = "top", intensity: float = 0
     }
     px, py = positions.get(position, positions["top"])
 
-    # Pre-generate rays pattern
     x = np.linspace(0, 1, w)
     y = np.linspace(0, 1, h)
     X, Y = np.meshgrid(x, y)
@@ -554,20 +561,12 @@ def apply_sun_rays(video: VideoClip, position: str = "top", intensity: float = 0
     ray_pattern = rays * falloff
 
     # Add warm color tint
-    rays_rgb = np.stack([
+    return np.stack([
         ray_pattern * 1.0,   # R
         ray_pattern * 0.9,   # G
         ray_pattern * 0.6,   # B
     ], axis=2)
 
-    def process_frame(frame):
-        frame_f = frame.astype(np.float32)
-        # Additive blend
-        result = frame_f + rays_rgb * intensity * 255
-        return np.clip(result, 0, 255).astype(np.uint8)
-
-    return video.image_transform(process_frame)
-
 
 def apply_sparkle(video: VideoClip, intensity: float = 0.4, density: str = "medium") -> VideoClip:
     """
@@ -579,64 +578,10 @@ def apply_sparkle(video: VideoClip, intensity: float = 0.4, density: str = "medi
         density: "sparse", "medium", "dense"
     """
     h, w = video.size[1], video.size[0]
-    duration = video.duration or 10.0
-
-    # Density mapping
-    density_map = {"sparse": 15, "medium": 30, "dense": 50}
-    num_sparkles = density_map.get(density, 30)
-
-    # Pre-generate sparkle positions
-    np.random.seed(42)
-    sparkles = []
-    for _ in range(num_sparkles):
-        sparkles.append({
-            "x": np.random.uniform(0, w),
-            "y": np.random.uniform(0, h),
-            "phase": np.random.uniform(0, 2 * np.pi),
-            "freq": np.random.uniform(2, 5),
-            "size": np.random.uniform(3, 8),
-        })
+    sparkles = create_particle_field("sparkle", w, h, density)
 
     def make_frame(get_frame, t):
-        frame = get_frame(t)
-        frame_f = frame.astype(np.float32)
-
-        # Create sparkle layer
-        sparkle_layer = np.zeros((h, w), dtype=np.float32)
-
-        for s in sparkles:
-            # Animated brightness (twinkling)
-            brightness = (np.sin(t * s["freq"] + s["phase"]) + 1) / 2
-            brightness = brightness ** 2  # Sharper peaks
-
-            if brightness > 0.3:  # Only draw bright sparkles
-                px, py = int(s["x"]), int(s["y"])
-                size = int(s["size"])
-
-                # Draw star shape
-                y1, y2 = max(0, py - size), min(h, py + size)
-                x1, x2 = max(0, px - size), min(w, px + size)
-
-                if y2 > y1 and x2 > x1:
-                    yy, xx = np.ogrid[y1:y2, x1:x2]
-                    # 4-pointed star
-                    dist_x = np.abs(xx - px)
-                    dist_y = np.abs(yy - py)
-                    star = np.maximum(
-                        np.clip(1 - dist_x / size, 0, 1) * np.clip(1 - dist_y / (size * 0.3), 0, 1),
-                        np.clip(1 - dist_x / (size * 0.3), 0, 1) * np.clip(1 - dist_y / size, 0, 1)
-                    )
-                    sparkle_layer[y1:y2, x1:x2] = np.maximum(
-                        sparkle_layer[y1:y2, x1:x2],
-                        star * brightness
-                    )
-
-        # Screen blend
-        sparkle_rgb = np.stack([sparkle_layer, sparkle_layer, sparkle_layer], axis=2)
-        frame_norm = frame_f / 255.0
-        result = 1 - (1 - frame_norm) * (1 - sparkle_rgb * intensity)
-
-        return (result * 255).astype(np.uint8)
+        return sparkles.composite(get_frame(t), t, intensity)
 
     return video.transform(make_frame)
 
@@ -651,7 +596,20 @@ def apply_anamorphic(video: VideoClip, intensity: float = 0.4, position: str = "
         position: "center", "top", "bottom"
     """
     h, w = video.size[1], video.size[0]
+    streak_rgb = get_texture_bank().get(
+        "anamorphic", w, h, lambda: _generate_anamorphic(w, h, position), variant=position
+    )
+    streak_layer = _additive_layer(streak_rgb, intensity * 255)
 
+    def process_frame(frame):
+        # Additive blend
+        return _blend_additive(frame, streak_layer)
+
+    return video.image_transform(process_frame)
+
+
+def _generate_anamorphic(w: int, h: int, position: str) -> np.ndarray:
+    """Generate anamorphic streak pattern."""
     # Position mapping
     y_positions = {"center": 0.5, "top": 0.3, "bottom": 0.7}
     py = y_positions.get(position, 0.5)
@@ -668,20 +626,12 @@ def apply_anamorphic(video: VideoClip, intensity: float = 0.4, position: str = "
     streak = vertical_falloff * horizontal_glow
 
     # Blue tint for anamorphic look
-    streak_rgb = np.stack([
+    return np.stack([
         streak * 0.7,   # R (less)
         streak * 0.8,   # G
         streak * 1.0,   # B (more)
     ], axis=2)
 
-    def process_frame(frame):
-        frame_f = frame.astype(np.float32)
-        # Additive blend
-        result = frame_f + streak_rgb * intensity * 255
-        return np.clip(result, 0, 255).astype(np.uint8)
-
-    return video.image_transform(process_frame)
-
 
 def apply_moody_shadow(video: VideoClip, intensity: float = 0.3, position: str = "bottom") -> VideoClip:
     """
@@ -693,7 +643,24 @@ def apply_moody_shadow(video: VideoClip, intensity: float = 0.3, position: str =
         position: "bottom", "edges", "top"
     """
     h, w = video.size[1], video.size[0]
+    shadow = get_texture_bank().get(
+        "moody_shadow", w, h, lambda: _generate_moody_shadow(w, h, position), variant=position
+    )
 
+    # Darken with shadow, plus a slight blue tint in the shadows
+    shade = 1 - shadow * np.float32(intensity * 0.7)
+    blue_lift = shadow[:, :, 0] * np.float32(intensity * 20)
+
+    def process_frame(frame):
+        darkened = frame.astype(np.float32) * shade
+        darkened[:, :, 2] += blue_lift
+        return np.clip(darkened, 0, 255).astype(np.uint8)
+
+    return video.image_transform(process_frame)
+
+
+def _generate_moody_shadow(w: int, h: int, position: str) -> np.ndarray:
+    """Generate moody shadow mask (h, w, 1)."""
     x = np.linspace(0, 1, w)
     y = np.linspace(0, 1, h)
     X, Y = np.meshgrid(x, y)
@@ -709,18 +676,7 @@ def apply_moody_shadow(video: VideoClip, intensity: float = 0.3, position: str =
     else:  # top
         shadow = (1 - Y) ** 2
 
-    # Apply shadow with blue tint for moodiness
-    shadow_mask = np.stack([shadow, shadow, shadow], axis=2)
-
-    def process_frame(frame):
-        frame_f = frame.astype(np.float32)
-        # Darken with shadow
-        darkened = frame_f * (1 - shadow_mask * intensity * 0.7)
-        # Add slight blue tint to shadows
-        darkened[:, :, 2] = darkened[:, :, 2] + shadow_mask[:, :, 0] * intensity * 20
-        return np.clip(darkened, 0, 255).astype(np.uint8)
-
-    return video.image_transform(process_frame)
+    return shadow[:, :, np.newaxis]
 
 
 def apply_chromatic(video: VideoClip, intensity: float = 0.3, direction: str = "horizontal") -> VideoClip:
@@ -734,6 +690,14 @@ def apply_chromatic(video: VideoClip, intensity: float = 0.3, direction: str = "
     """
     h, w = video.size[1], video.size[0]
 
+    if direction != "horizontal":
+        # Mean normalized distance from center (per-channel shift is based on it)
+        cx, cy = w // 2, h // 2
+        yy, xx = np.ogrid[:h, :w]
+        dist_from_center = np.sqrt((xx - cx)**2 + (yy - cy)**2)
+        max_dist = np.sqrt(cx**2 + cy**2)
+        radial_mean = float((dist_from_center / max_dist).mean())
+
     def process_frame(frame):
         # Calculate pixel shift based on intensity
         shift = int(intensity * 10)
@@ -748,20 +712,9 @@ def apply_chromatic(video: VideoClip, intensity: float = 0.3, direction: str = "
             result[:, :, 1] = frame[:, :, 1]              # G center
             result[:, :-shift, 2] = frame[:, shift:, 2]  # B shifted left
         else:  # radial
-            # Simplified radial - shift from center
-            cx, cy = w // 2, h // 2
-
-            # Create coordinate grids
-            yy, xx = np.ogrid[:h, :w]
-            dist_from_center = np.sqrt((xx - cx)**2 + (yy - cy)**2)
-            max_dist = np.sqrt(cx**2 + cy**2)
-
-            # Normalized radial factor
-            radial_factor = (dist_from_center / max_dist) * shift
-
-            # Shift channels radially (simplified approach)
+            # Simplified radial - shift channels by the mean radial factor
             for c in range(3):
-                channel_shift = int(radial_factor.mean() * (c - 1))
+                channel_shift = int(radial_mean * shift * (c - 1))
                 if channel_shift != 0:
                     if channel_shift > 0:
                         result[:, channel_shift:, c] = frame[:, :-channel_shift, c]
@@ -785,7 +738,20 @@ def apply_prism(video: VideoClip, intensity: float = 0.3, position: str = "edge"
         position: "edge", "diagonal", "corner"
     """
     h, w = video.size[1], video.size[0]
+    prism_effect = get_texture_bank().get(
+        "prism", w, h, lambda: _generate_prism(w, h, position), variant=position
+    )
+    prism_layer = _screen_layer(prism_effect, intensity)
 
+    def process_frame(frame):
+        # Screen blend
+        return _blend_screen(frame, prism_layer)
+
+    return video.image_transform(process_frame)
+
+
+def _generate_prism(w: int, h: int, position: str) -> np.ndarray:
+    """Generate prism rainbow pattern."""
     x = np.linspace(0, 1, w)
     y = np.linspace(0, 1, h)
     X, Y = np.meshgrid(x, y)
@@ -811,16 +777,7 @@ def apply_prism(video: VideoClip, intensity: float = 0.3, position: str = "edge"
     rainbow[:, :, 2] = np.sin(gradient * 2 * np.pi + 4.19) ** 2    # B
 
     # Apply mask
-    prism_effect = rainbow * rainbow_mask[:, :, np.newaxis]
-
-    def process_frame(frame):
-        frame_f = frame.astype(np.float32)
-        # Screen blend
-        frame_norm = frame_f / 255.0
-        result = 1 - (1 - frame_norm) * (1 - prism_effect * intensity)
-        return (result * 255).astype(np.uint8)
-
-    return video.image_transform(process_frame)
+    return rainbow * rainbow_mask[:, :, np.newaxis]
 
 
 def apply_haze(video: VideoClip, intensity: float = 0.3, color: str = "white") -> VideoClip:
@@ -840,27 +797,28 @@ def apply_haze(video: VideoClip, intensity: float = 0.3, color: str = "white") -
         "warm": (1.0, 0.95, 0.9),
         "cool": (0.9, 0.95, 1.0),
     }
-    haze_color = np.array(colors.get(color, colors["white"]))
+    haze_color = np.array(colors.get(color, colors["white"]), dtype=np.float32)
+    h = video.size[1]
+
+    # Create depth-like haze (heavier at edges/top)
+    y = np.linspace(0, 1, h, dtype=np.float32)[:, np.newaxis, np.newaxis]
+    haze_density = 0.3 + 0.7 * (1 - y)  # More haze at top
+    haze_amount = intensity * haze_density
+
+    # Per-row blend weights: original → blurred → haze
+    original_weight = 1 - haze_amount * 0.5
+    blurred_weight = haze_amount * 0.3
+    haze_layer = haze_color * haze_amount * 0.2
 
     def process_frame(frame):
         frame_f = frame.astype(np.float32) / 255.0
-        h, w = frame_f.shape[:2]
-
-        # Create depth-like haze (heavier at edges/top)
-        y = np.linspace(0, 1, h)[:, np.newaxis]
-        haze_density = 0.3 + 0.7 * (1 - y)  # More haze at top
 
         # Slight blur for fog effect
         blurred = np.zeros_like(frame_f)
         for c in range(3):
             blurred[:,:,c] = gaussian_filter(frame_f[:,:,c], sigma=5)
 
-        # Create haze layer
-        haze = np.ones_like(frame_f) * haze_color
-
-        # Blend: original → blurred → haze
-        haze_amount = intensity * haze_density
-        result = frame_f * (1 - haze_amount * 0.5) + blurred * haze_amount * 0.3 + haze * haze_amount * 0.2
+        result = frame_f * original_weight + blurred * blurred_weight + haze_layer
 
         return (np.clip(result, 0, 1) * 255).astype(np.uint8)
 
@@ -920,7 +878,20 @@ def apply_light_streak(video: VideoClip, intensity: float = 0.4, angle: str = "d
         angle: "diagonal", "horizontal", "vertical"
     """
     h, w = video.size[1], video.size[0]
+    streak_rgb = get_texture_bank().get(
+        "light_streak", w, h, lambda: _generate_light_streak(w, h, angle), variant=angle
+    )
+    streak_layer = _additive_layer(streak_rgb, intensity * 200)
+
+    def process_frame(frame):
+        # Additive blend
+        return _blend_additive(frame, streak_layer)
+
+    return video.image_transform(process_frame)
+
 
+def _generate_light_streak(w: int, h: int, angle: str) -> np.ndarray:
+    """Generate light streak pattern."""
     x = np.linspace(0, 1, w)
     y = np.linspace(0, 1, h)
     X, Y = np.meshgrid(x, y)
@@ -937,20 +908,12 @@ def apply_light_streak(video: VideoClip, intensity: float = 0.4, angle: str = "d
         streak = np.exp(-((X - 0.5) ** 2) * 30)
 
     # Warm light color
-    streak_rgb = np.stack([
+    return np.stack([
         streak * 1.0,
         streak * 0.9,
         streak * 0.7,
     ], axis=2)
 
-    def process_frame(frame):
-        frame_f = frame.astype(np.float32)
-        # Additive blend
-        result = frame_f + streak_rgb * intensity * 200
-        return np.clip(result, 0, 255).astype(np.uint8)
-
-    return video.image_transform(process_frame)
-
 
 # =============================================================================
 # OVERLAY EFFECT REGISTRY - for AI selection
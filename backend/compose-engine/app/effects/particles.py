@@ -0,0 +1,203 @@
+"""Vectorized particle rendering for dust and sparkle overlays.
+
+Particles are drawn from sprite stamps precomputed once per clip (one stamp
+per integer particle size, padded to a common grid). For each frame:
+
+- All particle positions and brightnesses are computed in one array op
+- All stamps are placed with one scatter: overlapping particles keep the
+  brightest value (same as drawing them one by one with np.maximum)
+- Only the touched pixels are blended, so cost scales with the particles,
+  not with the frame size
+
+Particle properties are drawn from a fixed seed in the same order as the
+original per-particle loops, so patterns are unchanged.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Seed for particle layouts (keeps effects deterministic across renders)
+PARTICLE_SEED = 42
+
+DUST_DENSITY = {"sparse": 30, "medium": 60, "dense": 100}
+SPARKLE_DENSITY = {"sparse": 15, "medium": 30, "dense": 50}
+
+
+def _dust_stamp(size: int, dy: np.ndarray, dx: np.ndarray) -> np.ndarray:
+    """Soft round particle."""
+    dist = np.sqrt(dx**2 + dy**2)
+    return np.clip(1 - dist / size, 0, 1)
+
+
+def _star_stamp(size: int, dy: np.ndarray, dx: np.ndarray) -> np.ndarray:
+    """4-pointed star."""
+    dist_x = np.abs(dx)
+    dist_y = np.abs(dy)
+    return np.maximum(
+        np.clip(1 - dist_x / size, 0, 1) * np.clip(1 - dist_y / (size * 0.3), 0, 1),
+        np.clip(1 - dist_x / (size * 0.3), 0, 1) * np.clip(1 - dist_y / size, 0, 1)
+    )
+
+
+class ParticleField(ABC):
+    """Particles drawn from per-size sprite stamps.
+
+    Subclasses define the stamp shape, per-frame positions/brightness and
+    the blend used by composite().
+    """
+
+    def __init__(self, width: int, height: int, sizes: np.ndarray):
+        self.width = width
+        self.height = height
+        self.sizes = sizes.astype(np.int64)
+        self._build_stamps()
+
+    # =========================================================================
+    # Subclass hooks
+    # =========================================================================
+
+    @abstractmethod
+    def stamp(self, size: int, dy: np.ndarray, dx: np.ndarray) -> np.ndarray:
+        """Brightness (0-1) of a particle of this size at offsets (dy, dx)."""
+
+    @abstractmethod
+    def state(self, t: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Integer pixel positions (px, py) and brightness for all particles."""
+
+    @abstractmethod
+    def blend(self, pixels: np.ndarray, values: np.ndarray, intensity: float) -> np.ndarray:
+        """Blend particle values (k,) onto uint8 pixels (k, 3)."""
+
+    # =========================================================================
+    # Rendering
+    # =========================================================================
+
+    def _build_stamps(self) -> None:
+        # Stamp for size s covers offsets [-s, s); pad all to [-R, R)
+        radius = int(self.sizes.max()) if len(self.sizes) else 0
+        offsets = np.arange(-radius, radius)
+        self._dy = offsets[:, np.newaxis]
+        self._dx = offsets[np.newaxis, :]
+
+        unique_sizes, self._size_index = np.unique(self.sizes, return_inverse=True)
+        self._stamps = np.zeros((len(unique_sizes), 2 * radius, 2 * radius))
+        for i, size in enumerate(unique_sizes):
+            if size <= 0:
+                continue
+            inside = slice(radius - size, radius + size)
+            self._stamps[i, inside, inside] = self.stamp(
+                int(size), self._dy[inside], self._dx[:, inside]
+            )
+
+    def render_layer(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Render the particle layer at time t.
+
+        Returns:
+            (flat pixel indices, float32 values) of the non-zero pixels, one
+            entry per pixel
+        """
+        px, py, brightness = self.state(t)
+        active = brightness > 0
+        if not np.any(active):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        values = self._stamps[self._size_index[active]] * brightness[active, np.newaxis, np.newaxis]
+        ys = py[active, np.newaxis, np.newaxis] + self._dy[np.newaxis]
+        xs = px[active, np.newaxis, np.newaxis] + self._dx[np.newaxis]
+
+        valid = (values > 0) & (ys >= 0) & (ys < self.height) & (xs >= 0) & (xs < self.width)
+        flat = (ys * self.width + xs)[valid]
+        values = values[valid]
+
+        # Keep the brightest value per pixel: sort by (pixel, value), take the last
+        order = np.lexsort((values, flat))
+        flat = flat[order]
+        values = values[order]
+        last = np.ones(len(flat), dtype=bool)
+        last[:-1] = flat[1:] != flat[:-1]
+        return flat[last], values[last].astype(np.float32)
+
+    def composite(self, frame: np.ndarray, t: float, intensity: float) -> np.ndarray:
+        """Blend the particle layer at time t onto a frame."""
+        flat, values = self.render_layer(t)
+        result = np.array(frame, dtype=np.uint8, order="C", copy=True)
+        if len(flat):
+            pixels = result.reshape(-1, 3)
+            pixels[flat] = self.blend(pixels[flat], values, intensity)
+        return result
+
+
+class DustParticles(ParticleField):
+    """Soft dust particles floating upward with horizontal drift."""
+
+    def __init__(self, width: int, height: int, num_particles: int, seed: int = PARTICLE_SEED):
+        # Same draw order as one uniform() call per property per particle
+        rng = np.random.RandomState(seed)
+        props = rng.uniform(
+            [0, 0, 2, 0.01, -0.005, 0.3],
+            [1, 1, 6, 0.03, 0.005, 0.8],
+            size=(num_particles, 6),
+        )
+        self.x, self.y, size, self.speed, self.drift, self.brightness = props.T
+        super().__init__(width, height, size.astype(np.int64))
+
+    def stamp(self, size, dy, dx):
+        return _dust_stamp(size, dy, dx)
+
+    def state(self, t):
+        px = ((self.x + self.drift * t) % 1.0 * self.width).astype(np.int64)
+        py = ((self.y - self.speed * t) % 1.0 * self.height).astype(np.int64)
+        return px, py, self.brightness
+
+    def blend(self, pixels, values, intensity):
+        # Screen blend
+        frame_f = pixels.astype(np.float32)
+        dust = (values * np.float32(intensity * 255))[:, np.newaxis]
+        result = frame_f + dust * (1 - frame_f / 255)
+        return np.clip(result, 0, 255).astype(np.uint8)
+
+
+class SparkleParticles(ParticleField):
+    """Twinkling 4-pointed stars at fixed positions."""
+
+    # Stars dimmer than this are not drawn
+    MIN_BRIGHTNESS = 0.3
+
+    def __init__(self, width: int, height: int, num_sparkles: int, seed: int = PARTICLE_SEED):
+        rng = np.random.RandomState(seed)
+        props = rng.uniform(
+            [0, 0, 0, 2, 3],
+            [width, height, 2 * np.pi, 5, 8],
+            size=(num_sparkles, 5),
+        )
+        x, y, self.phase, self.freq, size = props.T
+        self.px = x.astype(np.int64)
+        self.py = y.astype(np.int64)
+        super().__init__(width, height, size.astype(np.int64))
+
+    def stamp(self, size, dy, dx):
+        return _star_stamp(size, dy, dx)
+
+    def state(self, t):
+        # Animated brightness (twinkling), sharper peaks
+        brightness = ((np.sin(t * self.freq + self.phase) + 1) / 2) ** 2
+        brightness = np.where(brightness > self.MIN_BRIGHTNESS, brightness, 0.0)
+        return self.px, self.py, brightness
+
+    def blend(self, pixels, values, intensity):
+        # Screen blend
+        frame_norm = pixels.astype(np.float32) / 255.0
+        sparkle = values[:, np.newaxis]
+        result = 1 - (1 - frame_norm) * (1 - sparkle * intensity)
+        return (result * 255).astype(np.uint8)
+
+
+def create_particle_field(effect: str, width: int, height: int, density: str = "medium") -> Optional[ParticleField]:
+    """Create the particle field for an effect ("dust_particles" or "sparkle")."""
+    if effect == "dust_particles":
+        return DustParticles(width, height, DUST_DENSITY.get(density, 60))
+    if effect == "sparkle":
+        return SparkleParticles(width, height, SPARKLE_DENSITY.get(density, 30))
+    return None
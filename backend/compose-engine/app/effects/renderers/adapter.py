@@ -481,6 +481,7 @@ class RendererAdapter:
                 color_grade=color_grade,
                 vignette_strength=vignette_strength,
                 film_grain_intensity=film_grain_intensity,
+                job_id=job_id,
             )
 
             if success and os.path.exists(output_path):
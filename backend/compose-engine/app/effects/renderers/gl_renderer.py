@@ -1,14 +1,27 @@
 """GL Transitions Renderer - Uses OpenGL shaders for high-quality transitions.
 
-Renders GL Transitions (https://gl-transitions.com/) using OSMesa for headless rendering.
-Supports 100+ transition effects with customizable parameters.
+Renders GL Transitions (https://gl-transitions.com/) using OSMesa or EGL for
+headless rendering. Supports 100+ transition effects with customizable parameters.
+
+Frames are streamed to FFmpeg as they are rendered instead of being collected
+in memory first (a 1s 1080x1920 RGBA transition is ~250MB of frames):
+
+- Readback is double-buffered through two pixel pack buffers (PBOs), so the
+  GPU renders frame N while frame N-1 is copied out and handed to FFmpeg
+- FFmpeg flips the frames (vflip) instead of numpy
+- Image textures stay uploaded between transitions that share an image
+  (bounded by ``gl_texture_cache_size``)
+
+Set ``GL_PLATFORM`` (or ``PYOPENGL_PLATFORM``) to "osmesa" or "egl"; both
+render on the CPU through Mesa when no GPU is present, e.g. EGL with
+``EGL_PLATFORM=surfaceless`` and ``LIBGL_ALWAYS_SOFTWARE=1``.
 """
 
 import os
 import ctypes
 import logging
 import tempfile
-import subprocess
+from collections import OrderedDict
 from typing import List, Optional, Tuple, Dict, Any
 from dataclasses import dataclass
 from pathlib import Path
@@ -17,19 +30,24 @@ import numpy as np
 from PIL import Image
 
 # Import GL Transitions library
+from app.config import get_settings
 from app.effects.glsl.gl_transitions_lib import GL_TRANSITIONS, get_available_transitions as get_gl_transitions
+from app.utils.frame_pipe import FramePipeEncoder
 
 logger = logging.getLogger(__name__)
 
-# Set OSMesa as the OpenGL platform before importing OpenGL
-os.environ['PYOPENGL_PLATFORM'] = 'osmesa'
+# Set the OpenGL platform before importing OpenGL (OSMesa unless overridden)
+GL_PLATFORM = os.environ.setdefault('PYOPENGL_PLATFORM', get_settings().gl_platform)
 
 try:
     from OpenGL import GL
-    from OpenGL.osmesa import OSMesaCreateContext, OSMesaMakeCurrent, OSMesaDestroyContext, OSMESA_RGBA
+    if GL_PLATFORM == 'egl':
+        from OpenGL import EGL
+    else:
+        from OpenGL.osmesa import OSMesaCreateContext, OSMesaMakeCurrent, OSMesaDestroyContext, OSMESA_RGBA
     GL_AVAILABLE = True
-    print("[GL_RENDERER] PyOpenGL + OSMesa imported successfully!")
-    logger.info("PyOpenGL + OSMesa imported successfully")
+    print(f"[GL_RENDERER] PyOpenGL + {GL_PLATFORM} imported successfully!")
+    logger.info(f"PyOpenGL + {GL_PLATFORM} imported successfully")
 except ImportError as e:
     GL_AVAILABLE = False
     print(f"[GL_RENDERER] PyOpenGL import FAILED: {e}")
@@ -82,6 +100,19 @@ void main() {{
 # GL Transitions are now imported from gl_transitions_lib.py
 # Contains 50+ transitions from https://gl-transitions.com/
 
+# Full-screen quad: position (x, y), texCoord (u, v)
+QUAD_VERTICES = np.array([
+    -1.0, -1.0, 0.0, 0.0,
+    1.0, -1.0, 1.0, 0.0,
+    -1.0, 1.0, 0.0, 1.0,
+    1.0, 1.0, 1.0, 1.0,
+], dtype=np.float32)
+
+# Transition clips are short intermediates, encoded near-lossless.
+# Frames are read bottom-up, FFmpeg flips them back.
+TRANSITION_ENCODER_ARGS = ["-c:v", "libx264", "-preset", "fast", "-crf", "18"]
+TRANSITION_OUTPUT_ARGS = ["-vf", "vflip"]
+
 
 @dataclass
 class GLClipSegment:
@@ -106,8 +137,14 @@ class GLTransitionRenderer:
         self.height = height
         self._ctx = None
         self._buffer = None
+        self._egl: Optional[Tuple[Any, Any, Any]] = None  # (display, surface, context)
         self._initialized = False
         self._shader_cache: Dict[str, int] = {}
+        # (path, mtime_ns, size) -> texture ID, least recently used first
+        self._texture_cache: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+        self._texture_cache_size = max(2, get_settings().gl_texture_cache_size)
+        self._quad: Optional[Tuple[int, int]] = None  # (vao, vbo)
+        self._pbos: Optional[List[int]] = None
 
     def is_available(self) -> bool:
         """Check if GL rendering is available."""
@@ -125,10 +162,14 @@ class GLTransitionRenderer:
             return False
 
     def _init_context(self):
-        """Initialize OSMesa OpenGL context."""
+        """Initialize the headless OpenGL context (OSMesa or EGL)."""
         if self._initialized:
             return
 
+        if GL_PLATFORM == 'egl':
+            self._init_egl_context()
+            return
+
         try:
             print(f"[GL_RENDERER] Creating OSMesa context for {self.width}x{self.height}...")
             self._ctx = OSMesaCreateContext(OSMESA_RGBA, None)
@@ -157,6 +198,64 @@ class GLTransitionRenderer:
             traceback.print_exc()
             raise
 
+    def _init_egl_context(self):
+        """Initialize an EGL pbuffer context (GPU, or Mesa llvmpipe on CPU)."""
+        try:
+            print(f"[GL_RENDERER] Creating EGL context for {self.width}x{self.height}...")
+            display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+            major, minor = EGL.EGLint(), EGL.EGLint()
+            if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+                raise RuntimeError("Failed to initialize EGL display")
+            print(f"[GL_RENDERER] EGL {major.value}.{minor.value} initialized")
+
+            config_attribs = (EGL.EGLint * 13)(
+                EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                EGL.EGL_RED_SIZE, 8,
+                EGL.EGL_GREEN_SIZE, 8,
+                EGL.EGL_BLUE_SIZE, 8,
+                EGL.EGL_ALPHA_SIZE, 8,
+                EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                EGL.EGL_NONE,
+            )
+            config = EGL.EGLConfig()
+            num_configs = EGL.EGLint()
+            if not EGL.eglChooseConfig(display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(num_configs)) \
+                    or num_configs.value < 1:
+                raise RuntimeError("No EGL config with an RGBA pbuffer")
+
+            pbuffer_attribs = (EGL.EGLint * 5)(
+                EGL.EGL_WIDTH, self.width,
+                EGL.EGL_HEIGHT, self.height,
+                EGL.EGL_NONE,
+            )
+            surface = EGL.eglCreatePbufferSurface(display, config, pbuffer_attribs)
+            if surface == EGL.EGL_NO_SURFACE:
+                raise RuntimeError("Failed to create EGL pbuffer surface")
+
+            EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+            context_attribs = (EGL.EGLint * 7)(
+                EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+                EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                EGL.EGL_NONE,
+            )
+            context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+            if context == EGL.EGL_NO_CONTEXT:
+                raise RuntimeError("Failed to create EGL context")
+
+            if not EGL.eglMakeCurrent(display, surface, surface, context):
+                raise RuntimeError("Failed to make EGL context current")
+
+            self._egl = (display, surface, context)
+            self._initialized = True
+            print(f"[GL_RENDERER] GL renderer INITIALIZED (EGL): {self.width}x{self.height}")
+            logger.info(f"GL renderer initialized (EGL): {self.width}x{self.height}")
+
+        except Exception as e:
+            print(f"[GL_RENDERER] INIT FAILED: {e}")
+            logger.error(f"Failed to initialize GL renderer: {e}")
+            raise
+
     def _compile_shader(self, source: str, shader_type: int) -> int:
         """Compile a shader."""
         shader = GL.glCreateShader(shader_type)
@@ -196,6 +295,22 @@ class GLTransitionRenderer:
         self._shader_cache[cache_key] = program
         return program
 
+    def _get_texture(self, image_path: str) -> int:
+        """Get the texture for an image, uploading it only on first use."""
+        st = os.stat(image_path)
+        key = (os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+        texture = self._texture_cache.get(key)
+        if texture is not None:
+            self._texture_cache.move_to_end(key)
+            return texture
+
+        texture = self._load_texture(image_path)
+        self._texture_cache[key] = texture
+        while len(self._texture_cache) > self._texture_cache_size:
+            _, evicted = self._texture_cache.popitem(last=False)
+            GL.glDeleteTextures(1, [evicted])
+        return texture
+
     def _load_texture(self, image_path: str) -> int:
         """Load an image as OpenGL texture."""
         img = Image.open(image_path).convert('RGBA')
@@ -232,6 +347,36 @@ class GLTransitionRenderer:
         Returns:
             RGBA image as numpy array
         """
+        self._draw(from_texture, to_texture, transition_name, progress)
+
+        # Read pixels
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        pixels = GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+        image = np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.width, 4)
+        image = np.flipud(image)  # OpenGL has Y-flipped coordinates
+
+        return image
+
+    def _get_quad(self) -> int:
+        """Get the full-screen quad VAO (created once per context)."""
+        if self._quad is None:
+            vao = GL.glGenVertexArrays(1)
+            vbo = GL.glGenBuffers(1)
+
+            GL.glBindVertexArray(vao)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, QUAD_VERTICES.nbytes, QUAD_VERTICES, GL.GL_STATIC_DRAW)
+
+            GL.glVertexAttribPointer(0, 2, GL.GL_FLOAT, GL.GL_FALSE, 16, ctypes.c_void_p(0))
+            GL.glEnableVertexAttribArray(0)
+            GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE, 16, ctypes.c_void_p(8))
+            GL.glEnableVertexAttribArray(1)
+
+            self._quad = (vao, vbo)
+        return self._quad[0]
+
+    def _draw(self, from_texture: int, to_texture: int, transition_name: str, progress: float):
+        """Draw one transition frame into the framebuffer."""
         self._init_context()
 
         # Get transition code
@@ -253,41 +398,45 @@ class GLTransitionRenderer:
         GL.glBindTexture(GL.GL_TEXTURE_2D, to_texture)
         GL.glUniform1i(GL.glGetUniformLocation(program, "to"), 1)
 
-        # Setup vertex data (full-screen quad)
-        vertices = np.array([
-            -1.0, -1.0, 0.0, 0.0,
-            1.0, -1.0, 1.0, 0.0,
-            -1.0, 1.0, 0.0, 1.0,
-            1.0, 1.0, 1.0, 1.0,
-        ], dtype=np.float32)
-
-        vao = GL.glGenVertexArrays(1)
-        vbo = GL.glGenBuffers(1)
-
-        GL.glBindVertexArray(vao)
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL.GL_STATIC_DRAW)
-
-        GL.glVertexAttribPointer(0, 2, GL.GL_FLOAT, GL.GL_FALSE, 16, ctypes.c_void_p(0))
-        GL.glEnableVertexAttribArray(0)
-        GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE, 16, ctypes.c_void_p(8))
-        GL.glEnableVertexAttribArray(1)
+        GL.glBindVertexArray(self._get_quad())
 
         # Render
         GL.glViewport(0, 0, self.width, self.height)
         GL.glClear(GL.GL_COLOR_BUFFER_BIT)
         GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 4)
 
-        # Read pixels
-        pixels = GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
-        image = np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.width, 4)
-        image = np.flipud(image)  # OpenGL has Y-flipped coordinates
-
-        # Cleanup
-        GL.glDeleteBuffers(1, [vbo])
-        GL.glDeleteVertexArrays(1, [vao])
-
-        return image
+    def _get_pbos(self) -> List[int]:
+        """Get the two pixel pack buffers used for double-buffered readback."""
+        if self._pbos is None:
+            frame_bytes = self.width * self.height * 4
+            self._pbos = [int(pbo) for pbo in GL.glGenBuffers(2)]
+            for pbo in self._pbos:
+                GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+                GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, frame_bytes, None, GL.GL_STREAM_READ)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        return self._pbos
+
+    def _start_readback(self, pbo: int):
+        """Queue an asynchronous read of the framebuffer into a PBO."""
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+    def _finish_readback(self, pbo: int, encoder: FramePipeEncoder):
+        """Map a filled PBO and hand the frame (bottom-up) to the encoder."""
+        frame_bytes = self.width * self.height * 4
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        ptr = GL.glMapBufferRange(GL.GL_PIXEL_PACK_BUFFER, 0, frame_bytes, GL.GL_MAP_READ_BIT)
+        try:
+            if not ptr:
+                raise RuntimeError("Failed to map pixel pack buffer")
+            pixels = (ctypes.c_ubyte * frame_bytes).from_address(ptr)
+            # write() copies the frame before returning, so the mapping can go
+            encoder.write(np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.width, 4))
+        finally:
+            GL.glUnmapBuffer(GL.GL_PIXEL_PACK_BUFFER)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
 
     def render_transition(
         self,
@@ -315,70 +464,68 @@ class GLTransitionRenderer:
         try:
             self._init_context()
 
-            from_texture = self._load_texture(from_image_path)
-            to_texture = self._load_texture(to_image_path)
-
-            num_frames = int(duration * fps)
-            frames = []
-
-            for i in range(num_frames):
-                progress = i / (num_frames - 1) if num_frames > 1 else 1.0
-                frame = self.render_transition_frame(from_texture, to_texture, transition_name, progress)
-                frames.append(frame)
-
-            # Write frames to video using FFmpeg
-            self._write_frames_to_video(frames, output_path, fps)
-
-            # Cleanup textures
-            GL.glDeleteTextures(2, [from_texture, to_texture])
-
-            logger.info(f"GL transition rendered: {transition_name} ({duration}s)")
+            from_texture = self._get_texture(from_image_path)
+            to_texture = self._get_texture(to_image_path)
+            pbos = self._get_pbos()
+
+            num_frames = max(1, int(duration * fps))
+
+            # Frame i is read into pbos[i % 2] while frame i - 1, read into
+            # the other PBO, is mapped and streamed to FFmpeg
+            with FramePipeEncoder(
+                output_path,
+                fps=fps,
+                encoder_args=TRANSITION_ENCODER_ARGS,
+                pix_fmt="rgba",
+                extra_output_args=TRANSITION_OUTPUT_ARGS,
+            ) as encoder:
+                for i in range(num_frames):
+                    progress = i / (num_frames - 1) if num_frames > 1 else 1.0
+                    self._draw(from_texture, to_texture, transition_name, progress)
+                    self._start_readback(pbos[i % 2])
+                    if i > 0:
+                        self._finish_readback(pbos[(i - 1) % 2], encoder)
+                self._finish_readback(pbos[(num_frames - 1) % 2], encoder)
+
+            logger.info(f"GL transition rendered: {transition_name} ({duration}s, {num_frames} frames streamed)")
             return True
 
         except Exception as e:
             logger.error(f"GL transition render failed: {e}")
             return False
 
-    def _write_frames_to_video(self, frames: List[np.ndarray], output_path: str, fps: int):
-        """Write frames to video file using FFmpeg."""
-        height, width = frames[0].shape[:2]
-
-        cmd = [
-            'ffmpeg', '-y',
-            '-f', 'rawvideo',
-            '-vcodec', 'rawvideo',
-            '-s', f'{width}x{height}',
-            '-pix_fmt', 'rgba',
-            '-r', str(fps),
-            '-i', '-',
-            '-c:v', 'libx264',
-            '-preset', 'fast',
-            '-crf', '18',
-            '-pix_fmt', 'yuv420p',
-            output_path
-        ]
-
-        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        for frame in frames:
-            process.stdin.write(frame.tobytes())
-
-        process.stdin.close()
-        process.wait()
-
-        if process.returncode != 0:
-            raise RuntimeError(f"FFmpeg failed: {process.stderr.read().decode()}")
-
     def get_available_transitions(self) -> List[str]:
         """Get list of available GL transitions."""
         return get_gl_transitions()
 
     def cleanup(self):
         """Clean up OpenGL resources."""
+        if self._initialized:
+            if self._texture_cache:
+                GL.glDeleteTextures(len(self._texture_cache), list(self._texture_cache.values()))
+            if self._pbos:
+                GL.glDeleteBuffers(2, self._pbos)
+            if self._quad:
+                GL.glDeleteBuffers(1, [self._quad[1]])
+                GL.glDeleteVertexArrays(1, [self._quad[0]])
+            for program in self._shader_cache.values():
+                GL.glDeleteProgram(program)
+        self._texture_cache.clear()
+        self._shader_cache.clear()
+        self._pbos = None
+        self._quad = None
+
+        if self._egl:
+            display, surface, context = self._egl
+            EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(display, context)
+            EGL.eglDestroySurface(display, surface)
+            EGL.eglTerminate(display)
+            self._egl = None
         if self._ctx:
             OSMesaDestroyContext(self._ctx)
             self._ctx = None
-            self._initialized = False
+        self._initialized = False
 
 
 # Singleton instance
@@ -8,9 +8,13 @@ import os
 import subprocess
 import logging
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 from dataclasses import dataclass
 
+from ...config import get_settings
+from ...utils.ffmpeg_scheduler import get_ffmpeg_scheduler, run_ffmpeg_sync
+
 logger = logging.getLogger(__name__)
 
 # FFmpeg xfade transition names (from https://trac.ffmpeg.org/wiki/Xfade)
@@ -98,27 +102,6 @@ XFADE_TRANSITIONS = {
 # These run AFTER xfade transitions, in FFmpeg (not MoviePy per-frame)
 # =============================================================================
 
-# Color grading presets mapped to FFmpeg filter chains
-FFMPEG_COLOR_GRADES = {
-    # vibrant: +30% saturation
-    "vibrant": "eq=saturation=1.3",
-
-    # cinematic: orange/teal look - slight blue in shadows, desaturate, more contrast
-    "cinematic": "colorbalance=rs=-0.05:bs=0.05:rm=-0.03:bm=0.03,eq=saturation=0.9:contrast=1.1",
-
-    # bright: +10% brightness, slight gamma boost
-    "bright": "eq=brightness=0.1:gamma=1.1",
-
-    # moody: darker, blue tint, desaturated, high contrast
-    "moody": "colorbalance=bs=0.1:bm=0.05,eq=saturation=0.7:contrast=1.15:brightness=-0.1",
-
-    # bw: convert to grayscale
-    "bw": "colorchannelmixer=.3:.4:.3:0:.3:.4:.3:0:.3:.4:.3",
-
-    # natural: no changes
-    "natural": None,
-}
-
 # Vignette filter with configurable strength (0.0-1.0)
 # angle controls darkness spread: PI/4 is standard, lower = more vignette
 def get_vignette_filter(strength: float = 0.3) -> str:
@@ -137,6 +120,82 @@ def get_film_grain_filter(intensity: float = 0.05) -> str:
     return f"noise=alls={strength}:allf=t"
 
 
+# Group outputs of chunked sequences are re-read by the next xfade level;
+# encode them losslessly so chunking never costs quality
+INTERMEDIATE_ENCODER_OPTS = [
+    "-c:v", "libx264",
+    "-preset", "ultrafast",
+    "-qp", "0",
+    "-pix_fmt", "yuv420p",
+]
+
+
+def xfade_timeline(
+    durations: List[float],
+    transition_duration: float,
+    fps: int = 30,
+) -> Tuple[List[float], float, float]:
+    """Lay out an xfade sequence on whole frames.
+
+    Clip i starts where clip i - 1 ends minus one transition. Durations and
+    the transition are rounded to frames first, so the offsets are exact and
+    any grouping of the clips (see render_sequence) lands on the same frames.
+
+    Returns:
+        (start time of each clip, transition duration, total duration)
+    """
+    transition_frames = max(1, int(round(transition_duration * fps)))
+    starts = []
+    start_frame = 0
+    end_frame = 0
+    for duration in durations:
+        starts.append(start_frame / fps)
+        end_frame = start_frame + max(1, int(round(duration * fps)))
+        start_frame = max(0, end_frame - transition_frames)
+    return starts, transition_frames / fps, end_frame / fps
+
+
+def xfade_groups(
+    starts: List[float],
+    transition_duration: float,
+    group_size: int,
+) -> List[Tuple[int, int]]:
+    """Split an xfade sequence into consecutive groups of clips.
+
+    Fades are not associative: if a group join is still fading when a
+    neighbouring transition starts, rendering the groups separately blends
+    the clips in a different order than the flat chain. Groups are only
+    split at boundaries whose two clips both outlast two transitions (so
+    each fade ends before the next one starts). Groups hold at most
+    ``group_size`` clips unless there is no safe boundary within reach, in
+    which case they grow to the next one.
+
+    Returns:
+        (first clip index, end index) per group, covering every clip
+    """
+    count = len(starts)
+    # Slack for float error in offsets on the frame grid
+    slack = 1e-6
+
+    def safe(k: int) -> bool:
+        """Whether a group may start at clip k."""
+        left = starts[k] - starts[k - 1] >= transition_duration - slack
+        right = k == count - 1 or starts[k + 1] - starts[k] >= transition_duration - slack
+        return left and right
+
+    groups = []
+    first = 0
+    while first < count:
+        end = min(first + group_size, count)
+        if end < count and not safe(end):
+            earlier = [k for k in range(end - 1, first, -1) if safe(k)]
+            later = [k for k in range(end + 1, count) if safe(k)]
+            end = earlier[0] if earlier else (later[0] if later else count)
+        groups.append((first, end))
+        first = end
+    return groups
+
+
 @dataclass
 class ClipSegment:
     """Represents a video segment for xfade processing."""
@@ -183,6 +242,7 @@ class XfadeRenderer:
         transition: str = "fade",
         duration: float = 0.5,
         offset: Optional[float] = None,
+        job_id: str = "xfade",
     ) -> bool:
         """
         Render a single transition between two clips.
@@ -194,6 +254,7 @@ class XfadeRenderer:
             transition: xfade transition name
             duration: Transition duration in seconds
             offset: Time offset for transition (auto-calculate if None)
+            job_id: Job the FFmpeg process is scheduled under
 
         Returns:
             True if successful
@@ -216,18 +277,12 @@ class XfadeRenderer:
                 "-c:v", "libx264",
                 "-preset", "ultrafast",  # Changed from 'fast' for speed
                 "-crf", "23",
-                "-threads", "0",  # Use all available CPU threads
                 "-c:a", "aac",
                 "-b:a", "192k",
                 output_path
             ]
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            result = run_ffmpeg_sync(cmd, job_id=job_id, timeout=120)
 
             if result.returncode != 0:
                 logger.error(f"xfade render failed: {result.stderr}")
@@ -251,10 +306,17 @@ class XfadeRenderer:
         color_grade: Optional[str] = None,
         vignette_strength: Optional[float] = None,
         film_grain_intensity: Optional[float] = None,
+        fps: int = 30,
+        group_size: Optional[int] = None,
+        job_id: str = "xfade",
     ) -> bool:
         """
         Render a sequence of clips with transitions and post-processing.
 
+        Sequences longer than ``group_size`` clips are rendered as a tree of
+        smaller xfade chains (groups in parallel, joined at their boundary
+        transitions) instead of one deep filter graph; the timing is the same.
+
         Args:
             clips: List of ClipSegment objects
             output_path: Output file path
@@ -265,6 +327,9 @@ class XfadeRenderer:
             color_grade: Color grading preset (vibrant, cinematic, bright, moody, bw)
             vignette_strength: Vignette strength 0.0-1.0 (None to disable)
             film_grain_intensity: Film grain intensity 0.0-0.2 (None to disable)
+            fps: Frame rate the offsets are aligned to
+            group_size: Max clips per xfade chain (None = xfade_group_size setting)
+            job_id: Job the FFmpeg processes are scheduled under
 
         Returns:
             True if successful
@@ -338,172 +403,48 @@ class XfadeRenderer:
             while len(transitions) < len(clips) - 1:
                 transitions.append("fade")
 
-        try:
-            # Build complex filter for multiple transitions
-            inputs = []
-            for i, clip in enumerate(clips):
-                inputs.extend(["-i", clip.path])
-
-            # Build filter chain with cumulative offset calculation
-            # FFmpeg xfade chains: each xfade operates on the OUTPUT of the previous one
-            # So offsets must be calculated relative to accumulated duration
-            filter_parts = []
-
-            # CRITICAL: Add scale filters for EACH input to normalize dimensions
-            # Ken Burns motion effects change clip sizes, causing xfade to fail
-            # Scale filter: normalize → pad to exact size → reset SAR → ensure pixel format
-            for i in range(len(clips)):
-                scale_filter = (
-                    f"[{i}:v]scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,"
-                    f"pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p[s{i}]"
-                )
-                filter_parts.append(scale_filter)
+        # Frame-aligned timeline: where each clip starts in the output
+        starts, transition_duration, total_duration = xfade_timeline(
+            [clip.duration for clip in clips], transition_duration, fps
+        )
+        for i, transition in enumerate(transitions[:len(clips) - 1]):
+            print(f"[XFADE_RENDERER] Transition {i}: {transition}, offset={starts[i + 1]:.3f}s, duration={transition_duration:.3f}s")
+        logger.info(f"xfade final duration: ~{total_duration:.1f}s")
 
-            print(f"[XFADE_RENDERER] Added {len(clips)} scale filters for dimension normalization")
+        post_filters = self._build_post_filters(color_grade, vignette_strength, film_grain_intensity)
 
-            # Use scaled inputs [s0], [s1], etc. instead of raw [0:v], [1:v]
-            current_label = "[s0]"
+        if group_size is None:
+            group_size = get_settings().xfade_group_size
+        group_size = max(2, group_size)
 
-            # Start with first clip's duration
-            accumulated_duration = clips[0].duration
-            print(f"[XFADE_RENDERER] Initial accumulated_duration: {accumulated_duration}s")
-
-            for i, transition in enumerate(transitions):
-                next_input = f"[s{i + 1}]"  # Use scaled input, not raw
-
-                # Offset is where in the accumulated stream the transition starts
-                # It should be: accumulated_duration - transition_duration
-                offset = max(0, accumulated_duration - transition_duration)
-
-                # VALIDATION: Ensure offset is not longer than accumulated duration
-                if offset > accumulated_duration:
-                    print(f"[XFADE_RENDERER] WARNING: offset {offset} > accumulated {accumulated_duration}, clamping")
-                    offset = max(0, accumulated_duration - 0.1)
-
-                # VALIDATION: Ensure transition_duration doesn't exceed remaining time
-                remaining_time = accumulated_duration - offset
-                effective_transition = min(transition_duration, remaining_time)
-                if effective_transition != transition_duration:
-                    print(f"[XFADE_RENDERER] WARNING: Clamped transition from {transition_duration}s to {effective_transition}s")
-
-                print(f"[XFADE_RENDERER] Transition {i}: {transition}, offset={offset:.2f}s, duration={effective_transition:.2f}s")
-
-                if i < len(transitions) - 1:
-                    output_label = f"[v{i}]"
-                else:
-                    output_label = ""  # Final output has no label
-
-                xfade_filter = f"{current_label}{next_input}xfade=transition={transition}:duration={effective_transition}:offset={offset}{output_label}"
-                filter_parts.append(xfade_filter)
-
-                # Update accumulated duration: add next clip, subtract overlap
-                accumulated_duration = offset + clips[i + 1].duration
-                print(f"[XFADE_RENDERER] After transition {i}: accumulated_duration = {accumulated_duration}s")
-
-                if output_label:
-                    current_label = output_label
-
-            print(f"[XFADE_RENDERER] Filter chain: {len(filter_parts)} transitions")
-            print(f"[XFADE_RENDERER] Effects being applied: {transitions}")
-
-            # =================================================================
-            # POST-PROCESSING FILTERS (color grade, vignette, film grain)
-            # Applied in FFmpeg = FAST (vs MoviePy per-frame = SLOW)
-            # =================================================================
-            post_filters = []
-
-            # Color grading
-            if color_grade and color_grade != "natural":
-                grade_filter = FFMPEG_COLOR_GRADES.get(color_grade)
-                if grade_filter:
-                    post_filters.append(grade_filter)
-                    print(f"[XFADE_RENDERER] Adding color grade: {color_grade} -> {grade_filter}")
-
-            # Vignette
-            if vignette_strength is not None and vignette_strength > 0:
-                vignette_filter = get_vignette_filter(vignette_strength)
-                post_filters.append(vignette_filter)
-                print(f"[XFADE_RENDERER] Adding vignette: strength={vignette_strength} -> {vignette_filter}")
-
-            # Film grain
-            if film_grain_intensity is not None and film_grain_intensity > 0:
-                grain_filter = get_film_grain_filter(film_grain_intensity)
-                post_filters.append(grain_filter)
-                print(f"[XFADE_RENDERER] Adding film grain: intensity={film_grain_intensity} -> {grain_filter}")
-
-            # If we have post-processing, need to chain them after xfade
-            if post_filters:
-                # Last xfade currently has no output label, give it one
-                # Find the last xfade filter and add output label
-                last_filter_idx = len(filter_parts) - 1
-                filter_parts[last_filter_idx] = filter_parts[last_filter_idx] + "[xfade_out]"
-
-                # Chain post-processing filters
-                post_chain = ",".join(post_filters)
-                filter_parts.append(f"[xfade_out]{post_chain}")
-                print(f"[XFADE_RENDERER] Post-processing chain: {post_chain}")
-
-            print(f"[XFADE_RENDERER] Each filter part:")
-            for idx, part in enumerate(filter_parts):
-                print(f"  [{idx}] {part}")
-            logger.info(f"xfade filter chain: {len(filter_parts)} parts with effects: {transitions}")
-            logger.info(f"xfade final duration: ~{accumulated_duration:.1f}s")
-
-            filter_complex = ";".join(filter_parts)
-            print(f"[XFADE_RENDERER] Full filter_complex: {filter_complex}")
-            logger.debug(f"FFmpeg filter_complex: {filter_complex[:200]}...")
-
-            # Build command
-            cmd = [self.ffmpeg_path, "-y"]
-            cmd.extend(inputs)
-            cmd.extend(["-filter_complex", filter_complex])
-
-            # Encoding settings
-            if use_gpu and self._check_nvenc():
-                cmd.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p4",
-                    "-cq", "23",
-                    "-b:v", "8M",
-                ])
-            else:
-                cmd.extend([
-                    "-c:v", "libx264",
-                    "-preset", "ultrafast",  # Changed from 'fast' for speed
-                    "-crf", "23",
-                    "-threads", "0",  # Use all available CPU threads
-                ])
-
-            cmd.extend([
-                "-c:a", "aac",
-                "-b:a", "192k",
-                output_path
-            ])
+        try:
+            if len(clips) > group_size:
+                return self._render_sequence_chunked(
+                    clips=clips,
+                    starts=starts,
+                    output_path=output_path,
+                    transitions=transitions,
+                    transition_duration=transition_duration,
+                    target_size=target_size,
+                    post_filters=post_filters,
+                    use_gpu=use_gpu,
+                    group_size=group_size,
+                    job_id=job_id,
+                )
 
-            print(f"[XFADE_RENDERER] Full FFmpeg command:")
-            print(f"  {' '.join(cmd)}")
             logger.info(f"Running xfade sequence render with {len(clips)} clips")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes for longer sequences
+            return self._run_xfade_chain(
+                paths=[clip.path for clip in clips],
+                starts=starts,
+                output_path=output_path,
+                transitions=transitions,
+                transition_duration=transition_duration,
+                target_size=target_size,
+                post_filters=post_filters,
+                encoder_opts=self._final_encoder_opts(use_gpu),
+                job_id=job_id,
             )
 
-            if result.returncode != 0:
-                print(f"[XFADE_RENDERER] FFmpeg FAILED! Return code: {result.returncode}")
-                print(f"[XFADE_RENDERER] === FULL STDERR ===")
-                print(result.stderr)
-                print(f"[XFADE_RENDERER] === END STDERR ===")
-                # Also print stdout in case there's useful info there
-                if result.stdout:
-                    print(f"[XFADE_RENDERER] stdout: {result.stdout}")
-                logger.error(f"xfade sequence render failed: {result.stderr}")
-                return False
-
-            print(f"[XFADE_RENDERER] FFmpeg SUCCESS! Output: {output_path}")
-            return True
-
         except subprocess.TimeoutExpired:
             logger.error("xfade sequence render timed out")
             return False
@@ -511,6 +452,213 @@ class XfadeRenderer:
             logger.error(f"xfade sequence render error: {e}")
             return False
 
+    def _build_post_filters(
+        self,
+        color_grade: Optional[str],
+        vignette_strength: Optional[float],
+        film_grain_intensity: Optional[float],
+    ) -> List[str]:
+        """Color grade, vignette and film grain filters applied after the transitions."""
+        post_filters = []
+
+        # Color grading (lut3d from the same compiled LUT the MoviePy path uses)
+        if color_grade and color_grade != "natural":
+            from ...renderers.filters.color_grading import build_color_grade_filter
+
+            grade_filter = build_color_grade_filter(color_grade)
+            if grade_filter:
+                post_filters.append(grade_filter)
+                print(f"[XFADE_RENDERER] Adding color grade: {color_grade} -> {grade_filter}")
+
+        # Vignette
+        if vignette_strength is not None and vignette_strength > 0:
+            vignette_filter = get_vignette_filter(vignette_strength)
+            post_filters.append(vignette_filter)
+            print(f"[XFADE_RENDERER] Adding vignette: strength={vignette_strength} -> {vignette_filter}")
+
+        # Film grain
+        if film_grain_intensity is not None and film_grain_intensity > 0:
+            grain_filter = get_film_grain_filter(film_grain_intensity)
+            post_filters.append(grain_filter)
+            print(f"[XFADE_RENDERER] Adding film grain: intensity={film_grain_intensity} -> {grain_filter}")
+
+        return post_filters
+
+    def _final_encoder_opts(self, use_gpu: bool) -> List[str]:
+        if use_gpu and self._check_nvenc():
+            return [
+                "-c:v", "h264_nvenc",
+                "-preset", "p4",
+                "-cq", "23",
+                "-b:v", "8M",
+            ]
+        return [
+            "-c:v", "libx264",
+            "-preset", "ultrafast",  # Changed from 'fast' for speed
+            "-crf", "23",
+        ]
+
+    def _run_xfade_chain(
+        self,
+        paths: List[str],
+        starts: List[float],
+        output_path: str,
+        transitions: List[str],
+        transition_duration: float,
+        target_size: Optional[Tuple[int, int]],
+        post_filters: List[str],
+        encoder_opts: List[str],
+        job_id: str,
+    ) -> bool:
+        """Join pieces with xfade in one FFmpeg call.
+
+        ``starts`` are the pieces' start times on the output timeline; the
+        chain's offsets are taken relative to the first piece, so the same
+        code renders whole sequences, groups of clips, and groups of groups.
+        ``transitions[i]`` joins piece i and piece i + 1.
+        """
+        inputs = []
+        for path in paths:
+            inputs.extend(["-i", path])
+
+        filter_parts = []
+        if target_size:
+            # CRITICAL: Normalize every input - Ken Burns motion changes clip
+            # sizes and xfade requires identical dimensions
+            target_w, target_h = target_size
+            for i in range(len(paths)):
+                filter_parts.append(
+                    f"[{i}:v]scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,"
+                    f"pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p[s{i}]"
+                )
+            current_label = "[s0]"
+            source = "[s{}]"
+        else:
+            current_label = "[0:v]"
+            source = "[{}:v]"
+
+        # Each xfade operates on the OUTPUT of the previous one, so offsets
+        # are positions on the accumulated timeline
+        base = starts[0]
+        for i in range(1, len(paths)):
+            offset = starts[i] - base
+            output_label = f"[v{i}]" if i < len(paths) - 1 or post_filters else "[vout]"
+            filter_parts.append(
+                f"{current_label}{source.format(i)}xfade=transition={transitions[i - 1]}:"
+                f"duration={transition_duration:.6f}:offset={offset:.6f}{output_label}"
+            )
+            current_label = output_label
+
+        if post_filters:
+            filter_parts.append(f"{current_label}{','.join(post_filters)}[vout]")
+
+        filter_complex = ";".join(filter_parts)
+        logger.debug(f"FFmpeg filter_complex: {filter_complex[:200]}...")
+
+        cmd = [
+            self.ffmpeg_path, "-y",
+            *inputs,
+            "-filter_complex", filter_complex,
+            "-map", "[vout]",
+            *encoder_opts,
+            output_path,
+        ]
+        print(f"[XFADE_RENDERER] Running xfade chain: {len(paths)} inputs -> {os.path.basename(output_path)}")
+        result = run_ffmpeg_sync(cmd, job_id=job_id, timeout=300)  # 5 minutes for longer sequences
+
+        if result.returncode != 0:
+            print(f"[XFADE_RENDERER] FFmpeg FAILED! Return code: {result.returncode}")
+            print(f"[XFADE_RENDERER] === FULL STDERR ===")
+            print(result.stderr)
+            print(f"[XFADE_RENDERER] === END STDERR ===")
+            logger.error(f"xfade sequence render failed: {result.stderr[-2000:]}")
+            return False
+
+        print(f"[XFADE_RENDERER] FFmpeg SUCCESS! Output: {output_path}")
+        return True
+
+    def _render_sequence_chunked(
+        self,
+        clips: List[ClipSegment],
+        starts: List[float],
+        output_path: str,
+        transitions: List[str],
+        transition_duration: float,
+        target_size: Optional[Tuple[int, int]],
+        post_filters: List[str],
+        use_gpu: bool,
+        group_size: int,
+        job_id: str,
+    ) -> bool:
+        """Render a long sequence as a tree of xfade groups.
+
+        Consecutive clips are joined in groups of ``group_size`` (in
+        parallel, losslessly), then the group outputs are joined the same
+        way until one level fits in a single chain. A group output starts
+        at its first clip's start, and neighbouring groups are joined with
+        the transition between their boundary clips at the same offset the
+        flat chain uses, so timing matches the flat graph frame for frame.
+        Groups are only split where no fade overlaps the join (see
+        xfade_groups); clips with no such boundary are rendered flat.
+        Groups run in at most ``ffmpeg_max_processes`` threads; each chain
+        still waits for its own FFmpeg scheduler slot.
+        """
+        # (path, start on output timeline, index of its first clip)
+        pieces = [(clip.path, start, i) for i, (clip, start) in enumerate(zip(clips, starts))]
+        level = 0
+
+        with tempfile.TemporaryDirectory(prefix="xfade_", dir=os.path.dirname(os.path.abspath(output_path))) as tmp_dir:
+            while len(pieces) > group_size:
+                piece_starts = [piece[1] for piece in pieces]
+                groups = [
+                    pieces[first:end]
+                    for first, end in xfade_groups(piece_starts, transition_duration, group_size)
+                ]
+                if len(groups) == 1:
+                    # No join is safe: the remaining pieces go in one chain
+                    break
+                print(f"[XFADE_RENDERER] Level {level}: {len(pieces)} pieces -> {len(groups)} groups")
+
+                def render_group(index: int) -> Tuple[str, float, int]:
+                    group = groups[index]
+                    # A trailing single piece needs no render of its own
+                    if len(group) == 1:
+                        return group[0]
+                    group_path = os.path.join(tmp_dir, f"level{level}_group{index:03d}.mp4")
+                    ok = self._run_xfade_chain(
+                        paths=[piece[0] for piece in group],
+                        starts=[piece[1] for piece in group],
+                        output_path=group_path,
+                        transitions=[transitions[piece[2] - 1] for piece in group[1:]],
+                        transition_duration=transition_duration,
+                        target_size=target_size,
+                        post_filters=[],
+                        encoder_opts=INTERMEDIATE_ENCODER_OPTS,
+                        job_id=job_id,
+                    )
+                    if not ok:
+                        raise RuntimeError(f"xfade group {index} at level {level} failed")
+                    return group_path, group[0][1], group[0][2]
+
+                workers = max(1, min(len(groups), get_ffmpeg_scheduler().max_processes))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    pieces = list(executor.map(render_group, range(len(groups))))
+
+                level += 1
+
+            print(f"[XFADE_RENDERER] Final join: {len(pieces)} pieces")
+            return self._run_xfade_chain(
+                paths=[piece[0] for piece in pieces],
+                starts=[piece[1] for piece in pieces],
+                output_path=output_path,
+                transitions=[transitions[piece[2] - 1] for piece in pieces[1:]],
+                transition_duration=transition_duration,
+                target_size=target_size,
+                post_filters=post_filters,
+                encoder_opts=self._final_encoder_opts(use_gpu),
+                job_id=job_id,
+            )
+
     def create_clip_from_image(
         self,
         image_path: str,
@@ -518,6 +666,7 @@ class XfadeRenderer:
         duration: float,
         fps: int = 30,
         size: Optional[Tuple[int, int]] = None,
+        job_id: str = "xfade",
     ) -> bool:
         """
         Create a video clip from a static image.
@@ -528,6 +677,7 @@ class XfadeRenderer:
             duration: Duration in seconds
             fps: Frame rate
             size: Optional (width, height) to resize
+            job_id: Job the FFmpeg process is scheduled under
 
         Returns:
             True if successful
@@ -553,12 +703,7 @@ class XfadeRenderer:
                 output_path
             ])
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = run_ffmpeg_sync(cmd, job_id=job_id, timeout=60)
 
             if result.returncode != 0:
                 logger.error(f"Image to clip failed: {result.stderr}")
@@ -630,15 +775,16 @@ class XfadeRenderer:
         try:
             # Actually test NVENC encoding, not just encoder listing
             # NVENC requires minimum 128x128 frame size, using 256x256 to be safe
-            result = subprocess.run(
+            # Opens a real NVENC session, so it takes a scheduler slot too
+            result = run_ffmpeg_sync(
                 [
                     self.ffmpeg_path, "-hide_banner", "-loglevel", "error",
                     "-f", "lavfi", "-i", "color=black:s=256x256:d=0.1",
                     "-c:v", "h264_nvenc", "-f", "null", "-"
                 ],
-                capture_output=True,
-                text=True,
-                timeout=10
+                job_id="nvenc_check",
+                threads_hint=False,
+                timeout=10,
             )
             self._nvenc_available_cache = result.returncode == 0
             if self._nvenc_available_cache:
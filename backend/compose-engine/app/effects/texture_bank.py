@@ -0,0 +1,149 @@
+"""Shared cache of full-resolution overlay textures.
+
+Overlay effects (light leaks, bokeh, flares, rays, vignette masks, ...) are
+pure functions of the output size and the effect variant, but each clip used
+to rebuild them from meshgrids - at 1080x1920 that is tens of MB and tens of
+ms per texture, repeated for every clip of every render.
+
+TextureBank keeps the generated textures keyed by
+(effect, width, height, variant, rgb):
+
+- Textures are float32 and read-only; effects derive their per-clip blend
+  layers from them instead of mutating them
+- Memory is bounded by ``overlay_texture_cache_bytes`` with LRU eviction
+- A texture is generated at most once per key even when several clips ask
+  for it at the same time
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TextureKey = Tuple[str, int, int, Hashable, Optional[Tuple[float, ...]]]
+
+
+class TextureBank:
+    """Bounded LRU cache of overlay textures."""
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._textures: "OrderedDict[TextureKey, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[TextureKey, threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(
+        effect: str,
+        width: int,
+        height: int,
+        variant: Hashable = None,
+        rgb: Optional[tuple] = None,
+    ) -> TextureKey:
+        if rgb is not None:
+            rgb = tuple(round(float(c), 4) for c in rgb)
+        return (effect, int(width), int(height), variant, rgb)
+
+    def get(
+        self,
+        effect: str,
+        width: int,
+        height: int,
+        build: Callable[[], np.ndarray],
+        variant: Hashable = None,
+        rgb: Optional[tuple] = None,
+    ) -> np.ndarray:
+        """Get a texture, calling ``build()`` to generate it on a miss.
+
+        Args:
+            effect: Effect name (e.g. "light_leak")
+            width: Frame width
+            height: Frame height
+            build: Generates the texture; only called on a miss
+            variant: Anything else the texture depends on (style, position, ...)
+            rgb: Custom color the texture was generated with, if any
+
+        Returns:
+            Read-only float32 array
+        """
+        key = self.make_key(effect, width, height, variant, rgb)
+
+        texture = self._lookup(key)
+        if texture is not None:
+            return texture
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Single flight: concurrent misses for one key wait for the first build
+        try:
+            with key_lock:
+                texture = self._lookup(key, count_miss=True)
+                if texture is not None:
+                    return texture
+
+                texture = np.ascontiguousarray(build(), dtype=np.float32)
+                texture.flags.writeable = False
+                self._store(key, texture)
+                return texture
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def _lookup(self, key: TextureKey, count_miss: bool = False) -> Optional[np.ndarray]:
+        with self._lock:
+            texture = self._textures.get(key)
+            if texture is not None:
+                self._textures.move_to_end(key)
+                self._stats["hits"] += 1
+            elif count_miss:
+                self._stats["misses"] += 1
+            return texture
+
+    def _store(self, key: TextureKey, texture: np.ndarray) -> None:
+        if texture.nbytes > self.max_bytes:
+            logger.debug(f"[TextureBank] {key[0]} {key[1]}x{key[2]} exceeds cache budget, not cached")
+            return
+
+        with self._lock:
+            self._textures[key] = texture
+            self._bytes += texture.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._textures.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._textures.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._textures),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_bank: Optional[TextureBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_texture_bank() -> TextureBank:
+    """Get the process-wide texture bank configured from settings."""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = TextureBank(max_bytes=get_settings().overlay_texture_cache_bytes)
+        return _bank
@@ -3,13 +3,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import os
 import logging
 import sys
 
 from .config import get_settings
 from .utils.job_queue import JobQueue
-from .dependencies import set_job_queue, init_render_semaphore
+from .utils.work_queue import connect_work_queue
+from .dependencies import set_job_queue, set_work_queue, init_render_queue
+from .services.analysis_executor import get_analysis_executor, shutdown_analysis_executor
+from .utils.object_store import close_object_store
 
 # Configure logging to output to stdout
 logging.basicConfig(
@@ -42,13 +46,39 @@ async def lifespan(app: FastAPI):
     await job_queue.connect()
     set_job_queue(job_queue)
 
-    # Initialize render semaphore for concurrent job control
-    init_render_semaphore(settings.max_concurrent_jobs)
+    # Initialize render queue for concurrent job control
+    init_render_queue(settings.max_concurrent_jobs)
     logger.info(f"Render concurrency: max {settings.max_concurrent_jobs} parallel jobs")
 
+    # Start audio analysis process pool (keeps librosa off the event loop)
+    get_analysis_executor().start()
+    logger.info(f"Audio analysis: {settings.analysis_workers} workers, queue {settings.analysis_queue_size}")
+
+    # Initialize work queue (the API only enqueues; workers render)
+    work_queue = await connect_work_queue(
+        settings.redis_url,
+        visibility_timeout=settings.work_visibility_timeout_seconds,
+        max_attempts=settings.work_max_attempts,
+    )
+    set_work_queue(work_queue)
+
+    # Without Redis nobody else can see the queue, so render in this process
+    worker = worker_task = None
+    if settings.embedded_worker or not work_queue.is_durable:
+        from .worker import create_worker
+        worker = create_worker(work_queue, job_queue)
+        worker_task = asyncio.create_task(worker.run())
+        logger.info("Render worker: embedded in API process")
+
     yield
 
     # Shutdown
+    if worker:
+        worker.stop()
+        await worker_task
+    await work_queue.close()
+    shutdown_analysis_executor()
+    await close_object_store()
     await job_queue.disconnect()
 
 
@@ -104,3 +134,45 @@ async def health_check():
         "service": settings.app_name,
         "redis": "connected" if job_queue and job_queue.is_connected else "fallback (in-memory)"
     }
+
+
+@app.get("/cache/clips/stats")
+async def clip_cache_stats():
+    """Hit/miss counters and disk usage of the encoded clip cache."""
+    from .renderers.clip_cache import get_clip_cache
+    cache = get_clip_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@app.get("/cache/assets/stats")
+async def asset_cache_stats():
+    """Hit/miss counters and disk usage of the downloaded asset cache."""
+    from .utils.asset_cache import get_asset_cache
+    cache = get_asset_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@app.get("/cache/probes/stats")
+async def probe_cache_stats():
+    """Hit/miss counters of the ffprobe result cache."""
+    from .renderers.utils.ffprobe import get_probe_service
+    return get_probe_service().stats()
+
+
+@app.get("/object-store/stats")
+async def object_store_stats():
+    """Upload/download budget utilization and HTTP connection pool usage."""
+    from .utils.object_store import get_object_store
+    return get_object_store().stats()
+
+
+@app.get("/queue/stats")
+async def render_queue_stats():
+    """Queue length, wait times and duration estimates of the render queue."""
+    from .dependencies import get_render_queue, get_work_queue
+    render_queue = get_render_queue()
+    work_queue = get_work_queue()
+    stats = render_queue.stats() if render_queue else {"enabled": False}
+    if work_queue:
+        stats["work_queue"] = await work_queue.queue_stats()
+    return stats
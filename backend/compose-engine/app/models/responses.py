@@ -29,6 +29,8 @@ class JobStatusResponse(BaseModel):
     steps: Optional[list[JobStep]] = None
     output_url: Optional[str] = None
     error: Optional[str] = None
+    queue_position: Optional[int] = Field(default=None, description="Place in the render queue (0 while rendering)")
+    eta_seconds: Optional[float] = Field(default=None, description="Estimated seconds until rendering starts")
 
 
 class ClimaxCandidate(BaseModel):
@@ -77,6 +77,10 @@ class VideoEditRequest(BaseModel):
     # Subtitle settings (optional - adds subtitle overlays)
     subtitles: Optional[SubtitleSettings] = Field(default=None, description="Subtitle overlays to add")
 
+    # Render queue scheduling
+    priority: Optional[str] = Field(default=None, description="Render priority (interactive, variation, batch); defaults to interactive")
+    tenant_id: Optional[str] = Field(default=None, description="Tenant for fair queueing (defaults to metadata user_id, then campaign_id)")
+
 
 class VideoEditResponse(BaseModel):
     """Response model for video edit job submission."""
@@ -4,13 +4,13 @@ Replaces MoviePy's AudioFileClip operations with native FFmpeg audio filters.
 This handles trimming, volume adjustment, fades, and the TikTok hook effect.
 """
 
-import asyncio
 import logging
 import os
 import time
 from dataclasses import dataclass
 from typing import Optional
 
+from ...utils.ffmpeg_scheduler import run_ffmpeg
 from ..ffmpeg_pipeline import find_ffmpeg
 
 logger = logging.getLogger(__name__)
@@ -144,14 +144,9 @@ class AudioProcessor:
         logger.info(f"[{job_id}] Processing audio with filters")
         logger.debug(f"[{job_id}] Audio filter: {filter_chain}")
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        _, stderr = await proc.communicate()
+        returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-        if proc.returncode != 0:
+        if returncode != 0:
             logger.error(f"[{job_id}] Audio processing failed: {stderr.decode()}")
             return False
 
@@ -207,15 +202,10 @@ class AudioProcessor:
 
         _log_ffmpeg_cmd(cmd, job_id)
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        _, stderr = await proc.communicate()
+        returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
         elapsed = time.time() - start_time
 
-        if proc.returncode != 0:
+        if returncode != 0:
             logger.error(f"[{job_id}] Audio mix FAILED ({elapsed:.1f}s): {stderr.decode()[:500]}")
             return False
 
@@ -264,14 +254,9 @@ class AudioProcessor:
 
         logger.info(f"[{job_id}] Extracting audio from video")
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        _, stderr = await proc.communicate()
+        returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-        if proc.returncode != 0:
+        if returncode != 0:
             logger.error(f"[{job_id}] Audio extraction failed: {stderr.decode()}")
             return False
 
@@ -0,0 +1,201 @@
+"""Content-addressed cache for encoded Ken Burns image clips.
+
+A clip made by create_image_clip is fully determined by the image bytes and
+the encode parameters, but FFmpegRenderer loops a handful of images over
+many timeline slots, and variation jobs reuse the same images again. The
+cache keys each clip on
+
+    (image content hash, duration, motion_style, output_size, fps, encoder)
+
+so identical clips are encoded once:
+
+- Within a job, duplicate specs wait for the first encode and reuse it
+- Across jobs, clips are kept in ``clip_cache_dir``, which can live on a
+  shared volume (Modal's /cache); writes are atomic so concurrent workers
+  never see partial files
+- Entries are stored read-only and handed to jobs as hard links only where
+  that mode stops in-place writes, else as copies (see link_or_copy)
+- The directory is bounded by ``clip_cache_max_bytes`` with LRU eviction
+- Hit/miss counters are available from stats()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import get_settings
+from ..utils.disk_lru import DiskLRU
+from ..utils.temp_files import link_or_copy, make_read_only
+
+logger = logging.getLogger(__name__)
+
+# Bump when the Ken Burns filter or clip encode settings change
+CLIP_CACHE_VERSION = 1
+
+# Bytes read per chunk when hashing images
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ClipCache:
+    """Disk cache of encoded image clips, keyed by content and encode params."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.cache_dir = os.path.normpath(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # (path, mtime_ns, size) -> content hash
+        self._file_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "errors": 0,
+            "bytes_served": 0,
+        }
+        self._disk = DiskLRU(self.cache_dir, max_bytes, suffix=".mp4", name="ClipCache")
+
+    # =========================================================================
+    # Keys
+    # =========================================================================
+
+    def content_hash(self, image_path: str) -> str:
+        """Get the SHA-256 of an image (memoized by path/mtime/size)."""
+        st = os.stat(image_path)
+        memo_key = (os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._file_hashes.get(memo_key)
+            if cached:
+                self._file_hashes.move_to_end(memo_key)
+                return cached
+
+        digest = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            self._file_hashes[memo_key] = content_hash
+            while len(self._file_hashes) > 1024:
+                self._file_hashes.popitem(last=False)
+        return content_hash
+
+    def make_key(
+        self,
+        image_path: str,
+        duration: float,
+        motion_style: str,
+        output_size: Tuple[int, int],
+        fps: int,
+        encoder: str,
+    ) -> str:
+        """Build the cache key for a clip (hashes the image)."""
+        payload = json.dumps(
+            {
+                "v": CLIP_CACHE_VERSION,
+                "image": self.content_hash(image_path),
+                # str() is what create_image_clip passes to -t
+                "duration": str(duration),
+                "motion_style": motion_style,
+                "size": list(output_size),
+                "fps": fps,
+                "encoder": encoder,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # =========================================================================
+    # Get / Put
+    # =========================================================================
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp4")
+
+    def get(self, key: str, output_path: str) -> bool:
+        """Copy a cached clip to output_path. Returns False on a miss."""
+        path = self._path(key)
+        try:
+            link_or_copy(path, output_path)
+            self._disk.touch(path)  # LRU ordering
+        except FileNotFoundError:
+            self._count("misses")
+            return False
+        except OSError as e:
+            logger.warning(f"[ClipCache] Read failed for {key[:12]}: {e}")
+            self._count("errors")
+            self._count("misses")
+            return False
+
+        self._count("hits")
+        self._count("bytes_served", os.path.getsize(output_path))
+        return True
+
+    def put(self, key: str, clip_path: str) -> None:
+        """Store an encoded clip (atomically; failures are only logged)."""
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(clip_path, tmp_path)
+            make_read_only(tmp_path)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"[ClipCache] Write failed for {key[:12]}: {e}")
+            self._count("errors")
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+
+        self._count("stores")
+        self._disk.add(size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and disk usage."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["disk_bytes"] = self._disk.bytes
+        stats["evictions"] = self._disk.evictions
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def clear(self) -> None:
+        """Remove all cached clips."""
+        self._disk.clear()
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += delta
+
+
+@lru_cache()
+def get_clip_cache() -> Optional[ClipCache]:
+    """Get the process-wide clip cache, or None if disabled in settings."""
+    settings = get_settings()
+    if not settings.clip_cache_enabled:
+        return None
+    try:
+        return ClipCache(
+            cache_dir=settings.clip_cache_dir,
+            max_bytes=settings.clip_cache_max_bytes,
+        )
+    except OSError as e:
+        logger.warning(f"[ClipCache] Disabled, cannot use {settings.clip_cache_dir}: {e}")
+        return None
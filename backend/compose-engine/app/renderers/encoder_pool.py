@@ -0,0 +1,234 @@
+"""Batched FFmpeg encoding of short Ken Burns clips.
+
+create_image_clip starts one FFmpeg process per clip, and beat-synced
+timelines are full of clips well under a second long, so most of each
+process is startup, image probing and encoder initialization rather than
+encoding. ClipEncoderPool keeps a few long-lived workers for the duration
+of a clip batch; each worker takes whatever clips are waiting and encodes
+them in one FFmpeg process with one input and one output per clip:
+
+    ffmpeg -loop 1 -i a.png -loop 1 -i b.png
+           -filter_complex "[0:v]<ken burns a>[o0];[1:v]<ken burns b>[o1]"
+           -map [o0] -t 0.4 <encoder> clip_000.mp4
+           -map [o1] -t 0.8 <encoder> clip_001.mp4
+
+Each output gets exactly the filter, duration and encoder options of the
+single-clip command, so the clips are the same. If a batch process fails,
+its clips are retried one by one through the fallback (create_image_clip,
+which also falls back from NVENC to libx264), so one bad image never
+fails its neighbours. Batch processes are admitted by the process-wide
+FFmpeg scheduler like every other FFmpeg call.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from ..utils.ffmpeg_scheduler import encoder_kind, get_ffmpeg_scheduler
+
+logger = logging.getLogger(__name__)
+
+# How long a worker waits for more clips before starting a batch
+BATCH_WINDOW_SECONDS = 0.05
+
+
+@dataclass
+class ClipWorkItem:
+    """One clip to encode from a still image."""
+    image_path: str
+    output_path: str
+    duration: float
+    filter_chain: str
+    motion_style: str = "static"  # For the single-clip fallback
+    encoder: Optional[str] = None  # Codec that produced the clip, once encoded
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class ClipEncoderPool:
+    """Long-lived workers encoding queued clips in batched FFmpeg processes.
+
+    Usage:
+        async with ClipEncoderPool(ffmpeg, encoder_opts, fps, fallback) as pool:
+            ok = await pool.encode(ClipWorkItem(...))
+    """
+
+    def __init__(
+        self,
+        ffmpeg_path: str,
+        encoder_opts: List[str],
+        fps: int,
+        fallback: Callable[[ClipWorkItem], Awaitable[bool]],
+        workers: int = 4,
+        batch_size: int = 6,
+        job_id: str = "unknown",
+    ):
+        """
+        Args:
+            ffmpeg_path: FFmpeg executable
+            encoder_opts: Video codec options applied to every output
+            fps: Output frame rate
+            fallback: Encodes a single item (used when a batch fails);
+                sets item.encoder to the codec it used
+            workers: FFmpeg processes running at once
+            batch_size: Max clips per FFmpeg process
+            job_id: Job ID for logging
+        """
+        self.ffmpeg_path = ffmpeg_path
+        self.encoder_opts = list(encoder_opts)
+        self.encoder = (
+            encoder_opts[encoder_opts.index("-c:v") + 1] if "-c:v" in encoder_opts else None
+        )
+        self.fps = fps
+        self.fallback = fallback
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.job_id = job_id
+
+        self._queue: "asyncio.Queue[ClipWorkItem]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"batches": 0, "clips": 0, "batch_failures": 0, "fallbacks": 0}
+
+    async def __aenter__(self) -> "ClipEncoderPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(i)) for i in range(self.workers)
+            ]
+
+    async def close(self) -> None:
+        """Stop the workers (queued clips that were never started fail)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item.future and not item.future.done():
+                item.future.set_result(False)
+        logger.info(
+            f"[{self.job_id}] [EncoderPool] {self.stats['clips']} clips in {self.stats['batches']} processes "
+            f"({self.stats['batch_failures']} failed batches, {self.stats['fallbacks']} single-clip retries)"
+        )
+
+    async def encode(self, item: ClipWorkItem) -> bool:
+        """Queue a clip and wait until it is encoded."""
+        self.start()
+        item.future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(item)
+        return await item.future
+
+    # =========================================================================
+    # Workers
+    # =========================================================================
+
+    async def _next_batch(self) -> List[ClipWorkItem]:
+        batch = [await self._queue.get()]
+        # Give clips still being prepared (cache lookups) a moment to arrive
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        # Share what's waiting evenly between workers
+        fair_share = math.ceil((self._queue.qsize() + 1) / self.workers)
+        limit = max(1, min(self.batch_size, fair_share))
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                if len(batch) == 1:
+                    results = [await self._run_fallback(batch[0])]
+                else:
+                    results = await self._run_batch(batch, worker_id)
+            except asyncio.CancelledError:
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_result(False)
+                raise
+            except Exception as e:
+                logger.error(f"[{self.job_id}] [EncoderPool] Worker {worker_id} error: {e}")
+                results = [False] * len(batch)
+
+            for item, ok in zip(batch, results):
+                if not item.future.done():
+                    item.future.set_result(ok)
+
+    async def _run_fallback(self, item: ClipWorkItem) -> bool:
+        self.stats["clips"] += 1
+        self.stats["batches"] += 1
+        return await self.fallback(item)
+
+    def build_command(self, batch: List[ClipWorkItem], threads: Optional[int] = None) -> List[str]:
+        """FFmpeg command encoding every item of a batch."""
+        cmd = [self.ffmpeg_path, "-y"]
+        for item in batch:
+            cmd.extend(["-loop", "1", "-i", item.image_path])
+
+        filter_complex = ";".join(
+            f"[{i}:v]{item.filter_chain}[o{i}]" for i, item in enumerate(batch)
+        )
+        cmd.extend(["-filter_complex", filter_complex])
+
+        for i, item in enumerate(batch):
+            cmd.extend([
+                "-map", f"[o{i}]",
+                "-t", str(item.duration),
+                *self.encoder_opts,
+                *(["-threads", str(threads)] if threads else []),
+                "-an",
+                "-r", str(self.fps),
+                item.output_path,
+            ])
+        return cmd
+
+    async def _run_batch(self, batch: List[ClipWorkItem], worker_id: int) -> List[bool]:
+        start_time = time.time()
+        scheduler = get_ffmpeg_scheduler()
+        kind = encoder_kind(self.encoder_opts)
+        # Every clip in the batch opens its own NVENC session
+        weight = len(batch) if kind == "nvenc" else 1
+        async with scheduler.slot(self.job_id, kind, weight) as threads:
+            returncode, stderr = await self._run_process(self.build_command(batch, threads))
+
+        if returncode == 0:
+            self.stats["batches"] += 1
+            self.stats["clips"] += len(batch)
+            for item in batch:
+                item.encoder = self.encoder
+            logger.debug(
+                f"[{self.job_id}] [EncoderPool] Worker {worker_id}: {len(batch)} clips "
+                f"in one process ({time.time() - start_time:.2f}s)"
+            )
+            return [True] * len(batch)
+
+        # Isolate the failing clip(s): retry each one on its own
+        self.stats["batch_failures"] += 1
+        logger.warning(
+            f"[{self.job_id}] [EncoderPool] Batch of {len(batch)} failed, retrying clips individually: "
+            f"{stderr.decode(errors='replace')[-500:]}"
+        )
+        results = []
+        for item in batch:
+            self.stats["fallbacks"] += 1
+            results.append(await self._run_fallback(item))
+        return results
+
+    async def _run_process(self, cmd: List[str]) -> Tuple[int, bytes]:
+        """Run one batch command; returns (returncode, stderr)."""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+        return proc.returncode, stderr
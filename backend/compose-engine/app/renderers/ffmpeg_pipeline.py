@@ -10,8 +10,13 @@ import os
 import shutil
 import time
 from dataclasses import dataclass
-from typing import List, Literal, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Literal, Optional, Tuple
 
+from ..config import get_settings
+from ..utils.ffmpeg_scheduler import run_ffmpeg
+from .clip_cache import get_clip_cache, link_or_copy
+from .encoder_pool import ClipEncoderPool, ClipWorkItem
 from .filters.ken_burns import build_image_to_video_filter, get_diverse_motion_styles
 
 logger = logging.getLogger(__name__)
@@ -25,8 +30,9 @@ def _log_ffmpeg_cmd(cmd: List[str], job_id: str = "unknown"):
     logger.debug(f"[{job_id}] FFmpeg cmd: {cmd_str}")
 
 
+@lru_cache(maxsize=1)
 def find_ffmpeg() -> str:
-    """Find ffmpeg binary."""
+    """Find ffmpeg binary (resolved once per process)."""
     # Check imageio_ffmpeg first (used by MoviePy)
     try:
         import imageio_ffmpeg
@@ -112,6 +118,19 @@ def is_nvenc_available() -> bool:
     return _NVENC_AVAILABLE
 
 
+# Encoder options for intermediate image clips
+CLIP_GPU_ENCODER_OPTS = [
+    "-c:v", "h264_nvenc",
+    "-preset", "p4",  # Fast preset for clips
+    "-b:v", "8M",
+]
+CLIP_CPU_ENCODER_OPTS = [
+    "-c:v", "libx264",
+    "-preset", "ultrafast",  # Fast for intermediate clips
+    "-crf", "18",
+]
+
+
 @dataclass
 class ImageClipSpec:
     """Specification for creating a video clip from an image."""
@@ -133,6 +152,33 @@ async def create_image_clip(
 ) -> bool:
     """Create a video clip from a static image with Ken Burns motion.
 
+    See encode_image_clip; returns True if successful, False otherwise.
+    """
+    encoder = await encode_image_clip(
+        image_path=image_path,
+        output_path=output_path,
+        duration=duration,
+        motion_style=motion_style,
+        output_size=output_size,
+        fps=fps,
+        use_gpu=use_gpu,
+        job_id=job_id,
+    )
+    return encoder is not None
+
+
+async def encode_image_clip(
+    image_path: str,
+    output_path: str,
+    duration: float,
+    motion_style: Literal["zoom_in", "zoom_out", "pan", "static"],
+    output_size: Tuple[int, int],
+    fps: int = 30,
+    use_gpu: bool = True,
+    job_id: str = "unknown",
+) -> Optional[str]:
+    """Create a video clip from a static image with Ken Burns motion.
+
     This replaces MoviePy's ImageClip + resized() with pure FFmpeg,
     achieving significant speedup by avoiding Python per-frame processing.
 
@@ -147,7 +193,7 @@ async def create_image_clip(
         job_id: Job ID for logging
 
     Returns:
-        True if successful, False otherwise
+        Name of the encoder that produced the clip, or None on failure
     """
     start_time = time.time()
     ffmpeg = find_ffmpeg()
@@ -176,15 +222,10 @@ async def create_image_clip(
 
         _log_ffmpeg_cmd(cmd, job_id)
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
+        returncode, stdout, stderr = await run_ffmpeg(cmd, job_id=job_id)
         elapsed = time.time() - start_time
 
-        if proc.returncode != 0:
+        if returncode != 0:
             # Log full error (up to 2000 chars) for debugging
             error_msg = stderr.decode()
             logger.error(f"[{job_id}] FFmpeg {encoder_name} FAILED ({elapsed:.1f}s): {error_msg[-1500:]}")
@@ -199,23 +240,15 @@ async def create_image_clip(
 
     # Try GPU encoding first if requested
     if use_gpu and is_nvenc_available():
-        gpu_opts = [
-            "-c:v", "h264_nvenc",
-            "-preset", "p4",  # Fast preset for clips
-            "-b:v", "8M",
-        ]
-        if await try_encode(gpu_opts, "h264_nvenc"):
-            return True
+        if await try_encode(CLIP_GPU_ENCODER_OPTS, "h264_nvenc"):
+            return "h264_nvenc"
         # GPU failed, fall back to CPU
         logger.warning(f"[{job_id}] NVENC failed, falling back to CPU encoding")
 
     # CPU encoding (either as fallback or primary)
-    cpu_opts = [
-        "-c:v", "libx264",
-        "-preset", "ultrafast",  # Fast for intermediate clips
-        "-crf", "18",
-    ]
-    return await try_encode(cpu_opts, "libx264")
+    if await try_encode(CLIP_CPU_ENCODER_OPTS, "libx264"):
+        return "libx264"
+    return None
 
 
 async def create_clips_parallel(
@@ -226,6 +259,7 @@ async def create_clips_parallel(
     use_gpu: bool = True,
     max_workers: int = 4,
     job_id: str = "unknown",
+    use_cache: bool = True,
 ) -> List[str]:
     """Create multiple image clips in parallel.
 
@@ -233,6 +267,12 @@ async def create_clips_parallel(
     1. FFmpeg is native C code (no Python GIL)
     2. Parallel execution with semaphore limiting
     3. GPU encoding when available
+    4. Identical clips (same image content, duration, motion, size, fps and
+       encoder) are encoded once per job and served from the clip cache
+       across jobs
+    5. With clip_encode_batch_size > 1, waiting clips are encoded several
+       per FFmpeg process (see encoder_pool.py), so short clips don't each
+       pay process startup and encoder initialization
 
     Args:
         specs: List of ImageClipSpec defining each clip
@@ -242,6 +282,7 @@ async def create_clips_parallel(
         use_gpu: Whether to use GPU encoding
         max_workers: Maximum parallel FFmpeg processes
         job_id: Job ID for logging
+        use_cache: Reuse identical clips within the job and from the clip cache
 
     Returns:
         List of paths to created clips (in order)
@@ -252,13 +293,100 @@ async def create_clips_parallel(
     semaphore = asyncio.Semaphore(max_workers)
     results = [None] * len(specs)
     completed_count = [0]  # Use list to allow mutation in nested function
+    reuse_count = {"cache": 0, "job": 0}
+
+    cache = get_clip_cache() if use_cache else None
+    # Clips are looked up under the preferred encoder, but stored under the
+    # one that produced them (NVENC falls back to libx264 per clip)
+    encoder = "h264_nvenc" if use_gpu and is_nvenc_available() else "libx264"
+    # Clip key -> path of the first clip encoded for it in this job
+    inflight: Dict[str, asyncio.Future] = {}
+
+    pool = None
+    batch_size = get_settings().clip_encode_batch_size
+    if batch_size > 1 and len(specs) > 1:
+        async def encode_single(item: ClipWorkItem) -> bool:
+            item.encoder = await encode_image_clip(
+                image_path=item.image_path,
+                output_path=item.output_path,
+                duration=item.duration,
+                motion_style=item.motion_style,
+                output_size=output_size,
+                fps=fps,
+                use_gpu=use_gpu,
+                job_id=job_id,
+            )
+            return item.encoder is not None
+
+        pool = ClipEncoderPool(
+            ffmpeg_path=find_ffmpeg(),
+            encoder_opts=CLIP_GPU_ENCODER_OPTS if encoder == "h264_nvenc" else CLIP_CPU_ENCODER_OPTS,
+            fps=fps,
+            fallback=encode_single,
+            workers=max_workers,
+            batch_size=batch_size,
+            job_id=job_id,
+        )
+
+    async def clip_key(spec: ImageClipSpec, clip_encoder: str = encoder) -> Optional[str]:
+        if not use_cache:
+            return None
+        if cache is None:
+            # No cache: still dedupe within the job by path
+            return f"{spec.image_path}|{spec.duration}|{spec.motion_style}"
+        try:
+            return await asyncio.to_thread(
+                cache.make_key, spec.image_path, spec.duration, spec.motion_style,
+                output_size, fps, clip_encoder,
+            )
+        except OSError as e:
+            logger.warning(f"[{job_id}] Clip cache key failed for {spec.image_path}: {e}")
+            return None
+
+    async def store(spec: ImageClipSpec, key: Optional[str], clip_encoder: Optional[str], output_path: str) -> None:
+        if cache is None or key is None or clip_encoder is None:
+            return
+        if clip_encoder != encoder:
+            key = await clip_key(spec, clip_encoder)
+            if key is None:
+                return
+        await asyncio.to_thread(cache.put, key, output_path)
+
+    async def encode_one(index: int, spec: ImageClipSpec, output_path: str, key: Optional[str]) -> bool:
+        if pool is not None:
+            if cache is not None and key is not None:
+                if await asyncio.to_thread(cache.get, key, output_path):
+                    reuse_count["cache"] += 1
+                    logger.debug(f"[{job_id}] Clip {index+1}/{len(specs)} cache HIT ({key[:12]})")
+                    return True
+
+            # The pool limits concurrent FFmpeg processes itself
+            item = ClipWorkItem(
+                image_path=spec.image_path,
+                output_path=output_path,
+                duration=spec.duration,
+                filter_chain=build_image_to_video_filter(
+                    motion_style=spec.motion_style,
+                    duration=spec.duration,
+                    output_size=output_size,
+                    fps=fps,
+                ),
+                motion_style=spec.motion_style,
+            )
+            success = await pool.encode(item)
+            if success:
+                await store(spec, key, item.encoder, output_path)
+            return success
 
-    async def process_one(index: int, spec: ImageClipSpec) -> Tuple[int, Optional[str]]:
         async with semaphore:
-            output_path = os.path.join(output_dir, f"clip_{index:03d}.mp4")
-            logger.debug(f"[{job_id}] Clip {index+1}/{len(specs)} starting: {spec.motion_style}, {spec.duration:.2f}s")
+            if cache is not None and key is not None:
+                if await asyncio.to_thread(cache.get, key, output_path):
+                    reuse_count["cache"] += 1
+                    logger.debug(f"[{job_id}] Clip {index+1}/{len(specs)} cache HIT ({key[:12]})")
+                    return True
 
-            success = await create_image_clip(
+            logger.debug(f"[{job_id}] Clip {index+1}/{len(specs)} starting: {spec.motion_style}, {spec.duration:.2f}s")
+            clip_encoder = await encode_image_clip(
                 image_path=spec.image_path,
                 output_path=output_path,
                 duration=spec.duration,
@@ -268,15 +396,46 @@ async def create_clips_parallel(
                 use_gpu=use_gpu,
                 job_id=job_id,
             )
+            await store(spec, key, clip_encoder, output_path)
+            return clip_encoder is not None
 
-            completed_count[0] += 1
-            if completed_count[0] % 5 == 0 or completed_count[0] == len(specs):
-                logger.info(f"[{job_id}] Clips progress: {completed_count[0]}/{len(specs)} complete")
-
-            return (index, output_path if success else None)
+    async def process_one(index: int, spec: ImageClipSpec) -> Tuple[int, Optional[str]]:
+        output_path = os.path.join(output_dir, f"clip_{index:03d}.mp4")
+        key = await clip_key(spec)
+
+        success = False
+        first = inflight.get(key) if key is not None else None
+        if first is not None:
+            # Same clip as an earlier slot: wait for it and reuse its file
+            source = await first
+            if source is not None:
+                await asyncio.to_thread(link_or_copy, source, output_path)
+                reuse_count["job"] += 1
+                success = True
+
+        if not success:
+            future = None
+            if key is not None and first is None:
+                future = asyncio.get_running_loop().create_future()
+                inflight[key] = future
+            try:
+                success = await encode_one(index, spec, output_path, key)
+            finally:
+                if future is not None:
+                    future.set_result(output_path if success else None)
+
+        completed_count[0] += 1
+        if completed_count[0] % 5 == 0 or completed_count[0] == len(specs):
+            logger.info(f"[{job_id}] Clips progress: {completed_count[0]}/{len(specs)} complete")
+
+        return (index, output_path if success else None)
 
     tasks = [process_one(i, spec) for i, spec in enumerate(specs)]
-    completed = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        completed = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if pool is not None:
+            await pool.close()
 
     # Collect results in order
     clip_paths = []
@@ -300,6 +459,8 @@ async def create_clips_parallel(
         logger.warning(f"[{job_id}] Clip creation: {len(valid_paths)}/{len(specs)} succeeded, {failed_count} failed")
     else:
         logger.info(f"[{job_id}] All {len(valid_paths)} clips created in {elapsed:.1f}s ({elapsed/len(specs):.2f}s avg)")
+    if reuse_count["cache"] or reuse_count["job"]:
+        logger.info(f"[{job_id}] Clip reuse: {reuse_count['cache']} from cache, {reuse_count['job']} duplicates in job")
 
     return valid_paths
 
@@ -346,15 +507,10 @@ async def concatenate_clips_simple(
 
         _log_ffmpeg_cmd(cmd, job_id)
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        _, stderr = await proc.communicate()
+        returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
         elapsed = time.time() - start_time
 
-        if proc.returncode != 0:
+        if returncode != 0:
             logger.error(f"[{job_id}] Concat FAILED ({elapsed:.1f}s): {stderr.decode()[:500]}")
             return False
 
@@ -428,15 +584,10 @@ async def apply_filter_to_video(
 
     _log_ffmpeg_cmd(cmd, job_id)
 
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
+    returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
     elapsed = time.time() - start_time
 
-    if proc.returncode != 0:
+    if returncode != 0:
         stderr_text = stderr.decode()
         logger.error(f"[{job_id}] Filter FAILED ({elapsed:.1f}s, {encoder_name})")
         logger.error(f"[{job_id}] Full filter string: {filter_str}")
@@ -504,14 +655,9 @@ async def mix_audio_to_video(
 
     logger.info(f"[{job_id}] Mixing audio into video")
 
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
+    returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-    if proc.returncode != 0:
+    if returncode != 0:
         logger.error(f"[{job_id}] Audio mix failed: {stderr.decode()}")
         return False
 
@@ -601,15 +747,10 @@ async def create_video_from_image_sequence(
     _log_ffmpeg_cmd(cmd, job_id)
 
     try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
+        returncode, stdout, stderr = await run_ffmpeg(cmd, job_id=job_id)
         elapsed = time.time() - start_time
 
-        if proc.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode()
             logger.error(f"[{job_id}] Image sequence FAILED ({elapsed:.1f}s): {error_msg[-1000:]}")
             return False
@@ -685,14 +826,9 @@ async def final_encode(
 
     logger.info(f"[{job_id}] Final encode: GPU={'yes' if use_gpu and is_nvenc_available() else 'no'}")
 
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
+    returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-    if proc.returncode != 0:
+    if returncode != 0:
         logger.error(f"[{job_id}] Final encode failed: {stderr.decode()}")
         return False
 
@@ -753,14 +889,9 @@ async def trim_video_to_duration(
     logger.info(f"[{job_id}] Trimming video to {target_duration:.1f}s")
     _log_ffmpeg_cmd(cmd, job_id)
 
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
+    returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-    if proc.returncode != 0:
+    if returncode != 0:
         logger.error(f"[{job_id}] Trim failed: {stderr.decode()}")
         return False
 
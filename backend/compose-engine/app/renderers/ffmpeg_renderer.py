@@ -6,12 +6,14 @@ per-frame processing for significant performance improvements.
 """
 
 import asyncio
+import functools
 import logging
 import os
 import shutil
 import time
 from typing import Callable, Optional, List, Tuple
 
+from ..config import get_settings
 from ..models.render_job import (
     RenderRequest,
     ImageData,
@@ -21,12 +23,13 @@ from ..models.render_job import (
     AIEffectSelection,
 )
 from ..models.responses import AudioAnalysis
-from ..services.audio_analyzer import AudioAnalyzer
+from ..services.analysis_executor import analyze_audio
 from ..services.beat_sync import BeatSyncEngine
 from ..services.image_processor import ImageProcessor
 from ..effects import get_registry, EffectSelector, SelectionConfig, SelectedEffects
+from ..effects.safe_effects import get_safe_transition
 from ..presets import get_preset
-from ..utils.s3_client import S3Client
+from ..utils.s3_client import get_s3_client
 from ..utils.temp_files import TempFileManager
 
 from .ffmpeg_pipeline import (
@@ -42,8 +45,16 @@ from .ffmpeg_pipeline import (
 from .filters.ken_burns import get_diverse_motion_styles
 from .filters.color_grading import build_color_grade_filter, combine_filters
 from .filters.overlay_effects import build_overlay_chain
-from .filters.text_overlay import TextOverlaySpec, build_text_overlay_chain, apply_text_overlays_pillow, apply_text_overlays_ass
+from .filters.text_overlay import (
+    TextOverlaySpec,
+    build_text_overlay_chain,
+    apply_text_overlays_pillow,
+    apply_text_overlays_ass,
+    build_ass_subtitles,
+)
 from .audio.audio_processor import AudioProcessor, AudioSettings
+from .fused_render import fused_timeline, plan_fused_render
+from .render_plan import RenderPlan, optimize, run_render_plan
 from .utils.ffprobe import get_duration, get_video_info
 
 logger = logging.getLogger(__name__)
@@ -56,10 +67,6 @@ AUDIO_FADE_OUT = 0.75
 HOOK_DURATION = 2.0
 HOOK_CALM_FACTOR = 0.7
 
-# Audio analysis cache
-_audio_cache: dict = {}
-_audio_cache_lock = asyncio.Lock()
-
 
 class FFmpegRenderer:
     """Pure FFmpeg video renderer - replaces MoviePy-based VideoRenderer.
@@ -77,8 +84,7 @@ class FFmpegRenderer:
         self.ffmpeg = find_ffmpeg()
         logger.info(f"[FFmpegRenderer] FFmpeg binary: {self.ffmpeg}")
         logger.info(f"[FFmpegRenderer] NVENC available: {is_nvenc_available()}")
-        self.s3 = S3Client()
-        self.audio_analyzer = AudioAnalyzer()
+        self.s3 = get_s3_client()
         self.beat_sync = BeatSyncEngine()
         self.image_processor = ImageProcessor()
         self.temp = TempFileManager()
@@ -277,284 +283,45 @@ class FFmpegRenderer:
                     logger.info(f"[{job_id}] [STEP 5/11] AI effects selected: Transitions={ai_effects.transitions}")
 
             # =================================================================
-            # STEP 6+7: CREATE VIDEO (OPTIMIZED - ONE PASS for static clips)
+            # STEP 6-10.5: CREATE VIDEO (fused single pass, or one pass per stage)
             # =================================================================
-            step_start = time.time()
             await self._update_progress(progress_callback, job_id, 35, "Creating video")
 
             output_size = self._get_output_size(request.settings.aspect_ratio.value)
             use_gpu = is_nvenc_available()
             logger.info(f"[{job_id}] [STEP 6/11] Output size: {output_size[0]}x{output_size[1]}, GPU: {use_gpu}")
 
-            # Check if we need transitions (xfade)
-            has_transitions = ai_effects and ai_effects.transitions and len(ai_effects.transitions) > 0
-
-            if has_transitions:
-                # OLD PATH: Individual clips + xfade transitions
-                logger.info(f"[{job_id}] [STEP 6/11] Using INDIVIDUAL CLIPS path (transitions requested)")
-
-                motion_styles = ["static"] * num_clips
-                clip_specs = []
-                cumulative_time = 0.0
-                for i in range(num_clips):
-                    clip_duration = clip_durations[i]
-                    spec = ImageClipSpec(
-                        image_path=looped_paths[i],
-                        duration=clip_duration,
-                        motion_style=motion_styles[i],
-                        start_time=cumulative_time,
-                    )
-                    clip_specs.append(spec)
-                    cumulative_time += clip_duration
-
-                clip_paths = await create_clips_parallel(
-                    specs=clip_specs,
-                    output_dir=job_dir,
+            video_path = None
+            streamed_url = None
+            if get_settings().render_mode == "fused":
+                video_path, streamed_url = await self._render_fused(
+                    request=request,
+                    looped_paths=looped_paths,
+                    clip_durations=clip_durations,
                     output_size=output_size,
-                    fps=30,
                     use_gpu=use_gpu,
-                    max_workers=4,
-                    job_id=job_id,
-                )
-
-                if not clip_paths:
-                    raise RuntimeError(f"All {num_clips} clip creations failed.")
-
-                logger.info(f"[{job_id}] [STEP 6/11] Created {len(clip_paths)} clips, now concatenating with transitions...")
-
-                # STEP 7: Concatenate with transitions
-                await self._update_progress(progress_callback, job_id, 55, "Adding transitions")
-                video_path = await self._concatenate_clips(
-                    clip_paths=clip_paths,
-                    clip_durations=clip_durations,
+                    ai_effects=ai_effects,
+                    audio_path=audio_path,
+                    target_duration=target_duration,
                     job_dir=job_dir,
                     job_id=job_id,
-                    transitions=ai_effects.transitions,
-                    output_size=output_size,
+                    stream_key=request.output.s3_key if get_settings().upload_while_encoding else None,
                 )
-            else:
-                # NEW OPTIMIZED PATH: Single FFmpeg call for all images
-                logger.info(f"[{job_id}] [STEP 6/11] 🚀 Using OPTIMIZED SINGLE-PASS path (no transitions)")
-                logger.info(f"[{job_id}] [STEP 6/11] Creating {num_clips} clips in ONE FFmpeg call...")
-
-                from .ffmpeg_pipeline import create_video_from_image_sequence
 
-                video_path = os.path.join(job_dir, f"{job_id}_concat.mp4")
-                success = await create_video_from_image_sequence(
-                    image_paths=looped_paths,
-                    durations=clip_durations,
-                    output_path=video_path,
+            if video_path is None:
+                video_path = await self._render_multi_step(
+                    request=request,
+                    looped_paths=looped_paths,
+                    clip_durations=clip_durations,
                     output_size=output_size,
-                    fps=30,
                     use_gpu=use_gpu,
-                    job_id=job_id,
-                )
-
-                if not success:
-                    raise RuntimeError("Failed to create video from image sequence")
-
-            step_time = time.time() - step_start
-            if os.path.exists(video_path):
-                video_size = os.path.getsize(video_path) / (1024 * 1024)
-                logger.info(f"[{job_id}] [STEP 7/11] Video created in {step_time:.1f}s ({video_size:.1f}MB)")
-            else:
-                raise RuntimeError(f"Video output missing: {video_path}")
-
-            # =================================================================
-            # STEP 8: COLOR GRADING & OVERLAY EFFECTS (FFmpeg)
-            # =================================================================
-            step_start = time.time()
-            await self._update_progress(progress_callback, job_id, 70, "Applying effects")
-            logger.info(f"[{job_id}] [STEP 8/11] Applying color grading and overlay effects...")
-
-            # OVERRIDE: Disable all filters to prevent grainy/pixelated images
-            # No color grading, no overlay effects, no film grain
-            effect_filters = []
-            logger.info(f"[{job_id}] [STEP 8/11] All filters disabled (no color grading, no overlays, no grain)")
-
-            # Apply all effects in one pass
-            if False and effect_filters:
-                combined_filter = ",".join(effect_filters)
-                logger.info(f"[{job_id}] [STEP 8/11] Combined filter chain: {combined_filter[:100]}{'...' if len(combined_filter) > 100 else ''}")
-                effects_output = os.path.join(job_dir, f"{job_id}_effects.mp4")
-                success = await apply_filter_to_video(
-                    input_path=video_path,
-                    output_path=effects_output,
-                    filter_str=combined_filter,
-                    use_gpu=is_nvenc_available(),
-                    job_id=job_id,
-                )
-                step_time = time.time() - step_start
-                if success:
-                    video_path = effects_output
-                    logger.info(f"[{job_id}] [STEP 8/11] Effects applied in {step_time:.1f}s")
-                else:
-                    logger.warning(f"[{job_id}] [STEP 8/11] Effects filter failed, continuing with original")
-            else:
-                logger.info(f"[{job_id}] [STEP 8/11] No effects to apply (skipped)")
-
-            # =================================================================
-            # STEP 9: TEXT OVERLAYS (Pillow + FFmpeg overlay filter)
-            # =================================================================
-            # NOTE: Using Pillow-based rendering instead of FFmpeg drawtext
-            # because drawtext requires libfreetype which may not be compiled in
-            step_start = time.time()
-            await self._update_progress(progress_callback, job_id, 80, "Adding text overlays")
-            logger.info(f"[{job_id}] [STEP 9/11] Adding text overlays (Pillow method)...")
-
-            video_info = await get_video_info(video_path)
-            video_duration = video_info["duration"]
-            logger.info(f"[{job_id}] [STEP 9/11] Video info: {video_info['width']}x{video_info['height']}, {video_duration:.1f}s, {video_info['fps']:.0f}fps")
-
-            # ============ TEXT OVERLAY DEBUG LOGGING ============
-            logger.info(f"[{job_id}] [STEP 9/11] === TEXT OVERLAY INPUT DEBUG ===")
-            logger.info(f"[{job_id}] [STEP 9/11] Video duration: {video_duration:.2f}s")
-            logger.info(f"[{job_id}] [STEP 9/11] Video size: {output_size}")
-            logger.info(f"[{job_id}] [STEP 9/11] Input video path: {video_path}")
-            logger.info(f"[{job_id}] [STEP 9/11] request.script exists: {request.script is not None}")
-            logger.info(f"[{job_id}] [STEP 9/11] request.script type: {type(request.script)}")
-
-            if request.script:
-                logger.info(f"[{job_id}] [STEP 9/11] request.script.lines exists: {request.script.lines is not None}")
-                logger.info(f"[{job_id}] [STEP 9/11] request.script.lines type: {type(request.script.lines)}")
-                if request.script.lines:
-                    logger.info(f"[{job_id}] [STEP 9/11] Number of script lines: {len(request.script.lines)}")
-                    for idx, line in enumerate(request.script.lines):
-                        logger.info(f"[{job_id}] [STEP 9/11] Line {idx+1}: text='{line.text}', timing={line.timing}s, duration={line.duration}s")
-                else:
-                    logger.info(f"[{job_id}] [STEP 9/11] request.script.lines is empty or None")
-            else:
-                logger.info(f"[{job_id}] [STEP 9/11] request.script is None")
-
-            if request.script and request.script.lines:
-                logger.info(f"[{job_id}] [STEP 9/11] === PROCESSING {len(request.script.lines)} TEXT LINES ===")
-                text_output = os.path.join(job_dir, f"{job_id}_text.mp4")
-                logger.info(f"[{job_id}] [STEP 9/11] Text output path: {text_output}")
-
-                # Adjust timings to fit video duration
-                logger.info(f"[{job_id}] [STEP 9/11] Adjusting script timings to fit video duration {video_duration:.2f}s...")
-                adjusted_script = self._adjust_script_timings(request.script, video_duration, job_id)
-                logger.info(f"[{job_id}] [STEP 9/11] Adjusted script has {len(adjusted_script.lines)} lines (may be fewer if some exceeded video duration)")
-
-                for idx, line in enumerate(adjusted_script.lines):
-                    logger.info(f"[{job_id}] [STEP 9/11] Adjusted line {idx+1}: text='{line.text}', timing={line.timing:.2f}s, duration={line.duration:.2f}s, end={line.timing + line.duration:.2f}s")
-
-                text_animations = ai_effects.text_animations if ai_effects else None
-                logger.info(f"[{job_id}] [STEP 9/11] Text animations: {text_animations}")
-
-                # Build text overlay specs
-                text_specs = []
-                for i, line in enumerate(adjusted_script.lines):
-                    anim = text_animations[i % len(text_animations)] if text_animations else "fade"
-                    spec = TextOverlaySpec(
-                        text=line.text,
-                        start_time=line.timing,
-                        duration=line.duration,
-                        style=request.settings.text_style.value,
-                        animation=anim,
-                    )
-                    text_specs.append(spec)
-                    logger.info(f"[{job_id}] [STEP 9/11] TextOverlaySpec {i+1}: text='{line.text}', start={line.timing:.2f}s, dur={line.duration:.2f}s, end={line.timing + line.duration:.2f}s, style={request.settings.text_style.value}, anim={anim}")
-
-                # Use ASS subtitles - simpler and more reliable than Pillow overlay
-                logger.info(f"[{job_id}] [STEP 9/11] === APPLYING ASS SUBTITLES ===")
-                logger.info(f"[{job_id}] [STEP 9/11] Method: ASS subtitles (libass)")
-                logger.info(f"[{job_id}] [STEP 9/11] Input: {video_path}")
-                logger.info(f"[{job_id}] [STEP 9/11] Output: {text_output}")
-                logger.info(f"[{job_id}] [STEP 9/11] Overlays count: {len(text_specs)}")
-
-                success = await apply_text_overlays_ass(
-                    input_video=video_path,
-                    output_video=text_output,
-                    overlays=text_specs,
-                    video_size=output_size,
-                    job_id=job_id,
-                    ffmpeg_path=self.ffmpeg,
-                )
-                step_time = time.time() - step_start
-
-                if success:
-                    video_path = text_output
-                    logger.info(f"[{job_id}] [STEP 9/11] ✓ Text overlays applied successfully in {step_time:.1f}s")
-                    logger.info(f"[{job_id}] [STEP 9/11] Output video: {video_path}")
-                else:
-                    logger.error(f"[{job_id}] [STEP 9/11] ✗ Text overlay FAILED after {step_time:.1f}s")
-                    logger.warning(f"[{job_id}] [STEP 9/11] Continuing without text overlays")
-            else:
-                logger.info(f"[{job_id}] [STEP 9/11] No script text to apply (skipped)")
-
-            # =================================================================
-            # STEP 10: ADD AUDIO (FFmpeg)
-            # =================================================================
-            step_start = time.time()
-            await self._update_progress(progress_callback, job_id, 90, "Adding audio")
-            logger.info(f"[{job_id}] [STEP 10/11] Adding audio...")
-
-            if audio_path and request.audio:
-                logger.info(f"[{job_id}] [STEP 10/11] Audio settings:")
-                logger.info(f"[{job_id}] [STEP 10/11]   Start: {request.audio.start_time or 0.0}s")
-                logger.info(f"[{job_id}] [STEP 10/11]   Fade in: {AUDIO_FADE_IN}s, Fade out: {AUDIO_FADE_OUT}s")
-                logger.info(f"[{job_id}] [STEP 10/11]   TikTok hook: {HOOK_DURATION}s @ {HOOK_CALM_FACTOR} volume")
-                audio_output = os.path.join(job_dir, f"{job_id}_audio.mp4")
-                audio_settings = AudioSettings(
-                    start_time=request.audio.start_time or 0.0,
-                    duration=request.audio.duration,
-                    fade_in=AUDIO_FADE_IN,
-                    fade_out=AUDIO_FADE_OUT,
-                    tiktok_hook_enabled=True,
-                    tiktok_hook_duration=HOOK_DURATION,
-                    tiktok_hook_volume=HOOK_CALM_FACTOR,
-                )
-
-                success = await self.audio_processor.mix_into_video(
-                    video_path=video_path,
+                    ai_effects=ai_effects,
                     audio_path=audio_path,
-                    output_path=audio_output,
-                    video_duration=video_duration,
-                    settings=audio_settings,
-                    job_id=job_id,
-                )
-                step_time = time.time() - step_start
-                if success:
-                    video_path = audio_output
-                    logger.info(f"[{job_id}] [STEP 10/11] Audio mixed in {step_time:.1f}s")
-                else:
-                    logger.warning(f"[{job_id}] [STEP 10/11] Audio mix failed, continuing without audio")
-            else:
-                logger.info(f"[{job_id}] [STEP 10/11] No audio to add (skipped)")
-
-            # =================================================================
-            # STEP 10.5: DURATION VERIFICATION & TRIMMING
-            # =================================================================
-            # Ensure final video matches target_duration exactly
-            step_start = time.time()
-            final_video_info = await get_video_info(video_path)
-            final_video_duration = final_video_info["duration"]
-
-            logger.info(f"[{job_id}] [STEP 10.5/11] Duration verification:")
-            logger.info(f"[{job_id}] [STEP 10.5/11]   Target duration: {target_duration:.2f}s")
-            logger.info(f"[{job_id}] [STEP 10.5/11]   Actual duration: {final_video_duration:.2f}s")
-            logger.info(f"[{job_id}] [STEP 10.5/11]   Difference: {final_video_duration - target_duration:.2f}s")
-
-            # Trim if video exceeds target duration by more than 0.5 seconds
-            if final_video_duration > target_duration + 0.5:
-                logger.info(f"[{job_id}] [STEP 10.5/11] Video exceeds target - trimming to {target_duration:.2f}s")
-                trimmed_output = os.path.join(job_dir, f"{job_id}_trimmed.mp4")
-                trim_success = await trim_video_to_duration(
-                    input_path=video_path,
-                    output_path=trimmed_output,
                     target_duration=target_duration,
-                    use_gpu=is_nvenc_available(),
+                    job_dir=job_dir,
                     job_id=job_id,
+                    progress_callback=progress_callback,
                 )
-                step_time = time.time() - step_start
-                if trim_success and os.path.exists(trimmed_output):
-                    video_path = trimmed_output
-                    logger.info(f"[{job_id}] [STEP 10.5/11] ✓ Video trimmed to {target_duration:.2f}s in {step_time:.1f}s")
-                else:
-                    logger.warning(f"[{job_id}] [STEP 10.5/11] Trim failed, using original video")
-            else:
-                logger.info(f"[{job_id}] [STEP 10.5/11] Duration OK - no trimming needed")
 
             # =================================================================
             # STEP 11: UPLOAD TO S3
@@ -567,11 +334,20 @@ class FFmpegRenderer:
             logger.info(f"[{job_id}] [STEP 11/11] Final file: {video_path} ({final_size:.1f}MB)")
             logger.info(f"[{job_id}] [STEP 11/11] S3 key: {request.output.s3_key}")
 
-            s3_url = await self.s3.upload_file(
-                video_path,
-                request.output.s3_key,
-                content_type="video/mp4",
-            )
+            async def upload_progress(uploaded: int, total: Optional[int]):
+                if total:
+                    await self._update_progress(progress_callback, job_id, 95 + 4 * uploaded // total, "Uploading")
+
+            if streamed_url:
+                # Parts went up while FFmpeg was encoding
+                s3_url = streamed_url
+            else:
+                s3_url = await self.s3.upload_file(
+                    video_path,
+                    request.output.s3_key,
+                    content_type="video/mp4",
+                    progress=upload_progress,
+                )
             step_time = time.time() - step_start
             logger.info(f"[{job_id}] [STEP 11/11] Upload complete in {step_time:.1f}s")
             logger.info(f"[{job_id}] [STEP 11/11] URL: {s3_url}")
@@ -610,6 +386,439 @@ class FFmpegRenderer:
             self.temp.cleanup(job_id)
             raise
 
+    async def _render_fused(
+        self,
+        request: RenderRequest,
+        looped_paths: List[str],
+        clip_durations: List[float],
+        output_size: Tuple[int, int],
+        use_gpu: bool,
+        ai_effects: Optional[AIEffectSelection],
+        audio_path: Optional[str],
+        target_duration: float,
+        job_dir: str,
+        job_id: str,
+        stream_key: Optional[str] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Render video, subtitles, audio and trim in ONE FFmpeg pass.
+
+        Plans the same job as _render_multi_step as a RenderPlan, optimizes
+        it and runs it as a single filter_complex with one encode (see
+        fused_render.py and render_plan.py).
+
+        With stream_key, the output is written as fragmented MP4 and
+        uploaded to that key while FFmpeg encodes (upload_while_encoding).
+
+        Returns:
+            (path to the finished video or None to fall back to multi-step,
+             S3 URL if the upload while encoding completed)
+        """
+        step_start = time.time()
+        has_transitions = bool(ai_effects and ai_effects.transitions)
+        logger.info(f"[{job_id}] [STEP 6-10/11] 🚀 Using FUSED single-pass render (transitions: {has_transitions})")
+
+        audio_settings = None
+        if audio_path and request.audio:
+            audio_settings = AudioSettings(
+                start_time=request.audio.start_time or 0.0,
+                duration=request.audio.duration,
+                fade_in=AUDIO_FADE_IN,
+                fade_out=AUDIO_FADE_OUT,
+                tiktok_hook_enabled=True,
+                tiktok_hook_duration=HOOK_DURATION,
+                tiktok_hook_volume=HOOK_CALM_FACTOR,
+            )
+
+        try:
+            crossfade = has_transitions and len(looped_paths) > 1
+            # Requested transitions, cycled over the slot boundaries
+            transitions = [
+                get_safe_transition(ai_effects.transitions[i % len(ai_effects.transitions)])
+                for i in range(len(looped_paths) - 1)
+            ] if crossfade else None
+            _, _, _, final_duration = fused_timeline(clip_durations, 30, crossfade, target_duration)
+
+            subtitles = None
+            if request.script and request.script.lines:
+                adjusted_script = self._adjust_script_timings(request.script, final_duration, job_id)
+                text_animations = ai_effects.text_animations if ai_effects else None
+                text_specs = [
+                    TextOverlaySpec(
+                        text=line.text,
+                        start_time=line.timing,
+                        duration=line.duration,
+                        style=request.settings.text_style.value,
+                        animation=text_animations[i % len(text_animations)] if text_animations else "fade",
+                    )
+                    for i, line in enumerate(adjusted_script.lines)
+                ]
+                if text_specs:
+                    subtitles = build_ass_subtitles(text_specs, output_size, job_id=job_id)
+                    logger.info(f"[{job_id}] [STEP 6-10/11] {len(text_specs)} text overlays burned in the same pass")
+
+            plan = plan_fused_render(
+                image_paths=looped_paths,
+                durations=clip_durations,
+                output_size=output_size,
+                fps=30,
+                crossfade=crossfade,
+                transitions=transitions,
+                target_duration=target_duration,
+                audio_path=audio_path if audio_settings else None,
+                audio_settings=audio_settings,
+                effect_filters=[],  # STEP 8 effects are disabled
+                subtitles=subtitles,
+                job_id=job_id,
+            )
+            stats = optimize(plan)
+        except Exception as e:
+            logger.warning(f"[{job_id}] [STEP 6-10/11] Fused planning failed ({e}), using multi-step path")
+            return None, None
+
+        logger.info(f"[{job_id}] [STEP 6-10/11] Plan: {plan.metadata['slots']} slots, {plan.metadata['length']:.2f}s -> {plan.metadata['duration']:.2f}s, {len(plan.nodes)} nodes after optimize {stats}")
+        logger.debug(f"[{job_id}] [STEP 6-10/11] {plan.dump()}")
+        self._dump_render_plan(plan, job_id)
+
+        output_path = os.path.join(job_dir, f"{job_id}_fused.mp4")
+        uploads = []
+
+        async def stream_upload():
+            upload = await self.s3.start_streaming_upload(output_path, stream_key, content_type="video/mp4")
+            uploads.append(upload)
+            return upload
+
+        if stream_key:
+            plan.output.params["fragmented"] = True
+        success = await run_render_plan(
+            plan,
+            output_path,
+            use_gpu=use_gpu,
+            work_dir=job_dir,
+            ffmpeg_path=self.ffmpeg,
+            stream_upload=stream_upload if stream_key else None,
+        )
+        step_time = time.time() - step_start
+
+        if not success:
+            logger.warning(f"[{job_id}] [STEP 6-10/11] Fused render failed after {step_time:.1f}s, using multi-step path")
+            return None, None
+
+        logger.info(f"[{job_id}] [STEP 6-10/11] ✓ Fused render complete in {step_time:.1f}s")
+        streamed_url = None
+        if uploads and uploads[-1].completed:
+            streamed_url = self.s3.get_public_url(stream_key)
+        return output_path, streamed_url
+
+    def _dump_render_plan(self, plan: RenderPlan, job_id: str) -> None:
+        """Write the plan as JSON to render_plan_dump_dir, if configured."""
+        dump_dir = get_settings().render_plan_dump_dir
+        if not dump_dir:
+            return
+        try:
+            os.makedirs(dump_dir, exist_ok=True)
+            path = os.path.join(dump_dir, f"{job_id}.plan.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(plan.to_json())
+            logger.info(f"[{job_id}] Render plan written to {path}")
+        except OSError as e:
+            logger.warning(f"[{job_id}] Could not write render plan: {e}")
+
+    async def _render_multi_step(
+        self,
+        request: RenderRequest,
+        looped_paths: List[str],
+        clip_durations: List[float],
+        output_size: Tuple[int, int],
+        use_gpu: bool,
+        ai_effects: Optional[AIEffectSelection],
+        audio_path: Optional[str],
+        target_duration: float,
+        job_dir: str,
+        job_id: str,
+        progress_callback: Optional[Callable] = None,
+    ) -> str:
+        """Render with one FFmpeg pass per stage (video, text, audio, trim).
+
+        Fallback for _render_fused; every stage re-encodes the video.
+
+        Returns:
+            Path to the finished video
+        """
+        step_start = time.time()
+        num_clips = len(looped_paths)
+
+        # Check if we need transitions (xfade)
+        has_transitions = ai_effects and ai_effects.transitions and len(ai_effects.transitions) > 0
+
+        if has_transitions:
+            # OLD PATH: Individual clips + xfade transitions
+            logger.info(f"[{job_id}] [STEP 6/11] Using INDIVIDUAL CLIPS path (transitions requested)")
+
+            motion_styles = ["static"] * num_clips
+            clip_specs = []
+            cumulative_time = 0.0
+            for i in range(num_clips):
+                clip_duration = clip_durations[i]
+                spec = ImageClipSpec(
+                    image_path=looped_paths[i],
+                    duration=clip_duration,
+                    motion_style=motion_styles[i],
+                    start_time=cumulative_time,
+                )
+                clip_specs.append(spec)
+                cumulative_time += clip_duration
+
+            clip_paths = await create_clips_parallel(
+                specs=clip_specs,
+                output_dir=job_dir,
+                output_size=output_size,
+                fps=30,
+                use_gpu=use_gpu,
+                max_workers=4,
+                job_id=job_id,
+            )
+
+            if not clip_paths:
+                raise RuntimeError(f"All {num_clips} clip creations failed.")
+
+            logger.info(f"[{job_id}] [STEP 6/11] Created {len(clip_paths)} clips, now concatenating with transitions...")
+
+            # STEP 7: Concatenate with transitions
+            await self._update_progress(progress_callback, job_id, 55, "Adding transitions")
+            video_path = await self._concatenate_clips(
+                clip_paths=clip_paths,
+                clip_durations=clip_durations,
+                job_dir=job_dir,
+                job_id=job_id,
+                transitions=ai_effects.transitions,
+                output_size=output_size,
+            )
+        else:
+            # NEW OPTIMIZED PATH: Single FFmpeg call for all images
+            logger.info(f"[{job_id}] [STEP 6/11] 🚀 Using OPTIMIZED SINGLE-PASS path (no transitions)")
+            logger.info(f"[{job_id}] [STEP 6/11] Creating {num_clips} clips in ONE FFmpeg call...")
+
+            from .ffmpeg_pipeline import create_video_from_image_sequence
+
+            video_path = os.path.join(job_dir, f"{job_id}_concat.mp4")
+            success = await create_video_from_image_sequence(
+                image_paths=looped_paths,
+                durations=clip_durations,
+                output_path=video_path,
+                output_size=output_size,
+                fps=30,
+                use_gpu=use_gpu,
+                job_id=job_id,
+            )
+
+            if not success:
+                raise RuntimeError("Failed to create video from image sequence")
+
+        step_time = time.time() - step_start
+        if os.path.exists(video_path):
+            video_size = os.path.getsize(video_path) / (1024 * 1024)
+            logger.info(f"[{job_id}] [STEP 7/11] Video created in {step_time:.1f}s ({video_size:.1f}MB)")
+        else:
+            raise RuntimeError(f"Video output missing: {video_path}")
+
+        # =================================================================
+        # STEP 8: COLOR GRADING & OVERLAY EFFECTS (FFmpeg)
+        # =================================================================
+        step_start = time.time()
+        await self._update_progress(progress_callback, job_id, 70, "Applying effects")
+        logger.info(f"[{job_id}] [STEP 8/11] Applying color grading and overlay effects...")
+
+        # OVERRIDE: Disable all filters to prevent grainy/pixelated images
+        # No color grading, no overlay effects, no film grain
+        effect_filters = []
+        logger.info(f"[{job_id}] [STEP 8/11] All filters disabled (no color grading, no overlays, no grain)")
+
+        # Apply all effects in one pass
+        if False and effect_filters:
+            combined_filter = ",".join(effect_filters)
+            logger.info(f"[{job_id}] [STEP 8/11] Combined filter chain: {combined_filter[:100]}{'...' if len(combined_filter) > 100 else ''}")
+            effects_output = os.path.join(job_dir, f"{job_id}_effects.mp4")
+            success = await apply_filter_to_video(
+                input_path=video_path,
+                output_path=effects_output,
+                filter_str=combined_filter,
+                use_gpu=is_nvenc_available(),
+                job_id=job_id,
+            )
+            step_time = time.time() - step_start
+            if success:
+                video_path = effects_output
+                logger.info(f"[{job_id}] [STEP 8/11] Effects applied in {step_time:.1f}s")
+            else:
+                logger.warning(f"[{job_id}] [STEP 8/11] Effects filter failed, continuing with original")
+        else:
+            logger.info(f"[{job_id}] [STEP 8/11] No effects to apply (skipped)")
+
+        # =================================================================
+        # STEP 9: TEXT OVERLAYS (Pillow + FFmpeg overlay filter)
+        # =================================================================
+        # NOTE: Using Pillow-based rendering instead of FFmpeg drawtext
+        # because drawtext requires libfreetype which may not be compiled in
+        step_start = time.time()
+        await self._update_progress(progress_callback, job_id, 80, "Adding text overlays")
+        logger.info(f"[{job_id}] [STEP 9/11] Adding text overlays (Pillow method)...")
+
+        video_info = await get_video_info(video_path)
+        video_duration = video_info["duration"]
+        logger.info(f"[{job_id}] [STEP 9/11] Video info: {video_info['width']}x{video_info['height']}, {video_duration:.1f}s, {video_info['fps']:.0f}fps")
+
+        # ============ TEXT OVERLAY DEBUG LOGGING ============
+        logger.info(f"[{job_id}] [STEP 9/11] === TEXT OVERLAY INPUT DEBUG ===")
+        logger.info(f"[{job_id}] [STEP 9/11] Video duration: {video_duration:.2f}s")
+        logger.info(f"[{job_id}] [STEP 9/11] Video size: {output_size}")
+        logger.info(f"[{job_id}] [STEP 9/11] Input video path: {video_path}")
+        logger.info(f"[{job_id}] [STEP 9/11] request.script exists: {request.script is not None}")
+        logger.info(f"[{job_id}] [STEP 9/11] request.script type: {type(request.script)}")
+
+        if request.script:
+            logger.info(f"[{job_id}] [STEP 9/11] request.script.lines exists: {request.script.lines is not None}")
+            logger.info(f"[{job_id}] [STEP 9/11] request.script.lines type: {type(request.script.lines)}")
+            if request.script.lines:
+                logger.info(f"[{job_id}] [STEP 9/11] Number of script lines: {len(request.script.lines)}")
+                for idx, line in enumerate(request.script.lines):
+                    logger.info(f"[{job_id}] [STEP 9/11] Line {idx+1}: text='{line.text}', timing={line.timing}s, duration={line.duration}s")
+            else:
+                logger.info(f"[{job_id}] [STEP 9/11] request.script.lines is empty or None")
+        else:
+            logger.info(f"[{job_id}] [STEP 9/11] request.script is None")
+
+        if request.script and request.script.lines:
+            logger.info(f"[{job_id}] [STEP 9/11] === PROCESSING {len(request.script.lines)} TEXT LINES ===")
+            text_output = os.path.join(job_dir, f"{job_id}_text.mp4")
+            logger.info(f"[{job_id}] [STEP 9/11] Text output path: {text_output}")
+
+            # Adjust timings to fit video duration
+            logger.info(f"[{job_id}] [STEP 9/11] Adjusting script timings to fit video duration {video_duration:.2f}s...")
+            adjusted_script = self._adjust_script_timings(request.script, video_duration, job_id)
+            logger.info(f"[{job_id}] [STEP 9/11] Adjusted script has {len(adjusted_script.lines)} lines (may be fewer if some exceeded video duration)")
+
+            for idx, line in enumerate(adjusted_script.lines):
+                logger.info(f"[{job_id}] [STEP 9/11] Adjusted line {idx+1}: text='{line.text}', timing={line.timing:.2f}s, duration={line.duration:.2f}s, end={line.timing + line.duration:.2f}s")
+
+            text_animations = ai_effects.text_animations if ai_effects else None
+            logger.info(f"[{job_id}] [STEP 9/11] Text animations: {text_animations}")
+
+            # Build text overlay specs
+            text_specs = []
+            for i, line in enumerate(adjusted_script.lines):
+                anim = text_animations[i % len(text_animations)] if text_animations else "fade"
+                spec = TextOverlaySpec(
+                    text=line.text,
+                    start_time=line.timing,
+                    duration=line.duration,
+                    style=request.settings.text_style.value,
+                    animation=anim,
+                )
+                text_specs.append(spec)
+                logger.info(f"[{job_id}] [STEP 9/11] TextOverlaySpec {i+1}: text='{line.text}', start={line.timing:.2f}s, dur={line.duration:.2f}s, end={line.timing + line.duration:.2f}s, style={request.settings.text_style.value}, anim={anim}")
+
+            # Use ASS subtitles - simpler and more reliable than Pillow overlay
+            logger.info(f"[{job_id}] [STEP 9/11] === APPLYING ASS SUBTITLES ===")
+            logger.info(f"[{job_id}] [STEP 9/11] Method: ASS subtitles (libass)")
+            logger.info(f"[{job_id}] [STEP 9/11] Input: {video_path}")
+            logger.info(f"[{job_id}] [STEP 9/11] Output: {text_output}")
+            logger.info(f"[{job_id}] [STEP 9/11] Overlays count: {len(text_specs)}")
+
+            success = await apply_text_overlays_ass(
+                input_video=video_path,
+                output_video=text_output,
+                overlays=text_specs,
+                video_size=output_size,
+                job_id=job_id,
+                ffmpeg_path=self.ffmpeg,
+            )
+            step_time = time.time() - step_start
+
+            if success:
+                video_path = text_output
+                logger.info(f"[{job_id}] [STEP 9/11] ✓ Text overlays applied successfully in {step_time:.1f}s")
+                logger.info(f"[{job_id}] [STEP 9/11] Output video: {video_path}")
+            else:
+                logger.error(f"[{job_id}] [STEP 9/11] ✗ Text overlay FAILED after {step_time:.1f}s")
+                logger.warning(f"[{job_id}] [STEP 9/11] Continuing without text overlays")
+        else:
+            logger.info(f"[{job_id}] [STEP 9/11] No script text to apply (skipped)")
+
+        # =================================================================
+        # STEP 10: ADD AUDIO (FFmpeg)
+        # =================================================================
+        step_start = time.time()
+        await self._update_progress(progress_callback, job_id, 90, "Adding audio")
+        logger.info(f"[{job_id}] [STEP 10/11] Adding audio...")
+
+        if audio_path and request.audio:
+            logger.info(f"[{job_id}] [STEP 10/11] Audio settings:")
+            logger.info(f"[{job_id}] [STEP 10/11]   Start: {request.audio.start_time or 0.0}s")
+            logger.info(f"[{job_id}] [STEP 10/11]   Fade in: {AUDIO_FADE_IN}s, Fade out: {AUDIO_FADE_OUT}s")
+            logger.info(f"[{job_id}] [STEP 10/11]   TikTok hook: {HOOK_DURATION}s @ {HOOK_CALM_FACTOR} volume")
+            audio_output = os.path.join(job_dir, f"{job_id}_audio.mp4")
+            audio_settings = AudioSettings(
+                start_time=request.audio.start_time or 0.0,
+                duration=request.audio.duration,
+                fade_in=AUDIO_FADE_IN,
+                fade_out=AUDIO_FADE_OUT,
+                tiktok_hook_enabled=True,
+                tiktok_hook_duration=HOOK_DURATION,
+                tiktok_hook_volume=HOOK_CALM_FACTOR,
+            )
+
+            success = await self.audio_processor.mix_into_video(
+                video_path=video_path,
+                audio_path=audio_path,
+                output_path=audio_output,
+                video_duration=video_duration,
+                settings=audio_settings,
+                job_id=job_id,
+            )
+            step_time = time.time() - step_start
+            if success:
+                video_path = audio_output
+                logger.info(f"[{job_id}] [STEP 10/11] Audio mixed in {step_time:.1f}s")
+            else:
+                logger.warning(f"[{job_id}] [STEP 10/11] Audio mix failed, continuing without audio")
+        else:
+            logger.info(f"[{job_id}] [STEP 10/11] No audio to add (skipped)")
+
+        # =================================================================
+        # STEP 10.5: DURATION VERIFICATION & TRIMMING
+        # =================================================================
+        # Ensure final video matches target_duration exactly
+        step_start = time.time()
+        final_video_info = await get_video_info(video_path)
+        final_video_duration = final_video_info["duration"]
+
+        logger.info(f"[{job_id}] [STEP 10.5/11] Duration verification:")
+        logger.info(f"[{job_id}] [STEP 10.5/11]   Target duration: {target_duration:.2f}s")
+        logger.info(f"[{job_id}] [STEP 10.5/11]   Actual duration: {final_video_duration:.2f}s")
+        logger.info(f"[{job_id}] [STEP 10.5/11]   Difference: {final_video_duration - target_duration:.2f}s")
+
+        # Trim if video exceeds target duration by more than 0.5 seconds
+        if final_video_duration > target_duration + 0.5:
+            logger.info(f"[{job_id}] [STEP 10.5/11] Video exceeds target - trimming to {target_duration:.2f}s")
+            trimmed_output = os.path.join(job_dir, f"{job_id}_trimmed.mp4")
+            trim_success = await trim_video_to_duration(
+                input_path=video_path,
+                output_path=trimmed_output,
+                target_duration=target_duration,
+                use_gpu=is_nvenc_available(),
+                job_id=job_id,
+            )
+            step_time = time.time() - step_start
+            if trim_success and os.path.exists(trimmed_output):
+                video_path = trimmed_output
+                logger.info(f"[{job_id}] [STEP 10.5/11] ✓ Video trimmed to {target_duration:.2f}s in {step_time:.1f}s")
+            else:
+                logger.warning(f"[{job_id}] [STEP 10.5/11] Trim failed, using original video")
+        else:
+            logger.info(f"[{job_id}] [STEP 10.5/11] Duration OK - no trimming needed")
+
+        return video_path
+
     # =========================================================================
     # Helper Methods
     # =========================================================================
@@ -710,28 +919,22 @@ class FFmpegRenderer:
         audio_path: Optional[str],
         audio_url: Optional[str],
     ) -> AudioAnalysis:
-        """Get audio analysis with caching."""
+        """Get audio analysis with caching.
+
+        Analysis runs in the shared analysis process pool and consults the
+        content-addressed cache (keyed on the audio bytes, not the URL), so
+        repeated tracks skip librosa entirely.
+        """
         if not audio_path:
             return AudioAnalysis(
                 bpm=120, beat_times=[], energy_curve=[],
                 duration=15.0, suggested_vibe="Neutral"
             )
 
-        # Check cache
-        cache_key = audio_url or audio_path
-        async with _audio_cache_lock:
-            if cache_key in _audio_cache:
-                return _audio_cache[cache_key]
-
         try:
-            # Run sync audio analysis in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            analysis = await asyncio.wait_for(
-                loop.run_in_executor(None, self.audio_analyzer.analyze, audio_path),
-                timeout=60.0
-            )
-            async with _audio_cache_lock:
-                _audio_cache[cache_key] = analysis
+            # Waits for a pool slot rather than failing the render under load;
+            # the timeout (analysis_timeout) covers both queueing and analysis
+            analysis = await analyze_audio(audio_path, block=True)
             return analysis
         except asyncio.TimeoutError:
             logger.warning("Audio analysis timed out, using defaults")
@@ -779,7 +982,9 @@ class FFmpegRenderer:
 
         processed = []
         for i, path in enumerate(image_paths):
-            output_path = path.replace(".jpg", "_processed.jpg")
+            # Always a new file: downloads may share their inode with the asset cache
+            base, ext = os.path.splitext(path)
+            output_path = f"{base}_processed{ext or '.jpg'}"
             # Run sync image processing in executor
             result = await loop.run_in_executor(
                 None,
@@ -911,14 +1116,22 @@ class FFmpegRenderer:
             logger.info(f"[{job_id}] Transition duration: {transition_duration:.2f}s (avg clip: {avg_clip_duration:.2f}s)")
 
             # Use XfadeRenderer (pure FFmpeg, no MoviePy)
+            # Long sequences are rendered as parallel xfade groups; keep that
+            # work off the event loop
             xfade_renderer = XfadeRenderer()
-            success = xfade_renderer.render_sequence(
-                clips=segments,
-                output_path=concat_output,
-                transitions=xfade_names,
-                transition_duration=transition_duration,
-                use_gpu=is_nvenc_available(),
-                target_size=output_size,
+            loop = asyncio.get_event_loop()
+            success = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    xfade_renderer.render_sequence,
+                    clips=segments,
+                    output_path=concat_output,
+                    transitions=xfade_names,
+                    transition_duration=transition_duration,
+                    use_gpu=is_nvenc_available(),
+                    target_size=output_size,
+                    job_id=job_id,
+                ),
             )
 
             if success and os.path.exists(concat_output):
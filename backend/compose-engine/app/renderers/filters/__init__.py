@@ -1,7 +1,11 @@
 """FFmpeg filter builders."""
 
 from .ken_burns import build_ken_burns_filter
-from .color_grading import FFMPEG_COLOR_GRADES, build_color_grade_filter
+from .color_grading import (
+    FFMPEG_COLOR_GRADES,
+    build_color_grade_filter,
+    build_color_grade_lut_filter,
+)
 from .overlay_effects import FFMPEG_OVERLAY_EFFECTS, build_overlay_filter
 from .text_overlay import (
     build_drawtext_filter,
@@ -13,6 +17,7 @@ __all__ = [
     "build_ken_burns_filter",
     "FFMPEG_COLOR_GRADES",
     "build_color_grade_filter",
+    "build_color_grade_lut_filter",
     "FFMPEG_OVERLAY_EFFECTS",
     "build_overlay_filter",
     "build_drawtext_filter",
@@ -4,11 +4,16 @@ Replaces MoviePy's video.image_transform() per-frame processing with
 native FFmpeg filters for significant speedup.
 """
 
+import os
+import tempfile
 from typing import Optional, List
 
+# Where grade LUTs are exported for FFmpeg's lut3d filter
+LUT_CUBE_DIR = os.path.join(tempfile.gettempdir(), "compose-luts")
+
 
 # Color grading presets mapped to FFmpeg filter chains
-# These match the grades defined in filters.py and xfade_renderer.py
+# Grades with a compiled LUT in effects/filters.py use lut3d instead
 FFMPEG_COLOR_GRADES = {
     # vibrant: +30% saturation for punchy, colorful look
     "vibrant": "eq=saturation=1.3",
@@ -54,15 +59,43 @@ FFMPEG_COLOR_GRADES = {
 def build_color_grade_filter(grade: str) -> Optional[str]:
     """Get FFmpeg filter string for a color grade preset.
 
+    Grades that also exist in the MoviePy path (effects/filters.py) are
+    applied through the same compiled LUT, so both paths produce the same
+    look. Other grades use the filter chains above.
+
     Args:
         grade: Color grade name (vibrant, cinematic, bright, moody, bw, natural)
 
     Returns:
         FFmpeg filter string, or None for "natural" (no processing)
     """
+    lut_filter = build_color_grade_lut_filter(grade)
+    if lut_filter:
+        return lut_filter
     return FFMPEG_COLOR_GRADES.get(grade)
 
 
+def build_color_grade_lut_filter(grade: str, cube_dir: str = LUT_CUBE_DIR) -> Optional[str]:
+    """Build a lut3d filter from the compiled LUT for a color grade.
+
+    The .cube file is written once per grade and reused by later renders.
+
+    Args:
+        grade: Color grade name
+        cube_dir: Directory for exported .cube files
+
+    Returns:
+        FFmpeg filter string, or None if the grade has no LUT
+    """
+    from ...effects.filters import COLOR_GRADE_TRANSFORMS, export_grade_cube
+
+    if grade not in COLOR_GRADE_TRANSFORMS:
+        return None
+
+    cube_path = export_grade_cube(grade, cube_dir)
+    return build_lut_filter(cube_path) + ":interp=tetrahedral"
+
+
 def build_custom_color_grade(
     saturation: float = 1.0,
     contrast: float = 1.0,
@@ -0,0 +1,97 @@
+"""Pack rendered text sprites into one atlas image.
+
+apply_text_overlays_pillow used to save every caption line as a full-frame
+PNG and feed each one to FFmpeg as its own input, so a 20-line script meant
+20 decoders and 20 full-frame overlays. Instead, lines are rasterized as
+tight sprites (cropped to their drawn pixels), packed into a single atlas
+and cut back out with crop filters:
+
+    [1:v]split=N[a0][a1]...
+    [a0]crop=w:h:x:y,...[txt0]
+    [0:v][txt0]overlay=X:Y:...
+
+Identical sprites (the same Image object, e.g. from the rasterization cache)
+are packed once.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List
+
+from PIL import Image
+
+# Transparent gap between sprites, so crops never bleed into neighbours
+ATLAS_PADDING = 2
+
+
+@dataclass(frozen=True)
+class TextSprite:
+    """A rendered text line, cropped to its pixels.
+
+    x/y place the sprite's top-left corner on the video frame.
+    """
+    image: Image.Image
+    x: int
+    y: int
+
+
+@dataclass(frozen=True)
+class AtlasRegion:
+    """Where a sprite lives in the atlas."""
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def crop_filter(self) -> str:
+        return f"crop={self.width}:{self.height}:{self.x}:{self.y}"
+
+
+@dataclass
+class TextAtlas:
+    """Atlas image plus one region per packed sprite (in input order)."""
+    image: Image.Image
+    regions: List[AtlasRegion]
+
+
+def pack_text_atlas(images: List[Image.Image], padding: int = ATLAS_PADDING) -> TextAtlas:
+    """Shelf-pack sprite images into one RGBA atlas.
+
+    Sprites are placed tallest first on rows about as wide as the square
+    root of the total area (never narrower than the widest sprite).
+
+    Args:
+        images: Sprite images; repeated objects share one region
+        padding: Transparent pixels around each sprite
+
+    Returns:
+        TextAtlas with regions[i] for images[i]
+    """
+    if not images:
+        raise ValueError("No sprites to pack")
+
+    unique: Dict[int, Image.Image] = {}
+    for image in images:
+        unique.setdefault(id(image), image)
+
+    sizes = {key: (img.width + padding, img.height + padding) for key, img in unique.items()}
+    area = sum(w * h for w, h in sizes.values())
+    row_width = max(max(w for w, _ in sizes.values()), int(math.ceil(math.sqrt(area))))
+
+    placed: Dict[int, AtlasRegion] = {}
+    x = y = row_height = 0
+    for key in sorted(sizes, key=lambda k: sizes[k][1], reverse=True):
+        w, h = sizes[key]
+        if x + w > row_width:
+            x = 0
+            y += row_height
+            row_height = 0
+        placed[key] = AtlasRegion(x, y, unique[key].width, unique[key].height)
+        x += w
+        row_height = max(row_height, h)
+
+    atlas = Image.new("RGBA", (row_width, y + row_height), (0, 0, 0, 0))
+    for key, region in placed.items():
+        atlas.paste(unique[key].convert("RGBA"), (region.x, region.y))
+
+    return TextAtlas(image=atlas, regions=[placed[id(image)] for image in images])
@@ -5,20 +5,26 @@ using FFmpeg's overlay filter. This approach avoids the drawtext filter
 which requires FFmpeg to be compiled with --enable-libfreetype.
 
 The workflow:
-1. Render each text overlay as a transparent PNG using Pillow
-2. Use FFmpeg's overlay filter to composite the images onto the video
+1. Render each text overlay as a tight transparent sprite using Pillow
+   (fonts and sprites are cached per process, so repeated lines and
+   variation jobs reuse them)
+2. Pack the sprites into one atlas image (see text_atlas.py)
+3. Use FFmpeg's crop + overlay filters to composite them onto the video
 """
 
-import asyncio
 import logging
 import os
 import subprocess
 import textwrap
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Literal, Optional, Tuple
 
 from PIL import Image, ImageDraw, ImageFont
 
+from ...utils.ffmpeg_scheduler import run_ffmpeg
+from .text_atlas import TextSprite, pack_text_atlas
+
 logger = logging.getLogger(__name__)
 
 # Font path (same as text_overlay.py)
@@ -48,6 +54,28 @@ FALLBACK_FONTS = [
     "Sans",
 ]
 
+# Pillow fonts in order of preference (first loadable one is used)
+PILLOW_FONT_CANDIDATES = [
+    # CJK fonts (support Korean/Chinese/Japanese)
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJKkr-Bold.otf",
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc",
+    # Regular Noto Sans
+    "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+    # DejaVu (common fallback)
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    # Liberation fonts
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    # macOS fonts
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "/System/Library/Fonts/Helvetica.ttc",
+]
+
+# Rendered text sprites kept per process (captions repeat across variations)
+TEXT_SPRITE_CACHE_SIZE = 256
+
 # Animation registry matching text_overlay.py
 ANIMATION_REGISTRY = {
     "fade": {"in_duration": 0.3, "out_duration": 0.3},
@@ -301,54 +329,56 @@ def build_drawtext_filter(
 # =============================================================================
 
 
-def get_pillow_font(size: int) -> ImageFont.FreeTypeFont:
-    """Get a Pillow-compatible font.
-
-    Args:
-        size: Font size in pixels
+@lru_cache(maxsize=1)
+def resolve_pillow_font_path() -> Optional[str]:
+    """Find the first loadable Pillow font (resolved once per process).
 
     Returns:
-        ImageFont object
+        Font file path, or None if no TrueType font is available
     """
-    # Try fonts in order of preference
-    font_candidates = [
-        # CJK fonts (support Korean/Chinese/Japanese)
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
-        "/usr/share/fonts/opentype/noto/NotoSansCJKkr-Bold.otf",
-        "/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc",
-        # Regular Noto Sans
-        "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf",
-        "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
-        # DejaVu (common fallback)
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        # Liberation fonts
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-        # macOS fonts
-        "/System/Library/Fonts/AppleSDGothicNeo.ttc",
-        "/System/Library/Fonts/Helvetica.ttc",
-    ]
-
-    for font_path in font_candidates:
+    for font_path in PILLOW_FONT_CANDIDATES:
         if os.path.exists(font_path):
             try:
-                return ImageFont.truetype(font_path, size)
+                ImageFont.truetype(font_path, 12)
+                logger.info(f"[text_overlay] Using Pillow font: {font_path}")
+                return font_path
             except Exception as e:
                 logger.debug(f"Could not load font {font_path}: {e}")
                 continue
 
-    # Fallback to default font
     logger.warning("No TrueType fonts found, using default font")
-    return ImageFont.load_default()
+    return None
 
 
-def render_text_image(
+@lru_cache(maxsize=32)
+def _load_pillow_font(font_path: Optional[str], size: int) -> ImageFont.ImageFont:
+    if font_path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(font_path, size)
+
+
+def get_pillow_font(size: int) -> ImageFont.FreeTypeFont:
+    """Get a Pillow-compatible font.
+
+    Args:
+        size: Font size in pixels
+
+    Returns:
+        ImageFont object (shared; do not modify)
+    """
+    return _load_pillow_font(resolve_pillow_font_path(), size)
+
+
+def render_text_sprite(
     text: str,
     video_size: Tuple[int, int],
     font_size: Optional[int] = None,
     style: str = "minimal",
-) -> Image.Image:
-    """Render text to a transparent PNG image using Pillow.
+) -> TextSprite:
+    """Render text as a tight sprite positioned on the video frame.
+
+    Sprites are cached by (text, font, font size, style, video size), so
+    the returned image is shared and must not be modified.
 
     Args:
         text: Text to render
@@ -357,7 +387,7 @@ def render_text_image(
         style: Style name from STYLE_CONFIGS
 
     Returns:
-        PIL Image with transparent background and rendered text
+        TextSprite with the cropped RGBA image and its frame position
     """
     width, height = video_size
 
@@ -365,6 +395,19 @@ def render_text_image(
     if font_size is None:
         font_size = max(28, int(height * 0.028))
 
+    return _rasterize_text(text, resolve_pillow_font_path(), font_size, style, (width, height))
+
+
+@lru_cache(maxsize=TEXT_SPRITE_CACHE_SIZE)
+def _rasterize_text(
+    text: str,
+    font_path: Optional[str],
+    font_size: int,
+    style: str,
+    video_size: Tuple[int, int],
+) -> TextSprite:
+    width, height = video_size
+
     # Get style config
     config = STYLE_CONFIGS.get(style, STYLE_CONFIGS["minimal"])
 
@@ -388,7 +431,7 @@ def render_text_image(
     draw = ImageDraw.Draw(img)
 
     # Get font
-    font = get_pillow_font(font_size)
+    font = _load_pillow_font(font_path, font_size)
 
     # Auto line wrap
     max_chars = 16 if width < height else 30
@@ -420,6 +463,31 @@ def render_text_image(
     # Draw main text
     draw.text((x, y), wrapped_text, font=font, fill=text_rgba)
 
+    # Keep only the drawn pixels
+    drawn = img.getbbox() or (0, 0, 1, 1)
+    return TextSprite(image=img.crop(drawn), x=drawn[0], y=drawn[1])
+
+
+def render_text_image(
+    text: str,
+    video_size: Tuple[int, int],
+    font_size: Optional[int] = None,
+    style: str = "minimal",
+) -> Image.Image:
+    """Render text to a transparent PNG image using Pillow.
+
+    Args:
+        text: Text to render
+        video_size: (width, height) of the video
+        font_size: Font size (auto-calculated if None)
+        style: Style name from STYLE_CONFIGS
+
+    Returns:
+        PIL Image with transparent background and rendered text
+    """
+    sprite = render_text_sprite(text, video_size, font_size, style)
+    img = Image.new("RGBA", video_size, (0, 0, 0, 0))
+    img.paste(sprite.image, (sprite.x, sprite.y))
     return img
 
 
@@ -455,39 +523,48 @@ async def apply_text_overlays_pillow(
 
     # Create temp directory for text images
     temp_dir = os.path.dirname(output_video)
+    atlas_path = os.path.join(temp_dir, f"{job_id or 'text'}_text_atlas.png")
     text_images = []
 
     try:
-        # Render each text overlay to a PNG image
+        # Render each text overlay to a sprite (cached across overlays and jobs)
         for i, spec in enumerate(overlays):
-            img = render_text_image(
+            sprite = render_text_sprite(
                 text=spec.text,
                 video_size=video_size,
                 style=spec.style,
             )
-            img_path = os.path.join(temp_dir, f"text_overlay_{i:03d}.png")
-            img.save(img_path, "PNG")
             text_images.append({
-                "path": img_path,
+                "sprite": sprite,
                 "start": spec.start_time,
                 "end": spec.start_time + spec.duration,
                 "fade_in": ANIMATION_REGISTRY.get(spec.animation or "fade", {}).get("in_duration", 0.3),
                 "fade_out": ANIMATION_REGISTRY.get(spec.animation or "fade", {}).get("out_duration", 0.3),
             })
-            logger.debug(f"[{job_id}] Rendered text image {i}: '{spec.text[:30]}...'")
+            logger.debug(f"[{job_id}] Rendered text sprite {i}: '{spec.text[:30]}...'")
+
+        # Pack all sprites into one atlas image = one extra FFmpeg input
+        atlas = pack_text_atlas([img["sprite"].image for img in text_images])
+        atlas.image.save(atlas_path, "PNG")
+        logger.info(
+            f"[{job_id}] Text atlas: {len(text_images)} overlays, "
+            f"{len(set(atlas.regions))} sprites, {atlas.image.width}x{atlas.image.height}"
+        )
 
         # Build FFmpeg command with overlay filters
         # We need to chain multiple overlays
-        inputs = ["-i", input_video]
-        for img in text_images:
-            inputs.extend(["-i", img["path"]])
+        inputs = ["-i", input_video, "-i", atlas_path]
 
-        # Build filter complex
+        # Build filter complex: one atlas copy per overlay, cut out by crop
         filter_parts = []
         current_input = "0:v"
+        if len(text_images) > 1:
+            atlas_outputs = "".join(f"[atlas{i}]" for i in range(len(text_images)))
+            filter_parts.append(f"[1:v]format=rgba,split={len(text_images)}{atlas_outputs}")
+        else:
+            filter_parts.append("[1:v]format=rgba[atlas0]")
 
         for i, img in enumerate(text_images):
-            input_idx = i + 1  # Image inputs start at index 1
             output_label = f"v{i+1}"
 
             # Calculate enable expression for timing
@@ -537,14 +614,15 @@ async def apply_text_overlays_pillow(
                     f"if(gt(t\\,{end})\\,0\\,1))))"
                 )
 
-            # Format the image input with alpha expression
+            # Cut the sprite out of the atlas and apply the alpha expression
             filter_parts.append(
-                f"[{input_idx}:v]format=rgba,colorchannelmixer=aa='{alpha_expr}'[txt{i}]"
+                f"[atlas{i}]{atlas.regions[i].crop_filter()},colorchannelmixer=aa='{alpha_expr}'[txt{i}]"
             )
 
-            # Overlay filter
+            # Overlay filter (only the sprite's area is blended)
+            sprite = img["sprite"]
             filter_parts.append(
-                f"[{current_input}][txt{i}]overlay=0:0:enable='between(t\\,{start}\\,{end})'[{output_label}]"
+                f"[{current_input}][txt{i}]overlay={sprite.x}:{sprite.y}:enable='between(t\\,{start}\\,{end})'[{output_label}]"
             )
             current_input = output_label
 
@@ -587,14 +665,9 @@ async def apply_text_overlays_pillow(
         logger.debug(f"[{job_id}] FFmpeg command: {' '.join(cmd[:10])}...")
 
         # Run FFmpeg
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
+        returncode, stdout, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-        if process.returncode != 0:
+        if returncode != 0:
             logger.error(f"[{job_id}] FFmpeg overlay failed: {stderr.decode()[-500:]}")
             return False
 
@@ -608,13 +681,12 @@ async def apply_text_overlays_pillow(
         return False
 
     finally:
-        # Cleanup temp images
-        for img in text_images:
-            try:
-                if os.path.exists(img["path"]):
-                    os.remove(img["path"])
-            except:
-                pass
+        # Cleanup atlas image
+        try:
+            if os.path.exists(atlas_path):
+                os.remove(atlas_path)
+        except:
+            pass
 
 
 async def apply_text_overlays_ass(
@@ -696,8 +768,8 @@ async def apply_text_overlays_ass(
 
         # Build FFmpeg command with ASS filter
         # Note: ass filter path needs escaping for Windows compatibility
-        escaped_ass_path = ass_path.replace("\\", "/").replace(":", "\\:")
-        logger.info(f"[{job_id}] [ASS] Escaped ASS path: {escaped_ass_path}")
+        ass_filter = build_ass_filter(ass_path)
+        logger.info(f"[{job_id}] [ASS] ASS filter: {ass_filter}")
 
         # Check if NVENC is available for GPU encoding
         from ..ffmpeg_pipeline import is_nvenc_available
@@ -707,7 +779,7 @@ async def apply_text_overlays_ass(
             cmd = [
                 ffmpeg_path, "-y",
                 "-i", input_video,
-                "-vf", f"ass='{escaped_ass_path}'",
+                "-vf", ass_filter,
                 "-c:v", "h264_nvenc",
                 "-preset", "p4",
                 "-cq", "20",
@@ -719,7 +791,7 @@ async def apply_text_overlays_ass(
             cmd = [
                 ffmpeg_path, "-y",
                 "-i", input_video,
-                "-vf", f"ass='{escaped_ass_path}'",
+                "-vf", ass_filter,
                 "-c:v", "libx264",
                 "-preset", "ultrafast",
                 "-crf", "18",
@@ -732,14 +804,9 @@ async def apply_text_overlays_ass(
 
         # Run FFmpeg
         logger.info(f"[{job_id}] [ASS] Executing FFmpeg...")
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
+        returncode, stdout, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-        logger.info(f"[{job_id}] [ASS] FFmpeg return code: {process.returncode}")
+        logger.info(f"[{job_id}] [ASS] FFmpeg return code: {returncode}")
 
         if stdout:
             logger.info(f"[{job_id}] [ASS] FFmpeg stdout: {stdout.decode()[:500]}")
@@ -748,9 +815,9 @@ async def apply_text_overlays_ass(
             # Log last 1000 chars of stderr (most relevant part)
             logger.info(f"[{job_id}] [ASS] FFmpeg stderr (last 1000 chars): {stderr_text[-1000:]}")
 
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
-            logger.error(f"[{job_id}] [ASS] ✗ FFmpeg FAILED with return code {process.returncode}")
+            logger.error(f"[{job_id}] [ASS] ✗ FFmpeg FAILED with return code {returncode}")
             logger.error(f"[{job_id}] [ASS] Full error: {error_msg}")
             return False
 
@@ -781,6 +848,34 @@ async def apply_text_overlays_ass(
             logger.warning(f"[{job_id}] [ASS] Failed to cleanup ASS file: {cleanup_error}")
 
 
+def build_ass_filter(ass_path: str) -> str:
+    """Build the libass filter for an ASS file.
+
+    The path is escaped for use inside -vf and -filter_complex (Windows
+    separators and drive colons).
+    """
+    escaped_ass_path = ass_path.replace("\\", "/").replace(":", "\\:")
+    return f"ass='{escaped_ass_path}'"
+
+
+def build_ass_subtitles(
+    overlays: List["TextOverlaySpec"],
+    video_size: Tuple[int, int],
+    job_id: str = "",
+    display_mode: str = "sequential",
+    video_duration: Optional[float] = None,
+) -> str:
+    """Build ASS subtitle content for text overlays.
+
+    Used by renderers that burn subtitles inside a larger filtergraph
+    instead of running apply_text_overlays_ass as a separate pass.
+    """
+    width, height = video_size
+    if display_mode == "static" and video_duration is None:
+        video_duration = max(o.start_time + o.duration for o in overlays)
+    return _generate_ass_file(overlays, width, height, job_id, display_mode, video_duration)
+
+
 def _generate_ass_file(
     overlays: List["TextOverlaySpec"],
     width: int,
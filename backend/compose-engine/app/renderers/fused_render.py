@@ -0,0 +1,218 @@
+"""Single-pass ("fused") render plans for FFmpegRenderer.
+
+The multi-step pipeline runs a separate FFmpeg process for each stage
+(image sequence or xfade concat, ASS subtitles, audio mix, trim), and each
+stage decodes and re-encodes the whole video. A fused plan expresses the
+same job as one RenderPlan (see render_plan.py) with a single encode:
+
+    image inputs -> scale/pad -> loop per slot
+      -> concat (direct cuts) or chained xfade (requested transitions)
+      -> effects -> ass subtitles -> trim
+    audio input -> trim/hook/fades (build_audio_filter_chain)
+
+The plan is built naively, one input and one scale step per slot; the
+optimizer then merges repeated images so each distinct image is decoded
+and scaled once and held for its slots with the loop filter. Slot lengths
+are rounded to whole frames on the cumulative timeline, so rounding never
+drifts across many short cuts.
+
+The plan mirrors the multi-step path (same scaling, transition length and
+offsets, audio chain and trim rule), so FFmpegRenderer can fall back to it
+whenever a fused render fails. Unlike the multi-step xfade path, which
+fades every boundary, each boundary uses its requested xfade transition.
+"""
+
+from typing import List, Optional, Tuple
+
+from ..effects.safe_effects import SAFE_XFADE_TRANSITIONS
+from .audio.audio_processor import AudioSettings, build_audio_filter_chain
+from .render_plan import RenderPlan
+
+# Transition for boundaries without a requested one (as XfadeRenderer pads)
+DEFAULT_TRANSITION = "fade"
+
+# Videos longer than target by more than this are trimmed to target
+TRIM_TOLERANCE = 0.5
+
+# Static Ken Burns clips are cut from a 10% larger cover-scaled image
+STATIC_SCALE_FACTOR = 1.1
+
+SUBTITLES_FILE = "subtitles.ass"
+
+
+def slot_frame_counts(durations: List[float], fps: int) -> List[int]:
+    """Frames per slot, rounded on the cumulative timeline (at least 1 each)."""
+    frames = []
+    elapsed = 0.0
+    emitted = 0
+    for duration in durations:
+        elapsed += duration
+        count = max(1, int(round(elapsed * fps)) - emitted)
+        frames.append(count)
+        emitted += count
+    return frames
+
+
+def crossfade_duration(durations: List[float]) -> float:
+    """Transition length used for a sequence of slots.
+
+    Same rule as the multi-step xfade path: 25% of the average slot,
+    clamped to 0.2-0.5s, and shortened so every slot outlives it by 0.1s.
+    """
+    avg_duration = sum(durations) / len(durations)
+    transition = max(0.2, min(0.5, avg_duration * 0.25))
+    for duration in durations:
+        if duration < transition + 0.1:
+            transition = max(0.1, min(transition, duration - 0.1))
+    return transition
+
+
+def fused_timeline(
+    durations: List[float],
+    fps: int = 30,
+    crossfade: bool = False,
+    target_duration: Optional[float] = None,
+) -> Tuple[List[int], List[float], float, float]:
+    """Lay out slots on the output timeline.
+
+    Returns:
+        (frames per slot, xfade offsets, video length, final duration after trim)
+    """
+    frames = slot_frame_counts(durations, fps)
+    slot_durations = [count / fps for count in frames]
+
+    offsets: List[float] = []
+    if crossfade and len(slot_durations) > 1:
+        # Offsets are relative to the accumulated output of the previous xfade
+        transition = crossfade_duration(slot_durations)
+        length = slot_durations[0]
+        for slot_duration in slot_durations[1:]:
+            offset = max(0.0, length - transition)
+            offsets.append(offset)
+            length = offset + slot_duration
+    else:
+        length = sum(frames) / fps
+
+    duration = length
+    if target_duration and length > target_duration + TRIM_TOLERANCE:
+        duration = target_duration
+    return frames, offsets, length, duration
+
+
+def _prepare_filter(output_size: Tuple[int, int], crossfade: bool) -> str:
+    """Scale/pad chain for a source image."""
+    w, h = output_size
+    if crossfade:
+        # Same framing as create_image_clip(motion_style="static")
+        sw = int(w * STATIC_SCALE_FACTOR)
+        sh = int(h * STATIC_SCALE_FACTOR)
+        return (
+            f"scale={sw}:{sh}:force_original_aspect_ratio=increase:flags=lanczos,"
+            f"crop={sw}:{sh},scale={w}:{h},setsar=1,format=yuv420p"
+        )
+    # Same framing as create_video_from_image_sequence
+    return (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p"
+    )
+
+
+def plan_fused_render(
+    image_paths: List[str],
+    durations: List[float],
+    output_size: Tuple[int, int],
+    fps: int = 30,
+    crossfade: bool = False,
+    transitions: Optional[List[str]] = None,
+    target_duration: Optional[float] = None,
+    audio_path: Optional[str] = None,
+    audio_settings: Optional[AudioSettings] = None,
+    effect_filters: Optional[List[str]] = None,
+    subtitles: Optional[str] = None,
+    job_id: str = "unknown",
+) -> RenderPlan:
+    """Plan a whole render as a single-encode RenderPlan (not yet optimized).
+
+    Args:
+        image_paths: Image per timeline slot (repeats allowed)
+        durations: Duration of each slot in seconds
+        output_size: (width, height) of the output
+        fps: Output frame rate
+        crossfade: Transition between slots instead of direct cuts
+        transitions: xfade transition per slot boundary when crossfading
+            (missing ones are DEFAULT_TRANSITION); must be in
+            SAFE_XFADE_TRANSITIONS
+        target_duration: Trim to this if the video exceeds it by more
+            than TRIM_TOLERANCE
+        audio_path: Optional soundtrack
+        audio_settings: Audio trim/hook/fade settings
+        effect_filters: Color grade/overlay filters (empty = none)
+        subtitles: ASS subtitle content, timed for the final duration
+        job_id: Job ID for logging
+
+    Returns:
+        RenderPlan; metadata has "length" and "duration"
+    """
+    if not image_paths or len(image_paths) != len(durations):
+        raise ValueError("image_paths and durations must be non-empty and the same length")
+    boundaries = len(image_paths) - 1
+    names = list(transitions or [])[:boundaries]
+    names += [DEFAULT_TRANSITION] * (boundaries - len(names))
+    unsupported = sorted(set(names) - set(SAFE_XFADE_TRANSITIONS))
+    if crossfade and unsupported:
+        raise ValueError(f"unsupported xfade transitions: {unsupported}")
+
+    frames, offsets, length, duration = fused_timeline(durations, fps, crossfade, target_duration)
+    plan = RenderPlan(job_id=job_id, metadata={
+        "slots": len(image_paths),
+        "crossfade": crossfade,
+        "length": round(length, 3),
+        "duration": round(duration, 3),
+    })
+
+    prepare = _prepare_filter(output_size, crossfade)
+    slots = []
+    for path, count in zip(image_paths, frames):
+        image = plan.add_input(path=path)
+        prepared = plan.add_filter([f"{image}:v"], [prepare], label="prepare")
+        slots.append(plan.add_filter(
+            [prepared],
+            [f"loop=loop={count - 1}:size=1:start=0", f"setpts=N/({fps}*TB)", f"fps={fps}"],
+            label="hold",
+            unique=True,
+        ))
+
+    if len(slots) == 1:
+        video = slots[0]
+    elif crossfade:
+        transition = crossfade_duration([count / fps for count in frames])
+        video = slots[0]
+        for slot, offset, name in zip(slots[1:], offsets, names):
+            video = plan.add_filter(
+                [video, slot],
+                [f"xfade=transition={name}:duration={transition:.3f}:offset={offset:.3f}"],
+                label="transition",
+            )
+    else:
+        video = plan.add_filter(slots, [f"concat=n={len(slots)}:v=1:a=0"], label="concat")
+
+    video = plan.add_filter([video], list(effect_filters or []), label="effects")
+    if subtitles:
+        plan.add_file(SUBTITLES_FILE, subtitles)
+        video = plan.add_filter([video], [{"ass": SUBTITLES_FILE}], label="text")
+    if duration < length:
+        video = plan.add_filter([video], [f"trim=duration={duration:.3f}"], label="trim")
+
+    audio = None
+    if audio_path:
+        source = plan.add_input(path=audio_path)
+        # One chain entry: the hook volume expression contains escaped commas
+        audio = plan.add_filter(
+            [f"{source}:a"],
+            [build_audio_filter_chain(duration, audio_settings)],
+            media="a",
+            label="audio",
+        )
+
+    plan.set_output(video, audio, fps=fps, shortest=audio is not None)
+    return plan
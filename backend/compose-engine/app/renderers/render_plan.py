@@ -0,0 +1,586 @@
+"""Render plans: a serializable DAG of inputs, filters and an encode.
+
+A RenderPlan describes a whole render before any FFmpeg process runs:
+
+- ``input`` nodes: media files (local ``path`` or remote ``url``)
+- ``filter`` nodes: a chain of FFmpeg filters over one or more streams
+- one ``output`` node: the streams to encode and how
+
+Plans are plain data (to_dict/from_dict/to_json), so a plan can be dumped
+for debugging (render_plan_dump_dir) and loaded and run again later; URL
+inputs are downloaded when it runs. Files a filter needs (ASS subtitles)
+travel inside the plan and are written next to the output when it runs.
+
+optimize() rewrites a plan before it is compiled:
+
+- drop_noop_filters: remove empty or disabled filters (e.g. effects that
+  are switched off)
+- dedupe_nodes: merge identical inputs and filters, so an image used by
+  many slots is decoded and scaled once (fan-out becomes split/asplit;
+  filters marked ``unique`` are left alone)
+- fuse_filter_chains: merge single-consumer filter steps into one chain
+- choose_stream_copy: stream-copy output streams that are not filtered
+
+compile_plan() turns a plan into one FFmpeg command with a single
+filter_complex; run_render_plan() executes it.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.ffmpeg_scheduler import run_ffmpeg
+from ..utils.uploader import FRAGMENTED_MP4_MOVFLAGS, StreamingUpload
+from .ffmpeg_pipeline import find_ffmpeg, is_nvenc_available
+from .filters.text_overlay import build_ass_filter
+
+logger = logging.getLogger(__name__)
+
+PLAN_VERSION = 1
+
+# Filters that pass their input through unchanged
+NOOP_FILTERS = {"null", "anull", "copy", "acopy"}
+
+# Video encoder settings by encoder name (same as the multi-step path's
+# create_video_from_image_sequence encode)
+ENCODER_OPTS = {
+    "h264_nvenc": ["-c:v", "h264_nvenc", "-preset", "p4", "-cq", "20", "-b:v", "10M"],
+    "libx264": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18"],
+}
+
+
+@dataclass
+class PlanNode:
+    """One node of a render plan.
+
+    ``inputs`` are stream references: ``"<node>:v"`` / ``"<node>:a"`` for
+    input nodes, ``"<node>"`` for filter nodes (one output each).
+    """
+    id: str
+    op: str  # "input" | "filter" | "output"
+    inputs: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def media(self) -> str:
+        return self.params.get("media", "v")
+
+    def signature(self) -> str:
+        """Identity for deduplication (everything except the id)."""
+        return json.dumps([self.op, self.inputs, self.params], sort_keys=True)
+
+
+def _ref_node(ref: str) -> str:
+    return ref.split(":", 1)[0]
+
+
+class RenderPlan:
+    """DAG of render steps, built before any FFmpeg call."""
+
+    def __init__(self, job_id: str = "unknown", metadata: Optional[Dict[str, Any]] = None):
+        self.job_id = job_id
+        self.nodes: Dict[str, PlanNode] = {}
+        self.files: Dict[str, str] = {}  # name -> text content, written at run time
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+        self._counter = 0
+
+    # =========================================================================
+    # Building
+    # =========================================================================
+
+    def _add(self, prefix: str, op: str, inputs: List[str], params: Dict[str, Any]) -> str:
+        node_id = f"{prefix}{self._counter}"
+        self._counter += 1
+        self.nodes[node_id] = PlanNode(id=node_id, op=op, inputs=list(inputs), params=params)
+        return node_id
+
+    def add_input(self, path: Optional[str] = None, url: Optional[str] = None,
+                  args: Optional[List[str]] = None) -> str:
+        """Add a media input; returns its node id (streams: "<id>:v", "<id>:a")."""
+        if not path and not url:
+            raise ValueError("input needs a path or a url")
+        params: Dict[str, Any] = {"path": path} if path else {"url": url}
+        if args:
+            params["args"] = list(args)
+        return self._add("in", "input", [], params)
+
+    def add_filter(self, inputs: List[str], chain: List[Any], media: str = "v",
+                   label: str = "", enabled: bool = True, unique: bool = False) -> str:
+        """Add a filter chain; returns a stream reference to its output.
+
+        Chain entries are FFmpeg filter strings, or {"ass": name} for an ASS
+        file stored with add_file(). An entry may hold several filters
+        joined by "," (passes never split entries), so chains with escaped
+        commas can be added as a single entry.
+
+        ``unique`` filters are never merged with identical ones. Use it for
+        filters that emit many frames from little input (loop, zoompan):
+        sharing them through split would buffer every frame for consumers
+        that run later, which costs far more than computing them twice.
+        """
+        params: Dict[str, Any] = {"media": media, "chain": list(chain)}
+        if label:
+            params["label"] = label
+        if not enabled:
+            params["enabled"] = False
+        if unique:
+            params["unique"] = True
+        return self._add("f", "filter", inputs, params)
+
+    def add_file(self, name: str, content: str) -> str:
+        """Attach a text file (e.g. ASS subtitles) that filters can reference."""
+        self.files[name] = content
+        return name
+
+    def set_output(self, video: str, audio: Optional[str] = None, **params) -> str:
+        """Set the encoded streams and output options.
+
+        Params: fps, shortest, faststart, fragmented (append-only MP4 for
+        upload while encoding; overrides faststart), audio_bitrate,
+        video_codec ("encode" or "copy"), audio_codec ("aac" or "copy").
+        """
+        self.nodes.pop("out", None)
+        options = {
+            "fps": 30,
+            "shortest": False,
+            "faststart": True,
+            "audio_bitrate": "192k",
+            "video_codec": "encode",
+            "audio_codec": "aac",
+        }
+        options.update(params)
+        inputs = [video] + ([audio] if audio else [])
+        self.nodes["out"] = PlanNode(id="out", op="output", inputs=inputs, params=options)
+        return "out"
+
+    @property
+    def output(self) -> PlanNode:
+        if "out" not in self.nodes:
+            raise ValueError("render plan has no output")
+        return self.nodes["out"]
+
+    # =========================================================================
+    # Graph helpers
+    # =========================================================================
+
+    def consumers(self) -> Dict[str, List[Tuple[str, int]]]:
+        """Stream reference -> [(consumer node id, input slot)]."""
+        result: Dict[str, List[Tuple[str, int]]] = {}
+        for node in self.nodes.values():
+            for slot, ref in enumerate(node.inputs):
+                result.setdefault(ref, []).append((node.id, slot))
+        return result
+
+    def topological_order(self) -> List[PlanNode]:
+        order: List[PlanNode] = []
+        state: Dict[str, int] = {}
+
+        def visit(node_id: str) -> None:
+            if state.get(node_id) == 2:
+                return
+            if state.get(node_id) == 1:
+                raise ValueError(f"render plan has a cycle at {node_id}")
+            state[node_id] = 1
+            for ref in self.nodes[node_id].inputs:
+                visit(_ref_node(ref))
+            state[node_id] = 2
+            order.append(self.nodes[node_id])
+
+        for node_id in list(self.nodes):
+            visit(node_id)
+        return order
+
+    def replace_ref(self, old: str, new: str) -> None:
+        for node in self.nodes.values():
+            node.inputs = [new if ref == old else ref for ref in node.inputs]
+
+    def prune(self) -> int:
+        """Remove nodes the output does not depend on."""
+        reachable = set()
+        stack = ["out"] if "out" in self.nodes else []
+        while stack:
+            node_id = stack.pop()
+            if node_id in reachable:
+                continue
+            reachable.add(node_id)
+            stack.extend(_ref_node(ref) for ref in self.nodes[node_id].inputs)
+        removed = [node_id for node_id in self.nodes if node_id not in reachable]
+        for node_id in removed:
+            del self.nodes[node_id]
+        return len(removed)
+
+    # =========================================================================
+    # Serialization
+    # =========================================================================
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": PLAN_VERSION,
+            "job_id": self.job_id,
+            "metadata": self.metadata,
+            "files": self.files,
+            "nodes": [
+                {"id": n.id, "op": n.op, "inputs": n.inputs, "params": n.params}
+                for n in self.topological_order()
+            ],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RenderPlan":
+        if data.get("version") != PLAN_VERSION:
+            raise ValueError(f"unsupported render plan version: {data.get('version')}")
+        plan = cls(job_id=data.get("job_id", "unknown"), metadata=data.get("metadata"))
+        plan.files = dict(data.get("files", {}))
+        for raw in data["nodes"]:
+            plan.nodes[raw["id"]] = PlanNode(
+                id=raw["id"], op=raw["op"], inputs=list(raw["inputs"]), params=dict(raw["params"])
+            )
+        plan._counter = len(plan.nodes)
+        return plan
+
+    def dump(self) -> str:
+        """Human-readable listing, one node per line in execution order."""
+        lines = [f"RenderPlan job={self.job_id} {json.dumps(self.metadata, sort_keys=True)}"]
+        for node in self.topological_order():
+            inputs = " ".join(f"[{ref}]" for ref in node.inputs)
+            if node.op == "input":
+                detail = node.params.get("path") or node.params.get("url")
+            elif node.op == "filter":
+                detail = ",".join(_chain_text(entry) for entry in node.params["chain"]) or "(empty)"
+                if node.params.get("enabled") is False:
+                    detail += " (disabled)"
+            else:
+                detail = " ".join(f"{k}={v}" for k, v in sorted(node.params.items()))
+            lines.append(f"  {node.id:<6} {node.op:<6} {inputs} {detail}".rstrip())
+        for name, content in self.files.items():
+            lines.append(f"  file   {name} ({len(content)} bytes)")
+        return "\n".join(lines)
+
+
+def _chain_text(entry: Any) -> str:
+    if isinstance(entry, dict) and "ass" in entry:
+        return f"ass=<{entry['ass']}>"
+    return str(entry)
+
+
+# =============================================================================
+# Optimizer passes
+# =============================================================================
+
+def drop_noop_filters(plan: RenderPlan) -> int:
+    """Bypass disabled filters and filters whose chain does nothing."""
+    removed = 0
+    for node in list(plan.nodes.values()):
+        if node.op != "filter" or len(node.inputs) != 1:
+            continue
+        chain = [entry for entry in node.params["chain"] if _chain_text(entry) not in NOOP_FILTERS]
+        if chain and node.params.get("enabled", True):
+            node.params["chain"] = chain
+            continue
+        plan.replace_ref(node.id, node.inputs[0])
+        del plan.nodes[node.id]
+        removed += 1
+    return removed
+
+
+def dedupe_nodes(plan: RenderPlan) -> int:
+    """Merge inputs and filters that are identical (same params and sources)."""
+    merged = 0
+    changed = True
+    while changed:
+        changed = False
+        seen: Dict[str, str] = {}
+        for node in plan.topological_order():
+            if node.op == "output" or node.params.get("unique"):
+                continue
+            signature = node.signature()
+            keep = seen.get(signature)
+            if keep is None:
+                seen[signature] = node.id
+                continue
+            if node.op == "input":
+                for stream in ("v", "a"):
+                    plan.replace_ref(f"{node.id}:{stream}", f"{keep}:{stream}")
+            else:
+                plan.replace_ref(node.id, keep)
+            del plan.nodes[node.id]
+            merged += 1
+            changed = True
+            break
+    return merged
+
+
+def fuse_filter_chains(plan: RenderPlan) -> int:
+    """Fold single-input filters into the filter feeding them.
+
+    Only when the upstream filter has no other consumer, so the fused chain
+    computes exactly what the two steps did.
+    """
+    fused = 0
+    changed = True
+    while changed:
+        changed = False
+        consumers = plan.consumers()
+        for node in plan.topological_order():
+            if node.op != "filter" or len(node.inputs) != 1:
+                continue
+            parent = plan.nodes.get(_ref_node(node.inputs[0]))
+            if parent is None or parent.op != "filter" or parent.media != node.media:
+                continue
+            if len(consumers.get(parent.id, [])) != 1:
+                continue
+            parent.params["chain"] = parent.params["chain"] + node.params["chain"]
+            plan.replace_ref(node.id, parent.id)
+            del plan.nodes[node.id]
+            fused += 1
+            changed = True
+            break
+    return fused
+
+
+def choose_stream_copy(plan: RenderPlan) -> int:
+    """Stream-copy output streams that come straight from an input file."""
+    output = plan.output
+    copied = 0
+    for slot, key in ((0, "video_codec"), (1, "audio_codec")):
+        if slot >= len(output.inputs):
+            continue
+        source = plan.nodes[_ref_node(output.inputs[slot])]
+        if source.op == "input" and output.params.get(key) != "copy":
+            output.params[key] = "copy"
+            copied += 1
+    return copied
+
+
+OPTIMIZER_PASSES = (drop_noop_filters, dedupe_nodes, fuse_filter_chains, choose_stream_copy)
+
+
+def optimize(plan: RenderPlan) -> Dict[str, int]:
+    """Run all optimizer passes in place; returns changes per pass."""
+    stats = {"pruned": plan.prune()}
+    for optimizer_pass in OPTIMIZER_PASSES:
+        stats[optimizer_pass.__name__] = optimizer_pass(plan)
+    stats["pruned"] += plan.prune()
+    logger.debug(f"[RenderPlan] {plan.job_id} optimized: {stats}")
+    return stats
+
+
+# =============================================================================
+# Compile / run
+# =============================================================================
+
+def compile_plan(
+    plan: RenderPlan,
+    output_path: str,
+    work_dir: str,
+    encoder: str = "libx264",
+    ffmpeg_path: Optional[str] = None,
+) -> List[str]:
+    """Compile a plan into one FFmpeg command.
+
+    Writes the plan's files into work_dir (they are referenced by path).
+    """
+    order = plan.topological_order()
+    output = plan.output
+
+    for name, content in plan.files.items():
+        with open(os.path.join(work_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    cmd = [ffmpeg_path or find_ffmpeg(), "-y"]
+    input_index: Dict[str, int] = {}
+    for node in order:
+        if node.op == "input":
+            input_index[node.id] = len(input_index)
+            cmd.extend(node.params.get("args", []))
+            cmd.extend(["-i", node.params.get("path") or node.params["url"]])
+
+    # Fan-out: every filter consumer gets its own label
+    filter_uses = Counter(
+        ref for node in order if node.op == "filter" for ref in node.inputs
+    )
+    mapped = [ref for ref in output.inputs if plan.nodes[_ref_node(ref)].op == "filter"]
+    for ref in mapped:
+        filter_uses[ref] += 1
+
+    chains: List[str] = []
+    pending: Dict[str, List[str]] = {}
+
+    def source_label(ref: str) -> str:
+        node_id = _ref_node(ref)
+        if ref in pending:
+            return pending[ref].pop()
+        if plan.nodes[node_id].op == "input":
+            return f"[{input_index[node_id]}:{ref.split(':', 1)[1]}]"
+        return f"[{node_id}]"
+
+    def emit_split(ref: str, label: str, media: str) -> None:
+        count = filter_uses[ref]
+        if count <= 1:
+            return
+        tag = ref.replace(":", "_")
+        outs = [f"[{tag}_{i}]" for i in range(count)]
+        split = "asplit" if media == "a" else "split"
+        chains.append(f"{label}{split}={count}{''.join(outs)}")
+        pending[ref] = list(reversed(outs))
+
+    for node in order:
+        if node.op == "input":
+            for stream in ("v", "a"):
+                ref = f"{node.id}:{stream}"
+                emit_split(ref, f"[{input_index[node.id]}:{stream}]", stream)
+        elif node.op == "filter":
+            sources = "".join(source_label(ref) for ref in node.inputs)
+            chain = ",".join(
+                build_ass_filter(os.path.join(work_dir, entry["ass"]))
+                if isinstance(entry, dict) else entry
+                for entry in node.params["chain"]
+            ) or ("anull" if node.media == "a" else "null")
+            chains.append(f"{sources}{chain}[{node.id}]")
+            emit_split(node.id, f"[{node.id}]", node.media)
+
+    if chains:
+        cmd.extend(["-filter_complex", ";".join(chains)])
+
+    def map_arg(ref: str) -> str:
+        node_id = _ref_node(ref)
+        if plan.nodes[node_id].op == "input":
+            return f"{input_index[node_id]}:{ref.split(':', 1)[1]}"
+        return source_label(ref)
+
+    params = output.params
+    cmd.extend(["-map", map_arg(output.inputs[0])])
+    if len(output.inputs) > 1:
+        cmd.extend(["-map", map_arg(output.inputs[1])])
+        if params.get("audio_codec") == "copy":
+            cmd.extend(["-c:a", "copy"])
+        else:
+            cmd.extend(["-c:a", params.get("audio_codec", "aac"), "-b:a", params.get("audio_bitrate", "192k")])
+        if params.get("shortest"):
+            cmd.append("-shortest")
+    else:
+        cmd.append("-an")
+
+    if params.get("video_codec") == "copy":
+        cmd.extend(["-c:v", "copy"])
+    else:
+        cmd.extend(ENCODER_OPTS[encoder])
+        cmd.extend(["-pix_fmt", "yuv420p", "-r", str(params.get("fps", 30))])
+    if params.get("fragmented"):
+        cmd.extend(["-movflags", FRAGMENTED_MP4_MOVFLAGS])
+    elif params.get("faststart"):
+        cmd.extend(["-movflags", "+faststart"])
+    cmd.append(output_path)
+    return cmd
+
+
+async def fetch_plan_inputs(plan: RenderPlan, work_dir: str) -> None:
+    """Download URL inputs into work_dir and point the plan at the local copies."""
+    from ..utils.s3_client import get_s3_client
+
+    remote = [node for node in plan.nodes.values() if node.op == "input" and "url" in node.params]
+    if not remote:
+        return
+
+    s3 = get_s3_client()
+    downloads = []
+    for node in remote:
+        url = node.params["url"]
+        ext = os.path.splitext(url.split("?", 1)[0])[1] or ".bin"
+        downloads.append((url, os.path.join(work_dir, f"{node.id}{ext}")))
+    paths = await s3.download_files_parallel(downloads)
+    for node, path in zip(remote, paths):
+        node.params = {k: v for k, v in node.params.items() if k != "url"}
+        node.params["path"] = path
+
+
+async def run_render_plan(
+    plan: RenderPlan,
+    output_path: str,
+    use_gpu: bool = True,
+    work_dir: Optional[str] = None,
+    ffmpeg_path: Optional[str] = None,
+    stream_upload: Optional[Callable[[], Awaitable[StreamingUpload]]] = None,
+) -> bool:
+    """Execute a plan (NVENC first if requested, then libx264).
+
+    With stream_upload, each encode attempt starts a StreamingUpload of
+    output_path (use a fragmented output); it is completed when the encode
+    succeeds and aborted otherwise. Check the last upload's ``completed``:
+    a failed upload does not fail the render.
+
+    Returns:
+        True if successful
+    """
+    job_id = plan.job_id
+    start_time = time.time()
+    work_dir = work_dir or os.path.dirname(os.path.abspath(output_path))
+    await fetch_plan_inputs(plan, work_dir)
+
+    encoders = ["libx264"]
+    if use_gpu and is_nvenc_available():
+        encoders.insert(0, "h264_nvenc")
+
+    try:
+        for encoder in encoders:
+            cmd = compile_plan(plan, output_path, work_dir, encoder=encoder, ffmpeg_path=ffmpeg_path)
+            logger.debug(f"[{job_id}] FFmpeg plan cmd: {' '.join(cmd)[:2000]}")
+
+            upload = await _start_stream_upload(stream_upload, output_path, job_id) if stream_upload else None
+            try:
+                returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
+            except BaseException:
+                if upload:
+                    await upload.abort()
+                raise
+            elapsed = time.time() - start_time
+            succeeded = returncode == 0 and os.path.exists(output_path)
+            if upload:
+                await _finish_stream_upload(upload, succeeded, job_id)
+
+            if succeeded:
+                size_mb = os.path.getsize(output_path) / (1024 * 1024)
+                logger.info(f"[{job_id}] [RenderPlan] ✓ Rendered in one pass: {size_mb:.1f}MB in {elapsed:.1f}s ({encoder})")
+                return True
+
+            logger.error(f"[{job_id}] [RenderPlan] {encoder} FAILED ({elapsed:.1f}s): {stderr.decode(errors='replace')[-1500:]}")
+            if plan.output.params.get("video_codec") == "copy":
+                break  # Encoder choice does not matter when copying
+        return False
+    finally:
+        for name in plan.files:
+            path = os.path.join(work_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+async def _start_stream_upload(
+    stream_upload: Callable[[], Awaitable[StreamingUpload]],
+    output_path: str,
+    job_id: str,
+) -> Optional[StreamingUpload]:
+    # The upload follows output_path from byte 0: drop any earlier attempt's file
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    try:
+        return await stream_upload()
+    except Exception as e:
+        logger.warning(f"[{job_id}] [RenderPlan] Could not start upload while encoding: {e}")
+        return None
+
+
+async def _finish_stream_upload(upload: StreamingUpload, succeeded: bool, job_id: str) -> None:
+    if not succeeded:
+        await upload.abort()
+        return
+    try:
+        await upload.complete()
+    except Exception as e:
+        logger.warning(f"[{job_id}] [RenderPlan] Upload while encoding failed, output stays on disk: {e}")
@@ -1,6 +1,14 @@
 """FFmpeg utilities."""
 
 from .filter_chain import FilterChainBuilder
-from .ffprobe import get_duration, get_video_info
+from .ffprobe import ProbeResult, ProbeService, get_duration, get_probe_service, get_video_info, probe
 
-__all__ = ["FilterChainBuilder", "get_duration", "get_video_info"]
+__all__ = [
+    "FilterChainBuilder",
+    "ProbeResult",
+    "ProbeService",
+    "get_duration",
+    "get_probe_service",
+    "get_video_info",
+    "probe",
+]
@@ -1,16 +1,33 @@
-"""FFprobe utilities for getting media information."""
+"""FFprobe utilities for getting media information.
+
+All probes go through one ProbeService, which runs ffprobe once per file
+with ``-show_format -show_streams`` and caches the result by
+(path, mtime, size), so asking for a file's duration, size and stream
+info in different places of a job costs one subprocess. probe_many()
+probes a batch of files concurrently, skipping cached and duplicate paths.
+"""
 
 import asyncio
 import json
+import logging
 import os
 import shutil
-from typing import Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ...config import get_settings
+
+logger = logging.getLogger(__name__)
 
 
 def find_ffprobe() -> str:
     """Find ffprobe binary."""
     # Check common locations
     locations = [
+        os.environ.get("FFPROBE_BINARY"),
+        "/usr/lib/jellyfin-ffmpeg/ffprobe",
         "/usr/bin/ffprobe",
         "/usr/local/bin/ffprobe",
         "/opt/homebrew/bin/ffprobe",
@@ -22,6 +39,187 @@ def find_ffprobe() -> str:
     raise RuntimeError("ffprobe not found")
 
 
+@dataclass
+class ProbeResult:
+    """Format and stream information of one media file (ffprobe JSON)."""
+    path: str
+    format: dict = field(default_factory=dict)
+    streams: List[dict] = field(default_factory=list)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Container duration, else the longest stream; None for still images."""
+        value = self.format.get("duration")
+        if value is None:
+            durations = [s["duration"] for s in self.streams if "duration" in s]
+            value = max(durations, key=float) if durations else None
+        return float(value) if value is not None else None
+
+    def stream(self, codec_type: str) -> Optional[dict]:
+        """First stream of codec_type ("video", "audio", ...)."""
+        for stream in self.streams:
+            if stream.get("codec_type") == codec_type:
+                return stream
+        return None
+
+    @property
+    def video_stream(self) -> Optional[dict]:
+        return self.stream("video")
+
+    @property
+    def audio_stream(self) -> Optional[dict]:
+        return self.stream("audio")
+
+    @property
+    def size(self) -> Optional[Tuple[int, int]]:
+        """(width, height) of the first video stream (images are video streams too)."""
+        stream = self.video_stream
+        if not stream or not stream.get("width"):
+            return None
+        return stream["width"], stream["height"]
+
+    @property
+    def fps(self) -> Optional[float]:
+        stream = self.video_stream
+        if not stream:
+            return None
+        # Parse frame rate (could be "30/1" or "30000/1001" etc)
+        fps_str = stream.get("r_frame_rate", "30/1")
+        if "/" in fps_str:
+            num, den = fps_str.split("/")
+            return float(num) / float(den) if float(den) else None
+        return float(fps_str)
+
+
+class ProbeService:
+    """Cached, batched ffprobe runs.
+
+    Results are keyed by absolute path and checked against the file's
+    mtime and size on every lookup, so a file rewritten in place (e.g. a
+    trimmed output) is probed again. Concurrent probes of the same file
+    share one ffprobe process.
+    """
+
+    def __init__(self, max_entries: int = 1024, batch_concurrency: int = 8):
+        self.max_entries = max_entries
+        self.batch_concurrency = max(1, batch_concurrency)
+        # path -> ((mtime_ns, size), result), least recently used first
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], ProbeResult]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int, int], asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def probe(self, path: str) -> ProbeResult:
+        """Format and streams of path (cached by path, mtime and size).
+
+        Raises:
+            FileNotFoundError: path does not exist
+            ValueError: ffprobe could not read the file
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size)
+
+        cached = self._cache.get(path)
+        if cached and cached[0] == version:
+            self._cache.move_to_end(path)
+            self._stats["hits"] += 1
+            return cached[1]
+
+        key = (path, *version)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            result = await asyncio.shield(inflight)
+            if result is None:
+                # Their probe was cancelled: run our own
+                return await self.probe(path)
+            return result
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._run(path)
+        except asyncio.CancelledError:
+            future.set_result(None)
+            raise
+        except Exception as e:
+            self._stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't warn if there are none
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+
+        self._cache[path] = (version, result)
+        self._cache.move_to_end(path)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+
+    async def probe_many(self, paths: Sequence[str]) -> List[ProbeResult]:
+        """Probe several files at once (results in input order).
+
+        ffprobe reads one input per process, so this runs up to
+        batch_concurrency probes in parallel; cached files cost nothing
+        and repeated paths are probed once.
+        """
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def bounded(path: str) -> ProbeResult:
+            async with semaphore:
+                return await self.probe(path)
+
+        unique = list(dict.fromkeys(paths))
+        results = dict(zip(unique, await asyncio.gather(*(bounded(p) for p in unique))))
+        return [results[p] for p in paths]
+
+    def invalidate(self, path: str) -> None:
+        """Drop the cached result for path."""
+        self._cache.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and cache size."""
+        return {**self._stats, "entries": len(self._cache)}
+
+    async def _run(self, path: str) -> ProbeResult:
+        cmd = [
+            find_ffprobe(),
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            path,
+        ]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise ValueError(f"ffprobe failed for {path}: {stderr.decode(errors='ignore').strip()[:300]}")
+        data = json.loads(stdout.decode() or "{}")
+        return ProbeResult(path=path, format=data.get("format", {}), streams=data.get("streams", []))
+
+
+@lru_cache()
+def get_probe_service() -> ProbeService:
+    """Get the process-wide probe service."""
+    settings = get_settings()
+    return ProbeService(
+        max_entries=settings.probe_cache_entries,
+        batch_concurrency=settings.probe_batch_concurrency,
+    )
+
+
+async def probe(file_path: str) -> ProbeResult:
+    """Format and stream information of a media file (cached)."""
+    return await get_probe_service().probe(file_path)
+
+
 async def get_duration(file_path: str) -> float:
     """Get duration of a media file in seconds.
 
@@ -31,24 +229,10 @@ async def get_duration(file_path: str) -> float:
     Returns:
         Duration in seconds
     """
-    ffprobe = find_ffprobe()
-    cmd = [
-        ffprobe,
-        "-v", "quiet",
-        "-print_format", "json",
-        "-show_format",
-        file_path,
-    ]
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await proc.communicate()
-
-    data = json.loads(stdout.decode())
-    return float(data["format"]["duration"])
+    duration = (await probe(file_path)).duration
+    if duration is None:
+        raise ValueError(f"No duration for {file_path}")
+    return duration
 
 
 async def get_video_info(file_path: str) -> dict:
@@ -60,48 +244,16 @@ async def get_video_info(file_path: str) -> dict:
     Returns:
         Dict with width, height, duration, fps, codec
     """
-    ffprobe = find_ffprobe()
-    cmd = [
-        ffprobe,
-        "-v", "quiet",
-        "-print_format", "json",
-        "-show_format",
-        "-show_streams",
-        file_path,
-    ]
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await proc.communicate()
-
-    data = json.loads(stdout.decode())
-
-    # Find video stream
-    video_stream = None
-    for stream in data.get("streams", []):
-        if stream.get("codec_type") == "video":
-            video_stream = stream
-            break
-
+    result = await probe(file_path)
+    video_stream = result.video_stream
     if not video_stream:
         raise ValueError(f"No video stream found in {file_path}")
 
-    # Parse frame rate (could be "30/1" or "30000/1001" etc)
-    fps_str = video_stream.get("r_frame_rate", "30/1")
-    if "/" in fps_str:
-        num, den = fps_str.split("/")
-        fps = float(num) / float(den)
-    else:
-        fps = float(fps_str)
-
     return {
         "width": video_stream.get("width"),
         "height": video_stream.get("height"),
-        "duration": float(data["format"]["duration"]),
-        "fps": fps,
+        "duration": result.duration,
+        "fps": result.fps,
         "codec": video_stream.get("codec_name"),
     }
 
@@ -115,26 +267,7 @@ async def get_image_size(file_path: str) -> Tuple[int, int]:
     Returns:
         (width, height) tuple
     """
-    ffprobe = find_ffprobe()
-    cmd = [
-        ffprobe,
-        "-v", "quiet",
-        "-print_format", "json",
-        "-show_streams",
-        file_path,
-    ]
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await proc.communicate()
-
-    data = json.loads(stdout.decode())
-
-    for stream in data.get("streams", []):
-        if stream.get("codec_type") == "video":
-            return (stream["width"], stream["height"])
-
-    raise ValueError(f"Could not determine image size for {file_path}")
+    size = (await probe(file_path)).size
+    if size is None:
+        raise ValueError(f"Could not determine image size for {file_path}")
+    return size
@@ -36,6 +36,8 @@ from ..services.vertex_ai import (
 )
 from ..utils.job_queue import JobQueue
 from ..utils.gcs_client import get_gcs_client
+from ..utils.downloader import download_http
+from ..utils.ffmpeg_scheduler import run_ffmpeg
 from ..dependencies import get_job_queue
 from ..config import get_settings
 
@@ -263,15 +265,14 @@ async def apply_audio_overlay(
     Returns:
         Composed video bytes with audio overlay
     """
-    import subprocess
     import tempfile
     from pathlib import Path
+    from ..renderers.utils.ffprobe import probe
 
     logger.info(f"[{job_id}] Starting audio overlay composition...")
 
     # FFmpeg paths
     ffmpeg_path = os.environ.get("FFMPEG_BINARY", "/usr/bin/ffmpeg")
-    ffprobe_path = os.environ.get("FFPROBE_BINARY", "/usr/bin/ffprobe")
 
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_dir = Path(temp_dir)
@@ -285,21 +286,16 @@ async def apply_audio_overlay(
 
         # Download audio
         logger.info(f"[{job_id}] Downloading audio from {audio_overlay.audio_url[:50]}...")
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.get(audio_overlay.audio_url, follow_redirects=True)
-            response.raise_for_status()
-            audio_path.write_bytes(response.content)
-            logger.info(f"[{job_id}] Audio downloaded: {len(response.content)} bytes")
+        async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
+            audio = await download_http(client, audio_overlay.audio_url, str(audio_path))
+            logger.info(f"[{job_id}] Audio downloaded: {audio.size} bytes")
 
         # Get video duration using ffprobe
-        probe_cmd = [
-            ffprobe_path, "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
-        ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        video_duration = float(result.stdout.strip()) if result.stdout.strip() else 0
+        try:
+            video_duration = (await probe(str(video_path))).duration or 0
+        except ValueError as e:
+            logger.warning(f"[{job_id}] FFprobe failed: {e}")
+            video_duration = 0
         logger.info(f"[{job_id}] Video duration: {video_duration}s")
 
         # Build audio filters
@@ -379,10 +375,10 @@ async def apply_audio_overlay(
             ]
 
         logger.info(f"[{job_id}] Running FFmpeg for audio overlay...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
 
-        if result.returncode != 0:
-            logger.error(f"[{job_id}] FFmpeg error: {result.stderr}")
+        if returncode != 0:
+            logger.error(f"[{job_id}] FFmpeg error: {stderr.decode(errors='ignore')}")
             # Fallback to CPU encoding if GPU fails
             if "h264_nvenc" in str(cmd):
                 logger.info(f"[{job_id}] Retrying with CPU encoding...")
@@ -394,11 +390,11 @@ async def apply_audio_overlay(
                         cmd.insert(i + 2, "-preset")
                         cmd.insert(i + 3, "fast")
                         break
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    raise RuntimeError(f"FFmpeg failed: {result.stderr[:500]}")
+                returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
+                if returncode != 0:
+                    raise RuntimeError(f"FFmpeg failed: {stderr.decode(errors='ignore')[:500]}")
             else:
-                raise RuntimeError(f"FFmpeg failed: {result.stderr[:500]}")
+                raise RuntimeError(f"FFmpeg failed: {stderr.decode(errors='ignore')[:500]}")
 
         logger.info(f"[{job_id}] Audio overlay composition completed")
 
@@ -10,9 +10,15 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional, List
 
-from ..services.audio_analyzer import AudioAnalyzer
+from ..services.analysis_cache import get_analysis_cache
+from ..services.analysis_executor import (
+    AnalysisQueueFullError,
+    analyze_audio as run_audio_analysis,
+    find_best_segment as run_best_segment,
+    get_analysis_executor,
+)
 from ..models.responses import AudioAnalysis
-from ..utils.s3_client import S3Client
+from ..utils.s3_client import get_s3_client
 from ..utils.temp_files import TempFileManager
 from ..renderers.audio.audio_processor import AudioProcessor, AudioSettings
 
@@ -50,17 +56,22 @@ async def analyze_audio(request: AudioAnalyzeRequest):
     """
     Analyze an audio file for BPM, beats, and energy.
     """
-    s3 = S3Client()
+    s3 = get_s3_client()
     temp = TempFileManager()
-    analyzer = AudioAnalyzer()
 
     # Download audio to temp
     local_path = temp.get_path(request.job_id, "audio_analyze.mp3")
 
     try:
         await s3.download_file(request.audio_url, local_path)
-        result = analyzer.analyze(local_path, target_duration=request.target_duration)
+        result = await run_audio_analysis(
+            local_path, target_duration=request.target_duration, block=False
+        )
         return result
+    except AnalysisQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Analysis timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
     finally:
@@ -76,21 +87,26 @@ async def find_best_segment(request: BestSegmentRequest):
     Find the best segment of audio for a target duration.
     Returns the highest-energy segment.
     """
-    s3 = S3Client()
+    s3 = get_s3_client()
     temp = TempFileManager()
-    analyzer = AudioAnalyzer()
 
     local_path = temp.get_path(request.job_id, "audio_segment.mp3")
 
     try:
         await s3.download_file(request.audio_url, local_path)
-        start, end = analyzer.find_best_segment(local_path, request.target_duration)
+        start, end = await run_best_segment(
+            local_path, target_duration=request.target_duration, block=False
+        )
 
         return BestSegmentResponse(
             start_time=start,
             end_time=end,
             duration=end - start
         )
+    except AnalysisQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Segment analysis timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Segment analysis failed: {str(e)}")
     finally:
@@ -99,6 +115,18 @@ async def find_best_segment(request: BestSegmentRequest):
             os.remove(local_path)
 
 
+@router.get("/cache/stats")
+async def get_analysis_cache_stats():
+    """
+    Get hit/miss counters for the shared audio analysis cache, plus
+    analysis executor queue counters.
+    """
+    return {
+        **get_analysis_cache().stats(),
+        "executor": get_analysis_executor().stats(),
+    }
+
+
 # ============================================================================
 # Video + Audio Composition Endpoint
 # ============================================================================
@@ -156,7 +184,7 @@ async def _run_compose_job(
     output_s3_key: Optional[str],
 ):
     """Background task to run composition job."""
-    s3 = S3Client()
+    s3 = get_s3_client()
     temp = TempFileManager()
     processor = AudioProcessor()
 
@@ -175,7 +203,7 @@ async def _run_compose_job(
         await s3.download_file(audio_url, audio_path)
 
         # Get video duration
-        from ..utils.ffprobe import get_duration
+        from ..renderers.utils.ffprobe import get_duration
         video_duration = await get_duration(video_path)
         logger.info(f"[{job_id}] Video duration: {video_duration:.1f}s")
 
@@ -206,7 +234,7 @@ async def _run_compose_job(
         key = output_s3_key or f"composed/{job_id}/output.mp4"
 
         logger.info(f"[{job_id}] Uploading to s3://{bucket}/{key}")
-        output_url = await s3.upload_file(output_path, bucket, key)
+        output_url = await s3.upload_file(output_path, key, content_type="video/mp4", bucket=bucket)
 
         _compose_jobs[job_id] = {
             "status": "completed",
@@ -297,7 +325,7 @@ async def get_media_duration(audio_url: str, media_type: str = "audio"):
     """
     Get duration of a media file (audio or video).
     """
-    s3 = S3Client()
+    s3 = get_s3_client()
     temp = TempFileManager()
 
     job_id = f"duration-{os.urandom(4).hex()}"
@@ -307,7 +335,7 @@ async def get_media_duration(audio_url: str, media_type: str = "audio"):
     try:
         await s3.download_file(audio_url, local_path)
 
-        from ..utils.ffprobe import get_duration
+        from ..renderers.utils.ffprobe import get_duration
         duration = await get_duration(local_path)
 
         return {"duration": duration, "status": "completed"}
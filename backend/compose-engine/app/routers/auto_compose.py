@@ -3,7 +3,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List
-import asyncio
 import httpx
 import logging
 import random
@@ -19,7 +18,8 @@ from ..services.image_fetcher import ImageFetcher
 from ..services.video_renderer import VideoRenderer
 # Note: keyword_transformer is no longer used - variations use original tags directly
 from ..utils.job_queue import JobQueue
-from ..dependencies import get_job_queue, get_render_semaphore
+from ..utils.render_queue import RenderPriority
+from ..dependencies import get_job_queue, get_render_queue, get_work_queue
 from ..config import get_settings
 
 
@@ -51,6 +51,9 @@ class AutoComposeRequest(BaseModel):
     script_lines: Optional[List[ScriptLineInput]] = Field(default=None, description="Script lines for text overlays")
     # Original image URLs for 70/30 split (70% original + 30% new search)
     original_image_urls: Optional[List[str]] = Field(default=None, description="Original image URLs for variations")
+    # Render queue scheduling
+    priority: Optional[str] = Field(default=None, description="Render priority (interactive, variation, batch); defaults to variation")
+    tenant_id: Optional[str] = Field(default=None, description="Tenant for fair queueing (defaults to campaign_id)")
 
 
 class AutoComposeResponse(BaseModel):
@@ -61,7 +64,7 @@ class AutoComposeResponse(BaseModel):
     search_results: Optional[int] = None
 
 
-async def send_callback(callback_url: str, job_id: str, status: str, output_url: Optional[str] = None, error: Optional[str] = None, progress: Optional[int] = None):
+async def send_callback(callback_url: str, job_id: str, status: str, output_url: Optional[str] = None, error: Optional[str] = None, progress: Optional[int] = None, queue_position: Optional[int] = None, eta_seconds: Optional[float] = None):
     """Send callback to notify job status changes."""
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
@@ -72,6 +75,9 @@ async def send_callback(callback_url: str, job_id: str, status: str, output_url:
                 "error": error,
                 "progress": progress,
             }
+            if queue_position is not None:
+                payload["queue_position"] = queue_position
+                payload["eta_seconds"] = eta_seconds
             response = await client.post(callback_url, json=payload)
             if response.status_code != 200:
                 logger.error(f"Callback failed with status {response.status_code}: {response.text}")
@@ -88,26 +94,33 @@ async def process_auto_compose(request: AutoComposeRequest, job_queue: Optional[
     final_status = "failed"
     error_message = None
 
-    # Get render semaphore for concurrency control
-    semaphore = get_render_semaphore()
-    semaphore_acquired = False  # Track if we acquired the semaphore (for cleanup)
+    # Get render queue for concurrency control
+    render_queue = get_render_queue()
+    ticket = None  # Render slot ticket (released in finally)
 
     try:
-        # Wait for semaphore (limits concurrent renders)
-        if semaphore:
-            logger.info(f"[Auto-Compose] Job {request.job_id} waiting for render slot...")
+        # Wait for a render slot (limits concurrent renders, most urgent first)
+        if render_queue:
+            priority = RenderPriority.parse(request.priority, RenderPriority.VARIATION)
+            tenant = request.tenant_id or request.campaign_id or "default"
+            ticket = render_queue.enqueue(request.job_id, priority, tenant, kind="auto_compose")
+            queue_status = render_queue.status(request.job_id) or {}
+            logger.info(
+                f"[Auto-Compose] Job {request.job_id} waiting for render slot "
+                f"({priority.value}, position {queue_status.get('queue_position')}, eta {queue_status.get('eta_seconds')}s)..."
+            )
             if job_queue:
                 await job_queue.update_job(
                     request.job_id,
                     status="queued",
                     progress=0,
-                    current_step="Waiting for render slot..."
+                    current_step="Waiting for render slot...",
+                    **queue_status
                 )
             # Send callback for "queued" status so frontend shows "대기중"
             if request.callback_url:
-                await send_callback(request.callback_url, request.job_id, "queued", progress=0)
-            await semaphore.acquire()
-            semaphore_acquired = True
+                await send_callback(request.callback_url, request.job_id, "queued", progress=0, **queue_status)
+            await ticket.future
             logger.info(f"[Auto-Compose] Job {request.job_id} acquired render slot")
 
         # Update status to processing
@@ -425,9 +438,9 @@ async def process_auto_compose(request: AutoComposeRequest, job_queue: Optional[
             await send_callback(request.callback_url, request.job_id, "failed", error=error_message)
 
     finally:
-        # Release semaphore only if we acquired it
-        if semaphore_acquired and semaphore:
-            semaphore.release()
+        # Release the render slot (or leave the queue if never admitted)
+        if ticket and render_queue:
+            render_queue.release(ticket, failed=final_status != "completed")
             logger.info(f"[Auto-Compose] Job {request.job_id} released render slot")
 
 
@@ -441,20 +454,29 @@ async def auto_compose(request: AutoComposeRequest):
     - Searches for new images
     - Creates a new slideshow with the specified vibe
 
-    Jobs run in parallel up to max_concurrent_jobs (default: 2).
+    Jobs are queued for render workers, which run up to max_concurrent_jobs each.
     """
     job_queue = get_job_queue()
+    work_queue = get_work_queue()
+
+    if not work_queue:
+        raise HTTPException(status_code=503, detail="Work queue not available")
 
     if job_queue:
         await job_queue.create_job(request.job_id, request.model_dump())
 
-    # Start background processing with asyncio.create_task for true parallel execution
-    asyncio.create_task(process_auto_compose(request, job_queue))
+    # Hand the job to a render worker
+    await work_queue.enqueue(
+        "auto_compose",
+        request.model_dump(mode="json"),
+        request.job_id,
+        priority=RenderPriority.parse(request.priority, RenderPriority.VARIATION),
+    )
 
     return AutoComposeResponse(
         status="accepted",
         job_id=request.job_id,
-        message=f"Auto-compose job started with tags: {', '.join(request.search_tags)}"
+        message=f"Auto-compose job queued with tags: {', '.join(request.search_tags)}"
     )
 
 
@@ -1,23 +1,60 @@
 """Render API router."""
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query
 import asyncio
 import logging
+from typing import Optional
 
 from ..models.render_job import RenderRequest, RenderResponse
 from ..models.responses import JobStatus
 from ..services.video_renderer import VideoRenderer
 from ..utils.job_queue import JobQueue, create_progress_callback
-from ..dependencies import get_job_queue
+from ..utils.render_queue import RenderTicket
+from ..dependencies import get_job_queue, get_render_queue, get_work_queue
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _wait_for_render_slot(job_id: str, kind: str, job_queue: JobQueue) -> Optional[RenderTicket]:
+    """Queue the job in the render queue and wait until it is admitted.
+
+    The returned ticket must be released when the job finishes.
+    """
+    render_queue = get_render_queue()
+    if not render_queue:
+        return None
+
+    ticket = render_queue.enqueue(job_id, kind=kind)
+    if not ticket.future.done():
+        queue_status = render_queue.status(job_id) or {}
+        logger.info(
+            f"[{job_id}] Waiting for render slot "
+            f"(position {queue_status.get('queue_position')}, eta {queue_status.get('eta_seconds')}s)..."
+        )
+        await job_queue.update_job(
+            job_id,
+            status=JobStatus.QUEUED,
+            progress=0,
+            current_step="Waiting for render slot...",
+            **queue_status
+        )
+    try:
+        await ticket.future
+    except BaseException:
+        render_queue.release(ticket)
+        raise
+    return ticket
+
+
 async def process_render_job(request: RenderRequest, job_queue: JobQueue):
     """Background task to process a render job."""
+    ticket = None
+    failed = True
     try:
+        ticket = await _wait_for_render_slot(request.job_id, "render", job_queue)
+
         # Update status to processing
         await job_queue.update_job(
             request.job_id,
@@ -46,6 +83,7 @@ async def process_render_job(request: RenderRequest, job_queue: JobQueue):
             current_step="Completed",
             output_url=output_url
         )
+        failed = False
 
     except Exception as e:
         # Update with error
@@ -55,26 +93,28 @@ async def process_render_job(request: RenderRequest, job_queue: JobQueue):
             error=str(e)
         )
 
+    finally:
+        if ticket:
+            get_render_queue().release(ticket, failed=failed)
+
 
 @router.post("", response_model=RenderResponse)
-async def start_render(
-    request: RenderRequest,
-    background_tasks: BackgroundTasks
-):
+async def start_render(request: RenderRequest):
     """
     Start a video rendering job.
-    The job runs in the background and status can be polled via /job/{job_id}/status.
+    The job runs on a render worker and status can be polled via /job/{job_id}/status.
     """
     job_queue = get_job_queue()
+    work_queue = get_work_queue()
 
-    if not job_queue:
+    if not job_queue or not work_queue:
         raise HTTPException(status_code=503, detail="Job queue not available")
 
     # Create job entry
     await job_queue.create_job(request.job_id, request.model_dump())
 
-    # Add background task
-    background_tasks.add_task(process_render_job, request, job_queue)
+    # Hand the job to a render worker
+    await work_queue.enqueue("render", request.model_dump(mode="json"), request.job_id)
 
     return RenderResponse(
         status="accepted",
@@ -122,8 +162,13 @@ async def process_modal_render_job(request: RenderRequest, job_queue: JobQueue,
 
     job_id = request.job_id
     modal_client = get_modal_client()
+    ticket = None
+    failed = True
 
     try:
+        # Modal renders are polled from this worker, so they take a job slot too
+        ticket = await _wait_for_render_slot(job_id, "modal_render", job_queue)
+
         # Update status to processing
         await job_queue.update_job(
             job_id,
@@ -174,6 +219,7 @@ async def process_modal_render_job(request: RenderRequest, job_queue: JobQueue,
                     output_url=status.output_url
                 )
                 logger.info(f"[{job_id}] Modal render completed: {status.output_url}")
+                failed = False
                 return
 
             elif status.status == ModalJobStatus.FAILED:
@@ -219,11 +265,14 @@ async def process_modal_render_job(request: RenderRequest, job_queue: JobQueue,
             error=str(e)
         )
 
+    finally:
+        if ticket:
+            get_render_queue().release(ticket, failed=failed)
+
 
 @router.post("/modal", response_model=RenderResponse)
 async def start_modal_render(
     request: RenderRequest,
-    background_tasks: BackgroundTasks,
     use_gpu: bool = Query(default=True, description="Use GPU acceleration")
 ):
     """
@@ -243,14 +292,19 @@ async def start_modal_render(
         )
 
     job_queue = get_job_queue()
-    if not job_queue:
+    work_queue = get_work_queue()
+    if not job_queue or not work_queue:
         raise HTTPException(status_code=503, detail="Job queue not available")
 
     # Create job entry
     await job_queue.create_job(request.job_id, request.model_dump())
 
-    # Add background task for Modal rendering
-    background_tasks.add_task(process_modal_render_job, request, job_queue, use_gpu)
+    # Hand the Modal submission to a render worker
+    await work_queue.enqueue(
+        "modal_render",
+        {**request.model_dump(mode="json"), "use_gpu": use_gpu},
+        request.job_id,
+    )
 
     return RenderResponse(
         status="accepted",
@@ -260,10 +314,7 @@ async def start_modal_render(
 
 
 @router.post("/auto", response_model=RenderResponse)
-async def start_auto_render(
-    request: RenderRequest,
-    background_tasks: BackgroundTasks
-):
+async def start_auto_render(request: RenderRequest):
     """
     Start a video rendering job with automatic backend selection.
 
@@ -274,21 +325,23 @@ async def start_auto_render(
     """
     settings = get_settings()
     job_queue = get_job_queue()
+    work_queue = get_work_queue()
 
-    if not job_queue:
+    if not job_queue or not work_queue:
         raise HTTPException(status_code=503, detail="Job queue not available")
 
     # Create job entry
     await job_queue.create_job(request.job_id, request.model_dump())
 
     # Choose rendering backend
+    payload = request.model_dump(mode="json")
     if settings.modal_enabled and settings.modal_submit_url:
         logger.info(f"[{request.job_id}] Using Modal cloud rendering")
-        background_tasks.add_task(process_modal_render_job, request, job_queue, True)
+        await work_queue.enqueue("modal_render", {**payload, "use_gpu": True}, request.job_id)
         message = "Render job queued for Modal cloud (GPU)"
     else:
         logger.info(f"[{request.job_id}] Using local rendering")
-        background_tasks.add_task(process_render_job, request, job_queue)
+        await work_queue.enqueue("render", payload, request.job_id)
         message = "Render job queued for local rendering"
 
     return RenderResponse(
@@ -1,7 +1,6 @@
 """Video Edit API router for adding audio and subtitles to existing videos."""
 
 from fastapi import APIRouter, HTTPException
-import asyncio
 import httpx
 import logging
 import os
@@ -24,10 +23,13 @@ from ..renderers.ffmpeg_pipeline import (
     find_ffmpeg,
     is_nvenc_available,
 )
-from ..utils.s3_client import S3Client
+from ..renderers.utils.ffprobe import probe
+from ..utils.s3_client import get_s3_client
+from ..utils.ffmpeg_scheduler import run_ffmpeg
 from ..utils.job_queue import JobQueue
+from ..utils.render_queue import RenderPriority
 from ..utils.db_client import update_video_generation, update_video_generation_progress
-from ..dependencies import get_job_queue, get_render_semaphore
+from ..dependencies import get_job_queue, get_render_queue, get_work_queue
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -42,7 +44,9 @@ async def send_callback(
     output_url: Optional[str] = None,
     error: Optional[str] = None,
     progress: Optional[int] = None,
-    metadata: Optional[dict] = None
+    metadata: Optional[dict] = None,
+    queue_position: Optional[int] = None,
+    eta_seconds: Optional[float] = None
 ):
     """Send callback to notify job status changes."""
     try:
@@ -55,6 +59,9 @@ async def send_callback(
                 "progress": progress,
                 "metadata": metadata,
             }
+            if queue_position is not None:
+                payload["queue_position"] = queue_position
+                payload["eta_seconds"] = eta_seconds
             response = await client.post(callback_url, json=payload)
             if response.status_code != 200:
                 logger.error(f"[VideoEdit] Callback failed: {response.status_code}: {response.text}")
@@ -65,61 +72,30 @@ async def send_callback(
 
 
 async def get_video_duration(video_path: str, job_id: str = "") -> float:
-    """Get video duration using FFprobe."""
-    ffmpeg = find_ffmpeg()
-    ffprobe = ffmpeg.replace("ffmpeg", "ffprobe")
-
-    cmd = [
-        ffprobe,
-        "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        video_path
-    ]
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await proc.communicate()
-
-    if proc.returncode != 0:
-        logger.error(f"[{job_id}] FFprobe failed: {stderr.decode()}")
+    """Get video duration using FFprobe (cached probe service)."""
+    try:
+        duration = (await probe(video_path)).duration
+    except ValueError as e:
+        logger.error(f"[{job_id}] FFprobe failed: {e}")
+        raise ValueError("Failed to get video duration")
+    if duration is None:
         raise ValueError("Failed to get video duration")
 
-    duration = float(stdout.decode().strip())
     logger.info(f"[{job_id}] Video duration: {duration:.2f}s")
     return duration
 
 
 async def get_video_size(video_path: str, job_id: str = "") -> tuple[int, int]:
-    """Get video dimensions using FFprobe."""
-    ffmpeg = find_ffmpeg()
-    ffprobe = ffmpeg.replace("ffmpeg", "ffprobe")
-
-    cmd = [
-        ffprobe,
-        "-v", "error",
-        "-select_streams", "v:0",
-        "-show_entries", "stream=width,height",
-        "-of", "csv=p=0:s=x",
-        video_path
-    ]
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await proc.communicate()
-
-    if proc.returncode != 0:
-        logger.error(f"[{job_id}] FFprobe failed: {stderr.decode()}")
+    """Get video dimensions using FFprobe (cached probe service)."""
+    try:
+        size = (await probe(video_path)).size
+    except ValueError as e:
+        logger.error(f"[{job_id}] FFprobe failed: {e}")
+        raise ValueError("Failed to get video size")
+    if size is None:
         raise ValueError("Failed to get video size")
 
-    output = stdout.decode().strip()
-    width, height = map(int, output.split("x"))
+    width, height = size
     logger.info(f"[{job_id}] Video size: {width}x{height}")
     return width, height
 
@@ -225,15 +201,10 @@ async def replace_audio(
     logger.info(f"[{job_id}] Replacing audio: start={audio_start_time}s, vol={volume}, fade_in={fade_in}s, fade_out={fade_out}s")
     logger.debug(f"[{job_id}] FFmpeg cmd: {' '.join(cmd[:15])}...")
 
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
+    returncode, _, stderr = await run_ffmpeg(cmd, job_id=job_id)
     elapsed = time.time() - start_time
 
-    if proc.returncode != 0:
+    if returncode != 0:
         logger.error(f"[{job_id}] Audio replacement failed ({elapsed:.1f}s): {stderr.decode()[-500:]}")
         return False
 
@@ -251,24 +222,31 @@ async def process_video_edit(request: VideoEditRequest, job_queue: Optional[JobQ
     output_url = None
     error_message = None
 
-    # Get render semaphore for concurrency control
-    semaphore = get_render_semaphore()
-    semaphore_acquired = False
+    # Get render queue for concurrency control
+    render_queue = get_render_queue()
+    ticket = None
 
     # Create job directory
     job_dir = os.path.join(settings.temp_dir, f"video_edit_{job_id}")
     os.makedirs(job_dir, exist_ok=True)
 
     try:
-        # Wait for semaphore
-        if semaphore:
-            logger.info(f"[VideoEdit] Job {job_id} waiting for render slot...")
+        # Wait for a render slot
+        if render_queue:
+            priority = RenderPriority.parse(request.priority, RenderPriority.INTERACTIVE)
+            user_id = request.metadata.get("user_id") if request.metadata else None
+            tenant = request.tenant_id or user_id or request.campaign_id or "default"
+            ticket = render_queue.enqueue(job_id, priority, tenant, kind="video_edit")
+            queue_status = render_queue.status(job_id) or {}
+            logger.info(
+                f"[VideoEdit] Job {job_id} waiting for render slot "
+                f"({priority.value}, position {queue_status.get('queue_position')}, eta {queue_status.get('eta_seconds')}s)..."
+            )
             if job_queue:
-                await job_queue.update_job(job_id, status="queued", progress=0, current_step="Waiting for render slot...")
+                await job_queue.update_job(job_id, status="queued", progress=0, current_step="Waiting for render slot...", **queue_status)
             if request.callback_url:
-                await send_callback(request.callback_url, job_id, "queued", progress=0, metadata=request.metadata)
-            await semaphore.acquire()
-            semaphore_acquired = True
+                await send_callback(request.callback_url, job_id, "queued", progress=0, metadata=request.metadata, **queue_status)
+            await ticket.future
             logger.info(f"[VideoEdit] Job {job_id} acquired render slot")
 
         # Update status to processing
@@ -277,7 +255,7 @@ async def process_video_edit(request: VideoEditRequest, job_queue: Optional[JobQ
         if request.callback_url:
             await send_callback(request.callback_url, job_id, "processing", progress=5, metadata=request.metadata)
 
-        s3_client = S3Client()
+        s3_client = get_s3_client()
 
         # Step 1: Download source video
         logger.info(f"[VideoEdit] Job {job_id} downloading video: {request.video_url[:80]}...")
@@ -288,7 +266,7 @@ async def process_video_edit(request: VideoEditRequest, job_queue: Optional[JobQ
         if not os.path.exists(source_video_path):
             raise ValueError("Failed to download source video")
 
-        # Get video info
+        # Get video info (one ffprobe run, the second lookup is cached)
         video_duration = await get_video_duration(source_video_path, job_id)
         video_size = await get_video_size(source_video_path, job_id)
 
@@ -466,8 +444,8 @@ async def process_video_edit(request: VideoEditRequest, job_queue: Optional[JobQ
 
     finally:
         # Cleanup
-        if semaphore_acquired and semaphore:
-            semaphore.release()
+        if ticket and render_queue:
+            render_queue.release(ticket, failed=error_message is not None)
             logger.info(f"[VideoEdit] Job {job_id} released render slot")
 
         # Remove temp directory
@@ -502,6 +480,7 @@ async def edit_video(request: VideoEditRequest):
     - style: Font size, color, animation, position settings
     """
     job_queue = get_job_queue()
+    work_queue = get_work_queue()
 
     # Validate request
     if not request.audio and not request.subtitles:
@@ -510,17 +489,25 @@ async def edit_video(request: VideoEditRequest):
             detail="At least one of 'audio' or 'subtitles' must be provided"
         )
 
+    if not work_queue:
+        raise HTTPException(status_code=503, detail="Work queue not available")
+
     # Create job in queue
     if job_queue:
         await job_queue.create_job(request.job_id, request.model_dump())
 
-    # Start background processing
-    asyncio.create_task(process_video_edit(request, job_queue))
+    # Hand the job to a render worker
+    await work_queue.enqueue(
+        "video_edit",
+        request.model_dump(mode="json"),
+        job_id=request.job_id,
+        priority=RenderPriority.parse(request.priority, RenderPriority.INTERACTIVE),
+    )
 
     return VideoEditResponse(
         status="accepted",
         job_id=request.job_id,
-        message="Video edit job started"
+        message="Video edit job queued"
     )
 
 
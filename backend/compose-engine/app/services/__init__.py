@@ -1,6 +1,8 @@
 """Service modules for video composition."""
 
 from .audio_analyzer import AudioAnalyzer
+from .analysis_cache import AnalysisCache, get_analysis_cache
+from .analysis_executor import AnalysisExecutor, AnalysisQueueFullError, get_analysis_executor
 from .beat_sync import BeatSyncEngine
 from .video_renderer import VideoRenderer
 from .image_fetcher import ImageFetcher
@@ -19,6 +21,11 @@ from .vertex_ai import (
 __all__ = [
     # Video composition services
     "AudioAnalyzer",
+    "AnalysisCache",
+    "get_analysis_cache",
+    "AnalysisExecutor",
+    "AnalysisQueueFullError",
+    "get_analysis_executor",
     "BeatSyncEngine",
     "VideoRenderer",
     "ImageFetcher",
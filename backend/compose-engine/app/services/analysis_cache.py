@@ -0,0 +1,308 @@
+"""Persistent, content-addressed cache for audio analysis results.
+
+Analysis results are keyed on a SHA-256 of the audio bytes plus the
+analyzer namespace/version and the parameters that influence the result
+(sample rate, target duration, ...). The same track therefore hits the
+cache regardless of which URL or temp path it was downloaded to.
+
+Tiers (checked in order):
+1. In-process LRU (small, avoids unpickling on hot paths)
+2. Local disk directory with size-based LRU eviction (survives restarts,
+   can live on a shared volume such as Modal's /cache)
+3. Optional Redis (shared across workers)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import get_settings
+from ..utils.disk_lru import DiskLRU
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per chunk when hashing audio files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Redis key prefix and TTL for the shared tier
+REDIS_KEY_PREFIX = "compose:analysis:"
+REDIS_TTL_SECONDS = 7 * 86400
+
+
+def hash_file(path: str) -> str:
+    """Compute the SHA-256 hex digest of a file, streaming in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Content-addressed cache for analyzer results (memory + disk + Redis)."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_memory_entries: int = 64,
+        redis_url: Optional[str] = None,
+    ):
+        self.cache_dir = os.path.normpath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_memory_entries = max_memory_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        # (path, mtime_ns, size) -> content hash, so re-analysis of the same
+        # local file in one process does not re-read it
+        self._file_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+
+        self._redis = None
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=2.0)
+                self._redis.ping()
+                logger.info("[AnalysisCache] Redis tier enabled")
+            except Exception as e:
+                logger.warning(f"[AnalysisCache] Redis tier unavailable ({e}), using disk only")
+                self._redis = None
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "redis_hits": 0,
+            "errors": 0,
+        }
+        self._disk = DiskLRU(self.cache_dir, max_bytes, suffix=".pkl", name="AnalysisCache")
+
+    # =========================================================================
+    # Keys
+    # =========================================================================
+
+    def content_hash(self, audio_path: str) -> str:
+        """Get the content hash of an audio file (memoized by path/mtime/size)."""
+        st = os.stat(audio_path)
+        memo_key = (os.path.abspath(audio_path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._file_hashes.get(memo_key)
+            if cached:
+                self._file_hashes.move_to_end(memo_key)
+                return cached
+
+        digest = hash_file(audio_path)
+
+        with self._lock:
+            self._file_hashes[memo_key] = digest
+            while len(self._file_hashes) > 256:
+                self._file_hashes.popitem(last=False)
+        return digest
+
+    def make_key(self, audio_path: str, namespace: str, **params) -> str:
+        """Build a cache key from file content, namespace and parameters."""
+        payload = json.dumps(
+            {"content": self.content_hash(audio_path), "ns": namespace, "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # =========================================================================
+    # Get / Put
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a key across all tiers, promoting hits to faster tiers."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        value = self._disk_get(key)
+        if value is not None:
+            self._remember(key, value)
+            self._count_hit("disk_hits")
+            return value
+
+        value = self._redis_get(key)
+        if value is not None:
+            self._remember(key, value)
+            self._disk_put(key, value)
+            self._count_hit("redis_hits")
+            return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value in all tiers."""
+        self._remember(key, value)
+        self._disk_put(key, value)
+        self._redis_put(key, value)
+
+    def get_or_compute(
+        self,
+        audio_path: str,
+        namespace: str,
+        compute: Callable[[], Any],
+        **params,
+    ) -> Any:
+        """Return the cached result for this file/namespace/params or compute it.
+
+        Cache failures never fail the analysis - they only cost a recompute.
+        """
+        try:
+            key = self.make_key(audio_path, namespace, **params)
+        except OSError as e:
+            logger.warning(f"[AnalysisCache] Could not hash {audio_path}: {e}")
+            return compute()
+
+        cached = self.get(key)
+        if cached is not None:
+            logger.info(f"[AnalysisCache] HIT {namespace} ({key[:12]})")
+            return cached
+
+        logger.info(f"[AnalysisCache] MISS {namespace} ({key[:12]})")
+        value = compute()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["disk_bytes"] = self._disk.bytes
+        stats["evictions"] = self._disk.evictions
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        stats["max_bytes"] = self.max_bytes
+        stats["redis_enabled"] = self._redis is not None
+        return stats
+
+    def clear(self) -> None:
+        """Drop all memory and disk entries (Redis entries expire via TTL)."""
+        with self._lock:
+            self._memory.clear()
+        self._disk.clear()
+
+    # =========================================================================
+    # Memory tier
+    # =========================================================================
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count_hit(self, tier: str) -> None:
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats[tier] += 1
+
+    # =========================================================================
+    # Disk tier
+    # =========================================================================
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            self._disk.touch(path)  # LRU ordering
+            return value
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Dropping unreadable entry {key[:12]}: {e}")
+            self._count_error()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _disk_put(self, key: str, value: Any) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Disk write failed for {key[:12]}: {e}")
+            self._count_error()
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+
+        self._disk.add(new_size - old_size)
+
+    # =========================================================================
+    # Redis tier
+    # =========================================================================
+
+    def _redis_get(self, key: str) -> Optional[Any]:
+        if self._redis is None:
+            return None
+        try:
+            data = self._redis.get(REDIS_KEY_PREFIX + key)
+            return pickle.loads(data) if data else None
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Redis get failed: {e}")
+            self._count_error()
+            return None
+
+    def _redis_put(self, key: str, value: Any) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(
+                REDIS_KEY_PREFIX + key,
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                ex=REDIS_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Redis set failed: {e}")
+            self._count_error()
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self._stats["errors"] += 1
+
+
+@lru_cache()
+def get_analysis_cache() -> AnalysisCache:
+    """Get the process-wide analysis cache configured from settings."""
+    settings = get_settings()
+    return AnalysisCache(
+        cache_dir=settings.analysis_cache_dir,
+        max_bytes=settings.analysis_cache_max_bytes,
+        max_memory_entries=settings.analysis_cache_memory_entries,
+        redis_url=settings.analysis_cache_redis_url or None,
+    )
@@ -0,0 +1,342 @@
+"""Process-pool executor for blocking librosa audio analysis.
+
+librosa analysis holds the GIL for seconds at a time, so running it inside
+an ``async def`` handler (or even on the default thread pool) stalls every
+other request on the worker, including job-status polling. All analysis
+callers submit here instead:
+
+- Work runs in a pool of spawned worker processes (``analysis_workers``).
+- At most ``analysis_workers + analysis_queue_size`` jobs are outstanding.
+  Callers either wait for a slot (``block=True``, renders) or are rejected
+  immediately with AnalysisQueueFullError (``block=False``, HTTP endpoints).
+- Timeouts match FFmpegRenderer: ``asyncio.wait_for`` semantics, raising
+  asyncio.TimeoutError after ``analysis_timeout`` seconds (queue wait
+  included). Queued work is cancelled on timeout or caller cancellation;
+  work that already started finishes in the background and its result is
+  still written to the analysis cache for the next caller.
+- Cache lookups happen in the parent, so hits never touch the pool.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import get_settings
+from ..models.responses import AudioAnalysis
+from .audio_analyzer import AudioAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# How often a blocked submitter re-checks for a free slot
+SLOT_POLL_INTERVAL = 0.05
+
+
+class AnalysisQueueFullError(RuntimeError):
+    """Raised when the analysis queue is full and the caller did not block."""
+
+
+# =============================================================================
+# Worker side
+# =============================================================================
+
+# Per-process analyzer instances (keyed by kind and sample rate)
+_worker_analyzers: Dict[Tuple[str, int], Any] = {}
+
+
+def _load_analyzer_class(kind: str):
+    if kind == "advanced":
+        from ..slideshow_v2.analyzers.audio_analyzer import AdvancedAudioAnalyzer
+        return AdvancedAudioAnalyzer
+    return AudioAnalyzer
+
+
+def _worker_init() -> None:
+    """Warm the worker: import librosa once so the first job doesn't pay it."""
+    import librosa  # noqa: F401
+
+
+def _worker_run(kind: str, sample_rate: int, method: str, args: tuple) -> Any:
+    """Run an analyzer method inside a pool worker (uncached; parent caches)."""
+    analyzer = _worker_analyzers.get((kind, sample_rate))
+    if analyzer is None:
+        analyzer = _load_analyzer_class(kind)(sample_rate=sample_rate, use_cache=False)
+        _worker_analyzers[(kind, sample_rate)] = analyzer
+    return getattr(analyzer, method)(*args)
+
+
+# =============================================================================
+# Executor
+# =============================================================================
+
+class AnalysisExecutor:
+    """Bounded process-pool executor for audio analysis."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        queue_size: int = 8,
+        default_timeout: float = 60.0,
+    ):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.default_timeout = default_timeout
+        self.capacity = max(1, max_workers) + max(0, queue_size)
+
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "outstanding": 0,
+        }
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.max_workers > 0:
+                    # spawn: forking a process with live threads/event loop is unsafe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_worker_init,
+                    )
+                    logger.info(f"[AnalysisExecutor] Started process pool with {self.max_workers} workers")
+                else:
+                    # Local development fallback: in-process thread
+                    self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+                    logger.info("[AnalysisExecutor] Using in-process thread (analysis_workers=0)")
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> None:
+        """Create the pool eagerly (called at app startup)."""
+        self._get_pool()
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Shut down the pool, cancelling queued work."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += delta
+
+    async def _acquire_slot(self, block: bool, deadline: float) -> None:
+        if self._slots.acquire(blocking=False):
+            return
+        if not block:
+            self._count("rejected")
+            raise AnalysisQueueFullError(
+                f"Audio analysis queue is full ({self.capacity} outstanding jobs)"
+            )
+        loop = asyncio.get_running_loop()
+        while not self._slots.acquire(blocking=False):
+            if loop.time() >= deadline:
+                self._count("timeouts")
+                raise asyncio.TimeoutError("Timed out waiting for an analysis slot")
+            await asyncio.sleep(SLOT_POLL_INTERVAL)
+
+    async def submit(
+        self,
+        fn: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        block: bool = True,
+        on_result: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Run ``fn(*args)`` in the pool and await its result.
+
+        Args:
+            fn: Picklable module-level callable
+            timeout: Seconds to wait (queue + run); defaults to analysis_timeout
+            block: Wait for a queue slot instead of raising AnalysisQueueFullError
+            on_result: Called with the result when the work finishes, even if
+                the caller already timed out (used to populate the cache)
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        await self._acquire_slot(block, deadline)
+        self._count("submitted")
+        self._count("outstanding")
+
+        try:
+            future: Future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            self._count("outstanding", -1)
+            raise
+
+        def _done(f: Future) -> None:
+            # Runs when the work actually finishes, not when the caller gives up,
+            # so the slot bound reflects real pool load
+            self._slots.release()
+            self._count("outstanding", -1)
+            if f.cancelled():
+                self._count("cancelled")
+                return
+            if f.exception() is not None:
+                self._count("failed")
+                return
+            self._count("completed")
+            if on_result is not None:
+                try:
+                    on_result(f.result())
+                except Exception as e:
+                    logger.warning(f"[AnalysisExecutor] Result callback failed: {e}")
+
+        future.add_done_callback(_done)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=max(0.0, deadline - loop.time()),
+            )
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            future.cancel()  # Only succeeds if still queued
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault in a native lib); start fresh next time
+            logger.error("[AnalysisExecutor] Process pool broken, recreating on next submit")
+            self._reset_pool()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["workers"] = self.max_workers
+        stats["capacity"] = self.capacity
+        return stats
+
+
+_executor: Optional[AnalysisExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_analysis_executor() -> AnalysisExecutor:
+    """Get the process-wide analysis executor configured from settings."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            settings = get_settings()
+            _executor = AnalysisExecutor(
+                max_workers=settings.analysis_workers,
+                queue_size=settings.analysis_queue_size,
+                default_timeout=settings.analysis_timeout,
+            )
+        return _executor
+
+
+def shutdown_analysis_executor() -> None:
+    """Shut down the process-wide executor (called at app shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+# =============================================================================
+# Cached async entry points
+# =============================================================================
+
+async def _run_cached(
+    analyzer,
+    kind: str,
+    method: str,
+    audio_path: str,
+    args: tuple,
+    cache_kwargs: dict,
+    timeout: Optional[float],
+    block: bool,
+) -> Any:
+    """Serve from the analysis cache, else run the analyzer method in the pool."""
+    cache = analyzer.cache
+    key = None
+    if cache is not None:
+        namespace, params = analyzer.cache_spec(method, **cache_kwargs)
+        try:
+            # Hashing reads the whole file - keep it off the event loop
+            key = await asyncio.to_thread(cache.make_key, audio_path, namespace, **params)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                logger.info(f"[AnalysisExecutor] Cache HIT {namespace} ({key[:12]})")
+                return cached
+        except OSError as e:
+            logger.warning(f"[AnalysisExecutor] Cache lookup failed for {audio_path}: {e}")
+            key = None
+
+    def _store(result: Any) -> None:
+        if key is not None and result is not None:
+            cache.put(key, result)
+
+    return await get_analysis_executor().submit(
+        _worker_run,
+        kind,
+        analyzer.sample_rate,
+        method,
+        (audio_path, *args),
+        timeout=timeout,
+        block=block,
+        on_result=_store,
+    )
+
+
+async def analyze_audio(
+    audio_path: str,
+    target_duration: float = 15.0,
+    timeout: Optional[float] = None,
+    block: bool = True,
+) -> AudioAnalysis:
+    """Run AudioAnalyzer.analyze off the event loop (cached)."""
+    return await _run_cached(
+        AudioAnalyzer(), "audio", "analyze", audio_path,
+        (target_duration,), {"target_duration": target_duration}, timeout, block,
+    )
+
+
+async def find_best_segment(
+    audio_path: str,
+    target_duration: float = 15.0,
+    timeout: Optional[float] = None,
+    block: bool = True,
+) -> Tuple[float, float]:
+    """Run AudioAnalyzer.find_best_segment off the event loop (cached)."""
+    return await _run_cached(
+        AudioAnalyzer(), "audio", "find_best_segment", audio_path,
+        (target_duration,), {"target_duration": target_duration}, timeout, block,
+    )
+
+
+async def analyze_audio_advanced(
+    audio_path: str,
+    timeout: Optional[float] = None,
+    block: bool = True,
+):
+    """Run slideshow_v2 AdvancedAudioAnalyzer.analyze off the event loop (cached)."""
+    analyzer = _load_analyzer_class("advanced")()
+    return await _run_cached(
+        analyzer, "advanced", "analyze", audio_path, (), {}, timeout, block,
+    )
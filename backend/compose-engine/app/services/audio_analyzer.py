@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from scipy import signal
 
 from ..models.responses import AudioAnalysis, ClimaxCandidate
+from .analysis_cache import AnalysisCache, get_analysis_cache
+from .audio_features import AudioFeatures, FeatureMemo
 
 
 logger = logging.getLogger(__name__)
@@ -25,10 +27,37 @@ class DropInfo:
 class AudioAnalyzer:
     """Service for analyzing audio files with advanced climax detection."""
 
-    def __init__(self, sample_rate: int = 22050):
+    # Bump whenever detection logic changes so cached results are invalidated
+    ANALYZER_VERSION = "1"
+
+    def __init__(self, sample_rate: int = 22050, use_cache: bool = True):
         self.sample_rate = sample_rate
+        self.cache: Optional[AnalysisCache] = get_analysis_cache() if use_cache else None
+        # Lets analyze() + find_best_segment() on the same file share one decode
+        self._features_memo = FeatureMemo()
 
     def analyze(self, audio_path: str, target_duration: float = 15.0) -> AudioAnalysis:
+        """
+        Analyze an audio file, using the content-addressed cache if enabled.
+        """
+        if self.cache is None:
+            return self._analyze(audio_path, target_duration)
+        namespace, params = self.cache_spec("analyze", target_duration=target_duration)
+        return self.cache.get_or_compute(
+            audio_path, namespace, lambda: self._analyze(audio_path, target_duration), **params
+        )
+
+    def cache_spec(self, method: str, **kwargs) -> Tuple[str, dict]:
+        """Cache namespace and key parameters for a public analysis method.
+
+        Shared with the analysis executor so pooled and in-process calls
+        hit the same cache entries.
+        """
+        params = {"version": self.ANALYZER_VERSION, "sample_rate": self.sample_rate}
+        params.update({k: float(v) for k, v in kwargs.items()})
+        return f"audio_analyzer.{method}", params
+
+    def _analyze(self, audio_path: str, target_duration: float = 15.0) -> AudioAnalysis:
         """
         Analyze an audio file with comprehensive climax detection.
 
@@ -44,39 +73,28 @@ class AudioAnalyzer:
         logger.info(f"[AudioAnalyzer] Starting advanced audio analysis: {audio_path}")
         logger.info(f"[AudioAnalyzer] Target duration: {target_duration}s")
 
-        # Load audio
+        # Load audio once; every detector below reads from this shared bundle
         logger.info(f"[AudioAnalyzer] Loading audio file...")
-        y, sr = librosa.load(audio_path, sr=self.sample_rate)
-        logger.info(f"[AudioAnalyzer] Audio loaded: {len(y)} samples at {sr}Hz")
-        duration = librosa.get_duration(y=y, sr=sr)
+        features = self._features_memo.get(audio_path, self.sample_rate)
+        sr = features.sr
+        hop_length = features.hop_length
+        logger.info(f"[AudioAnalyzer] Audio loaded: {len(features.y)} samples at {sr}Hz")
+        duration = features.duration
         logger.info(f"[AudioAnalyzer] Duration: {duration:.2f}s")
 
-        # Separate harmonic and percussive for better analysis
-        y_harmonic, y_percussive = librosa.effects.hpss(y)
-
         # Detect tempo and beats (use percussive for cleaner beats)
         logger.info(f"[AudioAnalyzer] Detecting tempo and beats...")
-        tempo, beat_frames = librosa.beat.beat_track(y=y_percussive, sr=sr)
+        tempo, beat_frames = librosa.beat.beat_track(y=features.y_percussive, sr=sr)
         beat_times = librosa.frames_to_time(beat_frames, sr=sr)
         tempo_val = float(tempo[0]) if hasattr(tempo, '__iter__') else float(tempo)
         logger.info(f"[AudioAnalyzer] Detected tempo: {tempo_val:.1f} BPM, beats: {len(beat_times)}")
 
-        # Calculate energy curve (RMS)
+        # Calculate energy curve (RMS), normalized to 0-1
         logger.info(f"[AudioAnalyzer] Calculating energy curve...")
-        hop_length = 512
-        rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
-        rms_harmonic = librosa.feature.rms(y=y_harmonic, hop_length=hop_length)[0]
-
-        # Normalize energy to 0-1
-        if rms.max() > rms.min():
-            rms_normalized = (rms - rms.min()) / (rms.max() - rms.min())
-        else:
-            rms_normalized = np.zeros_like(rms)
-
-        if rms_harmonic.max() > rms_harmonic.min():
-            rms_harmonic_normalized = (rms_harmonic - rms_harmonic.min()) / (rms_harmonic.max() - rms_harmonic.min())
-        else:
-            rms_harmonic_normalized = np.zeros_like(rms_harmonic)
+        rms = features.rms
+        rms_harmonic = features.rms_harmonic
+        rms_normalized = features.rms_normalized
+        rms_harmonic_normalized = features.rms_harmonic_normalized
 
         # Sample energy curve (every 0.25 seconds for better resolution)
         energy_curve = []
@@ -104,11 +122,11 @@ class AudioAnalyzer:
 
         # 2. Detect onset bursts (sudden increase in onset strength)
         logger.info(f"[AudioAnalyzer] Analyzing onset strength...")
-        onset_drops = self._detect_onset_bursts(y, sr)
+        onset_drops = self._detect_onset_bursts(features)
 
         # 3. Detect spectral flux peaks (timbre changes)
         logger.info(f"[AudioAnalyzer] Analyzing spectral flux...")
-        spectral_drops = self._detect_spectral_flux_peaks(y, sr)
+        spectral_drops = self._detect_spectral_flux_peaks(features)
 
         # 4. NEW: Detect vocal/harmonic peaks (good for ballads)
         logger.info(f"[AudioAnalyzer] Detecting vocal peaks...")
@@ -149,6 +167,10 @@ class AudioAnalyzer:
         else:
             suggested_vibe = "Emotional"
 
+        # Spectral intermediates are no longer needed; keep signal + RMS for
+        # a follow-up find_best_segment() on the same file
+        features.release_spectral()
+
         # Extract drop times for response
         drop_times = [d.time for d in all_drops[:5]]
         build_pairs = [(b[0], b[1]) for b in builds[:3]]
@@ -239,7 +261,7 @@ class AudioAnalyzer:
 
         return sorted(drops, key=lambda x: x.score, reverse=True)[:10]
 
-    def _detect_onset_bursts(self, y: np.ndarray, sr: int) -> List[DropInfo]:
+    def _detect_onset_bursts(self, features: AudioFeatures) -> List[DropInfo]:
         """
         Detect onset strength bursts indicating climax moments.
 
@@ -247,9 +269,10 @@ class AudioAnalyzer:
         Bursts indicate dramatic changes in the music.
         """
         drops = []
+        sr = features.sr
 
-        # Calculate onset strength envelope
-        onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+        # Onset strength envelope (shared mel spectrogram)
+        onset_env = features.onset_env
 
         if len(onset_env) < 20:
             return drops
@@ -268,8 +291,8 @@ class AudioAnalyzer:
         peak_threshold = 0.3  # Peak must be at least this high
         ratio_threshold = 1.5  # Peak must be this much higher than average
 
-        hop_length = 512
-        duration = len(y) / sr
+        hop_length = features.hop_length
+        duration = len(features.y) / sr
 
         for i in range(window_size, len(onset_normalized) - window_size):
             # Local peak detection
@@ -298,7 +321,7 @@ class AudioAnalyzer:
 
         return sorted(drops, key=lambda x: x.score, reverse=True)[:10]
 
-    def _detect_spectral_flux_peaks(self, y: np.ndarray, sr: int) -> List[DropInfo]:
+    def _detect_spectral_flux_peaks(self, features: AudioFeatures) -> List[DropInfo]:
         """
         Detect spectral flux peaks indicating timbre/texture changes.
 
@@ -306,10 +329,11 @@ class AudioAnalyzer:
         High flux = dramatic timbral change (common in drops).
         """
         drops = []
+        sr = features.sr
 
-        # Calculate spectrogram
-        hop_length = 512
-        S = np.abs(librosa.stft(y, hop_length=hop_length))
+        # Shared magnitude spectrogram
+        hop_length = features.hop_length
+        S = features.magnitude
 
         if S.shape[1] < 20:
             return drops
@@ -325,7 +349,7 @@ class AudioAnalyzer:
 
         # Find peaks in spectral flux
         threshold = np.percentile(flux_normalized, 90)
-        duration = len(y) / sr
+        duration = len(features.y) / sr
 
         for i in range(1, len(flux_normalized) - 1):
             if (flux_normalized[i] > flux_normalized[i-1] and
@@ -947,15 +971,30 @@ class AudioAnalyzer:
         Find the best segment of audio for the target duration.
         Returns (start_time, end_time) of highest energy segment.
         """
-        y, sr = librosa.load(audio_path, sr=self.sample_rate)
-        total_duration = librosa.get_duration(y=y, sr=sr)
+        if self.cache is None:
+            return self._find_best_segment(audio_path, target_duration)
+        namespace, params = self.cache_spec("find_best_segment", target_duration=target_duration)
+        return self.cache.get_or_compute(
+            audio_path, namespace, lambda: self._find_best_segment(audio_path, target_duration), **params
+        )
+
+    def _find_best_segment(
+        self,
+        audio_path: str,
+        target_duration: float = 15.0
+    ) -> Tuple[float, float]:
+        """Uncached implementation of find_best_segment."""
+        # Reuses the decode (and RMS) from a preceding analyze() on this file
+        features = self._features_memo.get(audio_path, self.sample_rate)
+        sr = features.sr
+        total_duration = features.duration
 
         if total_duration <= target_duration:
             return (0.0, total_duration)
 
         # Calculate RMS energy
-        hop_length = 512
-        rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
+        hop_length = features.hop_length
+        rms = features.rms
 
         # Find segment with highest average energy
         samples_per_segment = int(target_duration * sr / hop_length)
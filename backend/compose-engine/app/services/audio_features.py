@@ -0,0 +1,168 @@
+"""Single-decode audio feature bundle shared by all analysis detectors.
+
+Decoding and the STFT dominate librosa analysis time. AudioFeatures decodes
+the file once and lazily derives every representation the detectors need
+from one complex STFT, so each intermediate is computed at most once:
+
+    y ──► STFT ──┬──► |STFT| ──► mel ──► onset envelope
+                 ├──► HPSS ──► harmonic / percussive signals
+                 └──► (time-domain) RMS, harmonic RMS
+
+The derivations use the same librosa defaults (n_fft=2048, hop=512, hann,
+centered, constant padding) as the individual librosa calls they replace,
+so results are identical to computing each feature from ``y`` directly.
+"""
+
+import logging
+import os
+import threading
+from functools import cached_property
+from typing import Optional, Tuple
+
+import librosa
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_N_FFT = 2048
+DEFAULT_HOP_LENGTH = 512
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    """Min-max normalize to 0-1 (zeros if the signal is flat)."""
+    if x.max() > x.min():
+        return (x - x.min()) / (x.max() - x.min())
+    return np.zeros_like(x)
+
+
+class AudioFeatures:
+    """Lazily computed, shared feature bundle for one decoded audio signal."""
+
+    def __init__(
+        self,
+        y: np.ndarray,
+        sr: int,
+        n_fft: int = DEFAULT_N_FFT,
+        hop_length: int = DEFAULT_HOP_LENGTH,
+    ):
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+
+    @classmethod
+    def load(cls, audio_path: str, sample_rate: int = 22050, **kwargs) -> "AudioFeatures":
+        """Decode an audio file once and wrap it in a feature bundle."""
+        y, sr = librosa.load(audio_path, sr=sample_rate)
+        logger.info(f"[AudioFeatures] Decoded {os.path.basename(audio_path)}: {len(y)} samples at {sr}Hz")
+        return cls(y, sr, **kwargs)
+
+    @property
+    def duration(self) -> float:
+        return librosa.get_duration(y=self.y, sr=self.sr)
+
+    # =========================================================================
+    # Spectral features (one STFT for everything)
+    # =========================================================================
+
+    @cached_property
+    def stft(self) -> np.ndarray:
+        """Complex STFT of the full signal."""
+        return librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length)
+
+    @cached_property
+    def magnitude(self) -> np.ndarray:
+        """Magnitude spectrogram |STFT|."""
+        return np.abs(self.stft)
+
+    @cached_property
+    def mel(self) -> np.ndarray:
+        """Mel power spectrogram (same as librosa.feature.melspectrogram(y=...))."""
+        return librosa.feature.melspectrogram(S=self.magnitude ** 2, sr=self.sr)
+
+    @cached_property
+    def onset_env(self) -> np.ndarray:
+        """Onset strength envelope (same as librosa.onset.onset_strength(y=...))."""
+        return librosa.onset.onset_strength(
+            S=librosa.power_to_db(self.mel), sr=self.sr, hop_length=self.hop_length
+        )
+
+    @cached_property
+    def spectral_centroid(self) -> np.ndarray:
+        """Spectral centroid (same as librosa.feature.spectral_centroid(y=...))."""
+        return librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr)
+
+    @cached_property
+    def _hpss(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Harmonic/percussive separation reusing the shared STFT."""
+        stft_harm, stft_perc = librosa.decompose.hpss(self.stft)
+        y_harm = librosa.istft(stft_harm, hop_length=self.hop_length, dtype=self.y.dtype, length=len(self.y))
+        y_perc = librosa.istft(stft_perc, hop_length=self.hop_length, dtype=self.y.dtype, length=len(self.y))
+        return y_harm, y_perc
+
+    @property
+    def y_harmonic(self) -> np.ndarray:
+        return self._hpss[0]
+
+    @property
+    def y_percussive(self) -> np.ndarray:
+        return self._hpss[1]
+
+    # =========================================================================
+    # Energy features
+    # =========================================================================
+
+    @cached_property
+    def rms(self) -> np.ndarray:
+        """Frame RMS energy of the full signal."""
+        return librosa.feature.rms(y=self.y, hop_length=self.hop_length)[0]
+
+    @cached_property
+    def rms_harmonic(self) -> np.ndarray:
+        """Frame RMS energy of the harmonic component."""
+        return librosa.feature.rms(y=self.y_harmonic, hop_length=self.hop_length)[0]
+
+    @cached_property
+    def rms_normalized(self) -> np.ndarray:
+        return _normalize(self.rms)
+
+    @cached_property
+    def rms_harmonic_normalized(self) -> np.ndarray:
+        return _normalize(self.rms_harmonic)
+
+    def release_spectral(self) -> None:
+        """Drop the large spectral intermediates, keeping the signal and RMS."""
+        for name in ("stft", "magnitude", "mel", "_hpss"):
+            self.__dict__.pop(name, None)
+
+
+class FeatureMemo:
+    """Single-slot memo so back-to-back calls on the same file decode once.
+
+    Safe to share between executor threads: the slot is read and replaced
+    under a lock, while decoding happens outside it (concurrent misses each
+    decode, as they would without the memo).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[str, int, int, int]] = None
+        self._features: Optional[AudioFeatures] = None
+
+    def get(self, audio_path: str, sample_rate: int) -> AudioFeatures:
+        st = os.stat(audio_path)
+        key = (os.path.abspath(audio_path), st.st_mtime_ns, st.st_size, sample_rate)
+        with self._lock:
+            if key == self._key and self._features is not None:
+                return self._features
+
+        features = AudioFeatures.load(audio_path, sample_rate=sample_rate)
+        with self._lock:
+            self._key = key
+            self._features = features
+        return features
+
+    def clear(self) -> None:
+        with self._lock:
+            self._key = None
+            self._features = None
@@ -12,7 +12,7 @@ from dataclasses import dataclass, field
 import logging
 import json
 
-from ...utils.s3_client import S3Client
+from ...utils.s3_client import get_s3_client
 
 logger = logging.getLogger(__name__)
 
@@ -81,14 +81,14 @@ class YouTubePublisher:
             # Check if it's an S3 URL - use S3Client for authenticated download
             if ".s3." in video_url and ".amazonaws.com" in video_url:
                 logger.info("[YouTube] Detected S3 URL, using S3Client for download")
-                s3_client = S3Client()
+                s3_client = get_s3_client()
 
                 # Download to temp file
                 with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
                     temp_path = tmp.name
 
                 try:
-                    await s3_client.download_file(video_url, temp_path)
+                    await s3_client.download_file(video_url, temp_path, use_cache=False)
 
                     with open(temp_path, "rb") as f:
                         video_data = f.read()
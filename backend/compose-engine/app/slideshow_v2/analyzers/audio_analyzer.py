@@ -23,6 +23,8 @@ from ..models.audio import (
     MusicGenre,
 )
 from ..conductor.schemas import AudioContext
+from ...services.analysis_cache import AnalysisCache, get_analysis_cache
+from ...services.audio_features import AudioFeatures
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +37,13 @@ class AdvancedAudioAnalyzer:
     madmom and essentia for better accuracy.
     """
 
-    def __init__(self, sample_rate: int = 22050):
+    # Bump whenever analysis logic changes so cached results are invalidated
+    ANALYZER_VERSION = "1"
+
+    def __init__(self, sample_rate: int = 22050, use_cache: bool = True):
         self.sample_rate = sample_rate
         self._librosa = None
+        self.cache: Optional[AnalysisCache] = get_analysis_cache() if use_cache else None
 
     @property
     def librosa(self):
@@ -51,26 +57,42 @@ class AdvancedAudioAnalyzer:
         """
         Perform comprehensive audio analysis.
 
+        Results are served from the shared content-addressed cache when the
+        same audio was analyzed before (by this or another worker).
+
         Args:
             audio_path: Path to audio file
 
         Returns:
             Complete AudioAnalysisResult
         """
+        if self.cache is None:
+            return self._analyze(audio_path)
+        namespace, params = self.cache_spec("analyze")
+        return self.cache.get_or_compute(
+            audio_path, namespace, lambda: self._analyze(audio_path), **params
+        )
+
+    def cache_spec(self, method: str, **kwargs) -> Tuple[str, dict]:
+        """Cache namespace and key parameters for a public analysis method."""
+        params = {"version": self.ANALYZER_VERSION, "sample_rate": self.sample_rate}
+        params.update(kwargs)
+        return f"slideshow_v2.advanced_audio_analyzer.{method}", params
+
+    def _analyze(self, audio_path: str) -> AudioAnalysisResult:
+        """Uncached implementation of analyze()."""
         logger.info(f"Analyzing audio: {audio_path}")
 
-        # Load audio
-        y, sr = self.librosa.load(audio_path, sr=self.sample_rate)
-        duration = self.librosa.get_duration(y=y, sr=sr)
+        # Load audio once; STFT, onset envelope and RMS are shared below
+        features = AudioFeatures.load(audio_path, sample_rate=self.sample_rate)
+        y, sr = features.y, features.sr
+        duration = features.duration
 
         logger.info(f"Audio loaded: {duration:.1f}s at {sr}Hz")
 
-        # Separate harmonic and percussive
-        y_harmonic, y_percussive = self.librosa.effects.hpss(y)
-
         # Beat detection (use percussive for better beats)
         tempo, beat_frames = self.librosa.beat.beat_track(
-            y=y_percussive,
+            y=features.y_percussive,
             sr=sr,
             units='frames'
         )
@@ -80,21 +102,21 @@ class AdvancedAudioAnalyzer:
         tempo_value = float(tempo[0]) if hasattr(tempo, '__iter__') else float(tempo)
 
         # BPM confidence via tempogram
-        bpm_confidence = self._calculate_bpm_confidence(y, sr, tempo_value)
+        bpm_confidence = self._calculate_bpm_confidence(features, tempo_value)
 
         # Detect downbeats (first beat of each measure)
         downbeat_times = self._detect_downbeats(beat_times, tempo_value)
 
         # Create beat info with strength
-        beats = self._create_beat_info(y, sr, beat_times, downbeat_times, tempo_value)
+        beats = self._create_beat_info(features, beat_times, downbeat_times, tempo_value)
 
         # Energy curve (RMS)
-        energy_curve = self._calculate_energy_curve(y, sr)
+        energy_curve = self._calculate_energy_curve(features)
 
         # Onset detection
-        onset_frames = self.librosa.onset.onset_detect(y=y, sr=sr)
+        onset_env = features.onset_env
+        onset_frames = self.librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr)
         onset_times = self.librosa.frames_to_time(onset_frames, sr=sr)
-        onset_env = self.librosa.onset.onset_strength(y=y, sr=sr)
         onset_strengths = [float(onset_env[f]) for f in onset_frames if f < len(onset_env)]
 
         # Calculate average energy
@@ -108,11 +130,11 @@ class AdvancedAudioAnalyzer:
         moods = self._detect_mood(y, sr, tempo_value, avg_energy)
 
         # Genre hints
-        genre = self._detect_genre(y, sr, tempo_value)
+        genre = self._detect_genre(features, tempo_value)
 
         # Spectral features
-        spectral_centroid = self.librosa.feature.spectral_centroid(y=y, sr=sr)
-        spectral_rolloff = self.librosa.feature.spectral_rolloff(y=y, sr=sr)
+        spectral_centroid = features.spectral_centroid
+        spectral_rolloff = self.librosa.feature.spectral_rolloff(S=features.magnitude, sr=sr)
 
         # Suggest settings based on analysis
         suggested_cut_style, suggested_trans_dur, suggested_intensity = \
@@ -146,10 +168,11 @@ class AdvancedAudioAnalyzer:
 
         return result
 
-    def _calculate_bpm_confidence(self, y: np.ndarray, sr: int, detected_bpm: float) -> float:
+    def _calculate_bpm_confidence(self, features: AudioFeatures, detected_bpm: float) -> float:
         """Calculate confidence in BPM detection."""
+        sr = features.sr
         # Use tempogram to check BPM stability
-        onset_env = self.librosa.onset.onset_strength(y=y, sr=sr)
+        onset_env = features.onset_env
         tempogram = self.librosa.feature.tempogram(onset_envelope=onset_env, sr=sr)
 
         # Find peak in tempogram
@@ -183,16 +206,16 @@ class AdvancedAudioAnalyzer:
 
     def _create_beat_info(
         self,
-        y: np.ndarray,
-        sr: int,
+        features: AudioFeatures,
         beat_times: np.ndarray,
         downbeat_times: List[float],
         bpm: float
     ) -> List[BeatInfo]:
         """Create detailed beat information."""
+        sr = features.sr
         # Get onset strength at beat positions
-        onset_env = self.librosa.onset.onset_strength(y=y, sr=sr)
-        hop_length = 512
+        onset_env = features.onset_env
+        hop_length = features.hop_length
 
         beats = []
         downbeat_set = set(downbeat_times)
@@ -219,23 +242,16 @@ class AdvancedAudioAnalyzer:
 
         return beats
 
-    def _calculate_energy_curve(
-        self,
-        y: np.ndarray,
-        sr: int,
-        hop_length: int = 512
-    ) -> List[Tuple[float, float]]:
+    def _calculate_energy_curve(self, features: AudioFeatures) -> List[Tuple[float, float]]:
         """Calculate energy curve (RMS) over time."""
-        rms = self.librosa.feature.rms(y=y, hop_length=hop_length)[0]
+        sr = features.sr
+        hop_length = features.hop_length
 
-        # Normalize to 0-1
-        if rms.max() > rms.min():
-            rms_normalized = (rms - rms.min()) / (rms.max() - rms.min())
-        else:
-            rms_normalized = np.zeros_like(rms)
+        # Normalized to 0-1
+        rms_normalized = features.rms_normalized
 
         # Sample every 0.25 seconds for efficiency
-        duration = len(y) / sr
+        duration = len(features.y) / sr
         curve = []
         sample_interval = 0.25
 
@@ -372,14 +388,15 @@ class AdvancedAudioAnalyzer:
 
         return moods[:3]  # Return top 3 moods
 
-    def _detect_genre(self, y: np.ndarray, sr: int, bpm: float) -> MusicGenre:
+    def _detect_genre(self, features: AudioFeatures, bpm: float) -> MusicGenre:
         """Detect music genre (simplified heuristic)."""
         # This is a simplified approach - real genre detection needs ML models
+        sr = features.sr
 
-        # Calculate some features
-        spectral_centroid = np.mean(self.librosa.feature.spectral_centroid(y=y, sr=sr))
-        spectral_bandwidth = np.mean(self.librosa.feature.spectral_bandwidth(y=y, sr=sr))
-        zero_crossing_rate = np.mean(self.librosa.feature.zero_crossing_rate(y))
+        # Calculate some features (spectral ones share the analysis STFT)
+        spectral_centroid = np.mean(features.spectral_centroid)
+        spectral_bandwidth = np.mean(self.librosa.feature.spectral_bandwidth(S=features.magnitude, sr=sr))
+        zero_crossing_rate = np.mean(self.librosa.feature.zero_crossing_rate(features.y))
 
         # Simple heuristics
         if bpm >= 120 and bpm <= 140 and spectral_centroid > 3000:
@@ -14,12 +14,29 @@ Effects include:
 """
 
 import logging
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, List, Iterator, Sequence
 import numpy as np
 from functools import lru_cache
 
+from ...utils.color_lut import ColorLUT, get_color_lut
+
 logger = logging.getLogger(__name__)
 
+# Frames processed together by process_segment (bounds float32 batch memory:
+# ~25MB per 1080x1920 frame)
+DEFAULT_SEGMENT_CHUNK_SIZE = 4
+
+# Pre-generated grain textures cycled through by process_segment
+GRAIN_BANK_SIZE = 8
+
+# Bump when any _grade_* math changes (invalidates compiled LUTs)
+GRADE_VERSION = 1
+
+GRADE_NAMES = (
+    "vibrant", "cinematic", "moody", "bright", "warm", "cool", "vintage",
+    "bw", "neon", "pastel", "dramatic", "golden_hour", "moonlight",
+)
+
 # Try to import CuPy for GPU acceleration
 try:
     import cupy as cp
@@ -61,6 +78,7 @@ class GPUEffects:
     def __init__(self):
         self.xp = get_array_module()
         self._vignette_cache: Dict[Tuple[int, int, float], Any] = {}
+        self._grain_bank_cache: Dict[Tuple[int, int], Any] = {}
         self._grain_seed = 42
 
     # =========================================================================
@@ -76,6 +94,9 @@ class GPUEffects:
         """
         Apply color grading to a frame.
 
+        The grade is compiled once into a 3D LUT (see get_grade_lut), so
+        this is a single table lookup per pixel.
+
         Args:
             frame: RGB image (H, W, 3) as uint8
             grade_name: Name of the color grade
@@ -86,7 +107,28 @@ class GPUEffects:
         """
         if grade_name == "natural" or intensity == 0:
             return frame
+        if grade_name not in GRADE_NAMES:
+            logger.warning(f"Unknown color grade: {grade_name}")
+            return frame
+
+        lut = self.get_grade_lut(grade_name, intensity)
+        return to_cpu(lut.apply(to_gpu(frame), self.xp))
 
+    def get_grade_lut(self, grade_name: str, intensity: float = 1.0) -> ColorLUT:
+        """Get the compiled 3D LUT for a grade at an intensity."""
+        intensity = round(float(intensity), 3)
+        return get_color_lut(
+            f"gpu_effects.v{GRADE_VERSION}.{grade_name}@{intensity}",
+            lambda chunk: self._grade_frame(chunk, grade_name, intensity),
+        )
+
+    def _grade_frame(
+        self,
+        frame: np.ndarray,
+        grade_name: str,
+        intensity: float,
+    ) -> np.ndarray:
+        """Reference float implementation of a grade (used to compile LUTs)."""
         xp = self.xp
         f = to_gpu(frame.astype(np.float32) / 255.0)
 
@@ -117,8 +159,6 @@ class GPUEffects:
             f = self._grade_golden_hour(f, intensity)
         elif grade_name == "moonlight":
             f = self._grade_moonlight(f, intensity)
-        else:
-            logger.warning(f"Unknown color grade: {grade_name}")
 
         # Clamp and convert back
         f = xp.clip(f, 0, 1)
@@ -288,8 +328,16 @@ class GPUEffects:
         """Apply vignette effect (dark corners)."""
         xp = self.xp
         h, w = frame.shape[:2]
+        mask = self._get_vignette_mask(h, w, intensity)
 
-        # Get or create vignette mask
+        f = to_gpu(frame.astype(np.float32))
+        f = f * mask
+        result = xp.clip(f, 0, 255).astype(xp.uint8)
+        return to_cpu(result)
+
+    def _get_vignette_mask(self, h: int, w: int, intensity: float):
+        """Get or create the (H, W, 1) vignette mask."""
+        xp = self.xp
         cache_key = (h, w, round(intensity, 2))
         if cache_key not in self._vignette_cache:
             y, x = xp.ogrid[:h, :w]
@@ -303,15 +351,19 @@ class GPUEffects:
 
             # Vignette falloff
             mask = 1 - xp.clip(dist - 0.5, 0, 1) * 2 * intensity
-            mask = mask[:, :, xp.newaxis]
+            mask = mask[:, :, xp.newaxis].astype(xp.float32)
             self._vignette_cache[cache_key] = mask
 
-        mask = self._vignette_cache[cache_key]
+        return self._vignette_cache[cache_key]
 
-        f = to_gpu(frame.astype(np.float32))
-        f = f * mask
-        result = xp.clip(f, 0, 255).astype(xp.uint8)
-        return to_cpu(result)
+    def _get_grain_bank(self, h: int, w: int):
+        """Get or create a bank of unit-variance grain textures (N, H, W, 1)."""
+        cache_key = (h, w)
+        if cache_key not in self._grain_bank_cache:
+            rng = np.random.default_rng(self._grain_seed)
+            bank = rng.standard_normal((GRAIN_BANK_SIZE, h, w, 1), dtype=np.float32)
+            self._grain_bank_cache[cache_key] = to_gpu(bank)
+        return self._grain_bank_cache[cache_key]
 
     def apply_film_grain(
         self,
@@ -528,6 +580,196 @@ class GPUEffects:
 
         return frame
 
+    def process_segment(
+        self,
+        base_frame: np.ndarray,
+        scales: Optional[Sequence[float]] = None,
+        positions: Optional[Sequence[Tuple[float, float]]] = None,
+        rotations: Optional[Sequence[float]] = None,
+        beat_proximities: Optional[Sequence[float]] = None,
+        num_frames: Optional[int] = None,
+        color_grade: str = "natural",
+        color_intensity: float = 1.0,
+        vignette: bool = False,
+        vignette_intensity: float = 0.3,
+        film_grain: bool = False,
+        grain_intensity: float = 0.03,
+        beat_flash_intensity: float = 0.1,
+        output_size: Tuple[int, int] = None,
+        chunk_size: int = DEFAULT_SEGMENT_CHUNK_SIZE,
+    ) -> Iterator[np.ndarray]:
+        """
+        Process all frames of a segment built from one still image.
+
+        Produces the same frames as calling process_frame once per frame,
+        but does the per-segment work once: the source is color graded a
+        single time, vignette mask and grain textures are built once, each
+        motion frame resamples only its visible source region straight to
+        output size (no full-size resize + crop), and the overlay effects run
+        on NumPy batches.
+
+        Without grading, frames match process_frame up to resampler rounding
+        (2 levels). Grading happens before resampling rather than after; the
+        grades are per-pixel color transforms, so on photos this differs by a
+        few levels (p99), and by a few tens along hard or rotated edges. On
+        high-frequency content such as noise, strong grades (vibrant) differ
+        much more (p99 ~45). Film grain is drawn from a cached texture bank,
+        so it is not bit-identical to process_frame's random grain.
+
+        Args:
+            base_frame: Source RGB image (H, W, 3) as uint8
+            scales: Per-frame motion scale (default 1.0)
+            positions: Per-frame normalized crop position (default center)
+            rotations: Per-frame rotation in degrees (default 0)
+            beat_proximities: Per-frame beat proximity 0-1 (default 0)
+            num_frames: Frame count when no per-frame arrays are given
+            output_size: Output size (width, height), None = same as input
+            chunk_size: Frames per yielded batch (bounds memory)
+
+        Yields:
+            uint8 batches of shape (n, out_h, out_w, 3), n <= chunk_size
+        """
+        xp = self.xp
+
+        if num_frames is None:
+            lengths = [len(a) for a in (scales, positions, rotations, beat_proximities) if a is not None]
+            num_frames = lengths[0] if lengths else 0
+
+        scales = np.full(num_frames, 1.0) if scales is None else np.asarray(scales, dtype=np.float64)[:num_frames]
+        positions = (
+            np.full((num_frames, 2), 0.5) if positions is None
+            else np.asarray(positions, dtype=np.float64).reshape(-1, 2)[:num_frames]
+        )
+        rotations = np.zeros(num_frames) if rotations is None else np.asarray(rotations, dtype=np.float64)[:num_frames]
+        beat_proximities = (
+            np.zeros(num_frames) if beat_proximities is None
+            else np.asarray(beat_proximities, dtype=np.float64)[:num_frames]
+        )
+
+        h, w = base_frame.shape[:2]
+        out_w, out_h = output_size if output_size else (w, h)
+        grade = color_grade != "natural" and color_intensity > 0
+
+        # Same test process_frame uses to decide between motion and plain resize
+        has_motion = (scales != 1.0) | (positions[:, 0] != 0.5) | (positions[:, 1] != 0.5) | (rotations != 0.0)
+
+        # Frames without motion are all identical: build that frame once
+        static_frame = None
+        if (~has_motion).any():
+            static = base_frame
+            if output_size:
+                from PIL import Image
+                static = np.array(Image.fromarray(base_frame).resize(output_size, Image.LANCZOS))
+            if grade:
+                static = self.apply_color_grade(static, color_grade, color_intensity)
+            out_h, out_w = static.shape[:2]
+            static_frame = static
+
+        # Motion source: graded once for the whole segment
+        source = None
+        if has_motion.any():
+            from PIL import Image
+            source = base_frame
+            if grade:
+                source = self.apply_color_grade(source, color_grade, color_intensity)
+            source = Image.fromarray(source)
+
+        mask = self._get_vignette_mask(out_h, out_w, vignette_intensity) if vignette else None
+        grain_bank = self._get_grain_bank(out_h, out_w) if film_grain else None
+        flash = beat_proximities * beat_flash_intensity * 50
+        flash[(beat_proximities < 0.01) | (beat_flash_intensity <= 0)] = 0.0
+
+        chunk_size = max(1, chunk_size)
+        for start in range(0, num_frames, chunk_size):
+            stop = min(start + chunk_size, num_frames)
+            frames = np.empty((stop - start, out_h, out_w, 3), dtype=np.uint8)
+
+            for j, i in enumerate(range(start, stop)):
+                if has_motion[i]:
+                    frames[j] = self._resample_motion_frame(
+                        source, (w, h), scales[i], positions[i], rotations[i], (out_w, out_h)
+                    )
+                else:
+                    frames[j] = static_frame
+
+            chunk_flash = flash[start:stop]
+            if mask is None and grain_bank is None and not chunk_flash.any():
+                yield frames
+                continue
+
+            batch = to_gpu(frames.astype(np.float32))
+
+            if mask is not None:
+                batch *= mask
+            if grain_bank is not None:
+                idx = xp.asarray(np.arange(start, stop) % GRAIN_BANK_SIZE)
+                batch += grain_bank[idx] * (grain_intensity * 255)
+                xp.clip(batch, 0, 255, out=batch)
+            if chunk_flash.any():
+                batch += to_gpu(chunk_flash.astype(np.float32))[:, None, None, None]
+
+            xp.clip(batch, 0, 255, out=batch)
+            yield to_cpu(batch.astype(xp.uint8))
+
+    def _resample_motion_frame(
+        self,
+        source,
+        base_size: Tuple[int, int],
+        scale: float,
+        position: Tuple[float, float],
+        rotation: float,
+        output_size: Tuple[int, int],
+    ) -> np.ndarray:
+        """
+        Resample one motion frame from the (graded) source image.
+
+        Reproduces apply_motion_transform's geometry (scale, crop or centered
+        pad, rotation about the frame center), but maps output pixels straight
+        to source pixels instead of resizing the whole image and cropping it:
+        only the visible source region is resampled, directly at output size.
+        """
+        from PIL import Image
+
+        w, h = base_size
+        out_w, out_h = output_size
+
+        scaled_w = int(w * scale)
+        scaled_h = int(h * scale)
+        if scaled_w <= 0 or scaled_h <= 0:
+            return np.zeros((out_h, out_w, 3), dtype=np.uint8)
+
+        # Offset of the scaled image inside the output canvas
+        if scaled_w >= out_w and scaled_h >= out_h:
+            crop_x = int((scaled_w - out_w) * position[0])
+            crop_y = int((scaled_h - out_h) * position[1])
+            off_x = -max(0, min(crop_x, scaled_w - out_w))
+            off_y = -max(0, min(crop_y, scaled_h - out_h))
+        else:
+            off_x = (out_w - scaled_w) // 2
+            off_y = (out_h - scaled_h) // 2
+
+        # Part of the canvas covered by the scaled image
+        x0, y0 = max(0, off_x), max(0, off_y)
+        x1, y1 = min(out_w, off_x + scaled_w), min(out_h, off_y + scaled_h)
+        if x1 <= x0 or y1 <= y0:
+            return np.zeros((out_h, out_w, 3), dtype=np.uint8)
+
+        # Resample only that region of the source, straight to its final size
+        fx = source.width / scaled_w
+        fy = source.height / scaled_h
+        box = ((x0 - off_x) * fx, (y0 - off_y) * fy, (x1 - off_x) * fx, (y1 - off_y) * fy)
+        img = source.resize((x1 - x0, y1 - y0), Image.LANCZOS, box=box)
+
+        if (x1 - x0, y1 - y0) != (out_w, out_h):
+            canvas = Image.new("RGB", (out_w, out_h), (0, 0, 0))
+            canvas.paste(img, (x0, y0))
+            img = canvas
+
+        if abs(rotation) > 0.1:
+            img = img.rotate(rotation, resample=Image.BICUBIC, expand=False)
+
+        return np.asarray(img)
+
 
 # Global instance
 _gpu_effects: Optional[GPUEffects] = None
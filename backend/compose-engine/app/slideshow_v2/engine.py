@@ -34,6 +34,7 @@ from .conductor.schemas import (
     AudioContext,
 )
 from .analyzers.audio_analyzer import AdvancedAudioAnalyzer
+from ..services.analysis_executor import analyze_audio_advanced
 from .analyzers.image_analyzer import ImageAnalyzer
 from .generators.timeline_generator import TimelineGenerator
 from .renderer.engine import SlideshowRenderer, RenderConfig
@@ -131,7 +132,7 @@ class SlideshowEngine:
             audio_context = None
             if audio_path:
                 logger.info(f"Analyzing audio: {audio_path}")
-                audio_analysis = self.audio_analyzer.analyze(audio_path)
+                audio_analysis = await analyze_audio_advanced(audio_path)
                 audio_context = self.audio_analyzer.to_conductor_context(audio_analysis)
 
                 # Auto-calculate duration from audio if not specified
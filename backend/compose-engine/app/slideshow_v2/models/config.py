@@ -467,3 +467,11 @@ def get_preset_config(preset: StylePreset) -> SlideshowConfig:
     if preset == StylePreset.CUSTOM:
         return SlideshowConfig()
     return PRESET_CONFIGS.get(preset, SlideshowConfig())
+
+
+def get_preset(name: str) -> SlideshowConfig:
+    """Get configuration for a preset by name (e.g. "cinematic")."""
+    try:
+        return get_preset_config(StylePreset(name))
+    except ValueError:
+        return SlideshowConfig()
@@ -16,7 +16,7 @@ import logging
 import tempfile
 import subprocess
 import shutil
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Iterable, Iterator, Union
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 import numpy as np
@@ -24,6 +24,8 @@ import numpy as np
 from ..models.timeline import Timeline, TimelineSegment, TransitionPoint, CaptionSegment
 from ..effects.gpu_effects import get_gpu_effects, GPUEffects
 from ..effects.registry import get_registry
+from ...utils.ffmpeg_scheduler import run_ffmpeg_sync
+from ...utils.frame_pipe import FramePipeEncoder
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +46,9 @@ class RenderConfig:
         temp_dir: Optional[str] = None,
         ffmpeg_path: str = "ffmpeg",
         max_workers: int = 4,
+        frame_transport: str = "pipe",  # pipe (raw frames to FFmpeg stdin) or png (frame files)
+        max_queued_frames: int = 4,  # Pipe back-pressure: frames buffered per encoder
+        segment_executor: str = "thread",  # thread or process (SlideshowRendererOptimized)
     ):
         self.output_size = output_size
         self.fps = fps
@@ -56,6 +61,9 @@ class RenderConfig:
         self.temp_dir = temp_dir
         self.ffmpeg_path = ffmpeg_path
         self.max_workers = max_workers
+        self.frame_transport = frame_transport
+        self.max_queued_frames = max_queued_frames
+        self.segment_executor = segment_executor
 
 
 class SlideshowRenderer:
@@ -76,6 +84,8 @@ class SlideshowRenderer:
         self.effects = get_gpu_effects()
         self.registry = get_registry()
         self._temp_dir: Optional[str] = None
+        self._nvenc_available: Optional[bool] = None
+        self._job_id = "slideshow_v2"  # FFmpeg scheduler job, per render
 
     def render(
         self,
@@ -101,6 +111,7 @@ class SlideshowRenderer:
 
         # Create temp directory
         self._temp_dir = tempfile.mkdtemp(prefix="slideshow_v2_")
+        self._job_id = os.path.basename(self._temp_dir)
         logger.info(f"Temp directory: {self._temp_dir}")
 
         try:
@@ -175,6 +186,31 @@ class SlideshowRenderer:
         output_path: str,
     ):
         """Render a single segment with motion and effects."""
+        frames = self._iter_segment_frames(segment, timeline)
+
+        if self.config.frame_transport == "png":
+            from PIL import Image
+
+            # Legacy path: write frames to disk, then encode the directory
+            frames_dir = os.path.join(self._temp_dir, f"frames_{segment.index}")
+            os.makedirs(frames_dir, exist_ok=True)
+
+            for frame_idx, processed in enumerate(frames):
+                frame_path = os.path.join(frames_dir, f"frame_{frame_idx:05d}.png")
+                Image.fromarray(processed).save(frame_path)
+
+            self._encode_frames_to_video(frames_dir, output_path)
+            shutil.rmtree(frames_dir)
+        else:
+            # Stream frames straight into FFmpeg (no intermediate files)
+            self._encode_frames_to_video(frames, output_path)
+
+    def _iter_segment_frames(
+        self,
+        segment: TimelineSegment,
+        timeline: Timeline,
+    ) -> Iterator[np.ndarray]:
+        """Generate the processed RGB frames of a segment."""
         from PIL import Image
 
         # Load image
@@ -182,50 +218,46 @@ class SlideshowRenderer:
         img = img.convert("RGB")
         base_frame = np.array(img)
 
+        # Process frames in batches with all effects
+        batches = self.effects.process_segment(
+            base_frame, **self._segment_effect_params(segment, timeline)
+        )
+        for batch in batches:
+            yield from batch
+
+    def _segment_effect_params(
+        self,
+        segment: TimelineSegment,
+        timeline: Timeline,
+    ) -> Dict[str, Any]:
+        """Build the GPUEffects.process_segment arguments for a segment."""
         # Calculate frame count
         num_frames = int(segment.duration * self.config.fps)
 
-        # Create frames directory
-        frames_dir = os.path.join(self._temp_dir, f"frames_{segment.index}")
-        os.makedirs(frames_dir, exist_ok=True)
-
-        # Generate frames with motion and effects
-        for frame_idx in range(num_frames):
-            # Get keyframe data
-            keyframe = self._get_keyframe(segment, frame_idx, num_frames)
-
-            # Calculate beat proximity for flash effect
-            beat_proximity = 0.0
-            if timeline.beat_times and timeline.global_effects.get("beat_flash", {}).get("enabled"):
-                frame_time = segment.start_time + (frame_idx / self.config.fps)
-                beat_proximity = self._calculate_beat_proximity(frame_time, timeline.beat_times)
-
-            # Process frame with all effects
-            processed = self.effects.process_frame(
-                base_frame,
-                color_grade=timeline.color_grade,
-                color_intensity=timeline.color_intensity,
-                vignette=timeline.global_effects.get("vignette", {}).get("enabled", False),
-                vignette_intensity=timeline.global_effects.get("vignette", {}).get("intensity", 0.3),
-                film_grain=timeline.global_effects.get("film_grain", {}).get("enabled", False),
-                grain_intensity=timeline.global_effects.get("film_grain", {}).get("intensity", 0.03),
-                beat_proximity=beat_proximity,
-                beat_flash_intensity=timeline.global_effects.get("beat_flash", {}).get("intensity", 0.1),
-                motion_scale=keyframe.get("scale", 1.0),
-                motion_position=(keyframe.get("position_x", 0.5), keyframe.get("position_y", 0.5)),
-                motion_rotation=keyframe.get("rotation", 0.0),
-                output_size=timeline.output_size,
-            )
-
-            # Save frame
-            frame_path = os.path.join(frames_dir, f"frame_{frame_idx:05d}.png")
-            Image.fromarray(processed).save(frame_path)
-
-        # Encode frames to video
-        self._encode_frames_to_video(frames_dir, output_path)
+        # Per-frame motion and beat arrays
+        keyframes = [self._get_keyframe(segment, i, num_frames) for i in range(num_frames)]
+        beat_proximities = [0.0] * num_frames
+        if timeline.beat_times and timeline.global_effects.get("beat_flash", {}).get("enabled"):
+            beat_proximities = [
+                self._calculate_beat_proximity(segment.start_time + (i / self.config.fps), timeline.beat_times)
+                for i in range(num_frames)
+            ]
 
-        # Cleanup frames
-        shutil.rmtree(frames_dir)
+        return dict(
+            scales=[kf.get("scale", 1.0) for kf in keyframes],
+            positions=[(kf.get("position_x", 0.5), kf.get("position_y", 0.5)) for kf in keyframes],
+            rotations=[kf.get("rotation", 0.0) for kf in keyframes],
+            beat_proximities=beat_proximities,
+            num_frames=num_frames,
+            color_grade=timeline.color_grade,
+            color_intensity=timeline.color_intensity,
+            vignette=timeline.global_effects.get("vignette", {}).get("enabled", False),
+            vignette_intensity=timeline.global_effects.get("vignette", {}).get("intensity", 0.3),
+            film_grain=timeline.global_effects.get("film_grain", {}).get("enabled", False),
+            grain_intensity=timeline.global_effects.get("film_grain", {}).get("intensity", 0.03),
+            beat_flash_intensity=timeline.global_effects.get("beat_flash", {}).get("intensity", 0.1),
+            output_size=timeline.output_size,
+        )
 
     def _get_keyframe(
         self,
@@ -270,32 +302,56 @@ class SlideshowRenderer:
             return 1.0 - (distance / 0.1)
         return 0.0
 
-    def _encode_frames_to_video(self, frames_dir: str, output_path: str):
-        """Encode PNG frames to video using FFmpeg."""
-        # Determine encoder
+    def _segment_encoder_args(self) -> List[str]:
+        """Video codec options for segment encoding."""
         if self.config.use_gpu and self._check_nvenc():
-            encoder = "h264_nvenc"
-            encoder_opts = ["-preset", "p4", "-b:v", self.config.video_bitrate]
-        else:
-            encoder = "libx264"
-            encoder_opts = [
-                "-preset", self.config.preset,
-                "-crf", str(self.config.crf),
-            ]
+            return ["-c:v", "h264_nvenc", "-preset", "p4", "-b:v", self.config.video_bitrate]
+        return [
+            "-c:v", "libx264",
+            "-preset", self.config.preset,
+            "-crf", str(self.config.crf),
+        ]
+
+    def _encode_frames_to_video(
+        self,
+        frames: Union[str, Iterable[np.ndarray]],
+        output_path: str,
+    ):
+        """
+        Encode frames to video using FFmpeg.
+
+        Args:
+            frames: Directory of frame_%05d.png files, or an iterable of RGB
+                frames which is streamed to FFmpeg over a rawvideo pipe
+            output_path: Where to save the encoded video
+        """
+        encoder_args = self._segment_encoder_args()
+
+        if not isinstance(frames, str):
+            with FramePipeEncoder(
+                output_path,
+                fps=self.config.fps,
+                encoder_args=encoder_args,
+                ffmpeg_path=self.config.ffmpeg_path,
+                max_queued_frames=self.config.max_queued_frames,
+                job_id=self._job_id,
+            ) as encoder:
+                for frame in frames:
+                    encoder.write(frame)
+            return
 
         cmd = [
             self.config.ffmpeg_path,
             "-y",
             "-framerate", str(self.config.fps),
-            "-i", os.path.join(frames_dir, "frame_%05d.png"),
-            "-c:v", encoder,
-            *encoder_opts,
+            "-i", os.path.join(frames, "frame_%05d.png"),
+            *encoder_args,
             "-pix_fmt", "yuv420p",
             output_path,
         ]
 
         logger.debug(f"FFmpeg command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg_sync(cmd, job_id=self._job_id)
 
         if result.returncode != 0:
             logger.error(f"FFmpeg error: {result.stderr}")
@@ -340,7 +396,7 @@ class SlideshowRenderer:
             ]
 
             logger.debug(f"Transition command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_ffmpeg_sync(cmd, job_id=self._job_id)
 
             if result.returncode != 0:
                 logger.error(f"Transition error: {result.stderr}")
@@ -370,7 +426,7 @@ class SlideshowRenderer:
             output_path,
         ]
 
-        subprocess.run(cmd, capture_output=True)
+        run_ffmpeg_sync(cmd, job_id=self._job_id)
         return output_path
 
     def _render_captions(
@@ -438,7 +494,7 @@ class SlideshowRenderer:
         ]
 
         logger.debug(f"Caption command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg_sync(cmd, job_id=self._job_id)
 
         if result.returncode != 0:
             logger.warning(f"Caption rendering failed, returning video without captions: {result.stderr}")
@@ -530,7 +586,7 @@ class SlideshowRenderer:
         ]
 
         logger.debug(f"Audio mix command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg_sync(cmd, job_id=self._job_id)
 
         if result.returncode != 0:
             logger.warning(f"Audio mixing failed: {result.stderr}")
@@ -573,7 +629,7 @@ class SlideshowRenderer:
         ]
 
         logger.debug(f"Final encode command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg_sync(cmd, job_id=self._job_id)
 
         if result.returncode != 0:
             logger.error(f"Final encoding failed: {result.stderr}")
@@ -597,25 +653,36 @@ class SlideshowRenderer:
             return 0.0
 
     def _check_nvenc(self) -> bool:
-        """Check if NVENC is available."""
-        cmd = [
-            self.config.ffmpeg_path,
-            "-hide_banner",
-            "-encoders",
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return "h264_nvenc" in result.stdout
+        """Check if NVENC is available (probed once per renderer)."""
+        if self._nvenc_available is None:
+            cmd = [
+                self.config.ffmpeg_path,
+                "-hide_banner",
+                "-encoders",
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            self._nvenc_available = "h264_nvenc" in result.stdout
+        return self._nvenc_available
 
 
 class SlideshowRendererOptimized(SlideshowRenderer):
     """
     Optimized renderer with parallel processing.
 
-    Uses ThreadPoolExecutor for parallel segment rendering.
+    Renders segments in parallel, each worker streaming its frames into its
+    own FFmpeg process (frame_transport="pipe"):
+    - segment_executor="thread": ThreadPoolExecutor (default; shares the
+      GPU effects instance, but NumPy/PIL work is largely GIL-bound)
+    - segment_executor="process": warm process pool with the decoded images
+      in shared memory, longest segments first (see segment_pool.py)
     """
 
     def _render_segments(self, timeline: Timeline) -> List[str]:
         """Render segments in parallel."""
+        if self.config.segment_executor == "process":
+            from .segment_pool import render_segments_in_processes
+            return render_segments_in_processes(self, timeline)
+
         segment_videos = [None] * len(timeline.segments)
 
         def render_segment(args):
@@ -0,0 +1,225 @@
+"""
+Process-pool segment rendering for SlideshowRendererOptimized.
+
+Per-frame work in GPUEffects and PIL is mostly GIL-bound, so rendering
+segments on threads stops scaling after ~2 cores. This module renders each
+segment in a worker process instead:
+
+- SegmentTask is small and picklable: the image reference, the per-frame
+  effect parameters (keyframes, beat proximity, global effects, output
+  size) and the output path
+- Each distinct source image is decoded once in the parent and placed in
+  shared memory; workers map it instead of re-decoding or unpickling pixels
+- The pool is spawned once and reused across renders, and each worker keeps
+  its renderer (effects caches, NVENC probe) between tasks
+- Each worker gets 1/max_workers of the FFmpeg scheduler budget, so the
+  pool as a whole stays within ``ffmpeg_max_processes``
+- Tasks are submitted longest-first, so total wall time tracks the slowest
+  segment rather than whichever long segment happened to be queued last
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...utils.ffmpeg_scheduler import configure_worker_scheduler
+from ..models.timeline import Timeline
+from .engine import RenderConfig, SlideshowRenderer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SharedImage:
+    """Reference to a decoded RGB image in shared memory."""
+    shm_name: str
+    shape: Tuple[int, ...]
+
+
+@dataclass
+class SegmentTask:
+    """Everything a worker needs to render one segment."""
+    index: int
+    image: SharedImage
+    effect_params: Dict[str, Any]  # GPUEffects.process_segment arguments
+    output_path: str
+    config: RenderConfig
+
+    @property
+    def num_frames(self) -> int:
+        return self.effect_params.get("num_frames", 0)
+
+
+# =============================================================================
+# Worker side
+# =============================================================================
+
+# Per-process renderers, keyed by render config
+_worker_renderers: Dict[Tuple, SlideshowRenderer] = {}
+
+
+def _config_key(config: RenderConfig) -> Tuple:
+    return tuple(sorted(vars(config).items()))
+
+
+def _warm_worker(workers: int) -> None:
+    """Take this worker's FFmpeg share and pay imports and effects setup once."""
+    configure_worker_scheduler(workers)
+
+    from PIL import Image  # noqa: F401
+    from ..effects.gpu_effects import get_gpu_effects
+    get_gpu_effects()
+
+
+def _render_segment_task(task: SegmentTask) -> Tuple[int, str, float]:
+    """Render one segment inside a pool worker."""
+    started = time.time()
+
+    key = _config_key(task.config)
+    renderer = _worker_renderers.get(key)
+    if renderer is None:
+        renderer = SlideshowRenderer(task.config)
+        _worker_renderers[key] = renderer
+
+    shm = shared_memory.SharedMemory(name=task.image.shm_name)
+    try:
+        base_frame = np.ndarray(task.image.shape, dtype=np.uint8, buffer=shm.buf)
+        frames = (
+            frame
+            for batch in renderer.effects.process_segment(base_frame, **task.effect_params)
+            for frame in batch
+        )
+        # Workers always stream; there is no per-render temp dir for PNGs here
+        renderer._encode_frames_to_video(frames, task.output_path)
+        del frames, base_frame
+    finally:
+        shm.close()
+
+    return task.index, task.output_path, time.time() - started
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_segment_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Get the warm segment pool, (re)creating it for a new worker count."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+                initargs=(max_workers,),
+            )
+            _pool_workers = max_workers
+            logger.info(f"[SegmentPool] Started {max_workers} segment workers")
+        return _pool
+
+
+def shutdown_segment_pool() -> None:
+    """Shut down the segment pool."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+            _pool_workers = 0
+
+
+# =============================================================================
+# Parent side
+# =============================================================================
+
+def _share_image(image_path: str) -> Tuple[shared_memory.SharedMemory, SharedImage]:
+    """Decode an image once and copy it into a new shared memory block."""
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        pixels = np.asarray(img.convert("RGB"))
+
+    shm = shared_memory.SharedMemory(create=True, size=pixels.nbytes)
+    shared = np.ndarray(pixels.shape, dtype=np.uint8, buffer=shm.buf)
+    shared[:] = pixels
+    del shared
+    return shm, SharedImage(shm_name=shm.name, shape=pixels.shape)
+
+
+def render_segments_in_processes(
+    renderer: SlideshowRenderer,
+    timeline: Timeline,
+) -> List[str]:
+    """
+    Render all timeline segments in the process pool.
+
+    Returns segment video paths in timeline order.
+    """
+    blocks: Dict[str, Tuple[shared_memory.SharedMemory, SharedImage]] = {}
+    segment_videos: List[Optional[str]] = [None] * len(timeline.segments)
+
+    try:
+        tasks = []
+        for i, segment in enumerate(timeline.segments):
+            if segment.image_path not in blocks:
+                blocks[segment.image_path] = _share_image(segment.image_path)
+            tasks.append(SegmentTask(
+                index=i,
+                image=blocks[segment.image_path][1],
+                effect_params=renderer._segment_effect_params(segment, timeline),
+                output_path=os.path.join(renderer._temp_dir, f"segment_{i:03d}.mp4"),
+                config=renderer.config,
+            ))
+
+        # Longest first: the pool starts tasks in submission order
+        tasks.sort(key=lambda t: t.num_frames, reverse=True)
+
+        pool = get_segment_pool(renderer.config.max_workers)
+        logger.info(f"[SegmentPool] Rendering {len(tasks)} segments "
+                    f"({len(blocks)} shared images) on {renderer.config.max_workers} processes")
+
+        futures = [pool.submit(_render_segment_task, task) for task in tasks]
+        try:
+            for future in as_completed(futures):
+                index, path, elapsed = future.result()
+                segment_videos[index] = path
+                logger.debug(f"[SegmentPool] Segment {index} rendered in {elapsed:.1f}s")
+        except BrokenProcessPool:
+            # A worker died (OOM, native crash); drop the pool so the next
+            # render starts fresh, and finish this one in-process
+            logger.error("[SegmentPool] Process pool broken, rendering remaining segments in-process")
+            shutdown_segment_pool()
+            for task in tasks:
+                if segment_videos[task.index] is None:
+                    segment = timeline.segments[task.index]
+                    renderer._render_single_segment(segment, timeline, task.output_path)
+                    segment_videos[task.index] = task.output_path
+        except BaseException:
+            # Don't unlink shared images under segments that are still running
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+
+        return segment_videos
+
+    finally:
+        for shm, _ in blocks.values():
+            shm.close()
+            shm.unlink()
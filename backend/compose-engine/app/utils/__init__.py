@@ -1,7 +1,9 @@
 """Utility modules."""
 
-from .s3_client import S3Client
+from .s3_client import S3Client, get_s3_client
 from .job_queue import JobQueue
 from .temp_files import TempFileManager
+from .frame_pipe import FramePipeEncoder
+from .color_lut import ColorLUT, get_color_lut
 
-__all__ = ["S3Client", "JobQueue", "TempFileManager"]
+__all__ = ["S3Client", "get_s3_client", "JobQueue", "TempFileManager", "FramePipeEncoder", "ColorLUT", "get_color_lut"]
@@ -0,0 +1,313 @@
+"""Node-local, content-addressed cache for downloaded assets.
+
+Renders download the same images and audio over and over: a variation job
+reuses most of the original's images, and every retry or re-render fetches
+the track again. The cache sits in front of S3Client downloads:
+
+- Blobs are stored once per content hash (``blobs/ab/<sha256>``), so the
+  same bytes behind two URLs take the space once
+- An index maps each URL to the blob and the ETag it was downloaded with
+  (``index/ab/<sha256(url)>.json``); entries older than
+  ``asset_cache_revalidate_seconds`` are checked against the current ETag
+  before reuse and downloaded again when it changed or can't be checked
+- Concurrent requests for the same URL share one download (single-flight)
+- The directory is bounded by ``asset_cache_max_bytes`` with LRU eviction,
+  and survives restarts; on Modal it lives on the ``hydra-render-cache``
+  volume (/cache/assets) so containers share it
+- Hit/miss counters are available from stats()
+
+Blobs are stored read-only. They are handed out as hard links only where
+that mode makes an in-place write fail (not for root, not across
+filesystems); everywhere else callers get writable copies (see
+link_or_copy).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..config import get_settings
+from .disk_lru import DiskLRU
+from .downloader import DownloadResult
+from .temp_files import link_or_copy, make_read_only
+
+logger = logging.getLogger(__name__)
+
+# download(url, local_path) -> DownloadResult
+Fetcher = Callable[[str, str], Awaitable[DownloadResult]]
+# current_etag(url) -> ETag, or None if it can't be determined
+EtagLookup = Callable[[str], Awaitable[Optional[str]]]
+
+
+class AssetCache:
+    """Disk cache of downloaded assets, keyed by URL + ETag and stored by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 4 * 1024 * 1024 * 1024,
+        revalidate_seconds: float = 3600.0,
+    ):
+        self.cache_dir = os.path.normpath(cache_dir)
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._blob_dir = os.path.join(self.cache_dir, "blobs")
+        self._index_dir = os.path.join(self.cache_dir, "index")
+        self._tmp_dir = os.path.join(self.cache_dir, "tmp")
+        for path in (self._blob_dir, self._index_dir, self._tmp_dir):
+            os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # url -> download shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "revalidated": 0,
+            "stale": 0,
+            "stores": 0,
+            "errors": 0,
+            "bytes_served": 0,
+            "bytes_downloaded": 0,
+        }
+        # Index entries of evicted blobs are dropped when next looked up
+        self._disk = DiskLRU(self._blob_dir, max_bytes, name="AssetCache")
+
+    # =========================================================================
+    # Fetch
+    # =========================================================================
+
+    async def fetch(
+        self,
+        url: str,
+        local_path: str,
+        download: Fetcher,
+        current_etag: Optional[EtagLookup] = None,
+    ) -> DownloadResult:
+        """Place the asset at url in local_path, downloading it only on a miss.
+
+        Cache failures never fail the download - they only cost a fetch.
+        """
+        entry = await self._lookup(url, current_etag)
+        if entry:
+            if await self._materialize(entry, local_path):
+                self._count("hits")
+                self._count("bytes_served", entry["size"])
+                return _result(entry, local_path)
+            self._count("misses")
+
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            # Someone is already downloading this URL: wait for their blob
+            self._count("coalesced")
+            entry = await asyncio.shield(inflight)
+            if entry is None:
+                # Their download was cancelled: start our own
+                return await self.fetch(url, local_path, download, current_etag)
+            if await self._materialize(entry, local_path):
+                self._count("bytes_served", entry["size"])
+                return _result(entry, local_path)
+            return await download(url, local_path)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            entry = await self._download(url, download)
+        except asyncio.CancelledError:
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't warn if there are none
+            raise
+        else:
+            future.set_result(entry)
+        finally:
+            self._inflight.pop(url, None)
+
+        if not await self._materialize(entry, local_path):
+            # Evicted by another process between store and link: fetch directly
+            return await download(url, local_path)
+        return _result(entry, local_path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and disk usage."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["disk_bytes"] = self._disk.bytes
+        stats["evictions"] = self._disk.evictions
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        stats["max_bytes"] = self.max_bytes
+        stats["downloads_in_flight"] = len(self._inflight)
+        return stats
+
+    def clear(self) -> None:
+        """Remove all cached assets and index entries."""
+        self._disk.clear(extra_dirs=[self._index_dir])
+
+    # =========================================================================
+    # Index
+    # =========================================================================
+
+    def _index_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self._index_dir, key[:2], f"{key}.json")
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self._blob_dir, sha256[:2], sha256)
+
+    async def _lookup(self, url: str, current_etag: Optional[EtagLookup]) -> Optional[dict]:
+        """Index entry for url if its blob is present and still current."""
+        index_path = self._index_path(url)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"[AssetCache] Dropping unreadable index entry for {url[:60]}: {e}")
+            self._count("errors")
+            self._count("misses")
+            _remove(index_path)
+            return None
+
+        if not os.path.exists(self._blob_path(entry["sha256"])):
+            # Blob evicted (possibly by another worker sharing the directory)
+            self._count("misses")
+            _remove(index_path)
+            return None
+
+        if time.time() - entry["validated_at"] < self.revalidate_seconds:
+            return entry
+
+        etag = None
+        if current_etag is not None:
+            try:
+                etag = await current_etag(url)
+            except Exception as e:
+                logger.warning(f"[AssetCache] Revalidation failed for {url[:60]}: {e}")
+        if etag is None or etag != entry["etag"]:
+            logger.info(f"[AssetCache] STALE {url[:60]} (etag {entry['etag']} -> {etag})")
+            self._count("stale")
+            self._count("misses")
+            return None
+
+        self._count("revalidated")
+        entry["validated_at"] = time.time()
+        self._write_index(url, entry)
+        return entry
+
+    def _write_index(self, url: str, entry: dict) -> None:
+        index_path = self._index_path(url)
+        tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.warning(f"[AssetCache] Index write failed for {url[:60]}: {e}")
+            self._count("errors")
+            _remove(tmp_path)
+
+    # =========================================================================
+    # Download / store
+    # =========================================================================
+
+    async def _download(self, url: str, download: Fetcher) -> dict:
+        """Download url into the cache and return its index entry."""
+        # Keep the extension: the downloader validates image paths by it
+        ext = os.path.splitext(url.split("?")[0])[1][:8]
+        tmp_path = os.path.join(self._tmp_dir, f"{uuid.uuid4().hex}{ext}")
+        try:
+            result = await download(url, tmp_path)
+            self._count("bytes_downloaded", result.size)
+            await asyncio.to_thread(self._store_blob, tmp_path, result.sha256, result.size)
+        finally:
+            _remove(tmp_path)
+
+        entry = {
+            "url": url,
+            "sha256": result.sha256,
+            "size": result.size,
+            "etag": result.etag,
+            "content_type": result.content_type,
+            "validated_at": time.time(),
+        }
+        self._write_index(url, entry)
+        logger.info(f"[AssetCache] MISS {url[:60]} ({result.size} bytes, {result.sha256[:12]})")
+        return entry
+
+    def _store_blob(self, tmp_path: str, sha256: str, size: int) -> None:
+        blob_path = self._blob_path(sha256)
+        if os.path.exists(blob_path):
+            # Same content already cached under another URL
+            return
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        make_read_only(tmp_path)
+        os.replace(tmp_path, blob_path)
+
+        self._count("stores")
+        self._disk.add(size)
+
+    async def _materialize(self, entry: dict, local_path: str) -> bool:
+        """Link or copy the entry's blob to local_path. False if the blob is gone."""
+        blob_path = self._blob_path(entry["sha256"])
+        try:
+            await asyncio.to_thread(link_or_copy, blob_path, local_path)
+            self._disk.touch(blob_path)  # LRU ordering
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"[AssetCache] Read failed for {entry['sha256'][:12]}: {e}")
+            self._count("errors")
+            return False
+        return True
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += delta
+
+
+def _result(entry: dict, local_path: str) -> DownloadResult:
+    return DownloadResult(
+        path=local_path,
+        size=entry["size"],
+        sha256=entry["sha256"],
+        content_type=entry["content_type"],
+        etag=entry["etag"],
+    )
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@lru_cache()
+def get_asset_cache() -> Optional[AssetCache]:
+    """Get the process-wide asset cache, or None if disabled in settings."""
+    settings = get_settings()
+    if not settings.asset_cache_enabled:
+        return None
+    try:
+        return AssetCache(
+            cache_dir=settings.asset_cache_dir,
+            max_bytes=settings.asset_cache_max_bytes,
+            revalidate_seconds=settings.asset_cache_revalidate_seconds,
+        )
+    except OSError as e:
+        logger.warning(f"[AssetCache] Disabled, cannot use {settings.asset_cache_dir}: {e}")
+        return None
@@ -0,0 +1,196 @@
+"""Precomputed color lookup tables for color grades.
+
+Every color grade in the engine is a per-pixel function of RGB, so a grade
+(at a given intensity) can be compiled once into a table and applied to any
+frame with a single vectorized lookup instead of a chain of float ops:
+
+- ColorLUT.compile(fn) runs the grade over all 256^3 colors once, in
+  chunks, and stores the result as a packed table. Lookups are exact: they
+  return what ``fn`` returns for that pixel.
+- ColorLUT.to_cube() samples the table on a 33^3 grid and writes an Adobe
+  .cube file, so FFmpeg's lut3d filter reproduces the same look.
+- get_color_lut(key, fn) caches compiled tables process-wide (LRU; each
+  table is 64MB).
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Grid size for exported .cube files (FFmpeg/Resolve default)
+CUBE_SIZE = 33
+
+# Compiled tables kept in memory (64MB each)
+MAX_CACHED_LUTS = 4
+
+# Red values per compile chunk (COMPILE_CHUNK * 65536 pixels per call)
+COMPILE_CHUNK = 16
+
+# A grade: uint8 RGB image (H, W, 3) -> uint8 RGB image of the same shape
+GradeFn = Callable[[np.ndarray], np.ndarray]
+
+
+class ColorLUT:
+    """Exact 8-bit RGB -> RGB lookup table."""
+
+    def __init__(self, table: np.ndarray):
+        """
+        Args:
+            table: (256**3,) uint32, entry r<<16|g<<8|b holds R | G<<8 | B<<16
+        """
+        self.table = table
+        self._device_tables = {}
+
+    @classmethod
+    def compile(cls, fn: GradeFn) -> "ColorLUT":
+        """Compile a per-pixel grade by evaluating it on every 8-bit color."""
+        table = np.empty(256 ** 3, dtype=np.uint32)
+        levels = np.arange(256, dtype=np.uint8)
+
+        # One chunk = COMPILE_CHUNK red values x 256 green rows x 256 blue columns
+        gb = np.empty((256, 256, 3), dtype=np.uint8)
+        gb[:, :, 1] = levels[:, np.newaxis]
+        gb[:, :, 2] = levels[np.newaxis, :]
+
+        for r_start in range(0, 256, COMPILE_CHUNK):
+            chunk = np.repeat(gb[np.newaxis], COMPILE_CHUNK, axis=0)
+            chunk[:, :, :, 0] = levels[r_start:r_start + COMPILE_CHUNK, np.newaxis, np.newaxis]
+            chunk = chunk.reshape(COMPILE_CHUNK * 256, 256, 3)
+
+            out = np.asarray(fn(chunk)).astype(np.uint32).reshape(-1, 3)
+            start = r_start * 65536
+            table[start:start + out.shape[0]] = out[:, 0] | (out[:, 1] << 8) | (out[:, 2] << 16)
+
+        return cls(table)
+
+    def _table_for(self, xp):
+        if xp is np:
+            return self.table
+        key = xp.__name__
+        if key not in self._device_tables:
+            self._device_tables[key] = xp.asarray(self.table)
+        return self._device_tables[key]
+
+    def apply(self, frame, xp=np):
+        """Look up every pixel of a uint8 RGB frame (any leading shape)."""
+        frame = xp.asarray(frame)
+        if frame.dtype != xp.uint8:
+            frame = xp.clip(frame, 0, 255).astype(xp.uint8)
+
+        idx = (
+            (frame[..., 0].astype(xp.int32) << 16)
+            | (frame[..., 1].astype(xp.int32) << 8)
+            | frame[..., 2]
+        )
+        packed = xp.take(self._table_for(xp), idx)
+        rgbx = packed.view(xp.uint8).reshape(frame.shape[:-1] + (4,))
+        return xp.ascontiguousarray(rgbx[..., :3])
+
+    def sample(self, rgb: np.ndarray) -> np.ndarray:
+        """Trilinearly sample the table at float RGB coordinates in 0-255."""
+        rgb = np.clip(np.asarray(rgb, dtype=np.float64), 0, 255)
+        lo = np.minimum(np.floor(rgb).astype(np.int64), 254)
+        frac = rgb - lo
+
+        result = np.zeros(rgb.shape, dtype=np.float64)
+        for dr in (0, 1):
+            for dg in (0, 1):
+                for db in (0, 1):
+                    weight = (
+                        (frac[..., 0] if dr else 1 - frac[..., 0])
+                        * (frac[..., 1] if dg else 1 - frac[..., 1])
+                        * (frac[..., 2] if db else 1 - frac[..., 2])
+                    )
+                    idx = ((lo[..., 0] + dr) << 16) | ((lo[..., 1] + dg) << 8) | (lo[..., 2] + db)
+                    packed = self.table[idx]
+                    corner = np.stack(
+                        [packed & 0xFF, (packed >> 8) & 0xFF, (packed >> 16) & 0xFF], axis=-1
+                    )
+                    result += corner * weight[..., np.newaxis]
+        return result
+
+    def to_cube(self, path: str, size: int = CUBE_SIZE, title: str = "compose-engine") -> str:
+        """Write the LUT as an Adobe .cube file (atomically) and return the path."""
+        grid = np.linspace(0.0, 255.0, size)
+        # .cube order: red varies fastest, then green, then blue
+        b, g, r = np.meshgrid(grid, grid, grid, indexing="ij")
+        coords = np.stack([r, g, b], axis=-1).reshape(-1, 3)
+        values = self.sample(coords) / 255.0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f'TITLE "{title}"\n')
+            f.write(f"LUT_3D_SIZE {size}\n")
+            f.write("DOMAIN_MIN 0.0 0.0 0.0\n")
+            f.write("DOMAIN_MAX 1.0 1.0 1.0\n")
+            np.savetxt(f, values, fmt="%.6f")
+        os.replace(tmp_path, path)
+        return path
+
+
+# =============================================================================
+# Process-wide cache
+# =============================================================================
+
+_luts: "OrderedDict[str, ColorLUT]" = OrderedDict()
+_luts_lock = threading.Lock()
+_key_locks: Dict[str, threading.Lock] = {}
+
+
+def _lookup_lut(key: str) -> Optional[ColorLUT]:
+    with _luts_lock:
+        lut = _luts.get(key)
+        if lut is not None:
+            _luts.move_to_end(key)
+        return lut
+
+
+def get_color_lut(key: str, fn: GradeFn) -> ColorLUT:
+    """Get the compiled LUT for ``key``, compiling ``fn`` on first use.
+
+    ``key`` must identify the grade and every parameter that changes its
+    output (name, intensity, version of the math). Compiling holds only a
+    per-key lock, so lookups of other grades never wait for it.
+    """
+    lut = _lookup_lut(key)
+    if lut is not None:
+        return lut
+
+    with _luts_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Single flight: concurrent misses for one key wait for the first compile
+    try:
+        with key_lock:
+            lut = _lookup_lut(key)
+            if lut is not None:
+                return lut
+
+            lut = ColorLUT.compile(fn)
+            logger.info(f"[ColorLUT] Compiled {key}")
+
+            with _luts_lock:
+                _luts[key] = lut
+                while len(_luts) > MAX_CACHED_LUTS:
+                    _luts.popitem(last=False)
+            return lut
+    finally:
+        with _luts_lock:
+            _key_locks.pop(key, None)
+
+
+def export_cube(key: str, fn: GradeFn, cube_dir: str, size: int = CUBE_SIZE) -> str:
+    """Get a .cube file for a grade, writing it on first use."""
+    safe_name = "".join(c if c.isalnum() or c in "._-" else "_" for c in key)
+    path = os.path.join(cube_dir, f"{safe_name}.{size}.cube")
+    if not os.path.exists(path):
+        get_color_lut(key, fn).to_cube(path, size=size, title=key)
+        logger.info(f"[ColorLUT] Exported {path}")
+    return path
@@ -0,0 +1,121 @@
+"""Size-bounded cache directories with least-recently-used eviction.
+
+Shared by the analysis, clip and asset caches. Entries are plain files
+whose mtime is their last use (callers touch() them on hits), so the
+directory can live on a volume shared by several workers: eviction
+rescans it and accounts for files written by the others.
+
+The directory walk and the deletions run without holding the lock;
+only the byte total is swapped under it, so stats() and writers are
+never blocked behind a scan of a large cache.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Eviction stops once usage is below this fraction of max_bytes
+EVICT_TO_FRACTION = 0.9
+
+
+class DiskLRU:
+    """Tracks the size of a cache directory and evicts its oldest files."""
+
+    def __init__(self, root: str, max_bytes: int, suffix: str = "", name: str = "DiskLRU"):
+        """
+        Args:
+            root: Directory holding the entries (walked recursively)
+            max_bytes: Size budget
+            suffix: Only files ending with this count as entries ("" = all)
+            name: Component name for log messages
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._evicting = False
+        self._added_while_evicting = 0
+        self.evictions = 0
+        self.bytes = sum(size for _, size, _ in self._iter_entries())
+
+    def _iter_entries(self) -> Iterator[Tuple[str, int, float]]:
+        """Yield (path, size, mtime) for each entry on disk."""
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """Mark an entry as just used."""
+        now = time.time()
+        os.utime(path, (now, now))
+
+    def add(self, delta: int) -> None:
+        """Account for delta bytes written (or removed); evicts when over budget."""
+        with self._lock:
+            self.bytes += delta
+            if self._evicting:
+                self._added_while_evicting += delta
+                return
+            if self.bytes <= self.max_bytes:
+                return
+            self._evicting = True
+            self._added_while_evicting = 0
+        self._evict()
+
+    def _evict(self) -> None:
+        total: Optional[int] = None
+        evicted = 0
+        try:
+            entries: List[Tuple[str, int, float]] = sorted(self._iter_entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * EVICT_TO_FRACTION)
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+        finally:
+            with self._lock:
+                if total is not None:
+                    # Writes that landed during the walk may already be in
+                    # total; counting them twice only makes the next eviction early
+                    self.bytes = total + self._added_while_evicting
+                self.evictions += evicted
+                self._evicting = False
+        logger.info(f"[{self.name}] Evicted {evicted} entries, now {self.bytes / 1024 / 1024:.1f}MB")
+
+    def clear(self, extra_dirs: Optional[List[str]] = None) -> None:
+        """Remove every entry (and every file under extra_dirs)."""
+        for path, _, _ in self._iter_entries():
+            _remove(path)
+        for directory in extra_dirs or []:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    _remove(os.path.join(root, name))
+        with self._lock:
+            self.bytes = 0
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,410 @@
+"""Streaming, hashing, resumable downloads to local files.
+
+S3Client used to buffer whole responses in memory (``response.content``),
+re-read downloaded S3 images just to sniff for HTML, and restart failed
+downloads from byte zero, which hurts for source videos of hundreds of MB.
+The helpers here:
+
+- write chunks to ``<path>.part`` as they arrive and rename on success,
+  so a failed download never leaves a truncated file at ``path``
+- check the magic bytes at the start of the content (HTML error pages,
+  non-images where an image is expected) and stop right away
+- verify complete images with PIL before renaming them into place, so a
+  valid header on a corrupt body is still rejected
+- compute the SHA-256 of the content while writing
+- resume HTTP downloads with ``Range`` on retry (restarting only if the
+  server ignores the range or the content changed)
+- fetch large objects (S3, GCS, ...) as parallel ranged GETs through the
+  shared ObjectStore, written and hashed in order with at most
+  ``concurrency`` parts in memory
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+import aiofiles
+import httpx
+from PIL import Image
+
+from .object_store import RETRY_STATUSES, ObjectStore, retryable_store_error
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg')
+
+# Bytes kept from the start of a download for content sniffing
+SNIFF_BYTES = 1024
+
+# Sniffed image types PIL can verify
+PIL_IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/bmp", "image/webp", "image/tiff", "image/x-icon")
+
+# (offset, signature) -> kind, for the formats we download
+_MAGIC = [
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"BM", "image/bmp"),
+    (8, b"WEBP", "image/webp"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"\x00\x00\x01\x00", "image/x-icon"),
+    (0, b"\x1a\x45\xdf\xa3", "video/webm"),
+    (8, b"WAVE", "audio/wav"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"\xff\xfb", "audio/mpeg"),
+    (0, b"\xff\xf3", "audio/mpeg"),
+    (0, b"\xff\xf2", "audio/mpeg"),
+    (0, b"\xff\xf1", "audio/aac"),
+    (0, b"\xff\xf9", "audio/aac"),
+    (0, b"OggS", "audio/ogg"),
+    (0, b"fLaC", "audio/flac"),
+]
+
+# ISO base media (ftyp box) brands that are images or audio rather than video
+_FTYP_BRANDS = {
+    b"avif": "image/avif", b"avis": "image/avif",
+    b"heic": "image/heic", b"heix": "image/heic", b"mif1": "image/heic", b"msf1": "image/heic",
+    b"M4A ": "audio/mp4",
+}
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Content type from the first bytes of a file (None if unknown)."""
+    if head[4:8] == b"ftyp":
+        return _FTYP_BRANDS.get(head[8:12], "video/mp4")
+    for offset, signature, kind in _MAGIC:
+        if head[offset:offset + len(signature)] == signature:
+            return kind
+    text = head[:1000].decode("utf-8", errors="ignore").lower()
+    if "<svg" in text:
+        return "image/svg+xml"
+    if "<html" in text or "<!doctype" in text or "<head" in text:
+        return "text/html"
+    return None
+
+
+def check_first_chunk(head: bytes, local_path: str, content_type: str = "") -> Optional[str]:
+    """Problem with the start of a download (None if it looks fine).
+
+    HTML is always a problem (hotlink protection / error pages). Where an
+    image is expected (image content type or image extension), content
+    that isn't a known image format is too.
+    """
+    kind = sniff_content_type(head)
+    if kind == "text/html":
+        return "returned HTML (likely hotlink protected or an error page)"
+    expects_image = content_type.startswith("image/") or local_path.lower().endswith(IMAGE_EXTENSIONS)
+    if expects_image and not (kind or "").startswith("image/"):
+        return f"is not a valid image (type={content_type or 'unknown'})"
+    return None
+
+
+def verify_image(path: str) -> Optional[str]:
+    """Problem with a complete image file (None if PIL accepts it)."""
+    try:
+        with Image.open(path) as img:
+            img.verify()
+    except Exception as e:
+        return f"is a corrupt image ({e})"
+    return None
+
+
+@dataclass
+class DownloadResult:
+    """A completed download."""
+    path: str
+    size: int
+    sha256: str
+    content_type: Optional[str] = None
+    etag: Optional[str] = None
+    resumed: int = 0  # Retries that continued from a byte offset
+
+
+class _HashingWriter:
+    """Writes chunks to <path>.part, hashing them; renamed into place on commit."""
+
+    def __init__(self, local_path: str):
+        self.local_path = local_path
+        self.part_path = f"{local_path}.part"
+        self.size = 0
+        self.head = b""
+        self._hasher = hashlib.sha256()
+        self._file = None
+
+    async def open(self) -> None:
+        self._file = await aiofiles.open(self.part_path, "wb")
+
+    async def write(self, chunk: bytes) -> None:
+        if len(self.head) < SNIFF_BYTES:
+            self.head += chunk[:SNIFF_BYTES - len(self.head)]
+        await self._file.write(chunk)
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+
+    async def reset(self) -> None:
+        """Start over from byte zero."""
+        await self._file.seek(0)
+        await self._file.truncate()
+        self.size = 0
+        self.head = b""
+        self._hasher = hashlib.sha256()
+
+    async def close(self) -> None:
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
+
+    async def commit(self) -> str:
+        await self.close()
+        os.replace(self.part_path, self.local_path)
+        return self._hasher.hexdigest()
+
+    async def abort(self) -> None:
+        await self.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+async def download_http(
+    client: httpx.AsyncClient,
+    url: str,
+    local_path: str,
+    headers: Optional[Dict[str, str]] = None,
+    validate: bool = True,
+    max_retries: int = 3,
+    retry_backoff: float = 2.0,
+) -> DownloadResult:
+    """Stream a URL to local_path, resuming with Range on retry.
+
+    Args:
+        client: Shared HTTP client
+        url: URL to download
+        local_path: Destination file
+        headers: Extra request headers
+        validate: Reject HTML, non-images where an image is expected and
+            images PIL can't verify
+        max_retries: Attempts for transient errors (429/5xx, connection drops)
+        retry_backoff: Seconds to wait before retry n is n * retry_backoff
+
+    Raises:
+        ValueError: Content failed validation
+        httpx.HTTPError: Non-transient HTTP error, or retries exhausted
+    """
+    writer = _HashingWriter(local_path)
+    await writer.open()
+    validator = _ResponseValidator(url, local_path, validate)
+    etag = None
+    resumed = 0
+    content_type = ""
+
+    try:
+        for attempt in range(max_retries):
+            request_headers = dict(headers or {})
+            if writer.size:
+                request_headers["Range"] = f"bytes={writer.size}-"
+                if etag:
+                    request_headers["If-Range"] = etag
+            try:
+                async with client.stream("GET", url, headers=request_headers) as response:
+                    response.raise_for_status()
+                    if writer.size:
+                        if response.status_code == 206 and _range_start(response) == writer.size:
+                            resumed += 1
+                            logger.info(f"[Downloader] Resuming {url[:60]}... at {writer.size} bytes")
+                        else:
+                            await writer.reset()  # Range ignored or content changed
+                            validator.checked = False
+                    etag = response.headers.get("etag") or etag
+                    content_type = response.headers.get("content-type", "")
+                    async for chunk in response.aiter_bytes():
+                        await writer.write(chunk)
+                        if not validator.checked and len(writer.head) >= SNIFF_BYTES:
+                            validator.check(writer.head, content_type)
+                    _check_length(response, writer.size, url)
+                break
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUSES or attempt == max_retries - 1:
+                    raise
+                logger.warning(
+                    f"[Downloader] Retry {attempt + 1}/{max_retries} after {e.response.status_code}: {url[:60]}..."
+                )
+            except httpx.TransportError as e:
+                if attempt == max_retries - 1:
+                    raise
+                logger.warning(
+                    f"[Downloader] Retry {attempt + 1}/{max_retries} after {type(e).__name__} "
+                    f"at {writer.size} bytes: {url[:60]}..."
+                )
+            await asyncio.sleep((attempt + 1) * retry_backoff)
+
+        if not writer.size:
+            raise ValueError(f"Empty download: {url[:60]}...")
+        if not validator.checked:
+            validator.check(writer.head, content_type)  # Shorter than SNIFF_BYTES
+        await writer.close()
+        await asyncio.to_thread(validator.verify, writer.part_path)
+        size = writer.size
+        sha256 = await writer.commit()
+    except BaseException:
+        await writer.abort()
+        raise
+
+    return DownloadResult(
+        path=local_path,
+        size=size,
+        sha256=sha256,
+        content_type=validator.content_type,
+        etag=etag,
+        resumed=resumed,
+    )
+
+
+class _ResponseValidator:
+    def __init__(self, url: str, local_path: str, enabled: bool):
+        self.url = url
+        self.local_path = local_path
+        self.enabled = enabled
+        self.checked = False
+        self.content_type: Optional[str] = None
+
+    def check(self, head: bytes, content_type: str) -> None:
+        self.checked = True
+        self.content_type = sniff_content_type(head) or content_type or None
+        if self.enabled:
+            problem = check_first_chunk(head, self.local_path, content_type)
+            if problem:
+                raise ValueError(f"URL {problem}: {self.url[:60]}...")
+
+    def verify(self, path: str) -> None:
+        """Check the whole body of an image PIL can read."""
+        if self.enabled and self.content_type in PIL_IMAGE_TYPES:
+            problem = verify_image(path)
+            if problem:
+                raise ValueError(f"URL {problem}: {self.url[:60]}...")
+
+
+def _range_start(response: httpx.Response) -> Optional[int]:
+    # Content-Range: bytes 1000-1999/2000
+    value = response.headers.get("content-range", "")
+    try:
+        return int(value.split(" ", 1)[1].split("-", 1)[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _check_length(response: httpx.Response, size: int, url: str) -> None:
+    """Raise a (retryable) transport error if the body ended early."""
+    value = response.headers.get("content-range", "").rpartition("/")[2]
+    if response.status_code != 206:
+        value = response.headers.get("content-length", "")
+    if value.isdigit() and size < int(value) and "content-encoding" not in response.headers:
+        raise httpx.ReadError(f"Body ended at {size} of {value} bytes: {url[:60]}...")
+
+
+# =============================================================================
+# Object store
+# =============================================================================
+
+async def download_object(
+    store: ObjectStore,
+    uri: str,
+    local_path: str,
+    part_size: int = 8 * 1024 * 1024,
+    concurrency: int = 4,
+    ranged_threshold: int = 16 * 1024 * 1024,
+    max_retries: int = 3,
+) -> DownloadResult:
+    """Download an object-store object, as parallel ranged GETs if it is large.
+
+    Each part is retried on its own, so a dropped connection costs one
+    part instead of the whole object. Content is not validated here; the
+    caller decides what to do with result.content_type.
+
+    Args:
+        store: Shared object store
+        uri: Object URI (``s3://bucket/key``)
+        local_path: Destination file
+        part_size: Bytes per ranged GET
+        concurrency: Ranged GETs in flight (and parts held in memory)
+        ranged_threshold: Objects at least this big are fetched in parts
+        max_retries: Attempts per part / per resumed single GET
+    """
+    head = await store.head(uri)
+    total = head.size
+    if total == 0:
+        raise ValueError(f"Object is empty: {uri}")
+
+    writer = _HashingWriter(local_path)
+    await writer.open()
+    resumed = 0
+    try:
+        if total < ranged_threshold:
+            for attempt in range(max_retries):
+                try:
+                    if writer.size:
+                        resumed += 1
+                    async with aclosing(store.iter_bytes(uri, start=writer.size, if_match=head.etag)) as chunks:
+                        async for chunk in chunks:
+                            await writer.write(chunk)
+                    if writer.size < total:
+                        raise IOError(f"Body ended at {writer.size} of {total} bytes")
+                    break
+                except Exception as e:
+                    if attempt == max_retries - 1 or not retryable_store_error(e):
+                        raise
+                    logger.warning(f"[Downloader] Retry {attempt + 1}/{max_retries} at {writer.size} bytes: {uri} ({e})")
+        else:
+            async def fetch(start: int) -> bytes:
+                end = min(start + part_size, total) - 1
+                for attempt in range(max_retries):
+                    try:
+                        data = await store.read(uri, start=start, end=end, if_match=head.etag)
+                        if len(data) != end - start + 1:
+                            raise IOError(f"Part {start}-{end} returned {len(data)} bytes")
+                        return data
+                    except Exception as e:
+                        if attempt == max_retries - 1 or not retryable_store_error(e):
+                            raise
+                        logger.warning(f"[Downloader] Part {start}-{end} retry {attempt + 1}/{max_retries}: {uri} ({e})")
+
+            # Sliding window: fetch ahead, write and hash strictly in order
+            offsets = iter(range(0, total, part_size))
+            window: Deque[asyncio.Task] = deque()
+            try:
+                for offset in offsets:
+                    window.append(asyncio.ensure_future(fetch(offset)))
+                    if len(window) >= concurrency:
+                        await writer.write(await window.popleft())
+                while window:
+                    await writer.write(await window.popleft())
+            finally:
+                for task in window:
+                    task.cancel()
+            logger.info(f"[Downloader] {uri}: {total} bytes in {-(-total // part_size)} ranged GETs")
+
+        size = writer.size
+        content_type = sniff_content_type(writer.head) or head.content_type
+        sha256 = await writer.commit()
+    except BaseException:
+        await writer.abort()
+        raise
+
+    return DownloadResult(
+        path=local_path,
+        size=size,
+        sha256=sha256,
+        content_type=content_type,
+        etag=head.etag,
+        resumed=resumed,
+    )
@@ -0,0 +1,386 @@
+"""Process-wide admission control for FFmpeg subprocesses.
+
+Every render job used to start FFmpeg processes on its own (up to
+``max_workers=4`` clip encodes, plus filter, concat and encode passes), and
+up to ``max_concurrent_jobs`` jobs run at once, so a busy worker could have
+dozens of encoders fighting over a handful of cores. FFmpegScheduler owns
+the decision of when a process may start:
+
+- CPU work is limited to ``ffmpeg_max_processes`` processes (auto: half
+  the cores) and held back while the 1-minute load per core is above
+  ``ffmpeg_max_load_per_cpu`` or available memory is below
+  ``ffmpeg_min_free_memory_mb``. A process is always admitted when none
+  are running, so work never stalls completely.
+- NVENC work is limited to ``ffmpeg_nvenc_sessions`` concurrent sessions
+  and does not count against the CPU limit. A process that opens several
+  encoders (a batched clip encode) takes one session per encoder.
+- When a slot frees up it goes to the waiting job with the fewest running
+  processes (fair share), oldest request first. A request that needs more
+  slots than are free holds back later requests of the same kind, so
+  heavy processes are not starved by light ones.
+- Each admitted process gets a ``-threads`` hint so the running processes
+  split the cores instead of each spawning one thread per core.
+
+The scheduler is thread-safe and works across event loops: async code uses
+run_ffmpeg()/slot(), code running in executor threads (XfadeRenderer, the
+slideshow engine, FramePipeEncoder) uses run_ffmpeg_sync()/slot_sync().
+
+Process pools (the slideshow segment pool) spawn workers with their own
+copy of the scheduler; each worker calls configure_worker_scheduler() so
+the workers split the budget instead of each getting all of it.
+
+Not scheduled: ffprobe runs and ``-encoders`` capability checks (short,
+no encoding), and the standalone Modal functions in modal_app.py, which
+run in their own containers.
+
+Usage:
+    returncode, stdout, stderr = await run_ffmpeg(cmd, job_id=job_id)
+    result = run_ffmpeg_sync(cmd, job_id=job_id, timeout=300)
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# How often blocked requests re-check load and memory
+POLL_INTERVAL_SECONDS = 0.5
+
+# Load and memory readings are reused for this long
+SAMPLE_TTL_SECONDS = 0.5
+
+
+def read_load_per_cpu() -> Optional[float]:
+    """1-minute load average per core (None if unavailable)."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+def read_available_memory() -> Optional[int]:
+    """Available memory in bytes from /proc/meminfo (None if unavailable)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def encoder_kind(cmd: List[str]) -> str:
+    """"nvenc" if the command encodes with NVENC, else "cpu"."""
+    return "nvenc" if any("_nvenc" in arg for arg in cmd) else "cpu"
+
+
+@dataclass
+class _Request:
+    job_id: str
+    kind: str
+    weight: int
+    seq: int
+    notify: Callable[[], None]  # Called outside the lock once granted
+    granted: bool = False
+
+
+class FFmpegScheduler:
+    """Admits FFmpeg processes by encoder type, live load and fair share."""
+
+    def __init__(
+        self,
+        max_processes: int = 0,
+        nvenc_sessions: int = 8,
+        max_load_per_cpu: float = 1.5,
+        min_free_memory_bytes: int = 512 * 1024 * 1024,
+        cpu_count: Optional[int] = None,
+        load_reader: Callable[[], Optional[float]] = read_load_per_cpu,
+        memory_reader: Callable[[], Optional[int]] = read_available_memory,
+    ):
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.max_processes = max_processes if max_processes > 0 else max(1, self.cpu_count // 2)
+        self.nvenc_sessions = max(1, nvenc_sessions)
+        self.max_load_per_cpu = max_load_per_cpu
+        self.min_free_memory_bytes = min_free_memory_bytes
+        self._load_reader = load_reader
+        self._memory_reader = memory_reader
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiting: List[_Request] = []
+        self._running = Counter()         # kind -> processes
+        self._running_by_job = Counter()  # job_id -> processes
+        self._sample: Tuple[float, Optional[float], Optional[int]] = (0.0, None, None)
+        self._stats = {"admitted": 0, "waited": 0, "held_by_pressure": 0}
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def threads_hint(self) -> int:
+        """Threads per process so that a full house uses every core once."""
+        return max(1, self.cpu_count // self.max_processes)
+
+    @asynccontextmanager
+    async def slot(self, job_id: str = "unknown", kind: str = "cpu", weight: int = 1) -> AsyncIterator[int]:
+        """Wait for admission; yields the -threads hint for the process.
+
+        Args:
+            job_id: Job the process belongs to (for fair share)
+            kind: "cpu" or "nvenc"
+            weight: Slots the process takes (NVENC sessions it opens)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        request = self._enqueue(job_id, kind, weight, lambda: loop.call_soon_threadsafe(_set_result, future))
+
+        try:
+            while not future.done():
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    self._dispatch()  # Load or memory may have recovered
+        except BaseException:
+            self._release(request)
+            raise
+
+        try:
+            yield self.threads_hint()
+        finally:
+            self._release(request)
+
+    @contextmanager
+    def slot_sync(self, job_id: str = "unknown", kind: str = "cpu", weight: int = 1) -> Iterator[int]:
+        """Blocking slot() for code running in worker threads."""
+        event = threading.Event()
+        request = self._enqueue(job_id, kind, weight, event.set)
+
+        try:
+            while not event.wait(POLL_INTERVAL_SECONDS):
+                self._dispatch()  # Load or memory may have recovered
+        except BaseException:
+            self._release(request)
+            raise
+
+        try:
+            yield self.threads_hint()
+        finally:
+            self._release(request)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "running_cpu": self._running["cpu"],
+                "running_nvenc": self._running["nvenc"],
+                "waiting": len(self._waiting),
+                "max_processes": self.max_processes,
+                "nvenc_sessions": self.nvenc_sessions,
+            }
+
+    # =========================================================================
+    # Admission
+    # =========================================================================
+
+    def _enqueue(self, job_id: str, kind: str, weight: int, notify: Callable[[], None]) -> _Request:
+        limit = self.nvenc_sessions if kind == "nvenc" else self.max_processes
+        request = _Request(job_id, kind, min(max(1, weight), limit), next(self._seq), notify)
+        with self._lock:
+            self._waiting.append(request)
+        self._dispatch()
+        if not request.granted:
+            with self._lock:
+                self._stats["waited"] += 1
+        return request
+
+    def _pressure_ok(self) -> bool:
+        now = time.monotonic()
+        sampled_at, load, memory = self._sample
+        if now - sampled_at > SAMPLE_TTL_SECONDS:
+            load, memory = self._load_reader(), self._memory_reader()
+            self._sample = (now, load, memory)
+        if load is not None and load > self.max_load_per_cpu:
+            return False
+        if memory is not None and memory < self.min_free_memory_bytes:
+            return False
+        return True
+
+    def _can_admit(self, kind: str, weight: int) -> bool:
+        if kind == "nvenc":
+            return self._running["nvenc"] + weight <= self.nvenc_sessions
+        if self._running["cpu"] + weight > self.max_processes:
+            return False
+        if self._running["cpu"] == 0:
+            return True  # Never stall completely
+        if not self._pressure_ok():
+            self._stats["held_by_pressure"] += 1
+            return False
+        return True
+
+    def _dispatch(self) -> None:
+        """Grant slots to waiting requests, fewest-running job first.
+
+        Only the next request of each kind is considered: if it doesn't fit,
+        nothing behind it of that kind is admitted either.
+        """
+        def order(request: _Request) -> Tuple[int, int]:
+            return self._running_by_job[request.job_id], request.seq
+
+        granted = []
+        with self._lock:
+            while self._waiting:
+                heads = {}
+                for r in sorted(self._waiting, key=order):
+                    heads.setdefault(r.kind, r)
+                candidates = [r for r in heads.values() if self._can_admit(r.kind, r.weight)]
+                if not candidates:
+                    break
+                request = min(candidates, key=order)
+                request.granted = True
+                self._running[request.kind] += request.weight
+                self._running_by_job[request.job_id] += 1
+                self._stats["admitted"] += 1
+                self._waiting.remove(request)
+                granted.append(request)
+
+        for request in granted:
+            request.notify()
+
+    def _release(self, request: _Request) -> None:
+        with self._lock:
+            if request.granted:
+                request.granted = False
+                self._running[request.kind] -= request.weight
+                self._running_by_job[request.job_id] -= 1
+                if self._running_by_job[request.job_id] <= 0:
+                    del self._running_by_job[request.job_id]
+            elif request in self._waiting:
+                self._waiting.remove(request)
+        self._dispatch()
+
+
+def _set_result(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def with_threads(cmd: List[str], threads: int) -> List[str]:
+    """Add a -threads hint before the output path (unless already set)."""
+    if "-threads" in cmd or len(cmd) < 2:
+        return cmd
+    return [*cmd[:-1], "-threads", str(threads), cmd[-1]]
+
+
+async def run_ffmpeg(
+    cmd: List[str],
+    job_id: str = "unknown",
+    threads_hint: bool = True,
+    weight: int = 1,
+) -> Tuple[int, bytes, bytes]:
+    """Run an FFmpeg command once the scheduler admits it.
+
+    Args:
+        cmd: Full command; the last argument must be the output path
+        job_id: Job the process belongs to (for fair share)
+        threads_hint: Add -threads to the command
+        weight: Slots the process takes (NVENC sessions it opens)
+
+    Returns:
+        (returncode, stdout, stderr)
+    """
+    async with get_ffmpeg_scheduler().slot(job_id, encoder_kind(cmd), weight) as threads:
+        if threads_hint:
+            cmd = with_threads(cmd, threads)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        return proc.returncode, stdout, stderr
+
+
+def run_ffmpeg_sync(
+    cmd: List[str],
+    job_id: str = "unknown",
+    threads_hint: bool = True,
+    timeout: Optional[float] = None,
+    weight: int = 1,
+) -> subprocess.CompletedProcess:
+    """Blocking run_ffmpeg() for code running in worker threads.
+
+    Output is decoded as text. The timeout covers the process run, not
+    the wait for admission.
+
+    Raises:
+        subprocess.TimeoutExpired: the process ran longer than timeout
+    """
+    with get_ffmpeg_scheduler().slot_sync(job_id, encoder_kind(cmd), weight) as threads:
+        if threads_hint:
+            cmd = with_threads(cmd, threads)
+        return subprocess.run(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+
+
+_scheduler: Optional[FFmpegScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def _scheduler_from_settings(workers: int = 1) -> FFmpegScheduler:
+    """Build a scheduler for 1/workers of the configured budget."""
+    settings = get_settings()
+    full = FFmpegScheduler(
+        max_processes=settings.ffmpeg_max_processes,
+        nvenc_sessions=settings.ffmpeg_nvenc_sessions,
+    )
+    scheduler = FFmpegScheduler(
+        max_processes=max(1, full.max_processes // workers),
+        nvenc_sessions=max(1, full.nvenc_sessions // workers),
+        max_load_per_cpu=settings.ffmpeg_max_load_per_cpu,
+        min_free_memory_bytes=settings.ffmpeg_min_free_memory_mb * 1024 * 1024,
+        # Keeps the -threads hint at this worker's share of the cores
+        cpu_count=max(1, full.cpu_count // workers),
+    )
+    logger.info(
+        f"[FFmpegScheduler] {scheduler.max_processes} CPU processes x "
+        f"{scheduler.threads_hint()} threads, {scheduler.nvenc_sessions} NVENC sessions"
+    )
+    return scheduler
+
+
+def get_ffmpeg_scheduler() -> FFmpegScheduler:
+    """Get the process-wide FFmpeg scheduler configured from settings."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = _scheduler_from_settings()
+        return _scheduler
+
+
+def configure_worker_scheduler(workers: int) -> FFmpegScheduler:
+    """Give this pool worker process its 1/workers share of the FFmpeg budget.
+
+    Call from the pool initializer, before the worker starts any FFmpeg.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = _scheduler_from_settings(max(1, workers))
+        return _scheduler
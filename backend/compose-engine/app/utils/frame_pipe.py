@@ -0,0 +1,255 @@
+"""Stream raw frames into a long-lived FFmpeg process.
+
+Writing every frame to a PNG and then running a second FFmpeg pass over the
+directory spends most of the time in PNG compression and disk I/O. A
+FramePipeEncoder instead starts one FFmpeg process reading ``rawvideo`` from
+stdin and feeds it frames as they are produced:
+
+- No intermediate files
+- Back-pressure: at most ``max_queued_frames`` frames wait in memory; the
+  producer blocks once FFmpeg falls behind
+- Frame generation overlaps with encoding (a writer thread owns stdin)
+- FFmpeg stderr is drained continuously so the process can't stall on a
+  full stderr pipe; the tail is kept for error messages
+- The process holds an FFmpeg scheduler slot from start to exit, so the
+  first write() waits for admission like any other FFmpeg run
+
+Usage:
+    with FramePipeEncoder(output_path, fps=30, encoder_args=["-c:v", "libx264"]) as enc:
+        for frame in frames:
+            enc.write(frame)
+"""
+
+import logging
+import queue
+import subprocess
+import threading
+from collections import deque
+from contextlib import ExitStack
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .ffmpeg_scheduler import encoder_kind, get_ffmpeg_scheduler, with_threads
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered between the producer and FFmpeg's stdin
+DEFAULT_MAX_QUEUED_FRAMES = 4
+
+# Lines of FFmpeg stderr kept for error reporting
+STDERR_TAIL_LINES = 40
+
+_PIX_FMT_CHANNELS = {"rgb24": 3, "bgr24": 3, "rgba": 4, "bgra": 4, "gray": 1}
+
+_SENTINEL = object()
+
+
+class FramePipeEncoder:
+    """Encode numpy frames by streaming them to FFmpeg over a rawvideo pipe."""
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        encoder_args: Sequence[str],
+        ffmpeg_path: str = "ffmpeg",
+        pix_fmt: str = "rgb24",
+        output_pix_fmt: str = "yuv420p",
+        max_queued_frames: int = DEFAULT_MAX_QUEUED_FRAMES,
+        extra_output_args: Optional[Sequence[str]] = None,
+        job_id: str = "frame_pipe",
+    ):
+        """
+        Args:
+            output_path: Video file to write
+            fps: Frame rate of the input frames
+            encoder_args: Codec options, e.g. ["-c:v", "libx264", "-crf", "23"]
+            ffmpeg_path: FFmpeg executable
+            pix_fmt: Pixel format of the frames passed to write()
+            output_pix_fmt: Pixel format of the encoded video
+            max_queued_frames: Frames buffered before write() blocks
+            extra_output_args: Additional output options (e.g. -movflags)
+            job_id: Job the FFmpeg process is scheduled under
+        """
+        if pix_fmt not in _PIX_FMT_CHANNELS:
+            raise ValueError(f"Unsupported pixel format: {pix_fmt}")
+
+        self.output_path = output_path
+        self.fps = fps
+        self.encoder_args = list(encoder_args)
+        self.ffmpeg_path = ffmpeg_path
+        self.pix_fmt = pix_fmt
+        self.output_pix_fmt = output_pix_fmt
+        self.extra_output_args = list(extra_output_args or [])
+        self.job_id = job_id
+        self.frames_written = 0
+
+        self._channels = _PIX_FMT_CHANNELS[pix_fmt]
+        self._shape: Optional[tuple] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._slot = ExitStack()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queued_frames))
+        self._writer: Optional[threading.Thread] = None
+        self._stderr_reader: Optional[threading.Thread] = None
+        self._stderr_tail: deque = deque(maxlen=STDERR_TAIL_LINES)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+    # =========================================================================
+    # Process lifecycle
+    # =========================================================================
+
+    def _build_command(self, width: int, height: int) -> List[str]:
+        return [
+            self.ffmpeg_path,
+            "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", self.pix_fmt,
+            "-s", f"{width}x{height}",
+            "-r", str(self.fps),
+            "-i", "-",
+            *self.encoder_args,
+            "-pix_fmt", self.output_pix_fmt,
+            *self.extra_output_args,
+            self.output_path,
+        ]
+
+    def _start(self, width: int, height: int) -> None:
+        cmd = self._build_command(width, height)
+        threads = self._slot.enter_context(
+            get_ffmpeg_scheduler().slot_sync(self.job_id, encoder_kind(cmd))
+        )
+        cmd = with_threads(cmd, threads)
+        logger.debug(f"[FramePipe] FFmpeg command: {' '.join(cmd)}")
+        try:
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        except BaseException:
+            self._slot.close()
+            raise
+        self._stderr_reader = threading.Thread(
+            target=self._drain_stderr, name="frame-pipe-stderr", daemon=True
+        )
+        self._stderr_reader.start()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="frame-pipe-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _drain_stderr(self) -> None:
+        for line in iter(self._process.stderr.readline, b""):
+            self._stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+        self._process.stderr.close()
+
+    def _write_loop(self) -> None:
+        stdin = self._process.stdin
+        while True:
+            item = self._queue.get()
+            if item is _SENTINEL:
+                break
+            if self._error is not None:
+                continue  # FFmpeg is gone; keep draining so producers never block
+            try:
+                stdin.write(memoryview(item))
+            except (BrokenPipeError, OSError) as e:
+                self._error = e
+        try:
+            stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _stderr_text(self) -> str:
+        return "\n".join(self._stderr_tail)
+
+    def _exit_stderr(self) -> str:
+        """Stderr once FFmpeg has exited (a broken pipe usually beats it)."""
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        self._stderr_reader.join(timeout=5)
+        return self._stderr_text()
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def write(self, frame: np.ndarray) -> None:
+        """Queue one frame for encoding (blocks while the queue is full)."""
+        if self._closed:
+            raise RuntimeError("FramePipeEncoder is closed")
+        if self._error is not None:
+            raise RuntimeError(f"FFmpeg pipe closed: {self._exit_stderr() or self._error}")
+
+        if frame.dtype != np.uint8:
+            frame = np.clip(frame, 0, 255).astype(np.uint8)
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
+        if frame.shape[2] != self._channels:
+            raise ValueError(
+                f"Expected {self._channels} channels for {self.pix_fmt}, got {frame.shape[2]}"
+            )
+
+        if self._shape is None:
+            height, width = frame.shape[:2]
+            self._shape = frame.shape
+            self._start(width, height)
+        elif frame.shape != self._shape:
+            raise ValueError(f"Frame shape changed from {self._shape} to {frame.shape}")
+
+        # The writer thread may hold the frame after we return, so it needs
+        # its own contiguous buffer (callers often reuse theirs)
+        self._queue.put(np.array(frame, dtype=np.uint8, order="C", copy=True))
+        self.frames_written += 1
+
+    def close(self) -> None:
+        """Flush queued frames, wait for FFmpeg and raise if encoding failed."""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._process is None:
+            raise RuntimeError("FFmpeg encoding failed: no frames were written")
+
+        self._queue.put(_SENTINEL)
+        self._writer.join()
+        returncode = self._process.wait()
+        self._slot.close()
+        self._stderr_reader.join(timeout=5)
+
+        if returncode != 0 or self._error is not None:
+            stderr = self._stderr_text()
+            logger.error(f"[FramePipe] FFmpeg error: {stderr}")
+            raise RuntimeError(f"FFmpeg encoding failed: {stderr or self._error}")
+
+        logger.debug(f"[FramePipe] Encoded {self.frames_written} frames to {self.output_path}")
+
+    def abort(self) -> None:
+        """Stop FFmpeg without waiting for queued frames."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._process is None:
+            return
+
+        self._error = self._error or RuntimeError("aborted")
+        self._process.kill()
+        self._queue.put(_SENTINEL)
+        self._writer.join(timeout=5)
+        self._process.wait()
+        self._slot.close()
+
+    def __enter__(self) -> "FramePipeEncoder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -1,30 +1,92 @@
-"""Redis-based job queue for managing render jobs."""
+"""Redis-based job queue for managing render jobs.
+
+Job state lives in a Redis hash (``compose:job:{id}``), one JSON-encoded
+value per field, and the request payload in a separate string key
+(``compose:job:{id}:data``). An update writes only the fields it changes
+in one scripted HSET, so concurrent updates (progress ticks, callbacks,
+status changes) no longer overwrite each other and a progress tick no
+longer re-serializes the whole request.
+
+Progress-only updates (progress, current_step, queue position/ETA) are
+coalesced: at most one write per job every
+``job_progress_min_interval_seconds``, with the latest values written when
+the interval ends. Any other update (status, output, error, metadata)
+writes immediately, together with pending progress.
+"""
 
 import redis.asyncio as redis
+import asyncio
 import json
 import logging
-from typing import Optional, Callable, Any
+import time
+from typing import Optional, Callable, Any, Dict
 from datetime import datetime
 
+from ..config import get_settings
 from ..models.responses import JobStatus, JobStatusResponse
+from .render_queue import RenderQueue
 
 logger = logging.getLogger(__name__)
 
+JOB_TTL_SECONDS = 86400  # Expire after 24 hours
+
+# Fields a progress tick may change; updates touching only these are throttled
+PROGRESS_FIELDS = frozenset({"progress", "current_step", "queue_position", "eta_seconds"})
+
+# HSET the given fields only if the job hash exists; refresh both TTLs.
+# KEYS: job hash, payload key. ARGV: ttl, field1, value1, ...
+UPDATE_JOB_SCRIPT = """
+if redis.call('TYPE', KEYS[1]).ok ~= 'hash' then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def _job_key(job_id: str) -> str:
+    return f"compose:job:{job_id}"
+
+
+def _data_key(job_id: str) -> str:
+    return f"compose:job:{job_id}:data"
+
 
 class InMemoryJobStore:
-    """In-memory fallback when Redis is unavailable."""
+    """In-memory fallback when Redis is unavailable (same commands, no expiry)."""
 
     def __init__(self):
-        self._jobs: dict[str, str] = {}
+        self._values: dict[str, str] = {}
+        self._hashes: dict[str, dict[str, str]] = {}
 
     async def set(self, key: str, value: str, ex: int = None) -> None:
-        self._jobs[key] = value
+        self._values[key] = value
 
     async def get(self, key: str) -> Optional[str]:
-        return self._jobs.get(key)
+        return self._values.get(key)
 
-    async def delete(self, key: str) -> None:
-        self._jobs.pop(key, None)
+    async def hset(self, name: str, mapping: Dict[str, str]) -> None:
+        self._hashes.setdefault(name, {}).update(mapping)
+
+    async def hgetall(self, name: str) -> Dict[str, str]:
+        return dict(self._hashes.get(name, {}))
+
+    async def expire(self, name: str, seconds: int) -> None:
+        pass
+
+    async def update_job_fields(self, job_key: str, mapping: Dict[str, str]) -> bool:
+        """UPDATE_JOB_SCRIPT equivalent (atomic: nothing awaits in between)."""
+        if job_key not in self._hashes:
+            return False
+        self._hashes[job_key].update(mapping)
+        return True
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key, None)
+            self._hashes.pop(key, None)
 
     async def close(self) -> None:
         pass
@@ -33,45 +95,68 @@ class InMemoryJobStore:
 class JobQueue:
     """Redis-based job queue for render jobs with in-memory fallback."""
 
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, progress_interval: Optional[float] = None):
         self.redis_url = redis_url
         self.client: Optional[redis.Redis] = None
         self.is_connected = False
         self._fallback_store: Optional[InMemoryJobStore] = None
+        self._update_script = None
+        # Live queue position/ETA for jobs waiting in this process
+        self.render_queue: Optional[RenderQueue] = None
+
+        # Progress coalescing
+        if progress_interval is None:
+            progress_interval = get_settings().job_progress_min_interval_seconds
+        self.progress_interval = progress_interval
+        self._last_write: Dict[str, float] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
 
     async def connect(self) -> None:
         """Connect to Redis with graceful fallback."""
         try:
-            self.client = redis.from_url(self.redis_url)
+            self.client = redis.from_url(self.redis_url, decode_responses=True)
             await self.client.ping()
+            self._update_script = self.client.register_script(UPDATE_JOB_SCRIPT)
             self.is_connected = True
             logger.info("✅ Connected to Redis")
         except Exception as e:
             logger.warning(f"⚠️ Redis unavailable ({e}), using in-memory job store")
             self._fallback_store = InMemoryJobStore()
             self.client = self._fallback_store
+            self._update_script = None
             self.is_connected = False
 
     async def disconnect(self) -> None:
-        """Disconnect from Redis."""
+        """Write pending progress and disconnect from Redis."""
+        for job_id in list(self._pending):
+            await self._flush(job_id)
         if self.client:
             await self.client.close()
 
     async def create_job(self, job_id: str, data: dict) -> None:
         """Create a new job entry."""
-        job_data = {
+        fields = {
             "job_id": job_id,
             "status": JobStatus.QUEUED.value,
             "progress": 0,
             "current_step": "Queued",
             "created_at": datetime.utcnow().isoformat(),
-            "data": data
         }
-        await self.client.set(
-            f"compose:job:{job_id}",
-            json.dumps(job_data),
-            ex=86400  # Expire after 24 hours
-        )
+        job_key = _job_key(job_id)
+        payload = json.dumps(data, default=str)
+        if self._update_script is None:
+            # In-memory store: nothing awaits in between, so this is atomic too
+            await self.client.delete(job_key)
+            await self.client.hset(job_key, mapping=_encode(fields))
+            await self.client.set(_data_key(job_id), payload)
+            return
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(job_key)
+            pipe.hset(job_key, mapping=_encode(fields))
+            pipe.expire(job_key, JOB_TTL_SECONDS)
+            pipe.set(_data_key(job_id), payload, ex=JOB_TTL_SECONDS)
+            await pipe.execute()
 
     async def update_job(
         self,
@@ -81,41 +166,62 @@ class JobQueue:
         current_step: Optional[str] = None,
         output_url: Optional[str] = None,
         error: Optional[str] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        queue_position: Optional[int] = None,
+        eta_seconds: Optional[float] = None
     ) -> None:
-        """Update job status."""
-        job_data = await self.get_job(job_id)
-        if not job_data:
-            return
-
+        """Update job status (only the given fields; no-op for unknown jobs)."""
+        fields: Dict[str, Any] = {}
         if status:
             # Handle both Enum and string status values
-            job_data["status"] = status.value if hasattr(status, 'value') else status
+            fields["status"] = status.value if hasattr(status, 'value') else status
         if progress is not None:
-            job_data["progress"] = progress
+            fields["progress"] = progress
         if current_step:
-            job_data["current_step"] = current_step
+            fields["current_step"] = current_step
         if output_url:
-            job_data["output_url"] = output_url
+            fields["output_url"] = output_url
         if error:
-            job_data["error"] = error
+            fields["error"] = error
         if metadata:
-            job_data["metadata"] = metadata
+            fields["metadata"] = metadata
+        if queue_position is not None:
+            fields["queue_position"] = queue_position
+        if eta_seconds is not None:
+            fields["eta_seconds"] = eta_seconds
+        if not fields:
+            return
 
-        job_data["updated_at"] = datetime.utcnow().isoformat()
+        if fields.keys() <= PROGRESS_FIELDS:
+            last_write = self._last_write.get(job_id)
+            since_last = time.monotonic() - last_write if last_write is not None else self.progress_interval
+            if since_last < self.progress_interval:
+                # Coalesce: the latest values are written when the interval ends
+                self._pending.setdefault(job_id, {}).update(fields)
+                if job_id not in self._flush_tasks:
+                    self._flush_tasks[job_id] = asyncio.create_task(
+                        self._flush_later(job_id, self.progress_interval - since_last)
+                    )
+                return
 
-        await self.client.set(
-            f"compose:job:{job_id}",
-            json.dumps(job_data),
-            ex=86400
-        )
+        await self._write(job_id, {**self._take_pending(job_id), **fields})
 
     async def get_job(self, job_id: str) -> Optional[dict]:
-        """Get job data by ID."""
-        data = await self.client.get(f"compose:job:{job_id}")
-        if data:
-            return json.loads(data)
-        return None
+        """Get job state by ID (the request payload is in get_job_data)."""
+        try:
+            fields = await self.client.hgetall(_job_key(job_id))
+        except redis.ResponseError:
+            # Job created before job state moved to hashes (JSON blob)
+            data = await self.client.get(_job_key(job_id))
+            return json.loads(data) if data else None
+        if not fields:
+            return None
+        return {name: json.loads(value) for name, value in fields.items()}
+
+    async def get_job_data(self, job_id: str) -> Optional[dict]:
+        """Get the request payload stored with the job."""
+        data = await self.client.get(_data_key(job_id))
+        return json.loads(data) if data else None
 
     async def get_job_status(self, job_id: str) -> Optional[JobStatusResponse]:
         """Get job status response."""
@@ -123,18 +229,71 @@ class JobQueue:
         if not job_data:
             return None
 
+        status = JobStatus(job_data.get("status", "queued"))
+        queue_status = self.render_queue.status(job_id) if self.render_queue else None
+        if queue_status is None and status == JobStatus.QUEUED:
+            # Queued in another process: last reported position and ETA
+            queue_status = {
+                "queue_position": job_data.get("queue_position"),
+                "eta_seconds": job_data.get("eta_seconds"),
+            }
+
         return JobStatusResponse(
             job_id=job_id,
-            status=JobStatus(job_data.get("status", "queued")),
+            status=status,
             progress=job_data.get("progress", 0),
             current_step=job_data.get("current_step"),
             output_url=job_data.get("output_url"),
-            error=job_data.get("error")
+            error=job_data.get("error"),
+            **(queue_status or {})
         )
 
     async def delete_job(self, job_id: str) -> None:
         """Delete a job entry."""
-        await self.client.delete(f"compose:job:{job_id}")
+        self._take_pending(job_id)
+        self._last_write.pop(job_id, None)
+        await self.client.delete(_job_key(job_id), _data_key(job_id))
+
+    # =========================================================================
+    # Writes
+    # =========================================================================
+
+    async def _write(self, job_id: str, fields: Dict[str, Any]) -> None:
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        mapping = _encode(fields)
+        if fields.get("status") in (JobStatus.COMPLETED.value, JobStatus.FAILED.value):
+            self._last_write.pop(job_id, None)
+        else:
+            self._last_write[job_id] = time.monotonic()
+        if self._update_script is None:
+            await self.client.update_job_fields(_job_key(job_id), mapping)
+            return
+        args = [JOB_TTL_SECONDS]
+        for name, value in mapping.items():
+            args.extend((name, value))
+        await self._update_script(keys=[_job_key(job_id), _data_key(job_id)], args=args)
+
+    def _take_pending(self, job_id: str) -> Dict[str, Any]:
+        task = self._flush_tasks.pop(job_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        return self._pending.pop(job_id, {})
+
+    async def _flush_later(self, job_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._flush(job_id)
+
+    async def _flush(self, job_id: str) -> None:
+        fields = self._take_pending(job_id)
+        if fields:
+            try:
+                await self._write(job_id, fields)
+            except Exception as e:
+                logger.warning(f"[JobQueue] Failed to write progress for {job_id}: {e}")
+
+
+def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+    return {name: json.dumps(value) for name, value in fields.items()}
 
 
 async def create_progress_callback(
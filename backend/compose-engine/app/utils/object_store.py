@@ -0,0 +1,701 @@
+"""Process-wide async object-store client with a shared connection pool.
+
+Every S3Client used to own a boto3 client and push each blocking call
+through a fixed 8-thread pool, so under concurrent jobs downloads queued
+behind uploads (and both behind the pool size). ObjectStore replaces that:
+
+- One httpx.AsyncClient per process (per event loop) whose connection
+  pool is shared by every backend and job. Requests are signed in-process
+  (SigV4 with botocore's signer, OAuth bearer tokens for GCS), so there
+  are no thread hops on the request path.
+- Separate concurrency budgets for downloads and uploads
+  (``object_store_download_connections`` / ``object_store_upload_connections``),
+  so a burst of output uploads can't starve asset downloads or vice versa.
+- stats(): per budget in use / waiting / peak / time spent waiting, plus
+  requests in flight against the HTTP pool size (served at /object-store/stats).
+- Pluggable backends addressed by URI scheme - ``s3://bucket/key``,
+  ``gs://bucket/key`` and ``file://bucket/key`` (local directory) - with
+  one interface: head, get (streamed, ranged), put, multipart, delete.
+
+S3 and GCS both speak the S3 XML API (GCS through its XML endpoint), so
+they share one implementation and differ only in URLs and auth.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+import uuid
+import weakref
+import xml.etree.ElementTree as ET
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import aiofiles
+import httpx
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Bytes per chunk yielded by get()
+CHUNK_SIZE = 1024 * 1024
+
+
+class ObjectStoreError(Exception):
+    """A request the storage service answered with an error."""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        code: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        region: Optional[str] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.headers = headers or {}
+        self.region = region
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in RETRY_STATUSES
+
+
+def retryable_store_error(error: Exception) -> bool:
+    """Connection problems and throttling, not missing objects or changed ones."""
+    if isinstance(error, ObjectStoreError):
+        return error.retryable
+    return isinstance(error, (httpx.TransportError, OSError))
+
+
+@dataclass
+class ObjectInfo:
+    """Metadata of a stored object."""
+    size: int
+    etag: Optional[str] = None  # Without quotes
+    content_type: Optional[str] = None
+
+
+def parse_uri(uri: str) -> Tuple[str, str, str]:
+    """Split ``scheme://bucket/key`` into (scheme, bucket, key)."""
+    scheme, sep, rest = uri.partition("://")
+    bucket, _, key = rest.partition("/")
+    if not sep or not bucket or not key:
+        raise ValueError(f"Invalid object URI: {uri}")
+    return scheme, bucket, key
+
+
+class ConnectionBudget:
+    """Bounded number of concurrent requests, with utilization counters."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.acquired = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_seconds += time.monotonic() - start
+        self.in_use += 1
+        self.acquired += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        try:
+            yield
+        finally:
+            self.in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "peak_in_use": self.peak_in_use,
+            "acquired": self.acquired,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "utilization": self.in_use / self.limit,
+        }
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+class ObjectStoreBackend(ABC):
+    """One kind of storage target; ObjectStore adds routing and budgets."""
+
+    scheme = ""
+
+    @abstractmethod
+    async def head(self, bucket: str, key: str) -> ObjectInfo:
+        pass
+
+    @abstractmethod
+    def get(
+        self,
+        bucket: str,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        if_match: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream bytes start..end (inclusive); fails if the ETag is no longer if_match."""
+
+    @abstractmethod
+    async def put(self, bucket: str, key: str, data: bytes, content_type: Optional[str] = None) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def create_multipart(self, bucket: str, key: str, content_type: Optional[str] = None) -> str:
+        pass
+
+    @abstractmethod
+    async def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        pass
+
+    @abstractmethod
+    async def complete_multipart(self, bucket: str, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        pass
+
+    @abstractmethod
+    async def abort_multipart(self, bucket: str, key: str, upload_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, bucket: str, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def public_url(self, bucket: str, key: str) -> str:
+        pass
+
+
+class _XmlApiBackend(ObjectStoreBackend):
+    """S3 XML API over the shared HTTP client (used by S3 and GCS)."""
+
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+
+    @abstractmethod
+    def _object_url(self, bucket: str, key: str) -> str:
+        pass
+
+    @abstractmethod
+    async def _sign(self, method: str, url: str, headers: Dict[str, str], body: bytes, bucket: str) -> Dict[str, str]:
+        pass
+
+    async def _send(
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        params: Optional[Dict[str, object]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+        stream: bool = False,
+    ) -> httpx.Response:
+        url = self._object_url(bucket, key)
+        if params:
+            url += "?" + urlencode(sorted(params.items()), quote_via=quote)
+        signed = await self._sign(method, url, dict(headers or {}), body, bucket)
+        request = self.http.build_request(
+            method, url, headers=signed, content=body if method in ("PUT", "POST") else None
+        )
+        response = await self.http.send(request, stream=stream, follow_redirects=False)
+        if response.status_code >= 300:
+            data = await response.aread()
+            await response.aclose()
+            raise _error_from_response(response, data, f"{method} {bucket}/{key}")
+        return response
+
+    async def head(self, bucket: str, key: str) -> ObjectInfo:
+        response = await self._send("HEAD", bucket, key)
+        return ObjectInfo(
+            size=int(response.headers.get("content-length", 0)),
+            etag=response.headers.get("etag", "").strip('"') or None,
+            content_type=response.headers.get("content-type"),
+        )
+
+    async def get(self, bucket, key, start=0, end=None, if_match=None):
+        headers = {}
+        if start or end is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        if if_match:
+            headers["If-Match"] = f'"{if_match}"'
+        response = await self._send("GET", bucket, key, headers=headers, stream=True)
+        try:
+            if start and response.status_code != 206:
+                raise ObjectStoreError(f"Range not honoured for {bucket}/{key}", status=response.status_code)
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def put(self, bucket, key, data, content_type=None):
+        headers = {"Content-Type": content_type} if content_type else {}
+        response = await self._send("PUT", bucket, key, headers=headers, body=data)
+        return response.headers.get("etag", "").strip('"') or None
+
+    async def create_multipart(self, bucket, key, content_type=None):
+        headers = {"Content-Type": content_type} if content_type else {}
+        response = await self._send("POST", bucket, key, params={"uploads": ""}, headers=headers)
+        upload_id = _xml_value(response.content, "UploadId")
+        if not upload_id:
+            raise ObjectStoreError(f"No UploadId in response for {bucket}/{key}")
+        return upload_id
+
+    async def upload_part(self, bucket, key, upload_id, part_number, data):
+        response = await self._send(
+            "PUT", bucket, key, params={"partNumber": part_number, "uploadId": upload_id}, body=data
+        )
+        return response.headers["etag"]
+
+    async def complete_multipart(self, bucket, key, upload_id, parts):
+        body = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in parts
+        ) + "</CompleteMultipartUpload>"
+        response = await self._send(
+            "POST", bucket, key, params={"uploadId": upload_id}, body=body.encode("utf-8"),
+            headers={"Content-Type": "application/xml"},
+        )
+        # S3 can report a failed completion in a 200 response
+        if b"<Error>" in response.content:
+            raise _error_from_response(response, response.content, f"complete {bucket}/{key}", status=500)
+
+    async def abort_multipart(self, bucket, key, upload_id):
+        await self._send("DELETE", bucket, key, params={"uploadId": upload_id})
+
+    async def delete(self, bucket, key):
+        await self._send("DELETE", bucket, key)
+
+
+class S3Backend(_XmlApiBackend):
+    """AWS S3 (or an S3-compatible endpoint such as MinIO), signed with SigV4."""
+
+    scheme = "s3"
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        region: str,
+        endpoint_url: str = "",
+        access_key_id: str = "",
+        secret_access_key: str = "",
+    ):
+        super().__init__(http)
+        self.region = region
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self._regions: Dict[str, str] = {}  # bucket -> region learned from redirects
+        self._credentials = None
+        if access_key_id and secret_access_key:
+            from botocore.credentials import Credentials
+            self._credentials = Credentials(access_key_id, secret_access_key)
+        logger.info(
+            f"[ObjectStore] S3 backend: region={region}, endpoint={self.endpoint_url or 'AWS'}, "
+            f"credentials={'explicit' if self._credentials else 'default chain (IAM role/environment)'}"
+        )
+
+    def _region_for(self, bucket: str) -> str:
+        return self._regions.get(bucket, self.region)
+
+    def _base_url(self, bucket: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url}/{bucket}"
+        host = f"s3.{self._region_for(bucket)}.amazonaws.com"
+        if "." in bucket:
+            # The wildcard certificate doesn't cover dotted bucket names: use path style
+            return f"https://{host}/{bucket}"
+        return f"https://{bucket}.{host}"
+
+    def _object_url(self, bucket: str, key: str) -> str:
+        return f"{self._base_url(bucket)}/{quote(key, safe='/~')}"
+
+    def public_url(self, bucket: str, key: str) -> str:
+        return f"{self._base_url(bucket)}/{key}"
+
+    async def _frozen_credentials(self):
+        if self._credentials is None:
+            import botocore.session
+            # One-time credential chain lookup (may query the instance metadata service)
+            self._credentials = await asyncio.to_thread(botocore.session.get_session().get_credentials)
+            if self._credentials is None:
+                raise ObjectStoreError("No AWS credentials found")
+        refresh_needed = getattr(self._credentials, "refresh_needed", None)
+        if refresh_needed and refresh_needed():
+            return await asyncio.to_thread(self._credentials.get_frozen_credentials)
+        return self._credentials.get_frozen_credentials()
+
+    async def _sign(self, method, url, headers, body, bucket):
+        from botocore.auth import S3SigV4Auth
+        from botocore.awsrequest import AWSRequest
+        from botocore.config import Config
+
+        request = AWSRequest(method=method, url=url, headers=headers, data=body)
+        # Over HTTPS the body is covered by TLS; skip hashing every part
+        request.context["client_config"] = Config(s3={"payload_signing_enabled": not url.startswith("https")})
+        S3SigV4Auth(await self._frozen_credentials(), "s3", self._region_for(bucket)).add_auth(request)
+        return dict(request.headers.items())
+
+    async def _send(self, method, bucket, key, **kwargs):
+        try:
+            return await super()._send(method, bucket, key, **kwargs)
+        except ObjectStoreError as e:
+            region = e.headers.get("x-amz-bucket-region") or e.region
+            if self.endpoint_url or e.status not in (301, 400) or not region or region == self._region_for(bucket):
+                raise
+            logger.info(f"[ObjectStore] Bucket {bucket} is in {region}, retrying there")
+            self._regions[bucket] = region
+            return await super()._send(method, bucket, key, **kwargs)
+
+
+class GCSBackend(_XmlApiBackend):
+    """Google Cloud Storage through its S3-compatible XML API (OAuth bearer token)."""
+
+    scheme = "gs"
+
+    def __init__(self, http: httpx.AsyncClient, credentials_factory: Optional[Callable[[], object]] = None):
+        super().__init__(http)
+        self._credentials_factory = credentials_factory or _default_gcp_credentials
+        self._credentials = None
+
+    def _object_url(self, bucket: str, key: str) -> str:
+        return f"https://storage.googleapis.com/{bucket}/{quote(key, safe='/~')}"
+
+    def public_url(self, bucket: str, key: str) -> str:
+        return f"https://storage.googleapis.com/{bucket}/{key}"
+
+    async def _sign(self, method, url, headers, body, bucket):
+        if self._credentials is None:
+            self._credentials = await asyncio.to_thread(self._credentials_factory)
+        if not self._credentials.valid:
+            # Token refresh is a blocking call, but only about once an hour
+            from google.auth.transport.requests import Request
+            await asyncio.to_thread(self._credentials.refresh, Request())
+        headers["Authorization"] = f"Bearer {self._credentials.token}"
+        return headers
+
+
+def _default_gcp_credentials():
+    from ..services.gcp_auth import get_auth_manager
+    return get_auth_manager().get_credentials()
+
+
+class LocalBackend(ObjectStoreBackend):
+    """Objects as files under ``root/bucket/key`` (development, tests, shared volumes)."""
+
+    scheme = "file"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, bucket, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Object key escapes the store root: {bucket}/{key}")
+        return path
+
+    def _multipart_dir(self, upload_id: str) -> str:
+        return os.path.join(self.root, ".multipart", upload_id)
+
+    def _stat(self, bucket: str, key: str) -> os.stat_result:
+        try:
+            return os.stat(self._path(bucket, key))
+        except FileNotFoundError:
+            raise ObjectStoreError(f"No such object: {bucket}/{key}", status=404, code="NoSuchKey")
+
+    @staticmethod
+    def _etag(st: os.stat_result) -> str:
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    async def head(self, bucket, key):
+        st = self._stat(bucket, key)
+        return ObjectInfo(size=st.st_size, etag=self._etag(st), content_type=mimetypes.guess_type(key)[0])
+
+    async def get(self, bucket, key, start=0, end=None, if_match=None):
+        st = self._stat(bucket, key)
+        if if_match and self._etag(st) != if_match:
+            raise ObjectStoreError(f"Object changed: {bucket}/{key}", status=412, code="PreconditionFailed")
+        remaining = (st.st_size if end is None else end + 1) - start
+        async with aiofiles.open(self._path(bucket, key), "rb") as f:
+            await f.seek(start)
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(data)
+        os.replace(tmp_path, path)
+
+    async def put(self, bucket, key, data, content_type=None):
+        await self._write(self._path(bucket, key), data)
+        return self._etag(self._stat(bucket, key))
+
+    async def create_multipart(self, bucket, key, content_type=None):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._multipart_dir(upload_id))
+        return upload_id
+
+    async def upload_part(self, bucket, key, upload_id, part_number, data):
+        await self._write(os.path.join(self._multipart_dir(upload_id), f"{part_number:05d}"), data)
+        return hashlib.md5(data).hexdigest()
+
+    async def complete_multipart(self, bucket, key, upload_id, parts):
+        part_dir = self._multipart_dir(upload_id)
+        path = self._path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{upload_id}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as out:
+            for number, _ in parts:
+                async with aiofiles.open(os.path.join(part_dir, f"{number:05d}"), "rb") as part:
+                    await out.write(await part.read())
+        os.replace(tmp_path, path)
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    async def abort_multipart(self, bucket, key, upload_id):
+        shutil.rmtree(self._multipart_dir(upload_id), ignore_errors=True)
+
+    async def delete(self, bucket, key):
+        try:
+            os.remove(self._path(bucket, key))
+        except FileNotFoundError:
+            pass
+
+    def public_url(self, bucket, key):
+        return f"file://{self._path(bucket, key)}"
+
+
+def _xml_value(data: bytes, tag: str) -> Optional[str]:
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return None
+    for element in root.iter():
+        if element.tag.rsplit("}", 1)[-1] == tag:
+            return element.text
+    return None
+
+
+def _error_from_response(
+    response: httpx.Response,
+    data: bytes,
+    what: str,
+    status: Optional[int] = None,
+) -> ObjectStoreError:
+    code = _xml_value(data, "Code") if data else None
+    message = _xml_value(data, "Message") if data else None
+    return ObjectStoreError(
+        f"{what} failed: {response.status_code} {code or ''} {message or ''}".strip(),
+        status=status or response.status_code,
+        code=code,
+        headers=dict(response.headers),
+        region=_xml_value(data, "Region") if data else None,
+    )
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+BackendFactory = Callable[[httpx.AsyncClient], ObjectStoreBackend]
+
+
+class ObjectStore:
+    """Routes object URIs to backends through shared connection budgets."""
+
+    def __init__(
+        self,
+        download_connections: int = 16,
+        upload_connections: int = 8,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        http: Optional[httpx.AsyncClient] = None,
+    ):
+        self.max_connections = download_connections + upload_connections
+        self.http = http or httpx.AsyncClient(
+            follow_redirects=True,  # For plain HTTP downloads; backends opt out
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        self.downloads = ConnectionBudget("downloads", download_connections)
+        self.uploads = ConnectionBudget("uploads", upload_connections)
+        self._factories: Dict[str, BackendFactory] = {}
+        self._backends: Dict[str, ObjectStoreBackend] = {}
+
+    def register(self, scheme: str, factory: BackendFactory) -> None:
+        """Register a backend for ``scheme://`` URIs (created on first use)."""
+        self._factories[scheme] = factory
+        self._backends.pop(scheme, None)
+
+    def backend(self, scheme: str) -> ObjectStoreBackend:
+        backend = self._backends.get(scheme)
+        if backend is None:
+            if scheme not in self._factories:
+                raise ValueError(f"No object store backend for {scheme}://")
+            backend = self._backends[scheme] = self._factories[scheme](self.http)
+        return backend
+
+    def _route(self, uri: str) -> Tuple[ObjectStoreBackend, str, str]:
+        scheme, bucket, key = parse_uri(uri)
+        return self.backend(scheme), bucket, key
+
+    # Downloads ---------------------------------------------------------------
+
+    async def head(self, uri: str) -> ObjectInfo:
+        backend, bucket, key = self._route(uri)
+        async with self.downloads.slot():
+            return await backend.head(bucket, key)
+
+    async def iter_bytes(
+        self,
+        uri: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        if_match: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream an object (or bytes start..end); holds a download slot while iterating."""
+        backend, bucket, key = self._route(uri)
+        async with self.downloads.slot():
+            async with aclosing(backend.get(bucket, key, start, end, if_match)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    async def read(
+        self,
+        uri: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        if_match: Optional[str] = None,
+    ) -> bytes:
+        async with aclosing(self.iter_bytes(uri, start, end, if_match)) as chunks:
+            return b"".join([chunk async for chunk in chunks])
+
+    # Uploads -----------------------------------------------------------------
+
+    async def put(self, uri: str, data: bytes, content_type: Optional[str] = None) -> Optional[str]:
+        backend, bucket, key = self._route(uri)
+        async with self.uploads.slot():
+            return await backend.put(bucket, key, data, content_type)
+
+    async def create_multipart(self, uri: str, content_type: Optional[str] = None) -> str:
+        backend, bucket, key = self._route(uri)
+        async with self.uploads.slot():
+            return await backend.create_multipart(bucket, key, content_type)
+
+    async def upload_part(self, uri: str, upload_id: str, part_number: int, data: bytes) -> str:
+        backend, bucket, key = self._route(uri)
+        async with self.uploads.slot():
+            return await backend.upload_part(bucket, key, upload_id, part_number, data)
+
+    async def complete_multipart(self, uri: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        backend, bucket, key = self._route(uri)
+        async with self.uploads.slot():
+            await backend.complete_multipart(bucket, key, upload_id, parts)
+
+    async def abort_multipart(self, uri: str, upload_id: str) -> None:
+        backend, bucket, key = self._route(uri)
+        async with self.uploads.slot():
+            await backend.abort_multipart(bucket, key, upload_id)
+
+    async def delete(self, uri: str) -> None:
+        backend, bucket, key = self._route(uri)
+        async with self.uploads.slot():
+            await backend.delete(bucket, key)
+
+    def public_url(self, uri: str) -> str:
+        backend, bucket, key = self._route(uri)
+        return backend.public_url(bucket, key)
+
+    # Metrics / lifecycle -----------------------------------------------------
+
+    def stats(self) -> Dict[str, object]:
+        """Budget utilization and HTTP connection pool usage."""
+        # Every request holds a budget slot, so the budgets count what is in flight
+        pool = {
+            "max_connections": self.max_connections,
+            "in_flight": self.downloads.in_use + self.uploads.in_use,
+        }
+        return {
+            "downloads": self.downloads.stats(),
+            "uploads": self.uploads.stats(),
+            "http_pool": pool,
+            "backends": sorted(self._backends),
+        }
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+
+def create_object_store() -> ObjectStore:
+    """Object store configured from settings, with S3, GCS and local backends."""
+    settings = get_settings()
+    store = ObjectStore(
+        download_connections=settings.object_store_download_connections,
+        upload_connections=settings.object_store_upload_connections,
+        connect_timeout=settings.object_store_connect_timeout,
+        read_timeout=settings.object_store_read_timeout,
+    )
+    store.register("s3", lambda http: S3Backend(
+        http,
+        region=settings.aws_region,
+        endpoint_url=settings.aws_s3_endpoint_url,
+        access_key_id=settings.aws_access_key_id,
+        secret_access_key=settings.aws_secret_access_key,
+    ))
+    store.register("gs", GCSBackend)
+    store.register("file", lambda http: LocalBackend(settings.object_store_local_root))
+    return store
+
+
+# One store per event loop: the HTTP pool and budgets belong to the loop
+# that created them (Modal functions run each call in a fresh asyncio.run)
+_stores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ObjectStore]" = weakref.WeakKeyDictionary()
+
+
+def get_object_store() -> ObjectStore:
+    """Get the process-wide object store for the running event loop."""
+    loop = asyncio.get_running_loop()
+    store = _stores.get(loop)
+    if store is None:
+        store = _stores[loop] = create_object_store()
+    return store
+
+
+async def close_object_store() -> None:
+    """Close the running loop's object store (on shutdown)."""
+    store = _stores.pop(asyncio.get_running_loop(), None)
+    if store:
+        await store.close()
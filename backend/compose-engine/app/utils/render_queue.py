@@ -0,0 +1,301 @@
+"""Priority-aware admission queue for render jobs.
+
+Auto-compose and video-edit jobs used to wait on a plain asyncio.Semaphore,
+so an interactive render submitted behind a batch of 50 variations waited
+for all of them, and nobody could see how deep the queue was. RenderQueue
+admits up to ``max_concurrent_jobs`` jobs at once and decides who goes next:
+
+- Priority first: interactive > variation > batch. A waiting job moves up
+  one priority level every ``render_queue_aging_seconds`` so batches are
+  never starved.
+- Within a priority, the tenant with the fewest running jobs goes first
+  (fair share), oldest request first.
+
+It also keeps queue-length and wait-time metrics, and per-kind history of
+how long jobs run, which gives each waiting job a queue position and an
+ETA for when it will start.
+
+Usage:
+    async with render_queue.slot(job_id, RenderPriority.INTERACTIVE, tenant):
+        ...
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPriority(str, Enum):
+    """Render priorities, most urgent first."""
+    INTERACTIVE = "interactive"
+    VARIATION = "variation"
+    BATCH = "batch"
+
+    @property
+    def rank(self) -> int:
+        return _PRIORITY_RANK[self]
+
+    @classmethod
+    def parse(cls, value: Optional[str], default: "RenderPriority") -> "RenderPriority":
+        """Priority from a request field (unknown values use the default)."""
+        try:
+            return cls(value) if value else default
+        except ValueError:
+            return default
+
+
+_PRIORITY_RANK = {
+    RenderPriority.INTERACTIVE: 0,
+    RenderPriority.VARIATION: 1,
+    RenderPriority.BATCH: 2,
+}
+
+
+@dataclass
+class RenderTicket:
+    """A job waiting for (or holding) a render slot."""
+    job_id: str
+    priority: RenderPriority
+    tenant: str
+    kind: str
+    seq: int
+    enqueued_at: float
+    future: asyncio.Future = field(repr=False)
+    started_at: Optional[float] = None
+
+
+class RenderQueue:
+    """Admits render jobs by priority and tenant fair share."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        aging_seconds: float = 300.0,
+        history_size: int = 50,
+        default_duration: float = 60.0,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            max_concurrent: Jobs rendering at once
+            aging_seconds: Waiting time that promotes a job one priority level (0 disables)
+            history_size: Finished jobs per kind used for duration estimates
+            default_duration: Estimated duration before any job of a kind finished
+            clock: Time source (monotonic seconds)
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.aging_seconds = aging_seconds
+        self.default_duration = default_duration
+        self._clock = clock
+
+        self._seq = itertools.count()
+        self._waiting: List[RenderTicket] = []
+        # Keyed by ticket seq: a redelivered job can hold two tickets at once
+        self._running: Dict[int, RenderTicket] = {}
+        self._running_by_tenant = Counter()
+        self._durations: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=history_size))
+        self._waits: Dict[RenderPriority, Deque[float]] = defaultdict(lambda: deque(maxlen=history_size))
+        self._stats = {"admitted": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        job_id: str,
+        priority: RenderPriority = RenderPriority.INTERACTIVE,
+        tenant: str = "default",
+        kind: str = "render",
+    ) -> AsyncIterator[RenderTicket]:
+        """Wait for a render slot and hold it for the duration of the block."""
+        ticket = self.enqueue(job_id, priority, tenant, kind)
+        try:
+            await ticket.future
+        except BaseException:
+            self.release(ticket)
+            raise
+
+        try:
+            yield ticket
+        except BaseException:
+            self.release(ticket, failed=True)
+            raise
+        self.release(ticket)
+
+    def enqueue(
+        self,
+        job_id: str,
+        priority: RenderPriority = RenderPriority.INTERACTIVE,
+        tenant: str = "default",
+        kind: str = "render",
+    ) -> RenderTicket:
+        """Add a job to the queue; its future resolves when it is admitted.
+
+        Every ticket must be passed to release() once the job is done (or
+        gives up waiting).
+        """
+        ticket = RenderTicket(
+            job_id=job_id,
+            priority=RenderPriority(priority),
+            tenant=tenant or "default",
+            kind=kind,
+            seq=next(self._seq),
+            enqueued_at=self._clock(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiting.append(ticket)
+        self._dispatch()
+        return ticket
+
+    def release(self, ticket: RenderTicket, failed: bool = False) -> None:
+        """Free the ticket's slot, or drop it from the queue if never admitted.
+
+        Only successful jobs feed the duration history used for ETAs.
+        """
+        if self._running.get(ticket.seq) is ticket:
+            del self._running[ticket.seq]
+            self._running_by_tenant[ticket.tenant] -= 1
+            if self._running_by_tenant[ticket.tenant] <= 0:
+                del self._running_by_tenant[ticket.tenant]
+            if failed:
+                self._stats["failed"] += 1
+            else:
+                self._stats["completed"] += 1
+                self._durations[ticket.kind].append(self._clock() - ticket.started_at)
+        elif ticket in self._waiting:
+            self._waiting.remove(ticket)
+            self._stats["cancelled"] += 1
+        else:
+            return  # Already released
+        self._dispatch()
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place in line (0 while rendering, None if unknown)."""
+        if self._is_running(job_id):
+            return 0
+        for index, ticket in enumerate(self._ordered_waiting()):
+            if ticket.job_id == job_id:
+                return index + 1
+        return None
+
+    def estimate_duration(self, kind: str) -> float:
+        """Mean duration of recent finished jobs of this kind."""
+        history = self._durations.get(kind)
+        if history:
+            return sum(history) / len(history)
+        # No history for this kind yet: fall back to all kinds, then the default
+        every = [d for durations in self._durations.values() for d in durations]
+        return sum(every) / len(every) if every else self.default_duration
+
+    def eta(self, job_id: str) -> Optional[float]:
+        """Estimated seconds until the job starts rendering (0 if running)."""
+        if self._is_running(job_id):
+            return 0.0
+
+        now = self._clock()
+        # When each slot frees up: running jobs finish after their estimate
+        free_at = [
+            max(0.0, self.estimate_duration(t.kind) - (now - t.started_at))
+            for t in self._running.values()
+        ]
+        free_at.extend([0.0] * (self.max_concurrent - len(free_at)))
+        heapq.heapify(free_at)
+
+        for ticket in self._ordered_waiting():
+            start = heapq.heappop(free_at)
+            if ticket.job_id == job_id:
+                return start
+            heapq.heappush(free_at, start + self.estimate_duration(ticket.kind))
+        return None
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """Queue position and ETA for a job (None if not queued or running)."""
+        position = self.position(job_id)
+        if position is None:
+            return None
+        return {"queue_position": position, "eta_seconds": round(self.eta(job_id), 1)}
+
+    def stats(self) -> dict:
+        now = self._clock()
+        waiting_by_priority = Counter(t.priority.value for t in self._waiting)
+        wait_times = {}
+        for priority in RenderPriority:
+            waits = self._waits.get(priority)
+            current = [now - t.enqueued_at for t in self._waiting if t.priority == priority]
+            wait_times[priority.value] = {
+                "avg_seconds": round(sum(waits) / len(waits), 1) if waits else 0.0,
+                "max_seconds": round(max(waits), 1) if waits else 0.0,
+                "oldest_waiting_seconds": round(max(current), 1) if current else 0.0,
+            }
+        return {
+            **self._stats,
+            "max_concurrent": self.max_concurrent,
+            "running": len(self._running),
+            "waiting": len(self._waiting),
+            "waiting_by_priority": {p.value: waiting_by_priority[p.value] for p in RenderPriority},
+            "running_by_tenant": dict(self._running_by_tenant),
+            "wait_times": wait_times,
+            "estimated_duration_seconds": {
+                kind: round(self.estimate_duration(kind), 1) for kind in self._durations
+            },
+        }
+
+    # =========================================================================
+    # Admission
+    # =========================================================================
+
+    def _is_running(self, job_id: str) -> bool:
+        return any(t.job_id == job_id for t in self._running.values())
+
+    def _effective_rank(self, ticket: RenderTicket, now: float) -> int:
+        rank = ticket.priority.rank
+        if self.aging_seconds > 0:
+            rank -= int((now - ticket.enqueued_at) // self.aging_seconds)
+        return max(0, rank)
+
+    def _next_ticket(self, waiting: List[RenderTicket], running_by_tenant: Counter, now: float) -> RenderTicket:
+        return min(
+            waiting,
+            key=lambda t: (self._effective_rank(t, now), running_by_tenant[t.tenant], t.seq),
+        )
+
+    def _ordered_waiting(self) -> List[RenderTicket]:
+        """Waiting tickets in the order they would be admitted."""
+        now = self._clock()
+        waiting = list(self._waiting)
+        running_by_tenant = Counter(self._running_by_tenant)
+        ordered = []
+        while waiting:
+            ticket = self._next_ticket(waiting, running_by_tenant, now)
+            waiting.remove(ticket)
+            running_by_tenant[ticket.tenant] += 1
+            ordered.append(ticket)
+        return ordered
+
+    def _dispatch(self) -> None:
+        now = self._clock()
+        while self._waiting and len(self._running) < self.max_concurrent:
+            ticket = self._next_ticket(self._waiting, self._running_by_tenant, now)
+            self._waiting.remove(ticket)
+            ticket.started_at = now
+            self._running[ticket.seq] = ticket
+            self._running_by_tenant[ticket.tenant] += 1
+            self._waits[ticket.priority].append(now - ticket.enqueued_at)
+            self._stats["admitted"] += 1
+            if not ticket.future.done():
+                ticket.future.set_result(None)
+            logger.info(
+                f"[RenderQueue] Admitted {ticket.job_id} ({ticket.priority.value}, tenant={ticket.tenant}) "
+                f"after {now - ticket.enqueued_at:.1f}s; {len(self._waiting)} waiting"
+            )
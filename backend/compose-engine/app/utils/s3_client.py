@@ -1,318 +1,160 @@
 """AWS S3 client for file operations with optimized parallel downloads.
 
-Last update: 2025-12-12 - Added 403 fallback with placeholder image generation.
+S3 URLs go through the shared ObjectStore, other URLs are streamed over HTTP
+with browser-like headers; downloader.py rejects HTML error pages and
+corrupt images instead of falling back to a placeholder.
 """
 
-import boto3
-from botocore.config import Config
-import aiofiles
-import httpx
 import asyncio
-import os
+import re
 import logging
+from functools import lru_cache
 from typing import Optional, List, Tuple
-from concurrent.futures import ThreadPoolExecutor
-from PIL import Image, ImageDraw, ImageFont
-import io
 
 from ..config import get_settings
+from .asset_cache import get_asset_cache
+from .downloader import IMAGE_EXTENSIONS, DownloadResult, download_http, download_object
+from .object_store import ObjectStore, get_object_store
+from .uploader import StreamingUpload, UploadProgress, upload_multipart
 
 logger = logging.getLogger(__name__)
 
-# User-Agent rotation for bypassing hotlink protection
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "Googlebot-Image/1.0",  # Some sites allow Googlebot
-    "facebookexternalhit/1.1",  # Facebook crawler - often allowed
-]
-
-
-def is_valid_image(data: bytes) -> bool:
-    """Check if data is a valid image file."""
-    try:
-        # Try to open as image
-        img = Image.open(io.BytesIO(data))
-        img.verify()  # Verify it's a valid image
-        return True
-    except Exception:
-        return False
-
-
-def is_html_response(data: bytes) -> bool:
-    """Check if response is HTML (common for hotlink protection blocks)."""
-    try:
-        text = data[:1000].decode('utf-8', errors='ignore').lower()
-        return '<html' in text or '<!doctype' in text or '<head' in text
-    except Exception:
-        return False
-
-
-def create_placeholder_image(
-    local_path: str,
-    width: int = 1080,
-    height: int = 1920,
-    message: str = "Image Unavailable",
-) -> str:
-    """Create a placeholder image when download fails.
-
-    Args:
-        local_path: Path to save the placeholder image
-        width: Image width
-        height: Image height
-        message: Text to display on placeholder
-
-    Returns:
-        Path to the created placeholder image
-    """
-    # Create a dark gradient background
-    img = Image.new("RGB", (width, height), (30, 30, 40))
-    draw = ImageDraw.Draw(img)
-
-    # Add subtle gradient effect
-    for y in range(height):
-        # Gradient from top (darker) to bottom (slightly lighter)
-        shade = int(30 + (y / height) * 20)
-        for x in range(width):
-            # Add some noise for texture
-            noise = (x + y) % 5
-            draw.point((x, y), fill=(shade + noise, shade + noise, shade + noise + 5))
-
-    # Try to load a font, fallback to default
-    font = None
-    font_size = max(32, int(height * 0.025))
-    font_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf",
-        "/System/Library/Fonts/Helvetica.ttc",
-    ]
-    for font_path in font_paths:
-        if os.path.exists(font_path):
-            try:
-                font = ImageFont.truetype(font_path, font_size)
-                break
-            except Exception:
-                continue
-
-    if font is None:
-        font = ImageFont.load_default()
-
-    # Draw centered text
-    bbox = draw.textbbox((0, 0), message, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    x = (width - text_width) // 2
-    y = (height - text_height) // 2
-
-    # Draw text shadow
-    draw.text((x + 2, y + 2), message, font=font, fill=(0, 0, 0, 128))
-    # Draw main text
-    draw.text((x, y), message, font=font, fill=(150, 150, 160))
-
-    # Save as JPEG
-    img.save(local_path, "JPEG", quality=85)
-    logger.info(f"[S3Client] Created placeholder image: {local_path}")
-    return local_path
-
-# Shared thread pool for S3 operations (connection pooling)
-_s3_executor: Optional[ThreadPoolExecutor] = None
-
-
-def get_s3_executor() -> ThreadPoolExecutor:
-    """Get or create shared thread pool for S3 operations."""
-    global _s3_executor
-    if _s3_executor is None:
-        _s3_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="s3_pool")
-    return _s3_executor
+# Browser User-Agent for external URLs (some hosts block unknown clients)
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
 
 
 class S3Client:
-    """AWS S3 client with optimized parallel operations."""
+    """S3 file operations on top of the process-wide async ObjectStore.
+
+    Holds no connections of its own, so it is cheap to construct; prefer
+    get_s3_client() anyway.
+    """
 
     def __init__(self):
         settings = get_settings()
         self.bucket = settings.aws_s3_bucket
         self.region = settings.aws_region
+        self.endpoint_url = settings.aws_s3_endpoint_url
 
-        # Debug: Log settings
-        print(f"[S3Client] Initializing with bucket={self.bucket}, region={self.region}")
-        print(f"[S3Client] Access key (first 4 chars): {settings.aws_access_key_id[:4] if settings.aws_access_key_id else 'EMPTY (using IAM role)'}")
-
-        # Build kwargs - only include credentials if explicitly set
-        # This allows IAM role to be used on EC2
-        client_kwargs = {
-            "region_name": settings.aws_region,
-            "config": Config(
-                signature_version="s3v4",
-                max_pool_connections=20,  # Connection pooling
-                retries={"max_attempts": 3, "mode": "adaptive"}
-            )
-        }
-
-        # Only add explicit credentials if they're actually set (non-empty)
-        if settings.aws_access_key_id and settings.aws_secret_access_key:
-            client_kwargs["aws_access_key_id"] = settings.aws_access_key_id
-            client_kwargs["aws_secret_access_key"] = settings.aws_secret_access_key
-            print("[S3Client] Using explicit AWS credentials")
-        else:
-            print("[S3Client] Using default credential chain (IAM role/environment)")
-
-        # Create S3 client with connection pooling
-        self.client = boto3.client("s3", **client_kwargs)
-
-        # Shared HTTP client for external URLs
-        self._http_client: Optional[httpx.AsyncClient] = None
+    @property
+    def store(self) -> ObjectStore:
+        """Shared object store (HTTP connection pool and upload/download budgets)."""
+        return get_object_store()
 
-    async def _get_http_client(self) -> httpx.AsyncClient:
-        """Get or create shared HTTP client."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(
-                follow_redirects=True,
-                timeout=60.0,
-                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
-            )
-        return self._http_client
+    def _uri(self, s3_key: str, bucket: Optional[str] = None) -> str:
+        return f"s3://{bucket or self.bucket}/{s3_key}"
 
-    def get_public_url(self, s3_key: str) -> str:
+    def get_public_url(self, s3_key: str, bucket: Optional[str] = None) -> str:
         """Generate public URL for AWS S3."""
-        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{s3_key}"
+        bucket = bucket or self.bucket
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{bucket}/{s3_key}"
+        return f"https://{bucket}.s3.{self.region}.amazonaws.com/{s3_key}"
 
-    async def download_file(self, url: str, local_path: str) -> str:
+    async def download_file(self, url: str, local_path: str, use_cache: bool = True) -> str:
         """
         Download a file from URL to local path.
         Supports both S3 URLs and external URLs.
+
+        Goes through the node-local asset cache unless use_cache is False
+        (one-off files such as rendered outputs).
         """
-        # Check if it's an S3 URL from our bucket (AWS S3 format)
-        s3_url_prefix = f"https://{self.bucket}.s3.{self.region}.amazonaws.com/"
+        cache = get_asset_cache() if use_cache else None
+        if cache:
+            result = await cache.fetch(url, local_path, self.download, self.current_etag)
+        else:
+            result = await self.download(url, local_path)
+        return result.path
 
-        # Debug: Log URL matching
-        print(f"[S3Client] download_file: url={url[:80]}...")
-        print(f"[S3Client] s3_url_prefix={s3_url_prefix}")
-        print(f"[S3Client] startswith={url.startswith(s3_url_prefix)}")
+    async def download(self, url: str, local_path: str) -> DownloadResult:
+        """
+        Stream a file from URL to local path (object store for S3 URLs, HTTP otherwise).
 
-        if url.startswith(s3_url_prefix):
-            # Extract key from URL (strip query params - presigned URL params don't belong in key)
-            key = url[len(s3_url_prefix):].split('?')[0]
-            print(f"[S3Client] Using S3 SDK download: bucket={self.bucket}, key={key}")
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                get_s3_executor(),
-                lambda k=key: self.client.download_file(self.bucket, k, local_path)
+        Returns size, SHA-256, sniffed content type and ETag of the download.
+        """
+        s3_location = self._parse_s3_url(url)
+        if s3_location:
+            bucket, key = s3_location
+            print(f"[S3Client] Using S3 download: bucket={bucket}, key={key[:80]}")
+            settings = get_settings()
+            result = await download_object(
+                self.store,
+                self._uri(key, bucket),
+                local_path,
+                part_size=settings.download_part_size_mb * 1024 * 1024,
+                concurrency=settings.download_part_concurrency,
+                ranged_threshold=settings.download_ranged_threshold_mb * 1024 * 1024,
+                max_retries=settings.download_max_retries,
             )
-            # Validate downloaded file exists and is not empty
-            if not os.path.exists(local_path):
-                raise ValueError(f"S3 download failed - file not created: {local_path}")
-            file_size = os.path.getsize(local_path)
-            if file_size == 0:
-                os.remove(local_path)
-                raise ValueError(f"S3 download failed - empty file: {key}")
-            print(f"[S3Client] Downloaded {file_size} bytes to {local_path}")
+            print(f"[S3Client] Downloaded {result.size} bytes to {local_path}")
 
             # Log a warning if image file seems invalid (don't throw - image processor will handle it)
-            if local_path.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')):
-                with open(local_path, 'rb') as f:
-                    data = f.read()
-                if is_html_response(data):
+            if local_path.lower().endswith(IMAGE_EXTENSIONS):
+                if result.content_type == "text/html":
                     print(f"[S3Client] WARNING: S3 file appears to be HTML (error page?): {key}")
-                elif not is_valid_image(data):
-                    print(f"[S3Client] WARNING: S3 file may not be a valid image: {key} (size={file_size})")
-        elif ".s3." in url and ".amazonaws.com" in url:
-            # S3 URL from any bucket - parse and use SDK download for IAM role access
-            # URL formats:
-            #   - https://BUCKET.s3.REGION.amazonaws.com/KEY (with region)
-            #   - https://BUCKET.s3.amazonaws.com/KEY (without region, uses us-east-1)
-            import re
-            # Try with region first
-            match = re.match(r'https://([^.]+)\.s3\.([^.]+)\.amazonaws\.com/(.+)', url)
-            if match and match.group(2) != 'amazonaws':
-                other_bucket = match.group(1)
-                other_region = match.group(2)
-                other_key = match.group(3).split('?')[0]  # Strip query params from key
-                print(f"[S3Client] Cross-bucket S3 download: bucket={other_bucket}, region={other_region}, key={other_key[:50]}...")
-            else:
-                # Try without region (bucket.s3.amazonaws.com format)
-                match_no_region = re.match(r'https://([^.]+)\.s3\.amazonaws\.com/(.+)', url)
-                if match_no_region:
-                    other_bucket = match_no_region.group(1)
-                    other_region = self.region  # Use configured region as default
-                    other_key = match_no_region.group(2).split('?')[0]  # Strip query params from key
-                    print(f"[S3Client] Cross-bucket S3 download (no region in URL): bucket={other_bucket}, using region={other_region}, key={other_key[:50]}...")
-                else:
-                    # Fallback to HTTP for unparseable S3 URLs
-                    print(f"[S3Client] S3 URL pattern not matched, falling back to HTTP download")
-                    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-                    client = await self._get_http_client()
-                    response = await client.get(url, headers=headers)
-                    response.raise_for_status()
-                    async with aiofiles.open(local_path, "wb") as f:
-                        await f.write(response.content)
-                    return local_path
-
-            # Use S3 SDK with the other bucket (relies on IAM role permissions or configured credentials)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                get_s3_executor(),
-                lambda b=other_bucket, k=other_key: self.client.download_file(b, k, local_path)
-            )
-            file_size = os.path.getsize(local_path) if os.path.exists(local_path) else 0
-            print(f"[S3Client] Downloaded {file_size} bytes from {other_bucket}")
-        else:
-            # External URL - download via HTTP with browser-like headers
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Referer": url.split('/')[0] + '//' + url.split('/')[2] + '/',
-            }
-            client = await self._get_http_client()
-
-            # Retry logic for transient errors (503, 502, 429, connection errors)
-            max_retries = 3
-            last_error = None
-            for attempt in range(max_retries):
-                try:
-                    response = await client.get(url, headers=headers)
-                    response.raise_for_status()
-                    break  # Success
-                except httpx.HTTPStatusError as e:
-                    last_error = e
-                    if e.response.status_code in (502, 503, 429):
-                        # Transient error - retry with exponential backoff
-                        wait_time = (attempt + 1) * 2  # 2s, 4s, 6s
-                        print(f"[S3Client] Retry {attempt + 1}/{max_retries} after {e.response.status_code} error, waiting {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    raise  # Non-transient error - don't retry
-                except (httpx.ConnectError, httpx.ReadTimeout) as e:
-                    last_error = e
-                    wait_time = (attempt + 1) * 2
-                    print(f"[S3Client] Retry {attempt + 1}/{max_retries} after connection error, waiting {wait_time}s...")
-                    await asyncio.sleep(wait_time)
-                    continue
-            else:
-                # All retries exhausted
-                raise last_error or ValueError(f"Failed to download after {max_retries} retries")
-
-            # Validate content - only check image validity for image files
-            content = response.content
-            content_type = response.headers.get('content-type', 'unknown')
-
-            if is_html_response(content):
-                raise ValueError(f"URL returned HTML (likely hotlink protected): {url[:60]}...")
-
-            # Only validate as image if content-type indicates an image
-            is_image_content = content_type.startswith('image/') or local_path.lower().endswith(
-                ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg')
+                elif not (result.content_type or "").startswith("image/"):
+                    print(f"[S3Client] WARNING: S3 file may not be a valid image: {key} (size={result.size})")
+            return result
+
+        # External URL - download via HTTP with browser-like headers
+        headers = {
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Referer": url.split('/')[0] + '//' + url.split('/')[2] + '/',
+        }
+        store = self.store
+        # Retries transient errors (429/5xx, dropped connections), resuming with Range
+        async with store.downloads.slot():
+            return await download_http(
+                store.http,
+                url,
+                local_path,
+                headers=headers,
+                max_retries=get_settings().download_max_retries,
             )
-            if is_image_content and not is_valid_image(content):
-                size = len(content)
-                raise ValueError(f"Invalid image from {url[:60]}... (type={content_type}, size={size})")
 
-            async with aiofiles.open(local_path, "wb") as f:
-                await f.write(content)
-
-        return local_path
+    async def current_etag(self, url: str) -> Optional[str]:
+        """ETag the asset at url has now (HEAD request), None if there is none."""
+        s3_location = self._parse_s3_url(url)
+        if s3_location:
+            bucket, key = s3_location
+            return (await self.store.head(self._uri(key, bucket))).etag
+
+        store = self.store
+        async with store.downloads.slot():
+            response = await store.http.head(url, headers={"User-Agent": BROWSER_USER_AGENT})
+        if response.status_code >= 400:
+            return None
+        return response.headers.get("etag")
+
+    def _parse_s3_url(self, url: str) -> Optional[Tuple[str, str]]:
+        """(bucket, key) for S3 URLs, None for anything else."""
+        # Our bucket (AWS S3 format)
+        s3_url_prefix = f"https://{self.bucket}.s3.{self.region}.amazonaws.com/"
+        if url.startswith(s3_url_prefix):
+            # Strip query params - presigned URL params don't belong in key
+            return self.bucket, url[len(s3_url_prefix):].split('?')[0]
+
+        if ".s3." not in url or ".amazonaws.com" not in url:
+            return None
+
+        # S3 URL from any bucket - use signed requests for IAM role access
+        # URL formats:
+        #   - https://BUCKET.s3.REGION.amazonaws.com/KEY (with region)
+        #   - https://BUCKET.s3.amazonaws.com/KEY (without region)
+        match = re.match(r'https://([^.]+)\.s3\.([^.]+)\.amazonaws\.com/(.+)', url)
+        if match and match.group(2) != 'amazonaws':
+            return match.group(1), match.group(3).split('?')[0]
+        match_no_region = re.match(r'https://([^.]+)\.s3\.amazonaws\.com/(.+)', url)
+        if match_no_region:
+            return match_no_region.group(1), match_no_region.group(2).split('?')[0]
+
+        # Unparseable S3 URL - fall back to HTTP
+        print(f"[S3Client] S3 URL pattern not matched, falling back to HTTP download")
+        return None
 
     async def download_files_parallel(
         self,
@@ -337,29 +179,54 @@ class S3Client:
         self,
         local_path: str,
         s3_key: str,
-        content_type: Optional[str] = None
+        content_type: Optional[str] = None,
+        progress: Optional[UploadProgress] = None,
+        bucket: Optional[str] = None
     ) -> str:
         """
-        Upload a file to S3.
+        Upload a file to S3 (parallel multipart parts above upload_part_size_mb).
+        Uploads to the configured bucket unless bucket is given.
         Returns the S3 URL.
         """
-        extra_args = {}
-        if content_type:
-            extra_args["ContentType"] = content_type
-
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            get_s3_executor(),
-            lambda: self.client.upload_file(
-                local_path,
-                self.bucket,
-                s3_key,
-                ExtraArgs=extra_args
-            )
+        settings = get_settings()
+        await upload_multipart(
+            self.store,
+            self._uri(s3_key, bucket),
+            local_path,
+            part_size=settings.upload_part_size_mb * 1024 * 1024,
+            concurrency=settings.upload_concurrency,
+            content_type=content_type,
+            progress=progress,
+            max_retries=settings.upload_max_retries,
         )
 
         # Return the public URL (AWS S3 format)
-        return self.get_public_url(s3_key)
+        return self.get_public_url(s3_key, bucket)
+
+    async def start_streaming_upload(
+        self,
+        local_path: str,
+        s3_key: str,
+        content_type: Optional[str] = None,
+        progress: Optional[UploadProgress] = None
+    ) -> StreamingUpload:
+        """
+        Start uploading a file that is still being written (fragmented MP4).
+        Call complete() on the result once the writer has finished.
+        """
+        settings = get_settings()
+        upload = StreamingUpload(
+            self.store,
+            self._uri(s3_key),
+            local_path,
+            part_size=settings.upload_part_size_mb * 1024 * 1024,
+            concurrency=settings.upload_concurrency,
+            content_type=content_type,
+            progress=progress,
+            max_retries=settings.upload_max_retries,
+        )
+        await upload.start()
+        return upload
 
     def generate_presigned_url(
         self,
@@ -367,17 +234,38 @@ class S3Client:
         expiration: int = 3600
     ) -> str:
         """Generate a presigned URL for downloading."""
-        return self.client.generate_presigned_url(
+        return _get_presign_client().generate_presigned_url(
             "get_object",
             Params={"Bucket": self.bucket, "Key": s3_key},
             ExpiresIn=expiration
         )
 
-    def delete_file(self, s3_key: str) -> None:
+    async def delete_file(self, s3_key: str) -> None:
         """Delete a file from S3."""
-        self.client.delete_object(Bucket=self.bucket, Key=s3_key)
-
-    async def close(self) -> None:
-        """Close HTTP client."""
-        if self._http_client and not self._http_client.is_closed:
-            await self._http_client.aclose()
+        await self.store.delete(self._uri(s3_key))
+
+
+@lru_cache()
+def get_s3_client() -> S3Client:
+    """Get the shared S3 client."""
+    return S3Client()
+
+
+@lru_cache()
+def _get_presign_client():
+    """boto3 client used only to presign URLs (a local computation, no requests)."""
+    import boto3
+    from botocore.config import Config
+
+    settings = get_settings()
+    client_kwargs = {
+        "region_name": settings.aws_region,
+        "config": Config(signature_version="s3v4"),
+    }
+    if settings.aws_s3_endpoint_url:
+        client_kwargs["endpoint_url"] = settings.aws_s3_endpoint_url
+    # Only add explicit credentials if they're actually set (IAM role otherwise)
+    if settings.aws_access_key_id and settings.aws_secret_access_key:
+        client_kwargs["aws_access_key_id"] = settings.aws_access_key_id
+        client_kwargs["aws_secret_access_key"] = settings.aws_secret_access_key
+    return boto3.client("s3", **client_kwargs)
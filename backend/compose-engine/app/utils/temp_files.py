@@ -58,3 +58,42 @@ class TempFileManager:
                 item_path = os.path.join(self.base_dir, item)
                 if os.path.isdir(item_path):
                     shutil.rmtree(item_path)
+
+
+# Mode of stored cache entries (see link_or_copy)
+READ_ONLY_MODE = 0o444
+
+
+def make_read_only(path: str) -> None:
+    """Drop write permission from a cache entry before it is published."""
+    os.chmod(path, READ_ONLY_MODE)
+
+
+def _link_is_protected(src: str) -> bool:
+    """Whether an in-place write through a hard link to src would fail."""
+    if os.stat(src).st_mode & 0o222:
+        return False
+    # Root ignores file modes
+    return not (hasattr(os, "geteuid") and os.geteuid() == 0)
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Give dst the contents of a cache entry, sharing the file when safe.
+
+    A hard link shares the entry's inode, so rewriting dst in place (e.g.
+    ``ffmpeg -y`` or ``img.save`` to the same path) would corrupt the entry
+    for every later job. Entries are stored read-only (make_read_only) and
+    only linked when that mode is enforced; otherwise, or across
+    filesystems, dst is a writable copy.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    if _link_is_protected(src):
+        try:
+            os.link(src, dst)
+            return
+        except FileNotFoundError:
+            raise
+        except OSError:
+            pass
+    shutil.copyfile(src, dst)
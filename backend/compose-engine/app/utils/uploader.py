@@ -0,0 +1,288 @@
+"""Multipart, parallel and streaming uploads of render outputs to the object store.
+
+S3Client.upload_file used boto3's ``upload_file`` with default transfer
+settings, and the upload could only start once the final encode had
+finished. The helpers here:
+
+- split files into ``part_size`` parts uploaded ``concurrency`` at a time,
+  with at most ``concurrency`` parts held in memory, each part retried on
+  its own
+- report progress as ``await progress(bytes_uploaded, total_bytes)``
+- optionally upload *while encoding*: StreamingUpload tails a fragmented
+  MP4 as FFmpeg writes it and ships every full part right away, so only
+  the last part is left when FFmpeg exits. Before completing it re-hashes
+  the finished file and aborts if any uploaded byte changed (in case the
+  muxer seeked back), so the caller can fall back to a normal upload.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiofiles
+
+from .object_store import ObjectStore, retryable_store_error
+
+logger = logging.getLogger(__name__)
+
+# S3 minimum size for every part except the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# FFmpeg output flags for a file that is only ever appended to
+FRAGMENTED_MP4_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+
+# progress(bytes_uploaded, total_bytes or None while still encoding)
+UploadProgress = Callable[[int, Optional[int]], Awaitable[None]]
+
+
+class _MultipartUpload:
+    """One multipart upload: parts go up in parallel, complete lists them in order."""
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        uri: str,
+        concurrency: int,
+        max_retries: int,
+        content_type: Optional[str],
+        progress: Optional[UploadProgress],
+    ):
+        self.store = store
+        self.uri = uri
+        self.max_retries = max_retries
+        self.content_type = content_type
+        self.progress = progress
+        self.total: Optional[int] = None
+        self.uploaded = 0
+
+        self._upload_id: Optional[str] = None
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: List[asyncio.Task] = []
+        self._etags: Dict[int, str] = {}
+
+    @property
+    def part_count(self) -> int:
+        return len(self._tasks)
+
+    async def start(self) -> None:
+        self._upload_id = await self.store.create_multipart(self.uri, self.content_type)
+
+    async def add_part(self, data: bytes) -> None:
+        """Queue a part; waits while ``concurrency`` parts are already in flight."""
+        await self._slots.acquire()
+        failed = next((t for t in self._tasks if t.done() and not t.cancelled() and t.exception()), None)
+        if failed:
+            self._slots.release()
+            raise failed.exception()
+        part_number = len(self._tasks) + 1
+        self._tasks.append(asyncio.create_task(self._upload_part(part_number, data)))
+
+    async def _upload_part(self, part_number: int, data: bytes) -> None:
+        try:
+            for attempt in range(self.max_retries):
+                try:
+                    self._etags[part_number] = await self.store.upload_part(
+                        self.uri, self._upload_id, part_number, data
+                    )
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries - 1 or not retryable_store_error(e):
+                        raise
+                    logger.warning(f"[Uploader] Part {part_number} retry {attempt + 1}/{self.max_retries}: {self.uri} ({e})")
+        finally:
+            self._slots.release()
+        self.uploaded += len(data)
+        if self.progress:
+            await self.progress(self.uploaded, self.total)
+
+    async def complete(self) -> None:
+        await asyncio.gather(*self._tasks)
+        parts = [(n, self._etags[n]) for n in sorted(self._etags)]
+        await self.store.complete_multipart(self.uri, self._upload_id, parts)
+
+    async def abort(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._upload_id is None:
+            return
+        try:
+            await self.store.abort_multipart(self.uri, self._upload_id)
+        except Exception as e:
+            logger.warning(f"[Uploader] Could not abort multipart upload of {self.uri}: {e}")
+
+
+async def upload_multipart(
+    store: ObjectStore,
+    uri: str,
+    local_path: str,
+    part_size: int = 8 * 1024 * 1024,
+    concurrency: int = 4,
+    content_type: Optional[str] = None,
+    progress: Optional[UploadProgress] = None,
+    max_retries: int = 3,
+) -> None:
+    """Upload a finished file, as parallel multipart parts if it is larger than one part.
+
+    Args:
+        store: Shared object store
+        uri: Destination object URI (``s3://bucket/key``)
+        local_path: File to upload
+        part_size: Bytes per part (at least 5MB)
+        concurrency: Parts in flight (and held in memory)
+        content_type: Content-Type of the object
+        progress: Called with (bytes uploaded, total bytes) after each part
+        max_retries: Attempts per part
+    """
+    part_size = max(part_size, MIN_PART_SIZE)
+    total = os.path.getsize(local_path)
+
+    if total <= part_size:
+        async with aiofiles.open(local_path, "rb") as f:
+            data = await f.read()
+        for attempt in range(max_retries):
+            try:
+                await store.put(uri, data, content_type)
+                break
+            except Exception as e:
+                if attempt == max_retries - 1 or not retryable_store_error(e):
+                    raise
+                logger.warning(f"[Uploader] Retry {attempt + 1}/{max_retries}: {uri} ({e})")
+        if progress:
+            await progress(total, total)
+        return
+
+    upload = _MultipartUpload(store, uri, concurrency, max_retries, content_type, progress)
+    upload.total = total
+    await upload.start()
+    try:
+        async with aiofiles.open(local_path, "rb") as f:
+            while True:
+                data = await f.read(part_size)
+                if not data:
+                    break
+                await upload.add_part(data)
+        await upload.complete()
+    except BaseException:
+        await upload.abort()
+        raise
+    logger.info(f"[Uploader] {uri}: {total} bytes in {-(-total // part_size)} parts")
+
+
+class StreamingUpload:
+    """Uploads a file while it is being written (FFmpeg fragmented MP4 output).
+
+    Usage:
+        upload = StreamingUpload(...)
+        await upload.start()        # before FFmpeg starts writing
+        ...FFmpeg runs...
+        await upload.complete()     # after FFmpeg exited successfully
+        # or: await upload.abort()  # encode failed
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        uri: str,
+        local_path: str,
+        part_size: int = 8 * 1024 * 1024,
+        concurrency: int = 4,
+        content_type: Optional[str] = None,
+        progress: Optional[UploadProgress] = None,
+        max_retries: int = 3,
+        poll_interval: float = 0.2,
+    ):
+        self.uri = uri
+        self.local_path = local_path
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.poll_interval = poll_interval
+        self.completed = False
+
+        self._upload = _MultipartUpload(store, uri, concurrency, max_retries, content_type, progress)
+        self._writer_done = asyncio.Event()
+        self._tail_task: Optional[asyncio.Task] = None
+        self._sha256 = hashlib.sha256()
+        self._offset = 0
+        self._parts_before_exit = 0
+
+    async def start(self) -> None:
+        """Create the multipart upload and start following the file."""
+        await self._upload.start()
+        self._tail_task = asyncio.create_task(self._tail())
+
+    async def complete(self) -> None:
+        """Upload the rest of the finished file and complete the upload.
+
+        Raises (after aborting) if the upload failed or the file changed
+        behind the uploaded parts; the file is then still on disk.
+        """
+        self._writer_done.set()
+        try:
+            await self._tail_task
+            self._upload.total = self._offset
+            digest = await asyncio.to_thread(_hash_file, self.local_path)
+            if digest != self._sha256.hexdigest():
+                raise IOError(f"{self.local_path} changed after its parts were uploaded")
+            await self._upload.complete()
+        except BaseException:
+            await self.abort()
+            raise
+        self.completed = True
+        logger.info(
+            f"[Uploader] {self.uri}: streamed {self._offset} bytes, "
+            f"{self._parts_before_exit} of {self._upload.part_count} parts before the encode finished"
+        )
+
+    async def abort(self) -> None:
+        """Stop following the file and abort the multipart upload."""
+        self._writer_done.set()
+        if self._tail_task and not self._tail_task.done():
+            self._tail_task.cancel()
+        if self._tail_task:
+            await asyncio.gather(self._tail_task, return_exceptions=True)
+        await self._upload.abort()
+
+    async def _tail(self) -> None:
+        while not os.path.exists(self.local_path):
+            if self._writer_done.is_set():
+                raise FileNotFoundError(self.local_path)
+            await self._wait_for_writer()
+
+        async with aiofiles.open(self.local_path, "rb") as f:
+            while True:
+                # Read the done flag before the size: after it is set, the file is final
+                done = self._writer_done.is_set()
+                size = os.path.getsize(self.local_path)
+                if size < self._offset:
+                    raise IOError(f"{self.local_path} was truncated while uploading")
+                while size - self._offset >= self.part_size:
+                    await self._send(await f.read(self.part_size))
+                    if not done:
+                        self._parts_before_exit += 1
+                if done:
+                    rest = await f.read()
+                    if rest or self._offset == 0:
+                        await self._send(rest)
+                    return
+                await self._wait_for_writer()
+
+    async def _send(self, data: bytes) -> None:
+        self._sha256.update(data)
+        self._offset += len(data)
+        await self._upload.add_part(data)
+
+    async def _wait_for_writer(self) -> None:
+        try:
+            await asyncio.wait_for(self._writer_done.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,381 @@
+"""Durable render work queue on Redis Streams.
+
+Render, auto-compose and video-edit requests used to run as background
+tasks inside the API process, so a deploy or crash lost every in-flight
+render and render capacity could only grow with the API. The API now only
+appends work to a stream; worker processes (``python -m app.worker``) read
+it through a consumer group:
+
+    compose:work:interactive   one stream per render priority, read
+    compose:work:variation     most urgent first
+    compose:work:batch
+    compose:work:dead          work that failed max_attempts times
+
+A message stays pending until the worker that read it acknowledges it.
+Workers refresh their pending messages while a render runs; a message
+whose worker stopped refreshing it for ``work_visibility_timeout_seconds``
+(crash, deploy, OOM kill) is claimed by another worker and queued again,
+up to ``work_max_attempts`` attempts.
+
+Without Redis, InMemoryStreams provides the same stream commands in
+process (like InMemoryJobStore for job status), and the API runs an
+embedded worker so local runs keep working.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from .render_queue import RenderPriority
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = "compose:work"
+CONSUMER_GROUP = "compose-workers"
+
+# Stream entries: (message id, fields)
+StreamEntry = Tuple[str, Dict[str, str]]
+
+
+class InMemoryStreams:
+    """In-memory subset of the Redis stream commands (decoded responses).
+
+    Used when Redis is unavailable, and as a stand-in for Redis in tests.
+    Only one consumer group per stream is supported.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._last_delivered: Dict[str, str] = {}
+        self._pending: Dict[str, Dict[str, Tuple[str, float, int]]] = {}  # id -> (consumer, delivered_at, count)
+        self._seq = itertools.count(1)
+        self._changed = asyncio.Event()
+
+    def _next_id(self) -> str:
+        return f"{int(time.time() * 1000)}-{next(self._seq)}"
+
+    @staticmethod
+    def _id_key(message_id: str) -> Tuple[int, int]:
+        ms, _, seq = message_id.partition("-")
+        return int(ms), int(seq or 0)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def xadd(self, name: str, fields: Dict[str, str]) -> str:
+        message_id = self._next_id()
+        self._entries.setdefault(name, {})[message_id] = {k: str(v) for k, v in fields.items()}
+        self._changed.set()
+        return message_id
+
+    async def xgroup_create(self, name: str, groupname: str, id: str = "$", mkstream: bool = False) -> bool:
+        if name in self._last_delivered:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        if name not in self._entries and not mkstream:
+            raise redis.ResponseError("ERR The XGROUP subcommand requires the key to exist")
+        entries = self._entries.setdefault(name, {})
+        self._last_delivered[name] = max(entries, key=self._id_key) if id == "$" and entries else "0-0"
+        self._pending[name] = {}
+        return True
+
+    async def xreadgroup(
+        self,
+        groupname: str,
+        consumername: str,
+        streams: Dict[str, str],
+        count: Optional[int] = None,
+        block: Optional[int] = None,
+    ) -> List[list]:
+        deadline = time.monotonic() + block / 1000 if block else None
+        while True:
+            result = []
+            for name in streams:
+                last = self._id_key(self._last_delivered[name])
+                new_ids = sorted(
+                    (i for i in self._entries.get(name, {}) if self._id_key(i) > last),
+                    key=self._id_key,
+                )[:count]
+                if new_ids:
+                    self._last_delivered[name] = new_ids[-1]
+                    now = time.monotonic()
+                    for message_id in new_ids:
+                        self._pending[name][message_id] = (consumername, now, 1)
+                    result.append([name, [(i, dict(self._entries[name][i])) for i in new_ids]])
+            if result or deadline is None:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+
+    async def xack(self, name: str, groupname: str, *ids: str) -> int:
+        pending = self._pending.get(name, {})
+        return sum(1 for i in ids if pending.pop(i, None) is not None)
+
+    async def xdel(self, name: str, *ids: str) -> int:
+        entries = self._entries.get(name, {})
+        return sum(1 for i in ids if entries.pop(i, None) is not None)
+
+    async def xclaim(
+        self,
+        name: str,
+        groupname: str,
+        consumername: str,
+        min_idle_time: int,
+        message_ids: List[str],
+        justid: bool = False,
+    ) -> list:
+        now = time.monotonic()
+        claimed = []
+        pending = self._pending.get(name, {})
+        for message_id in message_ids:
+            entry = pending.get(message_id)
+            if entry and (now - entry[1]) * 1000 >= min_idle_time:
+                pending[message_id] = (consumername, now, entry[2] + (0 if justid else 1))
+                claimed.append(message_id)
+        if justid:
+            return claimed
+        return [(i, dict(self._entries[name][i])) for i in claimed if i in self._entries.get(name, {})]
+
+    async def xautoclaim(
+        self,
+        name: str,
+        groupname: str,
+        consumername: str,
+        min_idle_time: int,
+        start_id: str = "0-0",
+        count: Optional[int] = None,
+    ) -> list:
+        now = time.monotonic()
+        pending = self._pending.get(name, {})
+        idle = sorted(
+            (i for i, (_, delivered_at, _) in pending.items() if (now - delivered_at) * 1000 >= min_idle_time),
+            key=self._id_key,
+        )[:count]
+        claimed = await self.xclaim(name, groupname, consumername, min_idle_time, idle)
+        return ["0-0", claimed, []]
+
+    async def xlen(self, name: str) -> int:
+        return len(self._entries.get(name, {}))
+
+    async def xpending(self, name: str, groupname: str) -> dict:
+        return {"pending": len(self._pending.get(name, {}))}
+
+    async def close(self) -> None:
+        pass
+
+
+@dataclass
+class WorkItem:
+    """One unit of work read from a stream."""
+    message_id: str
+    stream: str
+    task_type: str
+    job_id: str
+    payload: dict
+    priority: RenderPriority
+    attempt: int
+
+
+class WorkQueue:
+    """Enqueue, read, acknowledge and retry render work on Redis Streams."""
+
+    def __init__(
+        self,
+        client,
+        consumer: Optional[str] = None,
+        visibility_timeout: float = 120.0,
+        max_attempts: int = 3,
+        prefix: str = STREAM_PREFIX,
+        group: str = CONSUMER_GROUP,
+    ):
+        """
+        Args:
+            client: redis.asyncio client (decode_responses=True) or InMemoryStreams
+            consumer: Consumer name of this worker (default: host-pid)
+            visibility_timeout: Seconds without a refresh before work is reclaimed
+            max_attempts: Attempts before work goes to the dead-letter stream
+            prefix: Stream key prefix
+            group: Consumer group shared by all workers
+        """
+        self.client = client
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.group = group
+        self.streams = {priority: f"{prefix}:{priority.value}" for priority in RenderPriority}
+        self.dead_letter_stream = f"{prefix}:dead"
+        self.is_durable = not isinstance(client, InMemoryStreams)
+        self._groups_ready = False
+        self.stats = {"enqueued": 0, "acked": 0, "retried": 0, "reclaimed": 0, "dead_lettered": 0}
+
+    async def setup(self) -> None:
+        """Create the consumer group on every stream (idempotent)."""
+        if self._groups_ready:
+            return
+        for stream in self.streams.values():
+            try:
+                await self.client.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        self._groups_ready = True
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    # =========================================================================
+    # Producer
+    # =========================================================================
+
+    async def enqueue(
+        self,
+        task_type: str,
+        payload: dict,
+        job_id: str,
+        priority: RenderPriority = RenderPriority.INTERACTIVE,
+        attempt: int = 1,
+    ) -> str:
+        """Append work to the stream for its priority; returns the message id."""
+        await self.setup()
+        message_id = await self.client.xadd(self.streams[priority], {
+            "type": task_type,
+            "job_id": job_id,
+            "payload": json.dumps(payload),
+            "attempt": str(attempt),
+        })
+        self.stats["enqueued"] += 1
+        logger.info(f"[WorkQueue] Enqueued {task_type} job {job_id} ({priority.value}, attempt {attempt})")
+        return message_id
+
+    # =========================================================================
+    # Consumer
+    # =========================================================================
+
+    async def fetch(self, count: int, block_ms: int = 5000) -> List[WorkItem]:
+        """Read up to count items, most urgent stream first.
+
+        Work abandoned by dead workers is requeued first. Blocks up to
+        block_ms when nothing is waiting.
+        """
+        await self.setup()
+        await self.reclaim_stale()
+
+        items: List[WorkItem] = []
+        for priority in RenderPriority:
+            if len(items) >= count:
+                break
+            items.extend(await self._read({self.streams[priority]: ">"}, count - len(items), None))
+        if not items and block_ms:
+            items = await self._read({s: ">" for s in self.streams.values()}, count, block_ms)
+        return items
+
+    async def ack(self, item: WorkItem) -> None:
+        """Mark work as done and drop it from the stream."""
+        await self.client.xack(item.stream, self.group, item.message_id)
+        await self.client.xdel(item.stream, item.message_id)
+        self.stats["acked"] += 1
+
+    async def retry(self, item: WorkItem, error: str) -> None:
+        """Queue failed work again, or dead-letter it after max_attempts."""
+        if item.attempt < self.max_attempts:
+            logger.warning(f"[WorkQueue] Job {item.job_id} attempt {item.attempt} failed, retrying: {error}")
+            await self.enqueue(item.task_type, item.payload, item.job_id, item.priority, item.attempt + 1)
+            self.stats["retried"] += 1
+        else:
+            logger.error(f"[WorkQueue] Job {item.job_id} failed {item.attempt} times, dead-lettering: {error}")
+            await self.client.xadd(self.dead_letter_stream, {
+                "type": item.task_type,
+                "job_id": item.job_id,
+                "payload": json.dumps(item.payload),
+                "attempt": str(item.attempt),
+                "error": error[:1000],
+            })
+            self.stats["dead_lettered"] += 1
+        await self.ack(item)
+
+    async def touch(self, items: List[WorkItem]) -> None:
+        """Reset the idle time of in-flight work so it is not reclaimed."""
+        by_stream: Dict[str, List[str]] = {}
+        for item in items:
+            by_stream.setdefault(item.stream, []).append(item.message_id)
+        for stream, ids in by_stream.items():
+            await self.client.xclaim(stream, self.group, self.consumer, 0, ids, justid=True)
+
+    async def reclaim_stale(self) -> int:
+        """Requeue work whose worker stopped refreshing it."""
+        min_idle_ms = int(self.visibility_timeout * 1000)
+        reclaimed = 0
+        for stream in self.streams.values():
+            response = await self.client.xautoclaim(stream, self.group, self.consumer, min_idle_ms, "0-0", count=100)
+            for message_id, fields in response[1]:
+                if not fields:
+                    continue  # Entry was deleted while pending
+                item = self._to_item(stream, message_id, fields)
+                logger.warning(f"[WorkQueue] Reclaimed job {item.job_id} after visibility timeout")
+                await self.retry(item, "visibility timeout (worker stopped)")
+                reclaimed += 1
+        self.stats["reclaimed"] += reclaimed
+        return reclaimed
+
+    async def queue_stats(self) -> dict:
+        """Stream lengths and pending (in-flight) counts per priority."""
+        streams = {}
+        for priority, stream in self.streams.items():
+            pending = await self.client.xpending(stream, self.group)
+            streams[priority.value] = {
+                "length": await self.client.xlen(stream),
+                "pending": pending["pending"] if pending else 0,
+            }
+        return {
+            **self.stats,
+            "durable": self.is_durable,
+            "streams": streams,
+            "dead_lettered_total": await self.client.xlen(self.dead_letter_stream),
+        }
+
+    async def _read(self, streams: Dict[str, str], count: int, block_ms: Optional[int]) -> List[WorkItem]:
+        response = await self.client.xreadgroup(self.group, self.consumer, streams, count=count, block=block_ms)
+        items = []
+        for stream, entries in response or []:
+            for message_id, fields in entries:
+                items.append(self._to_item(stream, message_id, fields))
+        return items
+
+    def _to_item(self, stream: str, message_id: str, fields: Dict[str, str]) -> WorkItem:
+        priority = next(p for p, s in self.streams.items() if s == stream)
+        return WorkItem(
+            message_id=message_id,
+            stream=stream,
+            task_type=fields["type"],
+            job_id=fields["job_id"],
+            payload=json.loads(fields["payload"]),
+            priority=priority,
+            attempt=int(fields.get("attempt", 1)),
+        )
+
+
+async def connect_work_queue(redis_url: str, **kwargs) -> WorkQueue:
+    """Work queue on Redis, or on InMemoryStreams if Redis is unavailable."""
+    try:
+        client = redis.from_url(redis_url, decode_responses=True)
+        await client.ping()
+        logger.info("[WorkQueue] Using Redis Streams")
+    except Exception as e:
+        logger.warning(f"[WorkQueue] Redis unavailable ({e}), using in-memory streams")
+        client = InMemoryStreams()
+    work_queue = WorkQueue(client, **kwargs)
+    await work_queue.setup()
+    return work_queue
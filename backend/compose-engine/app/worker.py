@@ -0,0 +1,208 @@
+"""Render worker: runs queued render work from the Redis Streams work queue.
+
+Run one or more workers next to the API:
+
+    python -m app.worker
+
+Each worker keeps up to ``max_concurrent_jobs + worker_prefetch`` items in
+flight. The render queue admits them in priority/tenant order and reports
+their queue position, and the worker refreshes every in-flight item so
+other workers don't reclaim it. On SIGTERM the worker stops reading new
+work and lets running jobs finish for ``worker_shutdown_grace_seconds``;
+whatever is still unfinished is left unacknowledged and picked up by
+another worker after the visibility timeout.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+from typing import Awaitable, Callable, Dict, Optional
+
+from .config import get_settings
+from .utils.job_queue import JobQueue
+from .utils.work_queue import WorkItem, WorkQueue, connect_work_queue
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[[dict, Optional[JobQueue]], Awaitable[None]]
+
+
+# =============================================================================
+# Task handlers (payload = request.model_dump(mode="json"))
+# =============================================================================
+
+async def _run_render(payload: dict, job_queue: Optional[JobQueue]) -> None:
+    from .models.render_job import RenderRequest
+    from .routers.render import process_render_job
+    await process_render_job(RenderRequest(**payload), job_queue)
+
+
+async def _run_modal_render(payload: dict, job_queue: Optional[JobQueue]) -> None:
+    from .models.render_job import RenderRequest
+    from .routers.render import process_modal_render_job
+    use_gpu = payload.pop("use_gpu", True)
+    await process_modal_render_job(RenderRequest(**payload), job_queue, use_gpu)
+
+
+async def _run_auto_compose(payload: dict, job_queue: Optional[JobQueue]) -> None:
+    from .routers.auto_compose import AutoComposeRequest, process_auto_compose
+    await process_auto_compose(AutoComposeRequest(**payload), job_queue)
+
+
+async def _run_video_edit(payload: dict, job_queue: Optional[JobQueue]) -> None:
+    from .models.video_edit import VideoEditRequest
+    from .routers.video_edit import process_video_edit
+    await process_video_edit(VideoEditRequest(**payload), job_queue)
+
+
+TASK_HANDLERS: Dict[str, TaskHandler] = {
+    "render": _run_render,
+    "modal_render": _run_modal_render,
+    "auto_compose": _run_auto_compose,
+    "video_edit": _run_video_edit,
+}
+
+
+class RenderWorker:
+    """Reads work from the queue and runs it with bounded concurrency."""
+
+    def __init__(
+        self,
+        work_queue: WorkQueue,
+        job_queue: Optional[JobQueue],
+        concurrency: int,
+        handlers: Optional[Dict[str, TaskHandler]] = None,
+        block_ms: int = 5000,
+        shutdown_grace: float = 60.0,
+    ):
+        self.work_queue = work_queue
+        self.job_queue = job_queue
+        self.concurrency = max(1, concurrency)
+        self.handlers = handlers or TASK_HANDLERS
+        self.block_ms = block_ms
+        self.shutdown_grace = shutdown_grace
+
+        self._inflight: Dict[asyncio.Task, WorkItem] = {}
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Fetch and run work until stop() is called."""
+        heartbeat = asyncio.create_task(self._heartbeat())
+        logger.info(f"[Worker] {self.work_queue.consumer} started ({self.concurrency} in flight)")
+        try:
+            while not self._stopping.is_set():
+                free = self.concurrency - len(self._inflight)
+                if free <= 0:
+                    stopping = asyncio.ensure_future(self._stopping.wait())
+                    await asyncio.wait([*self._inflight, stopping], return_when=asyncio.FIRST_COMPLETED)
+                    stopping.cancel()
+                    continue
+                try:
+                    items = await self.work_queue.fetch(free, self.block_ms)
+                except Exception as e:
+                    logger.error(f"[Worker] Failed to read work: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                for item in items:
+                    task = asyncio.create_task(self._process(item))
+                    self._inflight[task] = item
+                    task.add_done_callback(self._inflight.pop)
+        finally:
+            await self._drain()
+            heartbeat.cancel()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _drain(self) -> None:
+        if not self._inflight:
+            return
+        logger.info(f"[Worker] Waiting up to {self.shutdown_grace:.0f}s for {len(self._inflight)} jobs")
+        _, unfinished = await asyncio.wait(list(self._inflight), timeout=self.shutdown_grace)
+        for task in unfinished:
+            # Left unacknowledged: another worker reclaims it after the visibility timeout
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+
+    async def _process(self, item: WorkItem) -> None:
+        handler = self.handlers.get(item.task_type)
+        if handler is None:
+            await self.work_queue.retry(item, f"Unknown task type: {item.task_type}")
+            return
+
+        logger.info(f"[Worker] Running {item.task_type} job {item.job_id} (attempt {item.attempt})")
+        try:
+            await handler(dict(item.payload), self.job_queue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Worker] {item.task_type} job {item.job_id} raised: {e}")
+            await self.work_queue.retry(item, str(e))
+            return
+        await self.work_queue.ack(item)
+
+    async def _heartbeat(self) -> None:
+        interval = max(0.1, self.work_queue.visibility_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if self._inflight:
+                try:
+                    await self.work_queue.touch(list(self._inflight.values()))
+                except Exception as e:
+                    logger.warning(f"[Worker] Failed to refresh in-flight work: {e}")
+
+
+def create_worker(work_queue: WorkQueue, job_queue: Optional[JobQueue]) -> RenderWorker:
+    """Worker configured from settings."""
+    settings = get_settings()
+    return RenderWorker(
+        work_queue,
+        job_queue,
+        concurrency=settings.max_concurrent_jobs + settings.worker_prefetch,
+        shutdown_grace=settings.worker_shutdown_grace_seconds,
+    )
+
+
+async def main() -> None:
+    from .dependencies import init_render_queue, set_job_queue
+    from .services.analysis_executor import get_analysis_executor, shutdown_analysis_executor
+    from .utils.object_store import close_object_store
+
+    settings = get_settings()
+    job_queue = JobQueue(settings.redis_url)
+    await job_queue.connect()
+    set_job_queue(job_queue)
+    init_render_queue(settings.max_concurrent_jobs)
+    get_analysis_executor().start()
+
+    work_queue = await connect_work_queue(
+        settings.redis_url,
+        visibility_timeout=settings.work_visibility_timeout_seconds,
+        max_attempts=settings.work_max_attempts,
+    )
+    if not work_queue.is_durable:
+        logger.error("[Worker] Redis is unavailable; a standalone worker can't see the API's in-memory queue")
+        sys.exit(1)
+
+    worker = create_worker(work_queue, job_queue)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        shutdown_analysis_executor()
+        await close_object_store()
+        await work_queue.close()
+        await job_queue.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    asyncio.run(main())
@@ -128,11 +128,17 @@ def render_video(request_data: dict) -> dict:
     # Enable GPU encoding (NVENC)
     os.environ["USE_NVENC"] = "1"
 
+    # Persist audio analysis results, encoded clips and downloaded assets on the shared cache volume
+    os.environ.setdefault("ANALYSIS_CACHE_DIR", "/cache/audio-analysis")
+    os.environ.setdefault("CLIP_CACHE_DIR", "/cache/clips")
+    os.environ.setdefault("ASSET_CACHE_DIR", "/cache/assets")
+
     # Add app to path
     sys.path.insert(0, "/root")
 
     from app.models.render_job import RenderRequest
     from app.services.video_renderer import VideoRenderer
+    from app.utils.object_store import close_object_store
 
     # Parse request
     request = RenderRequest(**request_data)
@@ -163,6 +169,8 @@ def render_video(request_data: dict) -> dict:
                 renderer.render(request, progress_callback)
             )
         finally:
+            # The object store's connection pool belongs to this loop
+            loop.run_until_complete(close_object_store())
             loop.close()
 
         print(f"[{job_id}] === Render complete ===")
@@ -228,11 +236,17 @@ def render_video_cpu(request_data: dict) -> dict:
     callback_url = request_data.pop("callback_url", None)
     callback_secret = request_data.pop("callback_secret", "")
 
+    # Persist audio analysis results, encoded clips and downloaded assets on the shared cache volume
+    os.environ.setdefault("ANALYSIS_CACHE_DIR", "/cache/audio-analysis")
+    os.environ.setdefault("CLIP_CACHE_DIR", "/cache/clips")
+    os.environ.setdefault("ASSET_CACHE_DIR", "/cache/assets")
+
     # Add app to path
     sys.path.insert(0, "/root")
 
     from app.models.render_job import RenderRequest
     from app.services.video_renderer import VideoRenderer
+    from app.utils.object_store import close_object_store
 
     # Parse request
     request = RenderRequest(**request_data)
@@ -254,6 +268,8 @@ def render_video_cpu(request_data: dict) -> dict:
                 renderer.render(request, progress_callback)
             )
         finally:
+            # The object store's connection pool belongs to this loop
+            loop.run_until_complete(close_object_store())
             loop.close()
 
         print(f"[{job_id}] Render complete: {output_url}")
@@ -0,0 +1,71 @@
+"""Shared test fixtures."""
+
+import os
+import uuid
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def s3_endpoint():
+    """(endpoint_url, access_key_id, secret_access_key) of an S3-compatible server.
+
+    Uses the MinIO (or other) server in S3_TEST_ENDPOINT_URL when set,
+    otherwise starts a moto server with signature checks enabled; skips
+    when neither is available.
+    """
+    endpoint = os.environ.get("S3_TEST_ENDPOINT_URL")
+    if endpoint:
+        yield (
+            endpoint,
+            os.environ.get("S3_TEST_ACCESS_KEY_ID", "minioadmin"),
+            os.environ.get("S3_TEST_SECRET_ACCESS_KEY", "minioadmin"),
+        )
+        return
+
+    server_module = pytest.importorskip("moto.server", reason="moto[server] not installed")
+    import boto3
+    from moto import settings
+
+    server = server_module.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+
+    # moto only checks signatures against IAM access keys, with auth enabled
+    iam = boto3.client(
+        "iam", endpoint_url=endpoint, region_name="us-east-1",
+        aws_access_key_id="testing", aws_secret_access_key="testing",
+    )
+    iam.create_user(UserName="compose-test")
+    iam.put_user_policy(
+        UserName="compose-test",
+        PolicyName="s3",
+        PolicyDocument='{"Version": "2012-10-17", "Statement": [{"Effect": "Allow", "Action": "s3:*", "Resource": "*"}]}',
+    )
+    key = iam.create_access_key(UserName="compose-test")["AccessKey"]
+    no_auth_count = settings.INITIAL_NO_AUTH_ACTION_COUNT
+    settings.INITIAL_NO_AUTH_ACTION_COUNT = 0
+    try:
+        yield endpoint, key["AccessKeyId"], key["SecretAccessKey"]
+    finally:
+        settings.INITIAL_NO_AUTH_ACTION_COUNT = no_auth_count
+        server.stop()
+
+
+@pytest.fixture
+def s3_bucket(s3_endpoint):
+    """A fresh bucket on the S3 test server."""
+    import boto3
+
+    endpoint, access_key_id, secret_access_key = s3_endpoint
+    client = boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        region_name="us-east-1",
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_access_key,
+    )
+    bucket = f"hydra-test-{uuid.uuid4().hex[:8]}"
+    client.create_bucket(Bucket=bucket)
+    return bucket
@@ -0,0 +1,83 @@
+"""Tests for the content-addressed audio analysis cache."""
+
+from app.services.analysis_cache import AnalysisCache
+
+
+class TestAnalysisCache:
+    """Tests for AnalysisCache."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return {"bpm": 120, "call": self.calls}
+
+    def _write(self, path, data: bytes):
+        with open(path, "wb") as f:
+            f.write(data)
+        return str(path)
+
+    def test_hit_after_miss(self, tmp_path):
+        """Test that the second lookup is served from cache."""
+        cache = AnalysisCache(str(tmp_path / "cache"))
+        audio = self._write(tmp_path / "a.mp3", b"audio-bytes")
+
+        first = cache.get_or_compute(audio, "test", self._compute, sample_rate=22050)
+        second = cache.get_or_compute(audio, "test", self._compute, sample_rate=22050)
+
+        assert first == second
+        assert self.calls == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_key_is_content_addressed(self, tmp_path):
+        """Test that identical bytes at different paths share an entry."""
+        cache = AnalysisCache(str(tmp_path / "cache"))
+        a = self._write(tmp_path / "a.mp3", b"same-track")
+        b = self._write(tmp_path / "b.mp3", b"same-track")
+        c = self._write(tmp_path / "c.mp3", b"other-track")
+
+        cache.get_or_compute(a, "test", self._compute)
+        cache.get_or_compute(b, "test", self._compute)
+        assert self.calls == 1
+
+        cache.get_or_compute(c, "test", self._compute)
+        assert self.calls == 2
+
+    def test_params_change_key(self, tmp_path):
+        """Test that analyzer version and params are part of the key."""
+        cache = AnalysisCache(str(tmp_path / "cache"))
+        audio = self._write(tmp_path / "a.mp3", b"audio-bytes")
+
+        cache.get_or_compute(audio, "test", self._compute, version="1", sample_rate=22050)
+        cache.get_or_compute(audio, "test", self._compute, version="2", sample_rate=22050)
+        cache.get_or_compute(audio, "test", self._compute, version="1", sample_rate=44100)
+
+        assert self.calls == 3
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a fresh cache instance reads entries from disk."""
+        cache_dir = str(tmp_path / "cache")
+        audio = self._write(tmp_path / "a.mp3", b"audio-bytes")
+
+        AnalysisCache(cache_dir).get_or_compute(audio, "test", self._compute)
+        restarted = AnalysisCache(cache_dir)
+        result = restarted.get_or_compute(audio, "test", self._compute)
+
+        assert self.calls == 1
+        assert result["call"] == 1
+        assert restarted.stats()["disk_hits"] == 1
+
+    def test_size_eviction(self, tmp_path):
+        """Test that disk usage is bounded by max_bytes."""
+        cache = AnalysisCache(str(tmp_path / "cache"), max_bytes=2048, max_memory_entries=1)
+
+        for i in range(20):
+            cache.put(f"{i:064x}", b"x" * 400)
+
+        stats = cache.stats()
+        assert stats["disk_bytes"] <= 2048
+        assert stats["evictions"] > 0
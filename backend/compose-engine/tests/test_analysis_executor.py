@@ -0,0 +1,65 @@
+"""Tests for the bounded audio analysis executor."""
+
+import asyncio
+import threading
+
+import pytest
+from app.services.analysis_executor import AnalysisExecutor, AnalysisQueueFullError
+
+
+def _wait_and_return(event: threading.Event, value):
+    event.wait(5)
+    return value
+
+
+class TestAnalysisExecutor:
+    """Tests for AnalysisExecutor (thread mode, analysis_workers=0)."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.executor = AnalysisExecutor(max_workers=0, queue_size=1, default_timeout=5.0)
+        self.release = threading.Event()
+
+    def teardown_method(self):
+        """Release blocked work and stop the pool."""
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_result(self):
+        """Test that submitted work returns its result."""
+        self.release.set()
+        result = await self.executor.submit(_wait_and_return, self.release, 42)
+        assert result == 42
+        assert self.executor.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Test non-blocking submit is rejected once capacity is used."""
+        running = asyncio.ensure_future(self.executor.submit(_wait_and_return, self.release, 1))
+        queued = asyncio.ensure_future(self.executor.submit(_wait_and_return, self.release, 2))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(AnalysisQueueFullError):
+            await self.executor.submit(_wait_and_return, self.release, 3, block=False)
+
+        self.release.set()
+        assert await running == 1
+        assert await queued == 2
+        assert self.executor.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_still_delivers_result(self):
+        """Test that work outliving its caller still reaches on_result."""
+        delivered = []
+
+        with pytest.raises(asyncio.TimeoutError):
+            await self.executor.submit(
+                _wait_and_return, self.release, "late",
+                timeout=0.1, on_result=delivered.append,
+            )
+
+        self.release.set()
+        await asyncio.sleep(0.1)
+        assert delivered == ["late"]
+        assert self.executor.stats()["outstanding"] == 0
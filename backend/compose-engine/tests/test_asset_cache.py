@@ -0,0 +1,135 @@
+"""Tests for the node-local asset cache."""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+from app.utils.asset_cache import AssetCache
+from app.utils.downloader import DownloadResult
+
+
+class FakeOrigin:
+    """Serves URL contents and counts downloads."""
+
+    def __init__(self):
+        self.files = {}
+        self.etags = {}
+        self.downloads = []
+        self.delay = 0.0
+
+    async def download(self, url: str, local_path: str) -> DownloadResult:
+        self.downloads.append(url)
+        await asyncio.sleep(self.delay)
+        data = self.files[url]
+        with open(local_path, "wb") as f:
+            f.write(data)
+        return DownloadResult(
+            path=local_path,
+            size=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+            etag=self.etags.get(url),
+        )
+
+    async def current_etag(self, url: str):
+        return self.etags.get(url)
+
+
+class TestAssetCache:
+    """Tests for AssetCache."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.origin = FakeOrigin()
+        self.origin.files["https://cdn/a.jpg"] = b"a" * 1000
+        self.origin.etags["https://cdn/a.jpg"] = "v1"
+
+    @pytest.mark.asyncio
+    async def test_second_fetch_is_served_from_disk(self, tmp_path):
+        """Test that a repeated URL is downloaded once, also after a restart."""
+        cache = AssetCache(str(tmp_path / "cache"))
+        first = str(tmp_path / "job1.jpg")
+        second = str(tmp_path / "job2.jpg")
+
+        await cache.fetch("https://cdn/a.jpg", first, self.origin.download)
+        result = await cache.fetch("https://cdn/a.jpg", second, self.origin.download)
+
+        assert self.origin.downloads == ["https://cdn/a.jpg"]
+        assert result.path == second and result.etag == "v1"
+        with open(second, "rb") as f:
+            assert f.read() == b"a" * 1000
+
+        restarted = AssetCache(str(tmp_path / "cache"))
+        await restarted.fetch("https://cdn/a.jpg", str(tmp_path / "job3.jpg"), self.origin.download)
+        assert len(self.origin.downloads) == 1
+        assert restarted.stats()["disk_bytes"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_rewriting_a_fetched_file_leaves_blob_intact(self, tmp_path):
+        """Test that writing over a fetched file never changes the cached blob."""
+        cache = AssetCache(str(tmp_path / "cache"))
+        first = str(tmp_path / "job1.jpg")
+        await cache.fetch("https://cdn/a.jpg", first, self.origin.download)
+
+        try:
+            with open(first, "wb") as f:
+                f.write(b"processed")
+        except PermissionError:
+            pass  # Linked read-only blob: the write fails loudly
+
+        blob = cache._blob_path(hashlib.sha256(b"a" * 1000).hexdigest())
+        assert not os.stat(blob).st_mode & 0o222
+        second = str(tmp_path / "job2.jpg")
+        await cache.fetch("https://cdn/a.jpg", second, self.origin.download)
+        with open(second, "rb") as f:
+            assert f.read() == b"a" * 1000
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_download(self, tmp_path):
+        """Test single-flight for simultaneous requests of the same URL."""
+        cache = AssetCache(str(tmp_path / "cache"))
+        self.origin.delay = 0.05
+
+        paths = [str(tmp_path / f"image_{i}.jpg") for i in range(5)]
+        await asyncio.gather(*(cache.fetch("https://cdn/a.jpg", p, self.origin.download) for p in paths))
+
+        assert len(self.origin.downloads) == 1
+        assert cache.stats()["coalesced"] == 4
+        assert all(os.path.getsize(p) == 1000 for p in paths)
+
+    @pytest.mark.asyncio
+    async def test_changed_etag_downloads_again(self, tmp_path):
+        """Test that entries past the revalidation age are refetched when the ETag changed."""
+        cache = AssetCache(str(tmp_path / "cache"), revalidate_seconds=0)
+        path = str(tmp_path / "image.jpg")
+        fetch = lambda: cache.fetch("https://cdn/a.jpg", path, self.origin.download, self.origin.current_etag)
+
+        await fetch()
+        await fetch()
+        assert len(self.origin.downloads) == 1
+        assert cache.stats()["revalidated"] == 1
+
+        self.origin.files["https://cdn/a.jpg"] = b"b" * 500
+        self.origin.etags["https://cdn/a.jpg"] = "v2"
+        result = await fetch()
+        assert len(self.origin.downloads) == 2
+        assert result.etag == "v2"
+        with open(path, "rb") as f:
+            assert f.read() == b"b" * 500
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the cache stays under max_bytes by dropping the oldest blobs."""
+        cache = AssetCache(str(tmp_path / "cache"), max_bytes=2500)
+        for name in ("a", "b", "c"):
+            self.origin.files[f"https://cdn/{name}.jpg"] = name.encode() * 1000
+
+        await cache.fetch("https://cdn/a.jpg", str(tmp_path / "a.jpg"), self.origin.download)
+        await cache.fetch("https://cdn/b.jpg", str(tmp_path / "b.jpg"), self.origin.download)
+        os.utime(cache._blob_path(hashlib.sha256(b"a" * 1000).hexdigest()), (1, 1))
+        await cache.fetch("https://cdn/c.jpg", str(tmp_path / "c.jpg"), self.origin.download)
+
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["disk_bytes"] == 2000
+        await cache.fetch("https://cdn/a.jpg", str(tmp_path / "a2.jpg"), self.origin.download)
+        assert self.origin.downloads.count("https://cdn/a.jpg") == 2
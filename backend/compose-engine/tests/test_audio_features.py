@@ -0,0 +1,145 @@
+"""Tests for the shared audio feature bundle."""
+
+import threading
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+from app.services import audio_features
+from app.services.audio_features import AudioFeatures, FeatureMemo
+
+SR = 22050
+
+
+def _synthetic_track(seconds: float = 6.0, bpm: float = 120.0) -> np.ndarray:
+    """Tone + noise bed with a click on every beat and a louder second half."""
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * SR)) / SR
+    y = 0.2 * np.sin(2 * np.pi * 220 * t) + 0.02 * rng.standard_normal(len(t))
+    click = np.exp(-np.arange(int(0.03 * SR)) / 200) * rng.standard_normal(int(0.03 * SR))
+    for beat in np.arange(0, seconds, 60 / bpm):
+        start = int(beat * SR)
+        y[start:start + len(click)] += 0.6 * click[:len(y) - start]
+    y[len(y) // 2:] *= 1.8
+    return y.astype(np.float32)
+
+
+class TestAudioFeatures:
+    """Tests that shared features match the per-detector librosa calls they replace."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.y = _synthetic_track()
+        self.features = AudioFeatures(self.y, SR)
+
+    def test_hpss_matches_effects_hpss(self):
+        """Test that harmonic/percussive signals equal librosa.effects.hpss(y)."""
+        y_harmonic, y_percussive = librosa.effects.hpss(self.y)
+
+        np.testing.assert_array_equal(self.features.y_harmonic, y_harmonic)
+        np.testing.assert_array_equal(self.features.y_percussive, y_percussive)
+
+    def test_energy_matches_direct_rms(self):
+        """Test that RMS curves equal librosa.feature.rms on the signals."""
+        y_harmonic, _ = librosa.effects.hpss(self.y)
+
+        np.testing.assert_array_equal(self.features.rms, librosa.feature.rms(y=self.y, hop_length=512)[0])
+        np.testing.assert_array_equal(
+            self.features.rms_harmonic, librosa.feature.rms(y=y_harmonic, hop_length=512)[0]
+        )
+
+    def test_spectral_features_match_direct_calls(self):
+        """Test that STFT-derived features equal computing them from y."""
+        y, sr = self.y, SR
+        magnitude = self.features.magnitude
+
+        np.testing.assert_array_equal(magnitude, np.abs(librosa.stft(y, hop_length=512)))
+        np.testing.assert_allclose(self.features.onset_env, librosa.onset.onset_strength(y=y, sr=sr), rtol=1e-6)
+        np.testing.assert_allclose(
+            self.features.spectral_centroid, librosa.feature.spectral_centroid(y=y, sr=sr), rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            librosa.feature.spectral_rolloff(S=magnitude, sr=sr), librosa.feature.spectral_rolloff(y=y, sr=sr)
+        )
+        np.testing.assert_allclose(
+            librosa.feature.spectral_bandwidth(S=magnitude, sr=sr),
+            librosa.feature.spectral_bandwidth(y=y, sr=sr),
+            rtol=1e-6,
+        )
+
+    def test_detections_unchanged(self):
+        """Test that onsets and beats come out the same as before."""
+        y, sr = self.y, SR
+        _, y_percussive = librosa.effects.hpss(y)
+
+        np.testing.assert_array_equal(
+            librosa.onset.onset_detect(onset_envelope=self.features.onset_env, sr=sr),
+            librosa.onset.onset_detect(y=y, sr=sr),
+        )
+        tempo, beats = librosa.beat.beat_track(y=self.features.y_percussive, sr=sr)
+        expected_tempo, expected_beats = librosa.beat.beat_track(y=y_percussive, sr=sr)
+        assert tempo == expected_tempo
+        np.testing.assert_array_equal(beats, expected_beats)
+
+    def test_release_spectral_recomputes(self):
+        """Test that dropped intermediates are rebuilt identically on demand."""
+        onset_env = self.features.onset_env.copy()
+
+        self.features.release_spectral()
+
+        assert "stft" not in self.features.__dict__
+        np.testing.assert_array_equal(self.features.onset_env, onset_env)
+
+
+class TestFeatureMemo:
+    """Tests for FeatureMemo."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.memo = FeatureMemo()
+
+    def _write(self, path, seconds=1.0):
+        sf.write(str(path), _synthetic_track(seconds), SR)
+        return str(path)
+
+    def test_same_file_decodes_once(self, tmp_path):
+        """Test that repeat calls share one bundle until the file changes."""
+        path = self._write(tmp_path / "a.wav")
+
+        first = self.memo.get(path, SR)
+        assert self.memo.get(path, SR) is first
+
+        self._write(tmp_path / "a.wav", seconds=1.5)
+        changed = self.memo.get(path, SR)
+        assert changed is not first
+        assert len(changed.y) == int(1.5 * SR)
+
+    def test_threads_get_their_own_file(self, tmp_path, monkeypatch):
+        """Test that racing calls on different files never get each other's audio."""
+        paths = [self._write(tmp_path / "a.wav"), self._write(tmp_path / "b.wav", seconds=1.5)]
+        load = AudioFeatures.load
+
+        def slow_load(audio_path, sample_rate=22050):
+            features = load(audio_path, sample_rate=sample_rate)
+            features.path = audio_path
+            time.sleep(0.01)
+            return features
+
+        monkeypatch.setattr(audio_features.AudioFeatures, "load", staticmethod(slow_load))
+        mismatches = []
+
+        def worker(path):
+            for _ in range(5):
+                if self.memo.get(path, SR).path != path:
+                    mismatches.append(path)
+
+        threads = [threading.Thread(target=worker, args=(paths[i % 2],)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mismatches == []
+        for path in paths:
+            assert self.memo.get(path, SR).path == path
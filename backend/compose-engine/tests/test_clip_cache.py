@@ -0,0 +1,140 @@
+"""Tests for the encoded image clip cache."""
+
+import os
+
+import pytest
+import app.services  # noqa: F401 - app.renderers imports app.services first
+from app.renderers import ffmpeg_pipeline
+from app.renderers.clip_cache import ClipCache
+from app.utils import temp_files
+from app.renderers.ffmpeg_pipeline import ImageClipSpec, create_clips_parallel
+
+
+class TestClipCache:
+    """Tests for ClipCache."""
+
+    def _write(self, path, data: bytes):
+        with open(path, "wb") as f:
+            f.write(data)
+        return str(path)
+
+    def _key(self, cache, image, encoder="libx264", duration=1.5):
+        return cache.make_key(image, duration, "zoom_in", (1080, 1920), 30, encoder)
+
+    def test_store_and_lookup(self, tmp_path):
+        """Test that a stored clip is served to a new output path."""
+        cache = ClipCache(str(tmp_path / "cache"))
+        image = self._write(tmp_path / "a.jpg", b"image-bytes")
+        clip = self._write(tmp_path / "clip.mp4", b"clip-bytes")
+        key = self._key(cache, image)
+
+        assert not cache.get(key, str(tmp_path / "miss.mp4"))
+        cache.put(key, clip)
+        out = str(tmp_path / "out.mp4")
+        assert cache.get(key, out)
+
+        with open(out, "rb") as f:
+            assert f.read() == b"clip-bytes"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["stores"] == 1
+        assert stats["disk_bytes"] == len(b"clip-bytes")
+
+    def test_rewriting_served_clip_leaves_entry_intact(self, tmp_path):
+        """Test that writing over a served clip never changes the cached copy."""
+        cache = ClipCache(str(tmp_path / "cache"))
+        image = self._write(tmp_path / "a.jpg", b"image-bytes")
+        key = self._key(cache, image)
+        cache.put(key, self._write(tmp_path / "clip.mp4", b"clip-bytes"))
+        out = str(tmp_path / "out.mp4")
+        assert cache.get(key, out)
+
+        try:
+            self._write(out, b"rewritten")
+        except PermissionError:
+            pass  # Linked read-only entry: the write fails loudly
+
+        assert not os.stat(cache._path(key)).st_mode & 0o222
+        with open(cache._path(key), "rb") as f:
+            assert f.read() == b"clip-bytes"
+
+    def test_links_only_when_read_only_is_enforced(self, tmp_path, monkeypatch):
+        """Test that entries are shared by hard link for non-root processes only."""
+        cache = ClipCache(str(tmp_path / "cache"))
+        image = self._write(tmp_path / "a.jpg", b"image-bytes")
+        key = self._key(cache, image)
+        cache.put(key, self._write(tmp_path / "clip.mp4", b"clip-bytes"))
+        entry = os.stat(cache._path(key))
+
+        monkeypatch.setattr(temp_files.os, "geteuid", lambda: 1000, raising=False)
+        assert cache.get(key, str(tmp_path / "linked.mp4"))
+        assert os.stat(tmp_path / "linked.mp4").st_ino == entry.st_ino
+
+        monkeypatch.setattr(temp_files.os, "geteuid", lambda: 0, raising=False)
+        assert cache.get(key, str(tmp_path / "copied.mp4"))
+        assert os.stat(tmp_path / "copied.mp4").st_ino != entry.st_ino
+        assert os.stat(tmp_path / "copied.mp4").st_mode & 0o200
+
+    def test_key_covers_content_and_params(self, tmp_path):
+        """Test that identical images share a key and encode params do not."""
+        cache = ClipCache(str(tmp_path / "cache"))
+        a = self._write(tmp_path / "a.jpg", b"same-image")
+        b = self._write(tmp_path / "b.jpg", b"same-image")
+        c = self._write(tmp_path / "c.jpg", b"other-image")
+
+        assert self._key(cache, a) == self._key(cache, b)
+        assert self._key(cache, a) != self._key(cache, c)
+        assert self._key(cache, a) != self._key(cache, a, encoder="h264_nvenc")
+        assert self._key(cache, a) != self._key(cache, a, duration=2.0)
+
+    def test_survives_restart(self, tmp_path):
+        """Test that a fresh cache instance serves clips stored earlier."""
+        cache_dir = str(tmp_path / "cache")
+        image = self._write(tmp_path / "a.jpg", b"image-bytes")
+        clip = self._write(tmp_path / "clip.mp4", b"clip-bytes")
+
+        first = ClipCache(cache_dir)
+        first.put(self._key(first, image), clip)
+        restarted = ClipCache(cache_dir)
+
+        assert restarted.stats()["disk_bytes"] == len(b"clip-bytes")
+        assert restarted.get(self._key(restarted, image), str(tmp_path / "out.mp4"))
+
+    def test_size_eviction(self, tmp_path):
+        """Test that disk usage is bounded by max_bytes."""
+        cache = ClipCache(str(tmp_path / "cache"), max_bytes=2048)
+        clip = self._write(tmp_path / "clip.mp4", b"x" * 400)
+
+        for i in range(20):
+            cache.put(f"{i:064x}", clip)
+
+        stats = cache.stats()
+        assert stats["disk_bytes"] <= 2048
+        assert stats["evictions"] > 0
+        assert cache.get(f"{19:064x}", str(tmp_path / "out.mp4"))
+
+    @pytest.mark.asyncio
+    async def test_stored_under_encoder_that_produced_clip(self, tmp_path, monkeypatch):
+        """Test that an NVENC fallback to libx264 is cached as libx264."""
+        cache = ClipCache(str(tmp_path / "cache"))
+        image = self._write(tmp_path / "a.jpg", b"image-bytes")
+
+        async def encode_image_clip(output_path, **kwargs):
+            self._write(output_path, b"cpu-clip")
+            return "libx264"
+
+        monkeypatch.setattr(ffmpeg_pipeline, "get_clip_cache", lambda: cache)
+        monkeypatch.setattr(ffmpeg_pipeline, "is_nvenc_available", lambda: True)
+        monkeypatch.setattr(ffmpeg_pipeline, "encode_image_clip", encode_image_clip)
+
+        spec = ImageClipSpec(image_path=image, duration=1.5, motion_style="zoom_in")
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        paths = await create_clips_parallel(
+            [spec], str(out_dir), (1080, 1920), fps=30, use_gpu=True, job_id="test",
+        )
+
+        assert len(paths) == 1 and os.path.exists(paths[0])
+        assert cache.get(self._key(cache, image, "libx264"), str(tmp_path / "cpu.mp4"))
+        assert not cache.get(self._key(cache, image, "h264_nvenc"), str(tmp_path / "gpu.mp4"))
@@ -0,0 +1,104 @@
+"""Tests for compiled color grade LUTs."""
+
+import threading
+
+import numpy as np
+from app.utils import color_lut
+from app.utils.color_lut import ColorLUT, export_cube, get_color_lut
+
+
+def _warm_grade(img: np.ndarray) -> np.ndarray:
+    frame = img.astype(np.float32)
+    frame[:, :, 0] = frame[:, :, 0] * 1.1 + 5
+    frame[:, :, 2] = frame[:, :, 2] * 0.9
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+class TestColorLUT:
+    """Tests for ColorLUT."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.lut = ColorLUT.compile(_warm_grade)
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+
+    def test_apply_matches_grade(self):
+        """Test that the lookup reproduces the grade exactly."""
+        result = self.lut.apply(self.frame)
+        assert result.dtype == np.uint8
+        assert result.shape == self.frame.shape
+        np.testing.assert_array_equal(result, _warm_grade(self.frame))
+
+    def test_to_cube(self, tmp_path):
+        """Test .cube export header, size and corner values."""
+        path = export_cube("test.warm", _warm_grade, str(tmp_path), size=5)
+        lines = open(path).read().splitlines()
+
+        assert lines[1] == "LUT_3D_SIZE 5"
+        assert len(lines) == 4 + 5 ** 3
+        # First entry is black, last is white through the grade
+        assert lines[4] == "%.6f %.6f %.6f" % tuple(_warm_grade(np.zeros((1, 1, 3), np.uint8))[0, 0] / 255)
+        assert lines[-1] == "%.6f %.6f %.6f" % tuple(_warm_grade(np.full((1, 1, 3), 255, np.uint8))[0, 0] / 255)
+
+
+class TestGetColorLUT:
+    """Tests for the shared LUT cache."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        color_lut._luts.clear()
+        self.compiled = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def teardown_method(self):
+        """Don't leak test grades into other tests."""
+        color_lut._luts.clear()
+
+    def _patch_compile(self, monkeypatch):
+        compile_lut = ColorLUT.compile
+
+        def slow_compile(fn):
+            self.compiled.append(fn)
+            self.started.set()
+            assert self.release.wait(5)
+            return compile_lut(fn)
+
+        monkeypatch.setattr(color_lut.ColorLUT, "compile", staticmethod(slow_compile))
+
+    def test_compile_does_not_block_other_grades(self, monkeypatch):
+        """Test that a cached grade is served while another one compiles."""
+        cached = get_color_lut("test.cached", _warm_grade)
+        self._patch_compile(monkeypatch)
+        worker = threading.Thread(target=get_color_lut, args=("test.slow", _warm_grade))
+        worker.start()
+
+        try:
+            assert self.started.wait(5)
+            assert get_color_lut("test.cached", _warm_grade) is cached
+        finally:
+            self.release.set()
+            worker.join()
+
+        assert "test.slow" in color_lut._luts
+        assert color_lut._key_locks == {}
+
+    def test_same_grade_compiles_once(self, monkeypatch):
+        """Test that concurrent misses for one grade share a single compile."""
+        self._patch_compile(monkeypatch)
+        results = []
+
+        def worker():
+            results.append(get_color_lut("test.shared", _warm_grade))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        assert self.started.wait(5)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(self.compiled) == 1
+        assert all(lut is results[0] for lut in results)
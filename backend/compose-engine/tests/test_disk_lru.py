@@ -0,0 +1,90 @@
+"""Tests for the shared disk LRU used by the cache directories."""
+
+import os
+import threading
+
+from app.utils.disk_lru import DiskLRU
+
+
+class TestDiskLRU:
+    """Tests for DiskLRU."""
+
+    def _write(self, root, name: str, size: int, mtime: float):
+        path = os.path.join(root, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_scans_existing_entries(self, tmp_path):
+        """Test that the byte total covers matching files already on disk."""
+        self._write(tmp_path, "a.pkl", 100, 1000)
+        self._write(tmp_path, "b.pkl", 50, 1000)
+        self._write(tmp_path, "c.tmp", 999, 1000)
+
+        lru = DiskLRU(str(tmp_path), max_bytes=1000, suffix=".pkl")
+
+        assert lru.bytes == 150
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the oldest entries go first and touched ones survive."""
+        old = self._write(tmp_path, "old.pkl", 400, 1000)
+        used = self._write(tmp_path, "used.pkl", 400, 1001)
+        lru = DiskLRU(str(tmp_path), max_bytes=1000, suffix=".pkl")
+        DiskLRU.touch(old)
+
+        new = self._write(tmp_path, "new.pkl", 400, 2000)
+        lru.add(400)
+
+        assert os.path.exists(old)
+        assert not os.path.exists(used)
+        assert os.path.exists(new)
+        assert lru.bytes == 800
+        assert lru.evictions == 1
+
+    def test_walk_runs_without_lock(self, tmp_path, monkeypatch):
+        """Test that the total can be read and updated while eviction walks."""
+        self._write(tmp_path, "a.pkl", 600, 1000)
+        lru = DiskLRU(str(tmp_path), max_bytes=1000, suffix=".pkl")
+        self._write(tmp_path, "b.pkl", 600, 2000)
+
+        walking = threading.Event()
+        resume = threading.Event()
+        entries = list(lru._iter_entries())
+
+        def slow_walk():
+            walking.set()
+            resume.wait(5)
+            return iter(entries)
+
+        monkeypatch.setattr(lru, "_iter_entries", slow_walk)
+        evictor = threading.Thread(target=lru.add, args=(600,))
+        evictor.start()
+        assert walking.wait(5)
+
+        # Neither of these may block behind the walk
+        assert lru.bytes == 1200
+        lru.add(10)
+
+        resume.set()
+        evictor.join(5)
+        assert not evictor.is_alive()
+        # a.pkl evicted; the write made during the walk is kept in the total
+        assert lru.bytes == 610
+        assert lru.evictions == 1
+
+    def test_clear(self, tmp_path):
+        """Test that clear removes entries and files under extra dirs."""
+        entries = tmp_path / "blobs"
+        index = tmp_path / "index"
+        entries.mkdir()
+        index.mkdir()
+        self._write(entries, "a", 10, 1000)
+        self._write(index, "a.json", 10, 1000)
+        lru = DiskLRU(str(entries), max_bytes=1000)
+
+        lru.clear(extra_dirs=[str(index)])
+
+        assert lru.bytes == 0
+        assert os.listdir(entries) == []
+        assert os.listdir(index) == []
@@ -0,0 +1,185 @@
+"""Tests for streaming, hashing, resumable downloads."""
+
+import hashlib
+import io
+import os
+
+import httpx
+import numpy as np
+import pytest
+from PIL import Image
+from app.utils.downloader import download_http, download_object, sniff_content_type
+from app.utils.object_store import LocalBackend, ObjectStore
+
+
+def _noise_png() -> bytes:
+    pixels = np.random.default_rng(0).integers(0, 256, (180, 180, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+PNG = _noise_png()  # ~100KB
+CHUNK = 8192
+
+
+def _chunks(data: bytes, fail_after: int = None):
+    async def stream():
+        for start in range(0, len(data), CHUNK):
+            if fail_after is not None and start >= fail_after:
+                raise httpx.ReadError("connection dropped")
+            yield data[start:start + CHUNK]
+    return stream()
+
+
+class TestDownloadHttp:
+    """Tests for download_http."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.requests = []
+
+    def _client(self, handler) -> httpx.AsyncClient:
+        def record(request):
+            self.requests.append(request)
+            return handler(request, len(self.requests))
+        return httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+    @pytest.mark.asyncio
+    async def test_resumes_with_range(self, tmp_path):
+        """Test that a dropped download continues from where it stopped."""
+        def handler(request, n):
+            headers = {"content-type": "image/png", "etag": '"v1"'}
+            if n == 1:
+                return httpx.Response(200, headers={**headers, "content-length": str(len(PNG))},
+                                      content=_chunks(PNG, fail_after=5 * CHUNK))
+            start = int(request.headers["range"].split("=")[1].rstrip("-"))
+            return httpx.Response(206, headers={**headers, "content-range": f"bytes {start}-{len(PNG) - 1}/{len(PNG)}"},
+                                  content=_chunks(PNG[start:]))
+
+        path = str(tmp_path / "image.png")
+        async with self._client(handler) as client:
+            result = await download_http(client, "https://cdn.example/a.png", path, retry_backoff=0)
+
+        assert self.requests[1].headers["range"] == f"bytes={5 * CHUNK}-"
+        assert self.requests[1].headers["if-range"] == '"v1"'
+        assert result.resumed == 1
+        assert result.sha256 == hashlib.sha256(PNG).hexdigest()
+        assert result.content_type == "image/png"
+        with open(path, "rb") as f:
+            assert f.read() == PNG
+
+    @pytest.mark.asyncio
+    async def test_restarts_when_range_ignored(self, tmp_path):
+        """Test that a 200 answer to a Range request starts the file over."""
+        def handler(request, n):
+            return httpx.Response(200, content=_chunks(PNG, fail_after=3 * CHUNK if n == 1 else None))
+
+        path = str(tmp_path / "image.png")
+        async with self._client(handler) as client:
+            result = await download_http(client, "https://cdn.example/a.png", path, retry_backoff=0)
+
+        assert result.resumed == 0
+        assert result.size == len(PNG)
+        assert result.sha256 == hashlib.sha256(PNG).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_rejects_html_before_downloading_everything(self, tmp_path):
+        """Test that a hotlink-protection page is rejected and leaves no file."""
+        page = b"<!DOCTYPE html><html><body>Forbidden</body></html>" + b" " * 100_000
+        handler = lambda request, n: httpx.Response(200, headers={"content-type": "text/html"}, content=_chunks(page))
+
+        path = str(tmp_path / "image.jpg")
+        async with self._client(handler) as client:
+            with pytest.raises(ValueError, match="HTML"):
+                await download_http(client, "https://cdn.example/a.jpg", path)
+
+        assert not os.path.exists(path)
+        assert not os.path.exists(path + ".part")
+
+    @pytest.mark.asyncio
+    async def test_rejects_corrupt_image_body(self, tmp_path):
+        """Test that an image with a valid header but a broken body leaves no file."""
+        corrupt = PNG[:64] + bytes(len(PNG) - 64)
+        handler = lambda request, n: httpx.Response(200, headers={"content-type": "image/png"}, content=_chunks(corrupt))
+
+        path = str(tmp_path / "image.png")
+        async with self._client(handler) as client:
+            with pytest.raises(ValueError, match="corrupt image"):
+                await download_http(client, "https://cdn.example/a.png", path)
+
+        assert not os.path.exists(path)
+        assert not os.path.exists(path + ".part")
+
+    def test_sniff_content_type(self):
+        """Test magic byte detection."""
+        assert sniff_content_type(PNG[:64]) == "image/png"
+        assert sniff_content_type(b"\x00\x00\x00\x20ftypisom") == "video/mp4"
+        assert sniff_content_type(b"\x00\x00\x00\x20ftypheic") == "image/heic"
+        assert sniff_content_type(b"ID3\x04") == "audio/mpeg"
+        assert sniff_content_type(b"hello") is None
+
+
+class FlakyBackend(LocalBackend):
+    """Local backend that records GETs and drops the given ranges once."""
+
+    def __init__(self, root: str, fail_ranges=()):
+        super().__init__(root)
+        self.fail_ranges = set(fail_ranges)
+        self.ranges = []
+
+    async def get(self, bucket, key, start=0, end=None, if_match=None):
+        self.ranges.append((start, end))
+        if (start, end) in self.fail_ranges:
+            self.fail_ranges.discard((start, end))
+            raise ConnectionResetError("reset by peer")
+        async for chunk in super().get(bucket, key, start, end, if_match):
+            yield chunk
+
+
+class TestDownloadObject:
+    """Tests for download_object."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.video = b"\x00\x00\x00\x20ftypisom" + os.urandom(100_000)
+
+    async def _store(self, tmp_path, fail_ranges=()):
+        backend = FlakyBackend(str(tmp_path / "store"), fail_ranges)
+        await backend.put("bucket", "source.mp4", self.video)
+        store = ObjectStore()
+        store.register("file", lambda http: backend)
+        return store, backend
+
+    @pytest.mark.asyncio
+    async def test_ranged_parts_written_in_order(self, tmp_path):
+        """Test that parallel ranged GETs rebuild the object, retrying a failed part."""
+        store, backend = await self._store(tmp_path, fail_ranges={(30000, 39999)})
+        path = str(tmp_path / "source.mp4")
+
+        result = await download_object(
+            store, "file://bucket/source.mp4", path,
+            part_size=10_000, concurrency=3, ranged_threshold=50_000,
+        )
+        await store.close()
+
+        assert result.sha256 == hashlib.sha256(self.video).hexdigest()
+        assert result.content_type == "video/mp4"
+        assert result.etag == (await backend.head("bucket", "source.mp4")).etag
+        assert backend.ranges.count((30000, 39999)) == 2
+        assert store.downloads.stats()["peak_in_use"] == 3
+        with open(path, "rb") as f:
+            assert f.read() == self.video
+
+    @pytest.mark.asyncio
+    async def test_small_object_single_get(self, tmp_path):
+        """Test that small objects are streamed with one GET."""
+        store, backend = await self._store(tmp_path)
+        path = str(tmp_path / "source.mp4")
+
+        result = await download_object(store, "file://bucket/source.mp4", path)
+        await store.close()
+
+        assert backend.ranges == [(0, None)]
+        assert result.size == len(self.video)
+        assert result.sha256 == hashlib.sha256(self.video).hexdigest()
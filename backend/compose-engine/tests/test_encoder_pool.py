@@ -0,0 +1,129 @@
+"""Tests for batched clip encoding."""
+
+import asyncio
+
+import pytest
+import app.services  # noqa: F401 - app.renderers imports app.services first
+from app.renderers.encoder_pool import ClipEncoderPool, ClipWorkItem
+
+ENCODER_OPTS = ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18"]
+
+
+def _item(i: int) -> ClipWorkItem:
+    return ClipWorkItem(
+        image_path=f"img{i}.png",
+        output_path=f"clip_{i:03d}.mp4",
+        duration=0.4 + i / 10,
+        filter_chain=f"scale=10{i}:100",
+    )
+
+
+def _outputs(cmd):
+    return [arg for arg in cmd if arg.startswith("clip_")]
+
+
+class TestClipEncoderPool:
+    """Tests for ClipEncoderPool batching and per-clip fallback."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.commands = []
+        self.fallbacks = []
+        self.failing_clips = set()
+
+    def _pool(self, monkeypatch, workers=1, batch_size=3) -> ClipEncoderPool:
+        pool = ClipEncoderPool(
+            "ffmpeg", ENCODER_OPTS, 30, self._fallback,
+            workers=workers, batch_size=batch_size, job_id="test",
+        )
+
+        async def run_process(cmd):
+            self.commands.append(cmd)
+            outputs = _outputs(cmd)
+            if self.failing_clips & set(outputs):
+                return 1, b"Error opening input file"
+            return 0, b""
+
+        monkeypatch.setattr(pool, "_run_process", run_process)
+        return pool
+
+    async def _fallback(self, item: ClipWorkItem) -> bool:
+        self.fallbacks.append(item.output_path)
+        if item.output_path in self.failing_clips:
+            return False
+        item.encoder = "libx264"
+        return True
+
+    @pytest.mark.asyncio
+    async def test_batches_split(self, monkeypatch):
+        """Test that queued clips are split into batches of at most batch_size."""
+        items = [_item(i) for i in range(7)]
+
+        async with self._pool(monkeypatch) as pool:
+            results = await asyncio.gather(*(pool.encode(item) for item in items))
+
+        assert results == [True] * 7
+        batches = [_outputs(cmd) for cmd in self.commands]
+        assert [len(batch) for batch in batches] == [3, 3]
+        # The leftover clip runs on its own through the single-clip path
+        assert self.fallbacks == ["clip_006.mp4"]
+        assert sorted(sum(batches, []) + self.fallbacks) == [item.output_path for item in items]
+        assert all(item.encoder == "libx264" for item in items)
+        assert pool.stats["clips"] == 7
+
+    @pytest.mark.asyncio
+    async def test_fair_share_across_workers(self, monkeypatch):
+        """Test that waiting clips are shared between workers, not taken by one."""
+        items = [_item(i) for i in range(6)]
+
+        async with self._pool(monkeypatch, workers=2, batch_size=6) as pool:
+            results = await asyncio.gather(*(pool.encode(item) for item in items))
+
+        assert results == [True] * 6
+        # One worker alone would have taken all six
+        assert max(len(_outputs(cmd)) for cmd in self.commands) <= 3
+        assert len(sum((_outputs(cmd) for cmd in self.commands), [])) + len(self.fallbacks) == 6
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_falls_back_per_clip(self, monkeypatch):
+        """Test that a failed batch retries each clip and only the bad one fails."""
+        items = [_item(i) for i in range(3)]
+        self.failing_clips = {"clip_001.mp4"}
+
+        async with self._pool(monkeypatch) as pool:
+            results = await asyncio.gather(*(pool.encode(item) for item in items))
+
+        assert results == [True, False, True]
+        assert len(self.commands) == 1
+        assert self.fallbacks == ["clip_000.mp4", "clip_001.mp4", "clip_002.mp4"]
+        assert [item.encoder for item in items] == ["libx264", None, "libx264"]
+        assert pool.stats["batch_failures"] == 1
+        assert pool.stats["fallbacks"] == 3
+
+    @pytest.mark.asyncio
+    async def test_close_fails_unstarted_clips(self, monkeypatch):
+        """Test that closing the pool resolves clips that never ran."""
+        pool = self._pool(monkeypatch)
+        item = _item(0)
+        item.future = asyncio.get_running_loop().create_future()
+        pool._queue.put_nowait(item)
+
+        await pool.close()
+
+        assert item.future.result() is False
+
+    def test_build_command(self, monkeypatch):
+        """Test that each output gets its own map, duration and encoder options."""
+        pool = self._pool(monkeypatch)
+
+        cmd = pool.build_command([_item(0), _item(1)], threads=2)
+
+        assert cmd[:6] == ["ffmpeg", "-y", "-loop", "1", "-i", "img0.png"]
+        assert cmd[cmd.index("-filter_complex") + 1] == (
+            "[0:v]scale=100:100[o0];[1:v]scale=101:100[o1]"
+        )
+        second = cmd[cmd.index("[o1]") - 1:]
+        assert second == [
+            "-map", "[o1]", "-t", "0.5", *ENCODER_OPTS,
+            "-threads", "2", "-an", "-r", "30", "clip_001.mp4",
+        ]
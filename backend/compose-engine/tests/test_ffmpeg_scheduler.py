@@ -0,0 +1,205 @@
+"""Tests for the process-wide FFmpeg scheduler."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from app.utils import ffmpeg_scheduler
+from app.utils.ffmpeg_scheduler import (
+    FFmpegScheduler,
+    configure_worker_scheduler,
+    encoder_kind,
+    get_ffmpeg_scheduler,
+    with_threads,
+)
+
+
+class TestFFmpegScheduler:
+    """Tests for FFmpegScheduler admission."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.load = 0.0
+        self.memory = 8 * 1024 * 1024 * 1024
+        self.scheduler = FFmpegScheduler(
+            max_processes=2,
+            nvenc_sessions=1,
+            cpu_count=8,
+            load_reader=lambda: self.load,
+            memory_reader=lambda: self.memory,
+        )
+
+    async def _hold(self, job_id, kind, order, release):
+        async with self.scheduler.slot(job_id, kind):
+            order.append(job_id)
+            await release.wait()
+
+    @pytest.mark.asyncio
+    async def test_limits_cpu_processes(self):
+        """Test that at most max_processes CPU slots run at once."""
+        order = []
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._hold(f"job{i}", "cpu", order, release)) for i in range(3)]
+        await asyncio.sleep(0.05)
+
+        assert order == ["job0", "job1"]
+        assert self.scheduler.stats()["waiting"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["job0", "job1", "job2"]
+        assert self.scheduler.stats()["running_cpu"] == 0
+
+    @pytest.mark.asyncio
+    async def test_nvenc_has_its_own_limit(self):
+        """Test that NVENC sessions don't use CPU slots."""
+        order = []
+        release = asyncio.Event()
+        tasks = [
+            asyncio.ensure_future(self._hold("a", "cpu", order, release)),
+            asyncio.ensure_future(self._hold("b", "cpu", order, release)),
+            asyncio.ensure_future(self._hold("c", "nvenc", order, release)),
+            asyncio.ensure_future(self._hold("d", "nvenc", order, release)),
+        ]
+        await asyncio.sleep(0.05)
+
+        assert order == ["a", "b", "c"]
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_fair_share_between_jobs(self):
+        """Test that a freed slot goes to the job with fewer running processes."""
+        order = []
+        busy = asyncio.Event()
+        release = asyncio.Event()
+        holders = [asyncio.ensure_future(self._hold("big", "cpu", order, busy)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        waiting = [asyncio.ensure_future(self._hold("big", "cpu", order, release)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        small = asyncio.ensure_future(self._hold("small", "cpu", order, release))
+        await asyncio.sleep(0.05)
+
+        # One "big" slot frees: "small" (0 running) beats the older "big" requests
+        busy.set()
+        await asyncio.sleep(0.05)
+        assert order[2] == "small"
+
+        release.set()
+        await asyncio.gather(*holders, *waiting, small)
+
+    @pytest.mark.asyncio
+    async def test_memory_pressure_holds_extra_processes(self):
+        """Test that low memory holds new processes but never the first one."""
+        self.memory = 0
+        order = []
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._hold(f"job{i}", "cpu", order, release)) for i in range(2)]
+        await asyncio.sleep(0.05)
+
+        assert order == ["job0"]
+        self.memory = 8 * 1024 * 1024 * 1024
+        await asyncio.sleep(1.2)  # Next poll re-reads memory
+        assert order == ["job0", "job1"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_nvenc_weight_counts_sessions(self):
+        """Test that a batched process takes one NVENC session per encoder."""
+        scheduler = FFmpegScheduler(max_processes=2, nvenc_sessions=8, cpu_count=8)
+        order = []
+        release = asyncio.Event()
+
+        async def hold(job_id, weight):
+            async with scheduler.slot(job_id, "nvenc", weight):
+                order.append(job_id)
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(hold(f"batch{i}", 6)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        # A single-session request behind the blocked batch waits its turn
+        tasks.append(asyncio.ensure_future(hold("single", 1)))
+        await asyncio.sleep(0.05)
+
+        assert order == ["batch0"]
+        assert scheduler.stats()["running_nvenc"] == 6
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["batch0", "batch1", "single"]
+        assert scheduler.stats()["running_nvenc"] == 0
+
+    def test_weight_is_clamped_to_limit(self):
+        """Test that a request larger than the limit still runs alone."""
+        with self.scheduler.slot_sync("job", "nvenc", weight=6):
+            assert self.scheduler.stats()["running_nvenc"] == 1
+        assert self.scheduler.stats()["running_nvenc"] == 0
+
+    def test_slot_sync_from_threads(self):
+        """Test that worker threads share the CPU limit with blocking slots."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(i):
+            with self.scheduler.slot_sync(f"job{i}"):
+                with lock:
+                    running.append(i)
+                    peak.append(len(running))
+                time.sleep(0.05)
+                with lock:
+                    running.remove(i)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert max(peak) == 2
+        stats = self.scheduler.stats()
+        assert (stats["admitted"], stats["running_cpu"], stats["waiting"]) == (5, 0, 0)
+
+    def test_threads_hint(self):
+        """Test that running processes split the cores."""
+        assert self.scheduler.threads_hint() == 4
+        assert with_threads(["ffmpeg", "-i", "in.mp4", "out.mp4"], 4) == [
+            "ffmpeg", "-i", "in.mp4", "-threads", "4", "out.mp4"
+        ]
+        assert encoder_kind(["ffmpeg", "-c:v", "h264_nvenc", "out.mp4"]) == "nvenc"
+        assert encoder_kind(["ffmpeg", "-c:v", "libx264", "out.mp4"]) == "cpu"
+
+
+class TestWorkerScheduler:
+    """Tests for splitting the budget between pool worker processes."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        ffmpeg_scheduler._scheduler = None
+
+    def teardown_method(self):
+        """Drop the configured scheduler so other tests build their own."""
+        ffmpeg_scheduler._scheduler = None
+
+    def test_worker_gets_its_share(self, monkeypatch):
+        """Test that a worker scheduler has 1/workers of the processes and cores."""
+        monkeypatch.setattr(ffmpeg_scheduler.os, "cpu_count", lambda: 16)
+        full = get_ffmpeg_scheduler()
+
+        worker = configure_worker_scheduler(4)
+
+        assert get_ffmpeg_scheduler() is worker
+        assert worker.max_processes == full.max_processes // 4
+        assert worker.nvenc_sessions == full.nvenc_sessions // 4
+        assert worker.threads_hint() == full.threads_hint()
+
+    def test_share_is_at_least_one(self, monkeypatch):
+        """Test that more workers than slots still leaves each worker one process."""
+        monkeypatch.setattr(ffmpeg_scheduler.os, "cpu_count", lambda: 4)
+
+        worker = configure_worker_scheduler(8)
+
+        assert (worker.max_processes, worker.nvenc_sessions, worker.cpu_count) == (1, 1, 1)
@@ -0,0 +1,88 @@
+"""Tests for the cached ffprobe service."""
+
+import asyncio
+import os
+
+import pytest
+from app.renderers.utils.ffprobe import ProbeResult, ProbeService
+
+
+class CountingProbeService(ProbeService):
+    """Probe service answering from canned ffprobe JSON instead of running ffprobe."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.runs = []
+
+    async def _run(self, path):
+        self.runs.append(os.path.basename(path))
+        await asyncio.sleep(0.01)
+        size = os.path.getsize(path)
+        return ProbeResult(
+            path=path,
+            format={"duration": str(size / 10)},
+            streams=[{"codec_type": "video", "width": 1080, "height": 1920, "r_frame_rate": "30000/1001"}],
+        )
+
+
+class TestProbeService:
+    """Tests for ProbeService."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.service = CountingProbeService(max_entries=2)
+
+    @pytest.mark.asyncio
+    async def test_cached_until_file_changes(self, tmp_path):
+        """Test that a file is probed once until its size or mtime changes."""
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"x" * 100)
+
+        first = await self.service.probe(str(path))
+        second = await self.service.probe(str(path))
+        assert first is second
+        assert first.duration == 10.0
+
+        path.write_bytes(b"x" * 200)
+        assert (await self.service.probe(str(path))).duration == 20.0
+        assert self.service.runs == ["video.mp4", "video.mp4"]
+        assert self.service.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_probe_many_dedups_and_keeps_order(self, tmp_path):
+        """Test that a batch probes each file once, concurrently, in input order."""
+        paths = []
+        for name, size in (("a.mp4", 10), ("b.mp4", 20)):
+            (tmp_path / name).write_bytes(b"x" * size)
+            paths.append(str(tmp_path / name))
+
+        results = await asyncio.gather(
+            self.service.probe_many([paths[1], paths[0], paths[1]]),
+            self.service.probe(paths[0]),
+        )
+
+        assert [r.duration for r in results[0]] == [2.0, 1.0, 2.0]
+        assert sorted(self.service.runs) == ["a.mp4", "b.mp4"]
+        assert self.service.stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the cache holds at most max_entries results."""
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_bytes(b"x")
+            await self.service.probe(str(tmp_path / name))
+        await self.service.probe(str(tmp_path / "a"))
+
+        assert self.service.stats()["entries"] == 2
+        assert self.service.runs == ["a", "b", "c", "a"]
+
+    def test_probe_result_fields(self):
+        """Test duration fallback, size and frame rate parsing."""
+        result = ProbeResult(path="x", streams=[
+            {"codec_type": "audio", "duration": "12.5"},
+            {"codec_type": "video", "width": 720, "height": 1280, "r_frame_rate": "30000/1001", "duration": "12.0"},
+        ])
+        assert result.duration == 12.5
+        assert result.size == (720, 1280)
+        assert round(result.fps, 2) == 29.97
+        assert ProbeResult(path="img.png").duration is None
@@ -0,0 +1,67 @@
+"""Tests for streaming raw frames into FFmpeg."""
+
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from app.utils.frame_pipe import FramePipeEncoder
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None,
+    reason="ffmpeg not installed",
+)
+
+ENCODER_ARGS = ["-c:v", "libx264", "-preset", "ultrafast"]
+
+
+def _count_frames(path: str) -> int:
+    result = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", path, "-map", "0:v", "-f", "framemd5", "-"],
+        capture_output=True, text=True, check=True,
+    )
+    return len([line for line in result.stdout.splitlines() if not line.startswith("#")])
+
+
+class TestFramePipeEncoder:
+    """Tests for FramePipeEncoder."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.frames = [np.full((24, 32, 3), i * 10, dtype=np.uint8) for i in range(12)]
+
+    @requires_ffmpeg
+    def test_writes_every_frame(self, tmp_path):
+        """Test that every written frame ends up in the video."""
+        output = str(tmp_path / "out.mp4")
+
+        with FramePipeEncoder(output, fps=30, encoder_args=ENCODER_ARGS, max_queued_frames=2) as encoder:
+            for frame in self.frames:
+                encoder.write(frame)
+
+        assert encoder.frames_written == 12
+        assert _count_frames(output) == 12
+
+    @requires_ffmpeg
+    def test_ffmpeg_exiting_early_raises(self, tmp_path):
+        """Test that an FFmpeg failure surfaces with its stderr instead of hanging."""
+        output = str(tmp_path / "out.mp4")
+
+        with pytest.raises(RuntimeError, match="no_such_codec"):
+            with FramePipeEncoder(output, fps=30, encoder_args=["-c:v", "no_such_codec"]) as encoder:
+                for frame in self.frames * 20:
+                    encoder.write(frame)
+
+    def test_close_without_frames_raises(self, tmp_path):
+        """Test that closing before any frame is written is an error."""
+        encoder = FramePipeEncoder(str(tmp_path / "out.mp4"), fps=30, encoder_args=ENCODER_ARGS)
+
+        with pytest.raises(RuntimeError, match="no frames"):
+            encoder.close()
+
+    def test_rejects_wrong_channel_count(self, tmp_path):
+        """Test that frames must match the input pixel format."""
+        encoder = FramePipeEncoder(str(tmp_path / "out.mp4"), fps=30, encoder_args=ENCODER_ARGS)
+
+        with pytest.raises(ValueError):
+            encoder.write(np.zeros((24, 32, 4), dtype=np.uint8))
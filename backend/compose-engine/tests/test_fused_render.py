@@ -0,0 +1,101 @@
+"""Tests for fused (single-pass) render planning."""
+
+import pytest
+import app.services  # noqa: F401 - app.renderers imports app.services first
+from app.renderers.fused_render import (
+    crossfade_duration,
+    fused_timeline,
+    plan_fused_render,
+    slot_frame_counts,
+)
+from app.renderers.render_plan import optimize
+
+
+def _chains(plan, label):
+    return [
+        entry
+        for node in plan.nodes.values()
+        if node.params.get("label") == label
+        for entry in node.params["chain"]
+    ]
+
+
+class TestFusedTimeline:
+    """Tests for slot rounding and transition timing."""
+
+    def test_slot_frame_counts_do_not_drift(self):
+        """Test that rounding on the cumulative timeline keeps the total exact."""
+        frames = slot_frame_counts([0.34, 0.33, 0.33] * 10, 30)
+
+        assert frames == [10, 10, 10] * 10
+        assert sum(frames) == 300
+
+    def test_slot_frame_counts_at_least_one(self):
+        """Test that every slot gets a frame, however short."""
+        assert slot_frame_counts([0.01, 0.01, 1.0], 30) == [1, 1, 29]
+
+    def test_crossfade_duration(self):
+        """Test the 25% rule, its clamps and the per-slot shortening."""
+        assert crossfade_duration([2.0, 2.0]) == pytest.approx(0.5)
+        assert crossfade_duration([0.4, 0.4]) == pytest.approx(0.2)
+        assert crossfade_duration([1.0, 0.25, 1.0]) == pytest.approx(0.15)
+        assert crossfade_duration([1.0, 0.15, 1.0]) == pytest.approx(0.1)
+
+    def test_crossfade_offsets(self):
+        """Test that each xfade starts one transition before the end so far."""
+        frames, offsets, length, duration = fused_timeline([1.0, 1.0, 1.0], 30, crossfade=True)
+
+        assert frames == [30, 30, 30]
+        assert offsets == pytest.approx([0.75, 1.5])
+        assert length == pytest.approx(2.5)
+        assert duration == pytest.approx(2.5)
+
+    def test_trim_only_beyond_tolerance(self):
+        """Test that videos are trimmed only when well over target."""
+        assert fused_timeline([1.0, 1.0], 30, target_duration=1.6)[3] == pytest.approx(2.0)
+        assert fused_timeline([1.0, 1.0], 30, target_duration=1.4)[3] == pytest.approx(1.4)
+
+
+class TestPlanFusedRender:
+    """Tests for plan_fused_render."""
+
+    def test_direct_cuts_share_repeated_images(self):
+        """Test that repeated images are decoded once and cut with concat."""
+        plan = plan_fused_render(["a.png", "b.png", "a.png"], [1.0, 1.0, 1.0], (100, 100))
+        optimize(plan)
+
+        inputs = [node for node in plan.nodes.values() if node.op == "input"]
+        assert sorted(node.params["path"] for node in inputs) == ["a.png", "b.png"]
+        assert _chains(plan, "concat") == ["concat=n=3:v=1:a=0"]
+        assert plan.metadata["duration"] == pytest.approx(3.0)
+
+    def test_requested_transitions(self):
+        """Test that each boundary uses its transition, missing ones fade."""
+        plan = plan_fused_render(
+            ["a.png", "b.png", "c.png"], [1.0, 1.0, 1.0], (100, 100),
+            crossfade=True, transitions=["wipeleft"],
+        )
+
+        assert _chains(plan, "transition") == [
+            "xfade=transition=wipeleft:duration=0.250:offset=0.750",
+            "xfade=transition=fade:duration=0.250:offset=1.500",
+        ]
+
+    def test_unsupported_transition_rejected(self):
+        """Test that transitions xfade cannot render fail planning."""
+        with pytest.raises(ValueError):
+            plan_fused_render(
+                ["a.png", "b.png"], [1.0, 1.0], (100, 100),
+                crossfade=True, transitions=["page_curl_3d"],
+            )
+
+    def test_trim_and_audio(self):
+        """Test that trimming and the audio chain follow the final duration."""
+        plan = plan_fused_render(
+            ["a.png", "b.png"], [2.0, 2.0], (100, 100),
+            target_duration=3.0, audio_path="music.mp3",
+        )
+
+        assert _chains(plan, "trim") == ["trim=duration=3.000"]
+        assert _chains(plan, "audio")[0].endswith("atrim=duration=3.0")
+        assert plan.output.params["shortest"] is True
@@ -0,0 +1,74 @@
+"""Tests for streamed GL transitions (software rendering via OSMesa/EGL)."""
+
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from PIL import Image
+
+gl_renderer = pytest.importorskip("app.effects.renderers.gl_renderer")
+
+WIDTH, HEIGHT = 64, 48
+
+
+def _decode(path: str) -> np.ndarray:
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+        capture_output=True,
+        check=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.uint8).reshape(-1, HEIGHT, WIDTH, 3)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+class TestGLTransitionRenderer:
+    """Tests for GLTransitionRenderer.render_transition."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        if not gl_renderer.GL_AVAILABLE:
+            pytest.skip("PyOpenGL not installed")
+        self.renderer = gl_renderer.GLTransitionRenderer(WIDTH, HEIGHT)
+        if not self.renderer.is_available():
+            pytest.skip("No headless GL context")
+
+    def teardown_method(self):
+        self.renderer.cleanup()
+
+    def _image(self, tmp_path, name, top, bottom):
+        img = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        img[: HEIGHT // 2] = top
+        img[HEIGHT // 2:] = bottom
+        path = str(tmp_path / name)
+        Image.fromarray(img).save(path)
+        return path
+
+    def test_streams_every_frame_upright(self, tmp_path):
+        """Test that all frames reach the video, in order and not flipped."""
+        red_blue = self._image(tmp_path, "a.png", (255, 0, 0), (0, 0, 255))
+        green_black = self._image(tmp_path, "b.png", (0, 255, 0), (0, 0, 0))
+        output = str(tmp_path / "fade.mp4")
+
+        assert self.renderer.render_transition(red_blue, green_black, output, "gl_fade", duration=0.5, fps=10)
+
+        frames = _decode(output).astype(int)
+        assert len(frames) == 5
+        # First frame is the source image, top half red
+        assert abs(frames[0, 4, WIDTH // 2] - (255, 0, 0)).max() < 40
+        assert abs(frames[0, HEIGHT - 4, WIDTH // 2] - (0, 0, 255)).max() < 40
+        # Last frame is the destination image, top half green
+        assert abs(frames[-1, 4, WIDTH // 2] - (0, 255, 0)).max() < 40
+
+    def test_textures_cached_across_transitions(self, tmp_path):
+        """Test that a shared image is uploaded once."""
+        a = self._image(tmp_path, "a.png", (255, 0, 0), (255, 0, 0))
+        b = self._image(tmp_path, "b.png", (0, 255, 0), (0, 255, 0))
+        c = self._image(tmp_path, "c.png", (0, 0, 255), (0, 0, 255))
+
+        assert self.renderer.render_transition(a, b, str(tmp_path / "ab.mp4"), duration=0.2, fps=10)
+        texture_b = self.renderer._get_texture(b)
+        assert self.renderer.render_transition(b, c, str(tmp_path / "bc.mp4"), duration=0.2, fps=10)
+
+        assert self.renderer._get_texture(b) == texture_b
+        assert len(self.renderer._texture_cache) == 3
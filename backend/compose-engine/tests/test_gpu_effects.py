@@ -0,0 +1,91 @@
+"""Tests for batched segment processing in GPUEffects."""
+
+import numpy as np
+import pytest
+from app.slideshow_v2.effects.gpu_effects import GPUEffects
+
+OUTPUT_SIZE = (120, 200)
+NUM_FRAMES = 6
+
+MOTIONS = {
+    "zoom_in": {"scales": np.linspace(1.0, 1.3, NUM_FRAMES)},
+    "zoom_out_pad": {"scales": np.linspace(1.0, 0.8, NUM_FRAMES)},
+    "pan": {
+        "scales": [1.2] * NUM_FRAMES,
+        "positions": [(x, 0.5) for x in np.linspace(0.2, 0.8, NUM_FRAMES)],
+    },
+    "shake": {"scales": [1.1] * NUM_FRAMES, "rotations": np.linspace(-3, 3, NUM_FRAMES)},
+}
+
+
+def _photo_like(h: int = 240, w: int = 160) -> np.ndarray:
+    """Gradients with a few hard-edged shapes, like a still photo."""
+    yy, xx = np.mgrid[:h, :w]
+    img = np.stack([xx * 255 / w, yy * 255 / h, (xx + yy) * 255 / (w + h)], axis=-1).astype(np.uint8)
+    img[60:120, 40:100] = (200, 40, 40)
+    img[150:200, 90:140] = (30, 160, 220)
+    return img
+
+
+class TestProcessSegment:
+    """Tests that process_segment matches per-frame process_frame."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.image = _photo_like()
+
+    def _compare(self, motion, **effects) -> np.ndarray:
+        fx = GPUEffects()
+        segment = np.concatenate(list(fx.process_segment(
+            self.image, output_size=OUTPUT_SIZE, chunk_size=4, **motion, **effects,
+        )))
+
+        scales = motion.get("scales", [1.0] * NUM_FRAMES)
+        positions = motion.get("positions", [(0.5, 0.5)] * NUM_FRAMES)
+        rotations = motion.get("rotations", [0.0] * NUM_FRAMES)
+        reference = np.stack([
+            fx.process_frame(
+                self.image,
+                motion_scale=float(scales[i]),
+                motion_position=tuple(positions[i]),
+                motion_rotation=float(rotations[i]),
+                output_size=OUTPUT_SIZE,
+                **effects,
+            )
+            for i in range(NUM_FRAMES)
+        ])
+
+        assert segment.shape == reference.shape == (NUM_FRAMES, OUTPUT_SIZE[1], OUTPUT_SIZE[0], 3)
+        return np.abs(segment.astype(np.int16) - reference.astype(np.int16))
+
+    @pytest.mark.parametrize("motion", MOTIONS.keys())
+    def test_matches_process_frame(self, motion):
+        """Test that ungraded segments match up to resampler rounding."""
+        diff = self._compare(MOTIONS[motion], vignette=True)
+        assert diff.max() <= 2
+
+    @pytest.mark.parametrize("grade", ["cinematic", "vibrant"])
+    @pytest.mark.parametrize("motion", MOTIONS.keys())
+    def test_graded_matches_process_frame(self, motion, grade):
+        """Test that grading before resampling stays within tolerance.
+
+        Grades are per-pixel, so grading the source first only differs by
+        interpolation error where neighbouring colors meet: at most a few
+        levels over the frame, a few tens along hard, padded or rotated edges.
+        """
+        diff = self._compare(MOTIONS[motion], color_grade=grade)
+        assert np.percentile(diff, 99) <= 3
+        assert diff.mean() < 0.5
+
+    def test_beat_flash_per_frame(self):
+        """Test that per-frame beat proximity brightens only its own frame."""
+        fx = GPUEffects()
+        proximities = [0.0, 1.0, 0.0]
+        frames = np.concatenate(list(fx.process_segment(
+            self.image, beat_proximities=proximities, output_size=OUTPUT_SIZE,
+        )))
+
+        np.testing.assert_array_equal(frames[0], frames[2])
+        assert frames[1].astype(np.int16).mean() > frames[0].astype(np.int16).mean()
+        reference = fx.process_frame(self.image, beat_proximity=1.0, output_size=OUTPUT_SIZE)
+        np.testing.assert_array_equal(frames[1], reference)
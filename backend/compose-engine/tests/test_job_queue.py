@@ -0,0 +1,82 @@
+"""Tests for job state updates in JobQueue (in-memory store)."""
+
+import asyncio
+
+import pytest
+from app.models.responses import JobStatus
+from app.utils.job_queue import JobQueue
+
+
+class TestJobQueue:
+    """Tests for partial, coalesced job updates."""
+
+    async def _queue(self, progress_interval=0.2):
+        queue = JobQueue("redis://127.0.0.1:1/0", progress_interval=progress_interval)
+        await queue.connect()
+        return queue
+
+    @pytest.mark.asyncio
+    async def test_payload_kept_separately(self):
+        """Test that job state and the request payload are stored apart."""
+        queue = await self._queue()
+        await queue.create_job("job-1", {"images": ["a.jpg"] * 3})
+
+        job = await queue.get_job("job-1")
+        assert job["status"] == "queued"
+        assert job["progress"] == 0
+        assert "data" not in job
+        assert await queue.get_job_data("job-1") == {"images": ["a.jpg"] * 3}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_keep_all_fields(self):
+        """Test that updates touching different fields don't overwrite each other."""
+        queue = await self._queue(progress_interval=0)
+        await queue.create_job("job-1", {})
+
+        await asyncio.gather(
+            queue.update_job("job-1", metadata={"modal_call_id": "fc-1"}),
+            queue.update_job("job-1", progress=40, current_step="Encoding"),
+            queue.update_job("job-1", output_url="https://cdn/out.mp4"),
+        )
+
+        job = await queue.get_job("job-1")
+        assert job["metadata"] == {"modal_call_id": "fc-1"}
+        assert job["progress"] == 40
+        assert job["output_url"] == "https://cdn/out.mp4"
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_not_created(self):
+        """Test that updating a missing job is a no-op."""
+        queue = await self._queue()
+        await queue.update_job("missing", status=JobStatus.PROCESSING)
+        assert await queue.get_job("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_progress_coalesced(self):
+        """Test that rapid progress ticks are written once with the latest values."""
+        queue = await self._queue(progress_interval=0.2)
+        await queue.create_job("job-1", {})
+        await queue.update_job("job-1", status=JobStatus.PROCESSING, progress=5)
+
+        for progress in (10, 20, 30):
+            await queue.update_job("job-1", progress=progress, current_step=f"Step {progress}")
+        assert (await queue.get_job("job-1"))["progress"] == 5
+
+        await asyncio.sleep(0.3)
+        job = await queue.get_job("job-1")
+        assert (job["progress"], job["current_step"]) == (30, "Step 30")
+
+    @pytest.mark.asyncio
+    async def test_status_change_flushes_pending_progress(self):
+        """Test that a status change writes immediately, with pending progress."""
+        queue = await self._queue(progress_interval=10)
+        await queue.create_job("job-1", {})
+        await queue.update_job("job-1", status=JobStatus.PROCESSING)
+        await queue.update_job("job-1", progress=90, current_step="Uploading")
+
+        await queue.update_job("job-1", status=JobStatus.FAILED, error="upload failed")
+
+        status = await queue.get_job_status("job-1")
+        assert status.status == JobStatus.FAILED
+        assert (status.progress, status.current_step, status.error) == (90, "Uploading", "upload failed")
+        assert not queue._flush_tasks
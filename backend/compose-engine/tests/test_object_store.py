@@ -0,0 +1,212 @@
+"""Tests for the async object store client."""
+
+import asyncio
+
+import httpx
+import pytest
+from app.utils.object_store import (
+    ConnectionBudget,
+    ObjectStore,
+    ObjectStoreError,
+    S3Backend,
+    close_object_store,
+    get_object_store,
+    parse_uri,
+)
+from app.utils.uploader import MIN_PART_SIZE
+
+
+class TestS3Backend:
+    """Tests for S3Backend over a mocked HTTP transport."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.requests = []
+
+    def _store(self, handler):
+        def record(request):
+            self.requests.append(request)
+            return handler(request)
+
+        http = httpx.AsyncClient(transport=httpx.MockTransport(record))
+        store = ObjectStore(http=http)
+        store.register("s3", lambda http: S3Backend(
+            http, region="ap-northeast-2", access_key_id="AKIDEXAMPLE", secret_access_key="secret",
+        ))
+        return store
+
+    @pytest.mark.asyncio
+    async def test_requests_are_signed_in_process(self):
+        """Test SigV4 headers on a ranged GET, without hashing the payload over HTTPS."""
+        store = self._store(lambda request: httpx.Response(206, content=b"abc"))
+
+        data = await store.read("s3://hydra/images/a b.jpg", start=10, end=12, if_match="v1")
+        await store.close()
+
+        request = self.requests[0]
+        assert data == b"abc"
+        assert str(request.url) == "https://hydra.s3.ap-northeast-2.amazonaws.com/images/a%20b.jpg"
+        assert request.headers["range"] == "bytes=10-12"
+        assert request.headers["if-match"] == '"v1"'
+        assert request.headers["x-amz-content-sha256"] == "UNSIGNED-PAYLOAD"
+        assert request.headers["authorization"].startswith(
+            "AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/"
+        )
+        assert "/ap-northeast-2/s3/aws4_request" in request.headers["authorization"]
+
+    @pytest.mark.asyncio
+    async def test_follows_bucket_region(self):
+        """Test that a bucket in another region is retried there and remembered."""
+        def handler(request):
+            if request.url.host.endswith("ap-northeast-2.amazonaws.com"):
+                return httpx.Response(301, headers={"x-amz-bucket-region": "us-east-1"})
+            return httpx.Response(200, headers={"content-length": "42", "etag": '"e1"'})
+
+        store = self._store(handler)
+        first = await store.head("s3://us-bucket/a.mp4")
+        await store.head("s3://us-bucket/b.mp4")
+        await store.close()
+
+        assert (first.size, first.etag) == (42, "e1")
+        assert [r.url.host for r in self.requests] == [
+            "us-bucket.s3.ap-northeast-2.amazonaws.com",
+            "us-bucket.s3.us-east-1.amazonaws.com",
+            "us-bucket.s3.us-east-1.amazonaws.com",
+        ]
+        assert "/us-east-1/s3/" in self.requests[-1].headers["authorization"]
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload(self):
+        """Test the multipart XML exchange, including errors reported with status 200."""
+        def handler(request):
+            if request.method == "POST" and "uploads" in request.url.params:
+                return httpx.Response(200, content=b"<InitiateMultipartUploadResult><UploadId>u1</UploadId></InitiateMultipartUploadResult>")
+            if request.method == "PUT":
+                return httpx.Response(200, headers={"etag": '"p1"'})
+            return httpx.Response(200, content=b"<Error><Code>InternalError</Code><Message>retry</Message></Error>")
+
+        store = self._store(handler)
+        upload_id = await store.create_multipart("s3://hydra/out.mp4", "video/mp4")
+        etag = await store.upload_part("s3://hydra/out.mp4", upload_id, 1, b"x" * 100)
+        with pytest.raises(ObjectStoreError) as excinfo:
+            await store.complete_multipart("s3://hydra/out.mp4", upload_id, [(1, etag)])
+        await store.close()
+
+        assert (upload_id, etag) == ("u1", '"p1"')
+        assert self.requests[1].url.params["partNumber"] == "1"
+        assert b"<PartNumber>1</PartNumber><ETag>\"p1\"</ETag>" in self.requests[2].content
+        assert excinfo.value.code == "InternalError"
+        assert excinfo.value.retryable
+        assert store.uploads.stats()["acquired"] == 3
+        assert store.downloads.stats()["acquired"] == 0
+
+
+    @pytest.mark.asyncio
+    async def test_dotted_bucket_uses_path_style(self):
+        """Test that buckets with dots are addressed path-style (TLS wildcard doesn't match)."""
+        store = self._store(lambda request: httpx.Response(200, headers={"content-length": "1"}))
+        await store.head("s3://media.hydra/a.mp4")
+        await store.close()
+
+        assert str(self.requests[0].url) == "https://s3.ap-northeast-2.amazonaws.com/media.hydra/a.mp4"
+        assert store.public_url("s3://media.hydra/a.mp4") == "https://s3.ap-northeast-2.amazonaws.com/media.hydra/a.mp4"
+
+
+class TestS3BackendServer:
+    """Tests for S3Backend against a real S3-compatible server (moto or MinIO)."""
+
+    def _store(self, s3_endpoint, secret_access_key=None):
+        endpoint, access_key_id, secret = s3_endpoint
+        store = ObjectStore()
+        store.register("s3", lambda http: S3Backend(
+            http, region="us-east-1", endpoint_url=endpoint,
+            access_key_id=access_key_id, secret_access_key=secret_access_key or secret,
+        ))
+        return store
+
+    @pytest.mark.asyncio
+    async def test_put_head_get_delete(self, s3_endpoint, s3_bucket):
+        """Test that signed single-part requests are accepted and round-trip."""
+        store = self._store(s3_endpoint)
+        uri = f"s3://{s3_bucket}/images/a b+c.jpg"
+        data = bytes(range(256)) * 40
+
+        etag = await store.put(uri, data, content_type="image/jpeg")
+        info = await store.head(uri)
+        full = await store.read(uri)
+        ranged = await store.read(uri, start=100, end=199, if_match=info.etag)
+        await store.delete(uri)
+        with pytest.raises(ObjectStoreError) as excinfo:
+            await store.head(uri)
+        await store.close()
+
+        assert (info.size, info.etag) == (len(data), etag)
+        assert full == data
+        assert ranged == data[100:200]
+        assert excinfo.value.status == 404
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload(self, s3_endpoint, s3_bucket):
+        """Test that the server accepts the multipart XML exchange."""
+        store = self._store(s3_endpoint)
+        uri = f"s3://{s3_bucket}/out.mp4"
+        first, last = b"a" * MIN_PART_SIZE, b"b" * 1000
+
+        upload_id = await store.create_multipart(uri, "video/mp4")
+        etags = [
+            await store.upload_part(uri, upload_id, 1, first),
+            await store.upload_part(uri, upload_id, 2, last),
+        ]
+        await store.complete_multipart(uri, upload_id, list(zip([1, 2], etags)))
+
+        aborted = await store.create_multipart(f"s3://{s3_bucket}/aborted.mp4")
+        await store.abort_multipart(f"s3://{s3_bucket}/aborted.mp4", aborted)
+        data = await store.read(uri)
+        await store.close()
+
+        assert data == first + last
+
+    @pytest.mark.asyncio
+    async def test_bad_signature_rejected(self, s3_endpoint, s3_bucket):
+        """Test that the server really checks signatures."""
+        store = self._store(s3_endpoint, secret_access_key="wrong-secret")
+        with pytest.raises(ObjectStoreError) as excinfo:
+            await store.put(f"s3://{s3_bucket}/x.txt", b"x")
+        await store.close()
+
+        assert excinfo.value.status == 403
+
+
+class TestObjectStore:
+    """Tests for connection budgets and the shared store."""
+
+    @pytest.mark.asyncio
+    async def test_budget_bounds_concurrency(self):
+        """Test that a budget never runs more than its limit and counts the waiting."""
+        budget = ConnectionBudget("downloads", 2)
+        waiting = []
+
+        async def request():
+            async with budget.slot():
+                waiting.append(budget.waiting)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(5)))
+
+        stats = budget.stats()
+        assert (stats["peak_in_use"], stats["acquired"], stats["in_use"]) == (2, 5, 0)
+        assert max(waiting) > 0
+        assert stats["wait_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_one_store_per_event_loop(self):
+        """Test that callers on the same loop share the store."""
+        assert get_object_store() is get_object_store()
+        assert set(get_object_store().stats()) >= {"downloads", "uploads", "http_pool"}
+        await close_object_store()
+
+    def test_parse_uri(self):
+        """Test URI parsing."""
+        assert parse_uri("s3://bucket/a/b.mp4") == ("s3", "bucket", "a/b.mp4")
+        with pytest.raises(ValueError):
+            parse_uri("https://bucket.s3.amazonaws.com/")
@@ -0,0 +1,58 @@
+"""Tests for the vectorized particle renderer."""
+
+import numpy as np
+from app.effects.particles import DustParticles, SparkleParticles
+
+
+def _draw_dust_reference(particles: DustParticles, t: float) -> np.ndarray:
+    """Per-particle loop the renderer replaces."""
+    h, w = particles.height, particles.width
+    dust = np.zeros((h, w), dtype=np.float32)
+    for x, y, size, speed, drift, brightness in zip(
+        particles.x, particles.y, particles.sizes, particles.speed, particles.drift, particles.brightness
+    ):
+        px = int((x + drift * t) % 1.0 * w)
+        py = int((y - speed * t) % 1.0 * h)
+        y1, y2 = max(0, py - size), min(h, py + size)
+        x1, x2 = max(0, px - size), min(w, px + size)
+        if y2 > y1 and x2 > x1:
+            yy, xx = np.ogrid[y1:y2, x1:x2]
+            dist = np.sqrt((xx - px)**2 + (yy - py)**2)
+            shape = np.clip(1 - dist / size, 0, 1) * brightness
+            dust[y1:y2, x1:x2] = np.maximum(dust[y1:y2, x1:x2], shape)
+    return dust
+
+
+class TestParticles:
+    """Tests for DustParticles and SparkleParticles."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.dust = DustParticles(64, 48, num_particles=60)
+
+    def test_layout_is_deterministic(self):
+        """Test that the same seed gives the same particles."""
+        other = DustParticles(64, 48, num_particles=60)
+        np.testing.assert_array_equal(other.x, self.dust.x)
+        np.testing.assert_array_equal(other.sizes, self.dust.sizes)
+
+    def test_layer_matches_per_particle_drawing(self):
+        """Test that the scattered layer equals drawing particles one by one."""
+        for t in (0.0, 1.3, 7.5):
+            flat, values = self.dust.render_layer(t)
+            layer = np.zeros(64 * 48, dtype=np.float32)
+            layer[flat] = values
+            np.testing.assert_array_equal(layer.reshape(48, 64), _draw_dust_reference(self.dust, t))
+
+    def test_composite_only_touches_particle_pixels(self):
+        """Test that pixels without particles are left unchanged."""
+        sparkle = SparkleParticles(64, 48, num_sparkles=15)
+        frame = np.full((48, 64, 3), 100, dtype=np.uint8)
+        flat, _ = sparkle.render_layer(0.5)
+
+        result = sparkle.composite(frame, 0.5, intensity=0.4)
+
+        untouched = np.ones(64 * 48, dtype=bool)
+        untouched[flat] = False
+        assert np.all(result.reshape(-1, 3)[untouched] == 100)
+        assert np.all(result.reshape(-1, 3)[flat] >= 100)
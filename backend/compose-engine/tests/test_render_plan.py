@@ -0,0 +1,207 @@
+"""Tests for the render plan IR, optimizer passes and compiler."""
+
+import json
+import os
+
+import pytest
+import app.services  # noqa: F401 - app.renderers imports app.services first
+from app.renderers.audio.audio_processor import AudioSettings
+from app.renderers.fused_render import plan_fused_render
+from app.renderers.render_plan import (
+    ENCODER_OPTS,
+    RenderPlan,
+    choose_stream_copy,
+    compile_plan,
+    dedupe_nodes,
+    drop_noop_filters,
+    fuse_filter_chains,
+    optimize,
+)
+
+
+def _filter_complex(cmd):
+    return cmd[cmd.index("-filter_complex") + 1]
+
+
+class TestRenderPlan:
+    """Tests for RenderPlan building and serialization."""
+
+    def _plan(self) -> RenderPlan:
+        plan = RenderPlan(job_id="job", metadata={"slots": 1})
+        image = plan.add_input(path="a.png", args=["-loop", "1"])
+        video = plan.add_filter([f"{image}:v"], ["scale=100:100"], label="prepare")
+        plan.add_file("subs.ass", "[Script Info]\n")
+        video = plan.add_filter([video], [{"ass": "subs.ass"}], label="text")
+        music = plan.add_input(url="https://cdn/music.mp3")
+        plan.set_output(video, f"{music}:a", fps=24, shortest=True)
+        return plan
+
+    def test_from_dict_round_trip(self):
+        """Test that a plan survives JSON serialization unchanged."""
+        plan = self._plan()
+
+        restored = RenderPlan.from_dict(json.loads(plan.to_json()))
+
+        assert restored.to_dict() == plan.to_dict()
+        assert restored.dump() == plan.dump()
+        # New nodes must not reuse restored ids
+        added = restored.add_filter([restored.output.inputs[0]], ["null"])
+        assert added not in plan.nodes
+
+    def test_from_dict_rejects_other_versions(self):
+        """Test that plans from another IR version are refused."""
+        data = self._plan().to_dict()
+        data["version"] = 99
+
+        with pytest.raises(ValueError):
+            RenderPlan.from_dict(data)
+
+
+class TestOptimizerPasses:
+    """Tests for the individual optimizer passes."""
+
+    def test_drop_noop_filters(self):
+        """Test that disabled and pass-through filters are bypassed."""
+        plan = RenderPlan()
+        source = plan.add_input(path="a.mp4")
+        video = plan.add_filter([f"{source}:v"], ["null", "scale=100:100"])
+        effects = plan.add_filter([video], ["eq=contrast=1.2"], enabled=False)
+        passthrough = plan.add_filter([effects], ["null"])
+        plan.set_output(passthrough)
+
+        assert drop_noop_filters(plan) == 2
+        assert plan.output.inputs == [video]
+        assert plan.nodes[video].params["chain"] == ["scale=100:100"]
+
+    def test_dedupe_nodes(self):
+        """Test that identical inputs and filters merge, unique ones do not."""
+        plan = RenderPlan()
+        holds = []
+        for _ in range(3):
+            image = plan.add_input(path="a.png")
+            prepared = plan.add_filter([f"{image}:v"], ["scale=100:100"])
+            holds.append(plan.add_filter([prepared], ["loop=loop=29:size=1:start=0"], unique=True))
+        concat = plan.add_filter(holds, ["concat=n=3:v=1:a=0"])
+        plan.set_output(concat)
+
+        assert dedupe_nodes(plan) == 4
+
+        ops = [node.op for node in plan.nodes.values()]
+        assert ops.count("input") == 1
+        assert len([n for n in plan.nodes.values() if n.params.get("unique")]) == 3
+        hold_inputs = {plan.nodes[hold].inputs[0] for hold in holds}
+        assert len(hold_inputs) == 1
+
+    def test_fuse_filter_chains(self):
+        """Test that single-consumer steps fuse and fan-out points stay."""
+        plan = RenderPlan()
+        source = plan.add_input(path="a.mp4")
+        scaled = plan.add_filter([f"{source}:v"], ["scale=100:100"])
+        graded = plan.add_filter([scaled], ["eq=contrast=1.2"])
+        left = plan.add_filter([graded], ["hflip"])
+        right = plan.add_filter([graded], ["vflip"])
+        stacked = plan.add_filter([left, right], ["hstack"])
+        plan.set_output(stacked)
+
+        assert fuse_filter_chains(plan) == 1
+
+        assert plan.nodes[scaled].params["chain"] == ["scale=100:100", "eq=contrast=1.2"]
+        assert graded not in plan.nodes
+        assert plan.nodes[left].inputs == [scaled]
+        assert plan.nodes[right].inputs == [scaled]
+
+    def test_choose_stream_copy(self):
+        """Test that unfiltered output streams are copied, filtered ones encoded."""
+        plan = RenderPlan()
+        source = plan.add_input(path="a.mp4")
+        music = plan.add_input(path="music.m4a")
+        video = plan.add_filter([f"{source}:v"], ["scale=100:100"])
+        plan.set_output(video, f"{music}:a")
+
+        assert choose_stream_copy(plan) == 1
+        assert plan.output.params["video_codec"] == "encode"
+        assert plan.output.params["audio_codec"] == "copy"
+
+    def test_optimize_prunes_unreachable(self):
+        """Test that nodes the output does not use are removed."""
+        plan = RenderPlan()
+        source = plan.add_input(path="a.mp4")
+        plan.add_filter([f"{source}:v"], ["hflip"])
+        plan.set_output(f"{source}:v")
+
+        stats = optimize(plan)
+
+        assert stats["pruned"] == 1
+        assert set(plan.nodes) == {source, "out"}
+
+
+class TestCompilePlan:
+    """Tests for compiling plans into FFmpeg commands."""
+
+    def test_compiled_argv(self, tmp_path):
+        """Test the full command for a filtered video with copied audio."""
+        plan = RenderPlan()
+        image = plan.add_input(path="a.png", args=["-loop", "1"])
+        video = plan.add_filter([f"{image}:v"], ["scale=100:100"])
+        music = plan.add_input(path="music.m4a")
+        plan.set_output(video, f"{music}:a", fps=24, shortest=True)
+        optimize(plan)
+
+        cmd = compile_plan(plan, "out.mp4", str(tmp_path), encoder="libx264", ffmpeg_path="ffmpeg")
+
+        assert cmd == [
+            "ffmpeg", "-y",
+            "-loop", "1", "-i", "a.png",
+            "-i", "music.m4a",
+            "-filter_complex", f"[0:v]scale=100:100[{video}]",
+            "-map", f"[{video}]",
+            "-map", "1:a", "-c:a", "copy", "-shortest",
+            *ENCODER_OPTS["libx264"],
+            "-pix_fmt", "yuv420p", "-r", "24",
+            "-movflags", "+faststart",
+            "out.mp4",
+        ]
+
+    def test_fan_out_uses_split(self, tmp_path):
+        """Test that a stream feeding several filters is split once."""
+        plan = RenderPlan()
+        source = plan.add_input(path="a.png")
+        left = plan.add_filter([f"{source}:v"], ["hflip"])
+        right = plan.add_filter([f"{source}:v"], ["vflip"])
+        plan.set_output(plan.add_filter([left, right], ["hstack"]))
+
+        cmd = compile_plan(plan, "out.mp4", str(tmp_path), ffmpeg_path="ffmpeg")
+
+        graph = _filter_complex(cmd).split(";")
+        assert graph[0] == f"[0:v]split=2[{source}_v_0][{source}_v_1]"
+        assert cmd.count("-i") == 1
+
+    def test_ass_files_written_to_work_dir(self, tmp_path):
+        """Test that subtitle files travel with the plan and are referenced by path."""
+        plan = RenderPlan()
+        source = plan.add_input(path="a.mp4")
+        plan.add_file("subs.ass", "[Script Info]\n")
+        plan.set_output(plan.add_filter([f"{source}:v"], [{"ass": "subs.ass"}]))
+
+        cmd = compile_plan(plan, "out.mp4", str(tmp_path), ffmpeg_path="ffmpeg")
+
+        assert os.path.exists(tmp_path / "subs.ass")
+        assert "subs.ass" in _filter_complex(cmd)
+
+    def test_audio_chain_with_escaped_commas(self, tmp_path):
+        """Test that the hook volume expression reaches FFmpeg intact."""
+        settings = AudioSettings(tiktok_hook_enabled=True, tiktok_hook_duration=2.0, tiktok_hook_volume=0.7)
+        plan = plan_fused_render(
+            image_paths=["a.png"],
+            durations=[5.0],
+            output_size=(100, 100),
+            audio_path="music.mp3",
+            audio_settings=settings,
+        )
+        optimize(plan)
+
+        cmd = compile_plan(plan, "out.mp4", str(tmp_path), ffmpeg_path="ffmpeg")
+
+        assert "volume='if(lt(t\\,2.0)\\,0.7\\,1.0)':eval=frame" in _filter_complex(cmd)
+        audio = [n for n in plan.nodes.values() if n.params.get("label") == "audio"]
+        assert len(audio) == 1 and len(audio[0].params["chain"]) == 1
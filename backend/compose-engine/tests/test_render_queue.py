@@ -0,0 +1,122 @@
+"""Tests for the priority-aware render admission queue."""
+
+import asyncio
+
+import pytest
+from app.utils.render_queue import RenderPriority, RenderQueue
+
+
+class TestRenderQueue:
+    """Tests for RenderQueue admission order and estimates."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.now = 0.0
+        self.queue = RenderQueue(max_concurrent=1, aging_seconds=300, default_duration=60, clock=lambda: self.now)
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self):
+        """Test that an interactive job jumps ahead of queued variations and batches."""
+        running = self.queue.enqueue("running", RenderPriority.BATCH)
+        batch = self.queue.enqueue("batch", RenderPriority.BATCH)
+        variation = self.queue.enqueue("variation", RenderPriority.VARIATION)
+        interactive = self.queue.enqueue("interactive", RenderPriority.INTERACTIVE)
+
+        assert running.future.done()
+        assert [self.queue.position(t.job_id) for t in (batch, variation, interactive)] == [3, 2, 1]
+
+        self.queue.release(running)
+        assert interactive.future.done() and not variation.future.done()
+        self.queue.release(interactive)
+        assert variation.future.done() and not batch.future.done()
+
+    @pytest.mark.asyncio
+    async def test_tenant_fair_share(self):
+        """Test that a tenant with nothing running goes before a busy tenant's backlog."""
+        self.queue = RenderQueue(max_concurrent=2, clock=lambda: self.now)
+        self.queue.enqueue("big-0", RenderPriority.VARIATION, tenant="big")
+        self.queue.enqueue("big-1", RenderPriority.VARIATION, tenant="big")
+        self.queue.enqueue("big-2", RenderPriority.VARIATION, tenant="big")
+        self.queue.enqueue("small-0", RenderPriority.VARIATION, tenant="small")
+
+        assert self.queue.position("small-0") == 1
+        assert self.queue.position("big-2") == 2
+
+    @pytest.mark.asyncio
+    async def test_aging_prevents_starvation(self):
+        """Test that a long-waiting batch job is promoted past newer variations."""
+        self.queue.enqueue("running", RenderPriority.INTERACTIVE)
+        self.queue.enqueue("batch", RenderPriority.BATCH)
+        self.now = 301
+        self.queue.enqueue("variation", RenderPriority.VARIATION)
+
+        assert self.queue.position("batch") == 1
+
+    @pytest.mark.asyncio
+    async def test_eta_from_history(self):
+        """Test that ETAs use the durations of finished jobs."""
+        for job_id in ("a", "b"):
+            ticket = self.queue.enqueue(job_id, kind="auto_compose")
+            self.now += 20
+            self.queue.release(ticket)
+        assert self.queue.estimate_duration("auto_compose") == 20
+
+        first = self.queue.enqueue("first", kind="auto_compose")
+        self.now += 5
+        self.queue.enqueue("second", kind="auto_compose")
+        self.queue.enqueue("third", kind="auto_compose")
+
+        assert self.queue.status("first") == {"queue_position": 0, "eta_seconds": 0.0}
+        assert self.queue.status("second") == {"queue_position": 1, "eta_seconds": 15.0}
+        assert self.queue.status("third") == {"queue_position": 2, "eta_seconds": 35.0}
+
+        self.now += 5
+        self.queue.release(first, failed=True)
+        stats = self.queue.stats()
+        assert stats["failed"] == 1
+        assert stats["waiting"] == 1
+        assert stats["wait_times"]["interactive"]["max_seconds"] == 5.0
+
+    @pytest.mark.asyncio
+    async def test_slot_cancelled_while_waiting(self):
+        """Test that a cancelled waiter leaves the queue without taking a slot."""
+        release = asyncio.Event()
+
+        async def hold(job_id):
+            async with self.queue.slot(job_id):
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold("holder"))
+        waiter = asyncio.ensure_future(hold("waiter"))
+        await asyncio.sleep(0.01)
+        assert self.queue.position("waiter") == 1
+
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        assert self.queue.position("waiter") is None
+        assert self.queue.stats()["cancelled"] == 1
+
+        release.set()
+        await holder
+        assert self.queue.stats()["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_duplicate_job_id_keeps_separate_slots(self):
+        """Test that two tickets with the same job_id are released independently."""
+        self.queue.max_concurrent = 2
+        first = self.queue.enqueue("dup", tenant="a")
+        second = self.queue.enqueue("dup", tenant="a")
+        waiting = self.queue.enqueue("next", tenant="b")
+        assert first.future.done() and second.future.done()
+        assert self.queue.stats()["running_by_tenant"] == {"a": 2}
+
+        self.queue.release(first)
+        assert self.queue.stats()["running_by_tenant"] == {"a": 1, "b": 1}
+        assert self.queue.position("dup") == 0
+        self.queue.release(first)  # Second release of the same ticket is a no-op
+        assert self.queue.stats()["completed"] == 1
+
+        self.queue.release(second)
+        self.queue.release(waiting)
+        stats = self.queue.stats()
+        assert (stats["running"], stats["running_by_tenant"], stats["completed"]) == (0, {}, 3)
@@ -0,0 +1,166 @@
+"""Tests for process-pool segment rendering."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+from app.slideshow_v2.renderer import segment_pool
+from app.slideshow_v2.renderer.engine import RenderConfig
+from app.utils import ffmpeg_scheduler
+
+
+def _attach_and_read(task):
+    """Worker stand-in: map the shared image and report what it sees."""
+    shm = shared_memory.SharedMemory(name=task.image.shm_name)
+    try:
+        pixels = np.ndarray(task.image.shape, dtype=np.uint8, buffer=shm.buf)
+        color = tuple(int(c) for c in pixels[0, 0])
+        del pixels
+    finally:
+        shm.close()
+    return task.index, color, 0.0
+
+
+def _skip_warm(workers):
+    """Worker initializer stand-in (no effects setup needed)."""
+
+
+def _report_budget(task):
+    """Worker stand-in: report this worker's FFmpeg scheduler budget."""
+    scheduler = ffmpeg_scheduler.get_ffmpeg_scheduler()
+    return task.index, (scheduler.max_processes, scheduler.cpu_count), 0.0
+
+
+def _exit_worker(task):
+    """Worker stand-in that dies like an OOM-killed process."""
+    os._exit(1)
+
+
+class FakeRenderer:
+    """Just the SlideshowRenderer surface render_segments_in_processes uses."""
+
+    def __init__(self, temp_dir: str):
+        self.config = RenderConfig(max_workers=2)
+        self._temp_dir = temp_dir
+        self.rendered_in_process = []
+
+    def _segment_effect_params(self, segment, timeline):
+        return {"num_frames": int(segment.duration * 30)}
+
+    def _render_single_segment(self, segment, timeline, output_path):
+        self.rendered_in_process.append(output_path)
+
+
+class TestSegmentPool:
+    """Tests for shared images, pool reuse and worker failure."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.created = []
+
+    def teardown_method(self):
+        """Stop any pool a test started."""
+        segment_pool.shutdown_segment_pool()
+
+    def _timeline(self, tmp_path, colors, durations):
+        segments = []
+        for i, (color, duration) in enumerate(zip(colors, durations)):
+            path = str(tmp_path / f"{color}.png")
+            if not os.path.exists(path):
+                Image.new("RGB", (8, 6), color).save(path)
+            segments.append(SimpleNamespace(index=i, image_path=path, duration=duration))
+        return SimpleNamespace(segments=segments)
+
+    def _track_shared(self, monkeypatch):
+        share_image = segment_pool._share_image
+
+        def tracked(image_path):
+            shm, shared = share_image(image_path)
+            self.created.append(shared.shm_name)
+            return shm, shared
+
+        monkeypatch.setattr(segment_pool, "_share_image", tracked)
+
+    def _assert_released(self):
+        for name in self.created:
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_share_image_attach_and_release(self, tmp_path):
+        """Test that a shared image can be mapped by name until it is unlinked."""
+        path = str(tmp_path / "a.png")
+        Image.new("RGB", (8, 6), (10, 20, 30)).save(path)
+
+        shm, shared = segment_pool._share_image(path)
+        try:
+            assert shared.shape == (6, 8, 3)
+            task = SimpleNamespace(index=0, image=shared)
+            assert _attach_and_read(task) == (0, (10, 20, 30), 0.0)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shared.shm_name)
+
+    def test_render_shares_each_image_once(self, tmp_path, monkeypatch):
+        """Test that repeated images share one block, freed after the render."""
+        self._track_shared(monkeypatch)
+        executor = ThreadPoolExecutor(max_workers=2)
+        monkeypatch.setattr(segment_pool, "get_segment_pool", lambda max_workers: executor)
+        monkeypatch.setattr(segment_pool, "_render_segment_task", _attach_and_read)
+        renderer = FakeRenderer(str(tmp_path))
+        timeline = self._timeline(tmp_path, ["red", "blue", "red"], [0.5, 1.0, 0.2])
+
+        try:
+            results = segment_pool.render_segments_in_processes(renderer, timeline)
+        finally:
+            executor.shutdown()
+
+        # Results come back in timeline order, whatever order they finished in
+        assert results == [(255, 0, 0), (0, 0, 255), (255, 0, 0)]
+        assert len(self.created) == 2
+        assert renderer.rendered_in_process == []
+        self._assert_released()
+
+    def test_pool_reused_for_same_worker_count(self):
+        """Test that the pool is kept between renders and replaced on resize."""
+        pool = segment_pool.get_segment_pool(2)
+
+        assert segment_pool.get_segment_pool(2) is pool
+        resized = segment_pool.get_segment_pool(3)
+        assert resized is not pool
+        segment_pool.shutdown_segment_pool()
+        assert segment_pool.get_segment_pool(3) is not resized
+
+    def test_worker_exit_falls_back_and_cleans_up(self, tmp_path, monkeypatch):
+        """Test that a dead worker drops the pool, renders in-process and frees memory."""
+        self._track_shared(monkeypatch)
+        # Spawned workers import this module to find the stand-in
+        monkeypatch.setattr(segment_pool, "_render_segment_task", _exit_worker)
+        monkeypatch.setattr(segment_pool, "_warm_worker", _skip_warm)
+        renderer = FakeRenderer(str(tmp_path))
+        timeline = self._timeline(tmp_path, ["red", "green"], [0.5, 1.0])
+
+        results = segment_pool.render_segments_in_processes(renderer, timeline)
+
+        expected = [os.path.join(str(tmp_path), f"segment_{i:03d}.mp4") for i in range(2)]
+        assert results == expected
+        assert sorted(renderer.rendered_in_process) == expected
+        assert segment_pool._pool is None
+        self._assert_released()
+
+    def test_workers_split_ffmpeg_budget(self, tmp_path, monkeypatch):
+        """Test that each worker gets its share of the FFmpeg budget, not all of it."""
+        monkeypatch.setattr(segment_pool, "_render_segment_task", _report_budget)
+        renderer = FakeRenderer(str(tmp_path))
+        timeline = self._timeline(tmp_path, ["red", "green"], [0.5, 1.0])
+
+        results = segment_pool.render_segments_in_processes(renderer, timeline)
+
+        share = ffmpeg_scheduler._scheduler_from_settings(workers=2)
+        assert results == [(share.max_processes, share.cpu_count)] * 2
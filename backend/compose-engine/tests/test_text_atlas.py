@@ -0,0 +1,109 @@
+"""Tests for text sprites and the text atlas."""
+
+import os
+
+import pytest
+from PIL import Image
+import app.services  # noqa: F401 - app.renderers imports app.services first
+from app.renderers.filters import text_overlay
+from app.renderers.filters.text_atlas import ATLAS_PADDING, pack_text_atlas
+from app.renderers.filters.text_overlay import render_text_sprite, resolve_pillow_font_path
+
+
+def _overlaps(a, b, padding):
+    return not (
+        a.x + a.width + padding <= b.x
+        or b.x + b.width + padding <= a.x
+        or a.y + a.height + padding <= b.y
+        or b.y + b.height + padding <= a.y
+    )
+
+
+class TestPackTextAtlas:
+    """Tests for pack_text_atlas."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        sizes = [(120, 30), (40, 44), (200, 18), (75, 30), (10, 10), (160, 52), (33, 27)]
+        self.images = [
+            Image.new("RGBA", size, (i * 30, 255 - i * 30, 100, 255))
+            for i, size in enumerate(sizes)
+        ]
+
+    def test_regions_do_not_overlap(self):
+        """Test that padded regions are disjoint and inside the atlas."""
+        atlas = pack_text_atlas(self.images)
+
+        regions = atlas.regions
+        for i, region in enumerate(regions):
+            assert region.x + region.width <= atlas.image.width
+            assert region.y + region.height <= atlas.image.height
+            for other in regions[i + 1:]:
+                assert not _overlaps(region, other, ATLAS_PADDING)
+
+    def test_regions_hold_their_sprites(self):
+        """Test that cropping a region gives back the sprite's pixels."""
+        atlas = pack_text_atlas(self.images)
+
+        for image, region in zip(self.images, atlas.regions):
+            crop = atlas.image.crop((region.x, region.y, region.x + region.width, region.y + region.height))
+            assert (region.width, region.height) == image.size
+            assert crop.tobytes() == image.tobytes()
+            assert region.crop_filter() == f"crop={region.width}:{region.height}:{region.x}:{region.y}"
+
+    def test_repeated_images_share_a_region(self):
+        """Test that the same image object is packed once."""
+        atlas = pack_text_atlas([self.images[0], self.images[1], self.images[0]])
+
+        assert atlas.regions[0] == atlas.regions[2]
+        assert atlas.regions[0] != atlas.regions[1]
+
+    def test_empty_input_rejected(self):
+        """Test that packing nothing is an error."""
+        with pytest.raises(ValueError):
+            pack_text_atlas([])
+
+
+class TestTextSprites:
+    """Tests for cached text rasterization."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        text_overlay._rasterize_text.cache_clear()
+
+    def teardown_method(self):
+        """Don't leak monkeypatched font lookups into other tests."""
+        resolve_pillow_font_path.cache_clear()
+        text_overlay._rasterize_text.cache_clear()
+
+    def test_sprite_cache_hit(self):
+        """Test that the same caption is rasterized once and shared."""
+        first = render_text_sprite("Hello world", (720, 1280))
+        second = render_text_sprite("Hello world", (720, 1280))
+        other = render_text_sprite("Hello world", (720, 1280), style="bold")
+
+        assert second is first
+        assert other is not first
+        info = text_overlay._rasterize_text.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+
+    def test_sprite_is_cropped_and_placed(self):
+        """Test that the sprite is tight and positioned where it was drawn."""
+        sprite = render_text_sprite("Hello", (720, 1280))
+
+        assert sprite.image.width < 720 and sprite.image.height < 1280
+        assert sprite.image.getbbox() == (0, 0, sprite.image.width, sprite.image.height)
+        # Centered on the frame
+        assert abs(sprite.x + sprite.image.width / 2 - 360) <= 2
+        assert abs(sprite.y + sprite.image.height / 2 - 640) <= sprite.image.height
+
+    def test_resolve_font_path(self, monkeypatch):
+        """Test that the first loadable font wins and missing fonts fall back to None."""
+        resolve_pillow_font_path.cache_clear()
+        path = resolve_pillow_font_path()
+        assert path is None or os.path.exists(path)
+        assert resolve_pillow_font_path() == path
+
+        resolve_pillow_font_path.cache_clear()
+        monkeypatch.setattr(text_overlay, "PILLOW_FONT_CANDIDATES", ["/nonexistent/font.ttf"])
+        assert resolve_pillow_font_path() is None
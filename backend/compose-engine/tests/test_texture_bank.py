@@ -0,0 +1,58 @@
+"""Tests for the overlay texture bank."""
+
+import numpy as np
+import pytest
+from app.effects.texture_bank import TextureBank
+
+
+class TestTextureBank:
+    """Tests for TextureBank."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        # Room for two 8x8x3 float32 textures
+        self.bank = TextureBank(max_bytes=2 * 8 * 8 * 3 * 4)
+        self.builds = []
+
+    def _build(self, value):
+        def build():
+            self.builds.append(value)
+            return np.full((8, 8, 3), value, dtype=np.float64)
+        return build
+
+    def test_builds_once_per_key(self):
+        """Test that a texture is generated once and then served from cache."""
+        first = self.bank.get("leak", 8, 8, self._build(0.5), variant="warm")
+        second = self.bank.get("leak", 8, 8, self._build(0.9), variant="warm")
+
+        assert self.builds == [0.5]
+        assert second is first
+        assert first.dtype == np.float32
+        assert self.bank.stats()["hits"] == 1
+
+    def test_textures_are_read_only(self):
+        """Test that cached textures cannot be modified by effects."""
+        texture = self.bank.get("leak", 8, 8, self._build(0.5))
+        with pytest.raises(ValueError):
+            texture[0, 0, 0] = 1.0
+
+    def test_rgb_is_part_of_key(self):
+        """Test that custom colors get their own textures."""
+        self.bank.get("leak", 8, 8, self._build(0.1), rgb=(1.0, 0.5, 0.0))
+        self.bank.get("leak", 8, 8, self._build(0.2), rgb=(0.0, 0.5, 1.0))
+        assert self.builds == [0.1, 0.2]
+
+    def test_evicts_least_recently_used(self):
+        """Test LRU eviction once the byte budget is exceeded."""
+        self.bank.get("a", 8, 8, self._build(1))
+        self.bank.get("b", 8, 8, self._build(2))
+        self.bank.get("a", 8, 8, self._build(1))  # a is now most recent
+        self.bank.get("c", 8, 8, self._build(3))  # evicts b
+
+        self.bank.get("a", 8, 8, self._build(1))
+        self.bank.get("b", 8, 8, self._build(2))
+
+        assert self.builds == [1, 2, 3, 2]
+        stats = self.bank.stats()
+        assert stats["bytes"] <= stats["max_bytes"]
+        assert stats["evictions"] == 2
@@ -0,0 +1,166 @@
+"""Tests for multipart and streaming uploads."""
+
+import asyncio
+import os
+
+import pytest
+from app.utils.object_store import LocalBackend, ObjectStore, ObjectStoreError, S3Backend
+from app.utils.uploader import MIN_PART_SIZE, StreamingUpload, upload_multipart
+
+BUCKET = "hydra-test"
+
+
+class RecordingMixin:
+    """Slows part uploads down, checks part numbering and records aborted uploads."""
+
+    aborted: list
+
+    async def upload_part(self, bucket, key, upload_id, part_number, data):
+        await asyncio.sleep(0.01)
+        return await super().upload_part(bucket, key, upload_id, part_number, data)
+
+    async def complete_multipart(self, bucket, key, upload_id, parts):
+        numbers = [number for number, _ in parts]
+        assert numbers == list(range(1, len(parts) + 1))
+        await super().complete_multipart(bucket, key, upload_id, parts)
+
+    async def abort_multipart(self, bucket, key, upload_id):
+        self.aborted.append(upload_id)
+        await super().abort_multipart(bucket, key, upload_id)
+
+
+class RecordingLocalBackend(RecordingMixin, LocalBackend):
+    """Local backend that also enforces S3's minimum part size."""
+
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.aborted = []
+
+    async def complete_multipart(self, bucket, key, upload_id, parts):
+        part_dir = self._multipart_dir(upload_id)
+        assert all(os.path.getsize(os.path.join(part_dir, f"{n:05d}")) >= MIN_PART_SIZE for n, _ in parts[:-1])
+        await super().complete_multipart(bucket, key, upload_id, parts)
+
+
+class RecordingS3Backend(RecordingMixin, S3Backend):
+    """S3Backend against the moto/MinIO test server."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.aborted = []
+
+
+@pytest.fixture(params=["local", "s3"])
+def target(request, tmp_path):
+    """(store, bucket URI prefix, backend): local files, and an S3 server when available."""
+    store = ObjectStore(upload_connections=8)
+    if request.param == "local":
+        backend = RecordingLocalBackend(str(tmp_path / "store"))
+        store.register("file", lambda http: backend)
+        return store, f"file://{BUCKET}", backend
+
+    endpoint, access_key_id, secret_access_key = request.getfixturevalue("s3_endpoint")
+    bucket = request.getfixturevalue("s3_bucket")
+    store.register("s3", lambda http: RecordingS3Backend(
+        http, region="us-east-1", endpoint_url=endpoint,
+        access_key_id=access_key_id, secret_access_key=secret_access_key,
+    ))
+    return store, f"s3://{bucket}", store.backend("s3")
+
+
+class TestUploader:
+    """Tests for upload_multipart and StreamingUpload."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.data = os.urandom(2 * MIN_PART_SIZE + 12345)
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload_with_progress(self, target, tmp_path):
+        """Test that a large file goes up as parallel parts and reports progress."""
+        store, prefix, backend = target
+        path = tmp_path / "out.mp4"
+        path.write_bytes(self.data)
+        reports = []
+
+        async def progress(uploaded, total):
+            reports.append((uploaded, total))
+
+        await upload_multipart(
+            store, f"{prefix}/out.mp4", str(path),
+            part_size=MIN_PART_SIZE, concurrency=3, content_type="video/mp4", progress=progress,
+        )
+        data = await store.read(f"{prefix}/out.mp4")
+        await store.close()
+
+        assert data == self.data
+        assert len(reports) == 3
+        assert reports[-1] == (len(self.data), len(self.data))
+        assert store.uploads.stats()["peak_in_use"] > 1
+
+    @pytest.mark.asyncio
+    async def test_small_file_single_put(self, target, tmp_path):
+        """Test that files up to one part use a single PUT."""
+        store, prefix, backend = target
+        path = tmp_path / "small.mp4"
+        path.write_bytes(b"x" * 1000)
+
+        await upload_multipart(store, f"{prefix}/small.mp4", str(path))
+        data = await store.read(f"{prefix}/small.mp4")
+        await store.close()
+
+        assert data == b"x" * 1000
+        assert store.uploads.stats()["acquired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_streaming_upload_while_writing(self, target, tmp_path):
+        """Test that full parts are uploaded before the writer finishes."""
+        store, prefix, backend = target
+        path = str(tmp_path / "growing.mp4")
+        upload = StreamingUpload(
+            store, f"{prefix}/growing.mp4", path,
+            part_size=MIN_PART_SIZE, poll_interval=0.01,
+        )
+        await upload.start()
+
+        with open(path, "wb") as f:
+            for start in range(0, len(self.data), 1024 * 1024):
+                f.write(self.data[start:start + 1024 * 1024])
+                f.flush()
+                await asyncio.sleep(0.02)
+        await asyncio.sleep(0.1)
+        await upload.complete()
+        data = await store.read(f"{prefix}/growing.mp4")
+        await store.close()
+
+        assert upload.completed
+        assert upload._parts_before_exit == 2
+        assert data == self.data
+
+    @pytest.mark.asyncio
+    async def test_streaming_upload_aborts_if_uploaded_bytes_change(self, target, tmp_path):
+        """Test that a writer seeking back into uploaded parts aborts the upload."""
+        store, prefix, backend = target
+        path = str(tmp_path / "rewritten.mp4")
+        upload = StreamingUpload(
+            store, f"{prefix}/rewritten.mp4", path,
+            part_size=MIN_PART_SIZE, poll_interval=0.01,
+        )
+        await upload.start()
+
+        with open(path, "wb") as f:
+            f.write(self.data)
+            f.flush()
+            await asyncio.sleep(0.2)
+            f.seek(0)
+            f.write(b"moov")
+
+        with pytest.raises(IOError, match="changed"):
+            await upload.complete()
+        with pytest.raises(ObjectStoreError) as excinfo:
+            await store.head(f"{prefix}/rewritten.mp4")
+        await store.close()
+
+        assert not upload.completed
+        assert len(backend.aborted) == 1
+        assert excinfo.value.status == 404
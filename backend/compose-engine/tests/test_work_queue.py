@@ -0,0 +1,154 @@
+"""Tests for the Redis Streams work queue and render worker."""
+
+import asyncio
+
+import pytest
+from app.utils.render_queue import RenderPriority
+from app.utils.work_queue import InMemoryStreams, WorkQueue
+from app.worker import RenderWorker
+
+
+@pytest.fixture(params=["memory", "fakeredis"])
+def streams_client(request):
+    """Stream client: the in-memory fallback, and fakeredis when installed."""
+    if request.param == "memory":
+        return InMemoryStreams()
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+class TestWorkQueue:
+    """Tests for WorkQueue delivery, acknowledgement and retries."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_most_urgent_first(self, streams_client):
+        """Test that interactive work is read before older batch work."""
+        queue = WorkQueue(streams_client, consumer="w1")
+        await queue.enqueue("render", {"n": 1}, "batch-job", RenderPriority.BATCH)
+        await queue.enqueue("render", {"n": 2}, "interactive-job", RenderPriority.INTERACTIVE)
+
+        items = await queue.fetch(2, block_ms=0)
+        assert [item.job_id for item in items] == ["interactive-job", "batch-job"]
+        assert items[1].payload == {"n": 1}
+
+        for item in items:
+            await queue.ack(item)
+        assert await queue.fetch(2, block_ms=0) == []
+        assert (await queue.queue_stats())["streams"]["batch"] == {"length": 0, "pending": 0}
+
+    @pytest.mark.asyncio
+    async def test_unacked_work_reclaimed_after_visibility_timeout(self, streams_client):
+        """Test that work from a dead worker is redelivered to another worker."""
+        crashed = WorkQueue(streams_client, consumer="crashed", visibility_timeout=0.1)
+        survivor = WorkQueue(streams_client, consumer="survivor", visibility_timeout=0.1)
+        await crashed.enqueue("render", {}, "job-1")
+
+        assert [item.job_id for item in await crashed.fetch(1, block_ms=0)] == ["job-1"]
+        assert await survivor.fetch(1, block_ms=0) == []
+
+        await asyncio.sleep(0.15)
+        items = await survivor.fetch(1, block_ms=0)
+        assert [(item.job_id, item.attempt) for item in items] == [("job-1", 2)]
+        assert survivor.stats["reclaimed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_touch_keeps_work_in_flight(self, streams_client):
+        """Test that refreshed work is not reclaimed."""
+        worker = WorkQueue(streams_client, consumer="busy", visibility_timeout=0.2)
+        other = WorkQueue(streams_client, consumer="other", visibility_timeout=0.2)
+        await worker.enqueue("render", {}, "job-1")
+        items = await worker.fetch(1, block_ms=0)
+
+        for _ in range(3):
+            await asyncio.sleep(0.1)
+            await worker.touch(items)
+            assert await other.fetch(1, block_ms=0) == []
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts(self, streams_client):
+        """Test that work failing max_attempts times goes to the dead-letter stream."""
+        queue = WorkQueue(streams_client, consumer="w1", max_attempts=2)
+        await queue.enqueue("render", {}, "job-1")
+
+        for attempt in (1, 2):
+            [item] = await queue.fetch(1, block_ms=0)
+            assert item.attempt == attempt
+            await queue.retry(item, "boom")
+
+        assert await queue.fetch(1, block_ms=0) == []
+        stats = await queue.queue_stats()
+        assert stats["retried"] == 1
+        assert stats["dead_lettered_total"] == 1
+
+
+class TestRenderWorker:
+    """Tests for RenderWorker running queued work."""
+
+    @pytest.mark.asyncio
+    async def test_runs_and_retries_work(self):
+        """Test that handlers run, failures are retried, and successes are acknowledged."""
+        queue = WorkQueue(InMemoryStreams(), consumer="w1", visibility_timeout=1)
+        calls = []
+
+        async def flaky(payload, job_queue):
+            calls.append(payload["name"])
+            if calls.count(payload["name"]) == 1 and payload["name"] == "flaky":
+                raise RuntimeError("transient")
+
+        worker = RenderWorker(queue, None, concurrency=2, handlers={"render": flaky}, block_ms=50)
+        await queue.enqueue("render", {"name": "ok"}, "job-ok")
+        await queue.enqueue("render", {"name": "flaky"}, "job-flaky")
+
+        task = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.3)
+        worker.stop()
+        await task
+
+        assert sorted(calls) == ["flaky", "flaky", "ok"]
+        assert queue.stats["acked"] == 3  # ok, flaky (retried), flaky
+        assert (await queue.queue_stats())["streams"]["interactive"] == {"length": 0, "pending": 0}
+
+    @pytest.mark.asyncio
+    async def test_render_jobs_go_through_render_queue(self, monkeypatch):
+        """Test that render jobs wait for a render slot like the other task kinds."""
+        import app.routers.render as render_router
+        from app.utils.render_queue import RenderQueue
+
+        render_queue = RenderQueue(max_concurrent=1)
+        monkeypatch.setattr(render_router, "get_render_queue", lambda: render_queue)
+        running = []
+        peak = []
+        release = asyncio.Event()
+
+        class FakeRenderer:
+            async def render(self, request, progress_callback):
+                running.append(request.job_id)
+                peak.append(len(running))
+                await release.wait()
+                running.remove(request.job_id)
+                return f"s3://out/{request.job_id}.mp4"
+
+        class FakeJobQueue:
+            def __init__(self):
+                self.updates = []
+
+            async def update_job(self, job_id, **fields):
+                self.updates.append((job_id, fields.get("status")))
+
+        monkeypatch.setattr(render_router, "VideoRenderer", FakeRenderer)
+        job_queue = FakeJobQueue()
+        requests = [
+            render_router.RenderRequest(job_id=f"job{i}", images=[], output={"s3_bucket": "b", "s3_key": f"k{i}"})
+            for i in range(3)
+        ]
+        tasks = [asyncio.ensure_future(render_router.process_render_job(r, job_queue)) for r in requests]
+        await asyncio.sleep(0.05)
+
+        assert running == ["job0"]
+        assert render_queue.stats()["waiting"] == 2
+        assert ("job1", "queued") in job_queue.updates
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert max(peak) == 1
+        assert render_queue.stats()["completed"] == 3
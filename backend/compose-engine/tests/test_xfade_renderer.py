@@ -0,0 +1,227 @@
+"""Tests for chunked (tree) xfade sequence rendering."""
+
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from PIL import Image
+from app.effects.filters import get_grade_lut
+from app.effects.renderers.xfade_renderer import (
+    INTERMEDIATE_ENCODER_OPTS,
+    ClipSegment,
+    XfadeRenderer,
+    xfade_groups,
+    xfade_timeline,
+)
+
+DURATIONS = [0.8, 1.0, 0.6, 1.2, 0.9, 0.7, 1.1, 0.8]
+# Clips shorter than two 0.2s transitions: neighbouring fades overlap
+SHORT_DURATIONS = [0.8, 1.0, 0.9, 0.3, 0.3, 1.0, 0.9, 0.3, 0.8, 0.7]
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None,
+    reason="ffmpeg not installed",
+)
+
+
+class TestChunkedXfade:
+    """Tests that the xfade tree lays clips out exactly like the flat chain."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.renderer = XfadeRenderer(ffmpeg_path="ffmpeg")
+        self.calls = []
+
+    def _record_chains(self, monkeypatch):
+        def run_chain(paths, starts, output_path, transitions, post_filters, encoder_opts, **kwargs):
+            self.calls.append({
+                "paths": paths,
+                "starts": starts,
+                "transitions": transitions,
+                "post_filters": post_filters,
+                "encoder_opts": encoder_opts,
+            })
+            open(output_path, "wb").close()
+            return True
+
+        monkeypatch.setattr(self.renderer, "_run_xfade_chain", run_chain)
+
+    def test_tree_offsets_match_flat(self, tmp_path, monkeypatch):
+        """Test that every boundary is joined once, at the flat chain's offset."""
+        self._record_chains(monkeypatch)
+        clips = [ClipSegment(path=f"clip{i}.mp4", duration=d) for i, d in enumerate(DURATIONS)]
+        transitions = [f"t{i}" for i in range(1, len(clips))]
+        starts, transition, _ = xfade_timeline(DURATIONS, 0.25, 30)
+
+        ok = self.renderer._render_sequence_chunked(
+            clips=clips,
+            starts=starts,
+            output_path=str(tmp_path / "out.mp4"),
+            transitions=transitions,
+            transition_duration=transition,
+            target_size=(64, 64),
+            post_filters=["eq=contrast=1.1"],
+            use_gpu=False,
+            group_size=3,
+            job_id="test",
+        )
+
+        assert ok
+        # Boundary transition -> start of the piece it brings in
+        joined = {}
+        for call in self.calls:
+            for name, start in zip(call["transitions"], call["starts"][1:]):
+                assert name not in joined
+                joined[name] = start
+        assert joined == {name: starts[i + 1] for i, name in enumerate(transitions)}
+
+        *groups, final = self.calls
+        assert all(call["post_filters"] == [] for call in groups)
+        assert all(call["encoder_opts"] == INTERMEDIATE_ENCODER_OPTS for call in groups)
+        assert all(len(call["paths"]) <= 3 for call in self.calls)
+        assert final["post_filters"] == ["eq=contrast=1.1"]
+        assert final["starts"][0] == 0.0
+
+    def test_groups_only_split_where_fades_do_not_overlap(self):
+        """Test that joins never touch a clip shorter than two transitions."""
+        starts, transition, _ = xfade_timeline(SHORT_DURATIONS, 0.2, 30)
+
+        groups = xfade_groups(starts, transition, 3)
+
+        assert groups[0][0] == 0 and groups[-1][1] == len(SHORT_DURATIONS)
+        for (_, end), (first, _) in zip(groups, groups[1:]):
+            assert end == first
+            assert SHORT_DURATIONS[first - 1] >= 0.4 and SHORT_DURATIONS[first] >= 0.4
+        assert groups == [(0, 2), (2, 6), (6, 9), (9, 10)]
+
+    def test_no_safe_join_renders_flat(self, tmp_path, monkeypatch):
+        """Test that a sequence of short clips is rendered as one chain."""
+        self._record_chains(monkeypatch)
+        durations = [0.3] * 6
+        clips = [ClipSegment(path=f"clip{i}.mp4", duration=d) for i, d in enumerate(durations)]
+        starts, transition, _ = xfade_timeline(durations, 0.2, 30)
+
+        assert self.renderer._render_sequence_chunked(
+            clips=clips,
+            starts=starts,
+            output_path=str(tmp_path / "out.mp4"),
+            transitions=["fade"] * 5,
+            transition_duration=transition,
+            target_size=(64, 64),
+            post_filters=[],
+            use_gpu=False,
+            group_size=2,
+            job_id="test",
+        )
+
+        assert len(self.calls) == 1
+        assert self.calls[0]["paths"] == [clip.path for clip in clips]
+
+    def _render_flat_and_tree(self, tmp_path, monkeypatch, durations, transition_duration):
+        colors = ["red", "green", "blue", "yellow", "cyan", "magenta", "white", "gray", "orange", "pink"]
+        clips = []
+        for i, (color, duration) in enumerate(zip(colors, durations)):
+            path = str(tmp_path / f"clip{i}.mp4")
+            subprocess.run(
+                [
+                    "ffmpeg", "-y", "-loglevel", "error",
+                    "-f", "lavfi", "-i", f"color=c={color}:s=64x64:r=30:d={duration}",
+                    "-c:v", "libx264", "-pix_fmt", "yuv420p", path,
+                ],
+                check=True,
+            )
+            clips.append(ClipSegment(path=path, duration=duration))
+        starts, transition, total = xfade_timeline(durations, transition_duration, 30)
+        transitions = ["fade"] * (len(clips) - 1)
+        # Lossless final encodes, so the frames themselves can be compared
+        monkeypatch.setattr(self.renderer, "_final_encoder_opts", lambda use_gpu: INTERMEDIATE_ENCODER_OPTS)
+
+        flat = str(tmp_path / "flat.mp4")
+        assert self.renderer._run_xfade_chain(
+            paths=[clip.path for clip in clips],
+            starts=starts,
+            output_path=flat,
+            transitions=transitions,
+            transition_duration=transition,
+            target_size=(64, 64),
+            post_filters=[],
+            encoder_opts=INTERMEDIATE_ENCODER_OPTS,
+            job_id="test",
+        )
+        tree = str(tmp_path / "tree.mp4")
+        assert self.renderer._render_sequence_chunked(
+            clips=clips,
+            starts=starts,
+            output_path=tree,
+            transitions=transitions,
+            transition_duration=transition,
+            target_size=(64, 64),
+            post_filters=[],
+            use_gpu=False,
+            group_size=3,
+            job_id="test",
+        )
+        return flat, tree, total
+
+    @staticmethod
+    def _frames(path):
+        result = subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-i", path, "-map", "0:v", "-f", "framemd5", "-"],
+            capture_output=True, text=True, check=True,
+        )
+        # stream, dts, pts, duration, size, md5
+        lines = [line for line in result.stdout.splitlines() if not line.startswith("#")]
+        return [tuple(field.strip() for field in line.split(",")[2::3]) for line in lines]
+
+    @requires_ffmpeg
+    def test_tree_matches_flat_frames(self, tmp_path, monkeypatch):
+        """Test that tree and flat renders have the same frames and timestamps."""
+        flat, tree, total = self._render_flat_and_tree(tmp_path, monkeypatch, DURATIONS, 0.25)
+
+        flat_frames = self._frames(flat)
+        assert len(flat_frames) == round(total * 30)
+        assert self._frames(tree) == flat_frames
+
+    @requires_ffmpeg
+    def test_tree_matches_flat_frames_with_short_clips(self, tmp_path, monkeypatch):
+        """Test that overlapping fades around short clips still match the flat chain."""
+        flat, tree, total = self._render_flat_and_tree(tmp_path, monkeypatch, SHORT_DURATIONS, 0.2)
+
+        flat_frames = self._frames(flat)
+        assert len(flat_frames) == round(total * 30)
+        assert self._frames(tree) == flat_frames
+
+
+class TestPostFilters:
+    """Tests for the filters applied after the transitions."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.renderer = XfadeRenderer(ffmpeg_path="ffmpeg")
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+
+    def test_natural_has_no_grade(self):
+        """Test that the natural grade adds no filter."""
+        assert self.renderer._build_post_filters("natural", None, None) == []
+
+    @requires_ffmpeg
+    @pytest.mark.parametrize("grade", ["vibrant", "cinematic", "bright", "moody", "bw"])
+    def test_grade_matches_python_lut(self, tmp_path, grade):
+        """Test that FFmpeg grades through the exported LUT, matching the Python path."""
+        [grade_filter] = self.renderer._build_post_filters(grade, None, None)
+        assert grade_filter.startswith("lut3d=")
+        source, output = str(tmp_path / "in.png"), str(tmp_path / "out.png")
+        Image.fromarray(self.frame).save(source)
+
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-i", source,
+             "-filter_complex", f"[0:v]{grade_filter}[vout]", "-map", "[vout]", output],
+            check=True,
+        )
+
+        graded = np.asarray(Image.open(output).convert("RGB")).astype(int)
+        expected = get_grade_lut(grade).apply(self.frame).astype(int)
+        # The 33^3 .cube is interpolated, the Python LUT is exact
+        assert np.abs(graded - expected).max() <= 3